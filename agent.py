@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 from livekit import agents
-from livekit.agents import AgentSession, Agent, RoomInputOptions, function_tool, RunContext
+from livekit.agents import AgentSession, Agent, RoomInputOptions, function_tool, memoize_tool, RunContext
 from livekit.plugins import openai, noise_cancellation, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 from financial_tools import FinancialCalculator, MarketInsights, analyze_client_portfolio, calculate_retirement_needs
@@ -8,6 +8,9 @@ import json
 
 load_dotenv()
 
+# the calculations run in a thread so they never block the audio of the session
+TOOL_TIMEOUT = 10.0
+
 class FinancialAdvisor(Agent):
     def __init__(self):
         super().__init__(
@@ -57,8 +60,9 @@ When clients ask for investment advice, always:
 You're here to be their trusted financial advisor and help them make informed decisions about their wealth."""
         )
 
-    @function_tool
-    async def calculate_compound_interest(self, context: RunContext, principal: float, rate: float, time_years: float) -> str:
+    @function_tool(executor="thread", timeout=TOOL_TIMEOUT)
+    @memoize_tool
+    def calculate_compound_interest(self, context: RunContext, principal: float, rate: float, time_years: float) -> str:
         """Calculate compound interest and future value for investment planning.
         
         Args:
@@ -86,8 +90,9 @@ This shows the power of compound growth over time!"""
         """
         return analyze_client_portfolio(portfolio_json)
 
-    @function_tool
-    async def retirement_planning_analysis(self, context: RunContext, current_age: int, current_savings: float, 
+    @function_tool(executor="thread", timeout=TOOL_TIMEOUT)
+    @memoize_tool
+    def retirement_planning_analysis(self, context: RunContext, current_age: int, current_savings: float, 
                                          monthly_contribution: float, desired_income: float) -> str:
         """Comprehensive retirement planning analysis.
         
@@ -127,8 +132,9 @@ Recommendations:
 - Consider increasing contributions annually
 - Review investment allocation for optimal returns"""
 
-    @function_tool
-    async def mortgage_analysis(self, context: RunContext, loan_amount: float, interest_rate: float, 
+    @function_tool(executor="thread", timeout=TOOL_TIMEOUT)
+    @memoize_tool
+    def mortgage_analysis(self, context: RunContext, loan_amount: float, interest_rate: float, 
                               loan_term_years: int, down_payment: float = 0) -> str:
         """Analyze mortgage options and payments.
         
@@ -157,8 +163,9 @@ Considerations:
 - Shorter terms increase monthly payments but reduce total cost
 - Compare with investment returns on down payment funds"""
 
-    @function_tool
-    async def tax_efficiency_analysis(self, context: RunContext, income: float, filing_status: str, 
+    @function_tool(executor="thread", timeout=TOOL_TIMEOUT)
+    @memoize_tool
+    def tax_efficiency_analysis(self, context: RunContext, income: float, filing_status: str, 
                                     investment_amount: float) -> str:
         """Provide tax-efficient investment recommendations.
         
@@ -45,7 +45,13 @@ from .llm.chat_context import (
     FunctionCall,
     FunctionCallOutput,
 )
-from .llm.tool_context import FunctionTool, StopResponse, ToolError, function_tool
+from .llm.tool_context import (
+    FunctionTool,
+    StopResponse,
+    ToolError,
+    function_tool,
+    memoize_tool,
+)
 from .plugin import Plugin
 from .types import (
     DEFAULT_API_CONNECT_OPTIONS,
@@ -109,6 +115,7 @@ __all__ = [
     "AutoSubscribe",
     "FunctionTool",
     "function_tool",
+    "memoize_tool",
     "ChatContext",
     "ChatItem",
     "RoomIO",
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import time
-from typing import TYPE_CHECKING, Any, Literal
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeVar
 
 from aiohttp import web
 
@@ -11,6 +12,38 @@ from .. import job
 if TYPE_CHECKING:
     from ..worker import Worker
 
+# a handle keeps the last events and spans, the oldest ones are overwritten
+DEFAULT_MAX_EVENTS = 1024
+DEFAULT_MAX_SPANS = 4096
+
+_T = TypeVar("_T")
+
+
+class _RingBuffer(Generic[_T]):
+    """Preallocated buffer keeping the last `capacity` items"""
+
+    def __init__(self, capacity: int) -> None:
+        self._items: list[_T | None] = [None] * capacity
+        self._next = 0
+        self._size = 0
+
+    def append(self, item: _T) -> None:
+        self._items[self._next] = item
+        self._next = (self._next + 1) % len(self._items)
+        if self._size < len(self._items):
+            self._size += 1
+
+    def to_list(self) -> list[_T]:
+        """The items, from the oldest to the newest"""
+        if self._size < len(self._items):
+            items = self._items[: self._size]
+        else:
+            items = self._items[self._next :] + self._items[: self._next]
+        return items  # type: ignore[return-value]
+
+    def __len__(self) -> int:
+        return self._size
+
 
 class TracingGraph:
     def __init__(
@@ -28,18 +61,21 @@ class TracingGraph:
         self._y_range = y_range
         self._max_data_points = max_data_points
         self._x_type = x_type
-        self._data: list[tuple[float | int, float]] = []
+        self._data = _RingBuffer[tuple[float | int, float]](max_data_points)
 
     def plot(self, x: float | int, y: float) -> None:
-        self._data.append((x, y))
-        if len(self._data) > self._max_data_points:
-            self._data.pop(0)
+        if Tracing._enabled:
+            self._data.append((x, y))
 
 
 class TracingHandle:
-    def __init__(self) -> None:
+    def __init__(
+        self, *, max_events: int = DEFAULT_MAX_EVENTS, max_spans: int = DEFAULT_MAX_SPANS
+    ) -> None:
         self._kv: dict[str, str | dict[str, Any]] = {}
-        self._events: list[dict[str, Any]] = []
+        self._events = _RingBuffer[dict[str, Any]](max_events)
+        # (name, category, start, duration, args)
+        self._spans = _RingBuffer[tuple[str, str, float, float, dict[str, Any] | None]](max_spans)
         self._graphs: list[TracingGraph] = []
 
     def store_kv(self, key: str, value: str | dict[str, Any]) -> None:
@@ -48,6 +84,18 @@ class TracingHandle:
     def log_event(self, name: str, data: dict[str, Any] | None) -> None:
         self._events.append({"name": name, "data": data, "timestamp": time.time()})
 
+    def add_span(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        *,
+        category: str = "default",
+        args: dict[str, Any] | None = None,
+    ) -> None:
+        """Record an operation that ran from `start` to `end` (seconds since the epoch)"""
+        self._spans.append((name, category, start, max(end - start, 0.0), args))
+
     def add_graph(
         self,
         *,
@@ -65,7 +113,17 @@ class TracingHandle:
     def _export(self) -> dict[str, Any]:
         return {
             "kv": self._kv,
-            "events": self._events,
+            "events": self._events.to_list(),
+            "spans": [
+                {
+                    "name": name,
+                    "category": category,
+                    "start": start,
+                    "duration": duration,
+                    "args": args or {},
+                }
+                for name, category, start, duration, args in self._spans.to_list()
+            ],
             "graph": [
                 {
                     "title": chart._title,
@@ -73,7 +131,7 @@ class TracingHandle:
                     "y_label": chart._y_label,
                     "y_range": chart._y_range,
                     "x_type": chart._x_type,
-                    "data": chart._data,
+                    "data": chart._data.to_list(),
                 }
                 for chart in self._graphs
             ],
@@ -82,6 +140,12 @@ class TracingHandle:
 
 class Tracing:
     _instance = None
+    _enabled = True
+
+    @staticmethod
+    def set_enabled(enabled: bool) -> None:
+        """Enable or disable the recording of events, spans and graph points of the process"""
+        Tracing._enabled = enabled
 
     def __init__(self) -> None:
         self._handles: dict[str, TracingHandle] = {}
@@ -116,7 +180,20 @@ class Tracing:
 
     @staticmethod
     def log_event(name: str, data: dict[str, Any] | None = None) -> None:
-        Tracing._get_current_handle().log_event(name, data)
+        if Tracing._enabled:
+            Tracing._get_current_handle().log_event(name, data)
+
+    @staticmethod
+    def add_span(
+        name: str,
+        start: float,
+        end: float,
+        *,
+        category: str = "default",
+        args: dict[str, Any] | None = None,
+    ) -> None:
+        if Tracing._enabled:
+            Tracing._get_current_handle().add_span(name, start, end, category=category, args=args)
 
     @staticmethod
     def add_graph(
@@ -138,6 +215,73 @@ class Tracing:
         )
 
 
+def _chrome_trace(tracing: dict[str, Any], *, pid: int, process_name: str) -> dict[str, Any]:
+    """Convert exported tracing info to the Chrome trace event format (chrome://tracing,
+    https://ui.perfetto.dev)"""
+    events: list[dict[str, Any]] = [
+        {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": process_name}}
+    ]
+
+    # one track per span category
+    tids: dict[str, int] = {}
+    for span in tracing.get("spans", []):
+        tid = tids.get(span["category"])
+        if tid is None:
+            tid = tids[span["category"]] = len(tids) + 1
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": span["category"]},
+                }
+            )
+
+        events.append(
+            {
+                "name": span["name"],
+                "cat": span["category"],
+                "ph": "X",
+                "ts": span["start"] * 1e6,
+                "dur": span["duration"] * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": span["args"],
+            }
+        )
+
+    for ev in tracing.get("events", []):
+        events.append(
+            {
+                "name": ev["name"],
+                "ph": "i",
+                "s": "p",
+                "ts": ev["timestamp"] * 1e6,
+                "pid": pid,
+                "tid": 0,
+                "args": ev["data"] or {},
+            }
+        )
+
+    for graph in tracing.get("graph", []):
+        if graph["x_type"] != "time":
+            continue
+
+        for x, y in graph["data"]:
+            events.append(
+                {
+                    "name": graph["title"],
+                    "ph": "C",
+                    "ts": x * 1e6,
+                    "pid": pid,
+                    "args": {graph["y_label"]: y},
+                }
+            )
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
 def _create_tracing_app(w: Worker) -> web.Application:
     async def tracing_index(request: web.Request) -> web.Response:
         import importlib.resources
@@ -177,15 +321,22 @@ def _create_tracing_app(w: Worker) -> web.Application:
             return web.Response(status=404)
 
         info = await asyncio.wait_for(runner.tracing_info(), timeout=5.0)  # proc could be stuck
+        if request.query.get("format") == "chrome":
+            job_id = runner.running_job.job.id if runner.running_job else runner_id
+            # jobs of the thread executor run in the worker process
+            pid = getattr(runner, "pid", None) or os.getpid()
+            return web.json_response(_chrome_trace(info, pid=pid, process_name=f"job {job_id}"))
+
         return web.json_response({"tracing": info})
 
     async def worker(request: web.Request) -> web.Response:
-        return web.json_response(
-            {
-                "id": w.id,
-                "tracing": Tracing.with_handle("global")._export(),
-            }
-        )
+        info = Tracing.with_handle("global")._export()
+        if request.query.get("format") == "chrome":
+            return web.json_response(
+                _chrome_trace(info, pid=os.getpid(), process_name=f"worker {w.id}")
+            )
+
+        return web.json_response({"id": w.id, "tracing": info})
 
     app = web.Application()
     app.add_routes([web.get("", tracing_index)])
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import threading
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from typing import ClassVar, Protocol
 
 
@@ -16,6 +17,13 @@ _RunnersDict = dict[str, type["_InferenceRunner"]]
 class _InferenceRunner(ABC, _RunnerMeta):
     registered_runners: _RunnersDict = {}
 
+    MAX_BATCH_SIZE: ClassVar[int] = 1
+    """Maximum number of requests given to `run_batch` at once. 1 disables batching."""
+    BATCH_WINDOW: ClassVar[float] = 0.0
+    """Time in seconds the inference process waits for more requests before running a batch."""
+    MAX_CONCURRENCY: ClassVar[int] = 1
+    """Maximum number of run/run_batch calls in flight at once, each one uses its own thread."""
+
     @classmethod
     def register_runner(cls, runner_class: type[_InferenceRunner]) -> None:
         if threading.current_thread() != threading.main_thread():
@@ -35,3 +43,12 @@ class _InferenceRunner(ABC, _RunnerMeta):
     def run(self, data: bytes) -> bytes | None:
         """Run inference on the given data."""
         ...
+
+    def run_batch(self, data: list[bytes]) -> Sequence[bytes | None | Exception]:
+        """Run inference on a batch of requests, only used when MAX_BATCH_SIZE > 1.
+
+        The results must be returned in the same order as the inputs. An invalid request can be
+        failed on its own by returning an exception as its result, instead of raising and failing
+        the whole batch.
+        """
+        return [self.run(d) for d in data]
@@ -6,6 +6,7 @@ from . import (
     job_thread_executor,
     proc_pool,
     proto,
+    shm_ring,
 )
 
 __all__ = [
@@ -16,6 +17,7 @@ __all__ = [
     "job_thread_executor",
     "proc_pool",
     "proto",
+    "shm_ring",
 ]
 
 # Cleanup docs of unexported modules
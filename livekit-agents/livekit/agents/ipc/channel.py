@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import io
 import struct
-from typing import ClassVar, Protocol, cast, runtime_checkable
+from typing import Any, Callable, ClassVar, Literal, Protocol, cast, runtime_checkable
 
 from .. import utils
 
@@ -20,18 +20,161 @@ class DataMessage(Message, Protocol):
 
 MessagesDict = dict[int, type[Message]]
 
+FieldKind = Literal["int", "long", "bool", "float", "double", "string", "bytes", "optional_bytes"]
+
+# same encoding as the write_*/read_* helpers
+_FIXED_FORMATS: dict[str, str] = {
+    "int": ">I",
+    "long": ">Q",
+    "bool": ">?",
+    "float": "=f",
+    "double": "=d",
+}
+_MSG_ID = struct.Struct(">I")
+_LENGTH = struct.Struct(">I")
+
+
+class MessageCodec:
+    """Precompiled encoder/decoder of a message, used instead of its write/read methods.
+
+    Like dataclasses, the codec generates the source of specialized functions for the layout:
+    consecutive fixed-size fields and length prefixes are packed and unpacked with a single
+    struct, and received fields are parsed in place with unpack_from. The wire format is the
+    same as writing the fields one by one with the write_* helpers.
+    """
+
+    def __init__(self, *fields: tuple[str, FieldKind]) -> None:
+        for name, kind in fields:
+            if not name.isidentifier():
+                raise ValueError(f"invalid field name: {name!r}")
+            if kind not in _FIXED_FORMATS and kind not in ("string", "bytes", "optional_bytes"):
+                raise ValueError(f"invalid field kind: {kind!r}")
+
+        self._fields = fields
+        self._globals: dict[str, Any] = {"_LENGTH": _LENGTH}
+        self.encode: Callable[[Message], bytes] = self._compile(self._encode_source())
+        self.decode_into: Callable[[Message, bytes, int], None] = self._compile(
+            self._decode_source()
+        )
+
+    def _struct(self, fmt: str) -> str:
+        name = f"_s{len(self._globals)}"
+        self._globals[name] = struct.Struct(fmt)
+        return name
+
+    def _compile(self, source: str) -> Any:
+        ns: dict[str, Any] = {}
+        exec(source, self._globals, ns)
+        return next(iter(ns.values()))
+
+    def _encode_source(self) -> str:
+        lines = ["def encode(msg):"]
+        parts: list[str] = []
+        run_fmt, run_args = "", []  # current run of fixed-size values with the same byte order
+
+        def _fixed(fmt: str, arg: str) -> None:
+            nonlocal run_fmt
+            if run_fmt and run_fmt[0] != fmt[0]:
+                _flush()
+            run_fmt = run_fmt + fmt[1:] if run_fmt else fmt
+            run_args.append(arg)
+
+        def _flush() -> None:
+            nonlocal run_fmt
+            if run_fmt:
+                parts.append(f"{self._struct(run_fmt)}.pack({', '.join(run_args)})")
+                run_fmt = ""
+                run_args.clear()
+
+        _fixed(">I", "msg.MSG_ID")
+        for i, (name, kind) in enumerate(self._fields):
+            fmt = _FIXED_FORMATS.get(kind)
+            if fmt is not None:
+                _fixed(fmt, f"msg.{name}")
+            elif kind == "optional_bytes":
+                lines.append(f"    v{i} = msg.{name}")
+                _fixed(">?", f"v{i} is not None")
+                _flush()
+                parts.append(f"*((_LENGTH.pack(len(v{i})), v{i}) if v{i} is not None else ())")
+            else:
+                encode = '.encode("utf-8")' if kind == "string" else ""
+                lines.append(f"    v{i} = msg.{name}{encode}")
+                _fixed(">I", f"len(v{i})")
+                _flush()
+                parts.append(f"v{i}")
+
+        _flush()
+        lines.append(f"    return b''.join(({', '.join(parts)},))")
+        return "\n".join(lines)
+
+    def _decode_source(self) -> str:
+        lines = ["def decode_into(msg, data, offset):"]
+        run_fmt, run_targets = "", []
+
+        def _fixed(fmt: str, target: str) -> None:
+            nonlocal run_fmt
+            if run_fmt and run_fmt[0] != fmt[0]:
+                _flush()
+            run_fmt = run_fmt + fmt[1:] if run_fmt else fmt
+            run_targets.append(target)
+
+        def _flush() -> None:
+            nonlocal run_fmt
+            if run_fmt:
+                st = self._struct(run_fmt)
+                lines.append(f"    {', '.join(run_targets)}, = {st}.unpack_from(data, offset)")
+                lines.append(f"    offset += {struct.calcsize(run_fmt)}")
+                run_fmt = ""
+                run_targets.clear()
+
+        for i, (name, kind) in enumerate(self._fields):
+            fmt = _FIXED_FORMATS.get(kind)
+            if fmt is not None:
+                _fixed(fmt, f"msg.{name}")
+            elif kind == "optional_bytes":
+                _fixed(">?", f"has{i}")
+                _flush()
+                lines.append(f"    if has{i}:")
+                lines.append(f"        n{i}, = _LENGTH.unpack_from(data, offset)")
+                lines.append("        offset += 4")
+                lines.append(f"        msg.{name} = data[offset : offset + n{i}]")
+                lines.append(f"        offset += n{i}")
+                lines.append("    else:")
+                lines.append(f"        msg.{name} = None")
+            else:
+                _fixed(">I", f"n{i}")
+                _flush()
+                value = f"data[offset : offset + n{i}]"
+                if kind == "string":
+                    value += '.decode("utf-8")'
+                lines.append(f"    msg.{name} = {value}")
+                lines.append(f"    offset += n{i}")
+
+        _flush()
+        lines.append("    return None")
+        return "\n".join(lines)
+
 
 def _read_message(data: bytes, messages: MessagesDict) -> Message:
-    bio = io.BytesIO(data)
-    msg_id = read_int(bio)
+    (msg_id,) = _MSG_ID.unpack_from(data, 0)
     msg = messages[msg_id]()
-    if isinstance(msg, DataMessage):
+
+    codec: MessageCodec | None = getattr(msg, "CODEC", None)
+    if codec is not None:
+        codec.decode_into(msg, data, _MSG_ID.size)
+    elif isinstance(msg, DataMessage):
+        bio = io.BytesIO(data)
+        bio.seek(_MSG_ID.size)
         msg.read(bio)
 
     return msg
 
 
 def _write_message(msg: Message) -> bytes:
+    codec: MessageCodec | None = getattr(msg, "CODEC", None)
+    if codec is not None:
+        return codec.encode(msg)
+
     bio = io.BytesIO()
     write_int(bio, msg.MSG_ID)
 
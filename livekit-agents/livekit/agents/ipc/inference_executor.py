@@ -4,4 +4,13 @@ from typing import Protocol
 
 
 class InferenceExecutor(Protocol):
-    async def do_inference(self, method: str, data: bytes) -> bytes | None: ...
+    async def do_inference(
+        self, method: str, data: bytes, *, timeout: float | None = None
+    ) -> bytes | None:
+        """Run inference using the given method.
+
+        If `timeout` is set, the request is dropped by the inference process when it couldn't
+        be started before the timeout expired. The caller is still responsible for not waiting
+        longer than it wants to.
+        """
+        ...
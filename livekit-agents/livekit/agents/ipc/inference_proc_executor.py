@@ -4,13 +4,14 @@ import asyncio
 import contextlib
 import multiprocessing as mp
 import socket
+import time
 from multiprocessing.context import BaseContext
 from typing import Any
 
 from ..inference_runner import _RunnersDict
 from ..log import logger
 from ..utils import aio, log_exceptions, shortuuid
-from . import channel, proto
+from . import channel, proto, shm_ring
 from .inference_proc_lazy_main import ProcStartArgs, proc_main
 from .supervised_proc import SupervisedProc
 
@@ -30,6 +31,7 @@ class InferenceProcExecutor(SupervisedProc):
         mp_ctx: BaseContext,
         loop: asyncio.AbstractEventLoop,
         http_proxy: str | None,
+        shm_ring_size: int = shm_ring.DEFAULT_RING_SIZE,
     ) -> None:
         super().__init__(
             initialize_timeout=initialize_timeout,
@@ -46,6 +48,7 @@ class InferenceProcExecutor(SupervisedProc):
 
         self._runners = runners
         self._active_requests: dict[str, asyncio.Future[proto.InferenceResponse]] = {}
+        self._shm_ring_size = shm_ring_size
 
     def _create_process(self, cch: socket.socket, log_cch: socket.socket) -> mp.Process:
         proc_args = ProcStartArgs(
@@ -64,30 +67,49 @@ class InferenceProcExecutor(SupervisedProc):
     async def _main_task(self, ipc_ch: aio.ChanReceiver[channel.Message]) -> None:
         async for msg in ipc_ch:
             if isinstance(msg, proto.InferenceResponse):
+                if msg.shm_seq:
+                    # always consumed, the responses must be read from the ring in order
+                    assert self._shm is not None
+                    msg.data = self._shm.responses.read(msg.shm_offset, msg.shm_length, msg.shm_seq)
+
                 fut = self._active_requests.pop(msg.request_id, None)
                 if fut is None:
                     logger.warning(
                         "received unexpected inference response",
                         extra={"request_id": msg.request_id},
                     )
-                    return
+                    continue
 
                 with contextlib.suppress(asyncio.InvalidStateError):
                     fut.set_result(msg)
 
-    async def do_inference(self, method: str, data: bytes) -> bytes | None:
+    async def do_inference(
+        self, method: str, data: bytes, *, timeout: float | None = None
+    ) -> bytes | None:
         if not self.started:
             raise RuntimeError("process not started")
 
         request_id = shortuuid("inference_req_")
         fut = asyncio.Future[proto.InferenceResponse]()
+        self._active_requests[request_id] = fut
 
-        await channel.asend_message(
-            self._pch,
-            proto.InferenceRequest(request_id=request_id, method=method, data=data),
+        req = proto.InferenceRequest(
+            request_id=request_id,
+            method=method,
+            deadline=time.time() + timeout if timeout is not None else 0.0,
         )
-
-        self._active_requests[request_id] = fut
+        desc = None
+        if self._shm_accepted and len(data) >= shm_ring.MIN_PAYLOAD_SIZE:
+            assert self._shm is not None
+            desc = self._shm.requests.write(data)
+
+        if desc is not None:
+            req.shm_offset, req.shm_length, req.shm_seq = desc
+        else:
+            req.data = data  # too small, or the ring is full
+
+        # no await between the write to the ring and the send, the descriptors stay in order
+        await channel.asend_message(self._pch, req)
 
         inf_resp = await fut
         if inf_resp.error:
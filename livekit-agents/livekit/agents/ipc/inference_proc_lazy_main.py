@@ -22,16 +22,18 @@ if current_process().name == "inference_proc":
 
 
 import asyncio
-import math
 import socket
 import time
+from collections.abc import Awaitable
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Callable
 
-from ..inference_runner import _RunnersDict
+from ..inference_runner import _InferenceRunner, _RunnersDict
 from ..log import logger
-from ..utils import aio, hw, log_exceptions
-from . import proto
+from ..utils import aio, log_exceptions
+from ..utils.aio.channel import ChanEmpty
+from . import proto, shm_ring
 from .channel import Message
 from .proc_client import _ProcClient
 
@@ -63,15 +65,215 @@ def proc_main(args: ProcStartArgs) -> None:
     client.run()
 
 
+@dataclass
+class _DispatchStats:
+    batch_count: int = 0
+    request_count: int = 0
+    expired_count: int = 0
+    """requests dropped because their deadline passed before they could run"""
+    max_batch_size: int = 0
+    total_latency: float = 0.0
+    """sum of the time spent inside run/run_batch"""
+    total_wait_time: float = 0.0
+    """sum of the time the first request of each batch waited before running"""
+
+
+class _RunnerDispatcher:
+    """Queue and run the inference requests of a single runner.
+
+    Every runner has its own queue and thread pool, so a slow model doesn't delay the others.
+    Up to MAX_CONCURRENCY batches run at the same time. A batch is started when MAX_BATCH_SIZE
+    requests are pending, or BATCH_WINDOW seconds after its first request arrived. Requests
+    whose deadline already passed when they're dequeued are answered with an error instead of
+    being computed.
+    """
+
+    def __init__(
+        self,
+        runner: _InferenceRunner,
+        *,
+        send_fnc: Callable[[proto.InferenceResponse], Awaitable[None]],
+    ) -> None:
+        self._runner = runner
+        self._method = runner.__class__.INFERENCE_METHOD
+        self._send_fnc = send_fnc
+        self._max_batch_size = max(1, runner.MAX_BATCH_SIZE)
+        self._batch_window = max(0.0, runner.BATCH_WINDOW)
+        self._max_concurrency = max(1, runner.MAX_CONCURRENCY)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_concurrency, thread_name_prefix=f"inference_{self._method}"
+        )
+        self._sem = asyncio.Semaphore(self._max_concurrency)
+        self._req_ch = aio.Chan[tuple[proto.InferenceRequest, float]]()
+        self._batch_tasks: set[asyncio.Task[None]] = set()
+        self._stats = _DispatchStats()
+        self._main_atask = asyncio.create_task(
+            self._main_task(), name=f"inference_dispatcher_{self._method}"
+        )
+
+    @property
+    def stats(self) -> _DispatchStats:
+        return self._stats
+
+    def push(self, msg: proto.InferenceRequest) -> None:
+        self._req_ch.send_nowait((msg, time.perf_counter()))
+
+    async def aclose(self) -> None:
+        self._req_ch.close()
+        await self._main_atask
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+        self._executor.shutdown(wait=False)
+
+    @log_exceptions(logger=logger)
+    async def _main_task(self) -> None:
+        while True:
+            # wait for a free slot first, requests received in the meantime are batched together
+            await self._sem.acquire()
+            try:
+                first_req = await self._req_ch.recv()
+            except aio.ChanClosed:
+                self._sem.release()
+                break
+
+            batch = await self._gather_batch(first_req)
+            batch = await self._drop_expired(batch)
+            if not batch:
+                self._sem.release()
+                continue
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._on_batch_done)
+
+    def _on_batch_done(self, task: asyncio.Task[None]) -> None:
+        self._batch_tasks.discard(task)
+        self._sem.release()
+
+    async def _gather_batch(
+        self, first_req: tuple[proto.InferenceRequest, float]
+    ) -> list[tuple[proto.InferenceRequest, float]]:
+        batch = [first_req]
+        window_end = first_req[1] + self._batch_window
+        while len(batch) < self._max_batch_size:
+            try:
+                batch.append(self._req_ch.recv_nowait())
+                continue
+            except ChanEmpty:
+                pass
+            except aio.ChanClosed:
+                break
+
+            timeout = window_end - time.perf_counter()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self._req_ch.recv(), timeout))
+            except (asyncio.TimeoutError, aio.ChanClosed):
+                break
+
+        return batch
+
+    async def _drop_expired(
+        self, batch: list[tuple[proto.InferenceRequest, float]]
+    ) -> list[tuple[proto.InferenceRequest, float]]:
+        now = time.time()
+        valid = []
+        for req, recv_time in batch:
+            if req.deadline and now > req.deadline:
+                self._stats.expired_count += 1
+                logger.debug(
+                    "dropping expired inference request",
+                    extra={"method": self._method, "request_id": req.request_id},
+                )
+                await self._send_fnc(
+                    proto.InferenceResponse(request_id=req.request_id, error="deadline exceeded")
+                )
+            else:
+                valid.append((req, recv_time))
+
+        return valid
+
+    @log_exceptions(logger=logger)
+    async def _run_batch(self, batch: list[tuple[proto.InferenceRequest, float]]) -> None:
+        loop = asyncio.get_running_loop()
+
+        start_time = time.perf_counter()
+        try:
+            if self._max_batch_size > 1:
+                results = await loop.run_in_executor(
+                    self._executor, self._runner.run_batch, [req.data for req, _ in batch]
+                )
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"run_batch returned {len(results)} results for {len(batch)} requests"
+                    )
+            else:
+                results = [
+                    await loop.run_in_executor(self._executor, self._runner.run, batch[0][0].data)
+                ]
+        except Exception as e:
+            logger.exception("error running inference", extra={"method": self._method})
+            for req, _ in batch:
+                await self._send_fnc(
+                    proto.InferenceResponse(request_id=req.request_id, error=str(e))
+                )
+            return
+
+        latency = time.perf_counter() - start_time
+        wait_time = start_time - batch[0][1]
+
+        self._stats.batch_count += 1
+        self._stats.request_count += len(batch)
+        self._stats.max_batch_size = max(self._stats.max_batch_size, len(batch))
+        self._stats.total_latency += latency
+        self._stats.total_wait_time += wait_time
+
+        if self._max_batch_size > 1:
+            logger.debug(
+                "inference batch done",
+                extra={
+                    "method": self._method,
+                    "batch_size": len(batch),
+                    "latency": round(latency, 3),
+                    "wait_time": round(wait_time, 3),
+                },
+            )
+
+        for (req, _), data in zip(batch, results):
+            if isinstance(data, Exception):
+                logger.error(
+                    "error running inference",
+                    extra={"method": self._method, "error": str(data)},
+                )
+                await self._send_fnc(
+                    proto.InferenceResponse(request_id=req.request_id, error=str(data))
+                )
+                continue
+
+            await self._send_fnc(proto.InferenceResponse(request_id=req.request_id, data=data))
+
+
 class _InferenceProc:
     def __init__(self, runners: _RunnersDict) -> None:
         # create an instance of each runner (the ctor must not requires any argument)
         self._runners = {name: runner() for name, runner in runners.items()}
-        self._executor = ThreadPoolExecutor(max_workers=math.ceil(hw.get_cpu_monitor().cpu_count()))
+        self._dispatchers: dict[str, _RunnerDispatcher] = {}
+        self._shm: shm_ring.ShmTransport | None = None
 
-    def initialize(self, init_req: proto.InitializeRequest, client: _ProcClient) -> None:
+    def initialize(
+        self, init_req: proto.InitializeRequest, client: _ProcClient
+    ) -> proto.InitializeResponse:
         self._client = client
 
+        if init_req.shm_name:
+            try:
+                self._shm = shm_ring.ShmTransport.attach(init_req.shm_name, init_req.shm_ring_size)
+            except OSError:
+                logger.warning("failed to attach to the shared memory, using the socket")
+
         for runner in self._runners.values():
             try:
                 logger.debug(
@@ -93,35 +295,53 @@ class _InferenceProc:
                     extra={"runner": runner.__class__.INFERENCE_METHOD},
                 )
 
+        return proto.InitializeResponse(shm_name=self._shm.name if self._shm else "")
+
     @log_exceptions(logger=logger)
     async def entrypoint(self, cch: aio.ChanReceiver[Message]) -> None:
+        for method, runner in self._runners.items():
+            self._dispatchers[method] = _RunnerDispatcher(runner, send_fnc=self._send_response)
+
         async for msg in cch:
             if isinstance(msg, proto.InferenceRequest):
+                if msg.shm_seq:
+                    # read right away, the requests must be consumed from the ring in order
+                    assert self._shm is not None
+                    msg.data = self._shm.requests.read(msg.shm_offset, msg.shm_length, msg.shm_seq)
+
                 await self._handle_inference_request(msg)
 
             if isinstance(msg, proto.ShutdownRequest):
+                await asyncio.gather(*(d.aclose() for d in self._dispatchers.values()))
                 await self._client.send(proto.Exiting(reason=msg.reason))
                 break
 
-    async def _handle_inference_request(self, msg: proto.InferenceRequest) -> None:
-        loop = asyncio.get_running_loop()
+        if self._shm is not None:
+            self._shm.close()
 
-        if msg.method not in self._runners:
-            logger.warning("unknown inference method", extra={"method": msg.method})
+    async def _send_response(self, resp: proto.InferenceResponse) -> None:
+        if (
+            self._shm is not None
+            and resp.data is not None
+            and len(resp.data) >= shm_ring.MIN_PAYLOAD_SIZE
+        ):
+            desc = self._shm.responses.write(resp.data)
+            if desc is not None:
+                resp.shm_offset, resp.shm_length, resp.shm_seq = desc
+                resp.data = None
 
-        try:
-            data = await loop.run_in_executor(
-                self._executor, self._runners[msg.method].run, msg.data
-            )
+        # no await between the write to the ring and the send, the descriptors stay in order
+        await self._client.send(resp)
+
+    async def _handle_inference_request(self, msg: proto.InferenceRequest) -> None:
+        dispatcher = self._dispatchers.get(msg.method)
+        if dispatcher is None:
+            logger.warning("unknown inference method", extra={"method": msg.method})
             await self._client.send(
                 proto.InferenceResponse(
-                    request_id=msg.request_id,
-                    data=data,
+                    request_id=msg.request_id, error=f"unknown inference method {msg.method}"
                 )
             )
+            return
 
-        except Exception as e:
-            logger.exception("error running inference")
-            await self._client.send(
-                proto.InferenceResponse(request_id=msg.request_id, error=str(e))
-            )
+        dispatcher.push(msg)
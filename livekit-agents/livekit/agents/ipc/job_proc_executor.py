@@ -4,14 +4,17 @@ import asyncio
 import contextlib
 import multiprocessing as mp
 import socket
+import time
 from collections.abc import Awaitable
+from dataclasses import asdict
 from multiprocessing.context import BaseContext
 from typing import Any, Callable
 
 from ..job import JobContext, JobProcess, RunningJobInfo
 from ..log import logger
+from ..metrics import TurnLatency
 from ..utils import aio, log_exceptions, shortuuid
-from . import channel, proto
+from . import channel, proto, shm_ring
 from .inference_executor import InferenceExecutor
 from .job_executor import JobStatus
 from .job_proc_lazy_main import ProcStartArgs, proc_main
@@ -35,6 +38,9 @@ class ProcJobExecutor(SupervisedProc):
         http_proxy: str | None,
         mp_ctx: BaseContext,
         loop: asyncio.AbstractEventLoop,
+        audio_decoder_workers: int = 0,
+        on_turn_latency: Callable[[TurnLatency], None] | None = None,
+        shm_ring_size: int = shm_ring.DEFAULT_JOB_RING_SIZE,
     ) -> None:
         super().__init__(
             initialize_timeout=initialize_timeout,
@@ -56,13 +62,21 @@ class ProcJobExecutor(SupervisedProc):
         self._job_entrypoint_fnc = job_entrypoint_fnc
         self._inference_executor = inference_executor
         self._inference_tasks: list[asyncio.Task[None]] = []
+        self._audio_decoder_workers = audio_decoder_workers
         self._id = shortuuid("PCEXEC_")
         self._tracing_requests = dict[str, asyncio.Future[proto.TracingResponse]]()
+        self._on_turn_latency = on_turn_latency
+        self._shm_ring_size = shm_ring_size
 
     @property
     def id(self) -> str:
         return self._id
 
+    def _initialize_request(self) -> proto.InitializeRequest:
+        init_req = super()._initialize_request()
+        init_req.audio_decoder_workers = self._audio_decoder_workers
+        return init_req
+
     async def tracing_info(self) -> dict[str, Any]:
         if not self.started:
             raise RuntimeError("process not started")
@@ -112,11 +126,21 @@ class ProcJobExecutor(SupervisedProc):
         try:
             async for msg in ipc_ch:
                 if isinstance(msg, proto.InferenceRequest):
+                    if msg.shm_seq:
+                        # read right away, the requests must be consumed from the ring in order
+                        assert self._shm is not None
+                        msg.data = self._shm.requests.read(
+                            msg.shm_offset, msg.shm_length, msg.shm_seq
+                        )
+
                     self._inference_tasks.append(asyncio.create_task(self._do_inference_task(msg)))
                 elif isinstance(msg, proto.TracingResponse):
                     fut = self._tracing_requests.pop(msg.request_id)
                     with contextlib.suppress(asyncio.InvalidStateError):
                         fut.set_result(msg)
+                elif isinstance(msg, proto.TurnLatencyReport):
+                    if self._on_turn_latency is not None:
+                        self._on_turn_latency(TurnLatency(**asdict(msg)))
         finally:
             await aio.cancel_and_wait(*self._inference_tasks)
 
@@ -139,11 +163,24 @@ class ProcJobExecutor(SupervisedProc):
             return
 
         try:
-            inf_res = await self._inference_executor.do_inference(inf_req.method, inf_req.data)
-            await channel.asend_message(
-                self._pch,
-                proto.InferenceResponse(request_id=inf_req.request_id, data=inf_res),
+            timeout = max(0.0, inf_req.deadline - time.time()) if inf_req.deadline else None
+            inf_res = await self._inference_executor.do_inference(
+                inf_req.method, inf_req.data, timeout=timeout
             )
+            resp = proto.InferenceResponse(request_id=inf_req.request_id, data=inf_res)
+            if (
+                self._shm_accepted
+                and inf_res is not None
+                and len(inf_res) >= shm_ring.MIN_PAYLOAD_SIZE
+            ):
+                assert self._shm is not None
+                desc = self._shm.responses.write(inf_res)
+                if desc is not None:
+                    resp.shm_offset, resp.shm_length, resp.shm_seq = desc
+                    resp.data = None
+
+            # no await between the write to the ring and the send, the descriptors stay in order
+            await channel.asend_message(self._pch, resp)
         except Exception as e:
             await channel.asend_message(
                 self._pch,
@@ -24,7 +24,8 @@ if current_process().name == "job_proc":
 import asyncio
 import contextlib
 import socket
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass
 from typing import Any, Callable, cast
 
 from livekit import rtc
@@ -33,7 +34,9 @@ from ..cli import cli
 from ..debug import tracing
 from ..job import JobContext, JobExecutorType, JobProcess, _JobContextVar
 from ..log import logger
-from ..utils import aio, http_context, log_exceptions, shortuuid
+from ..metrics import TurnLatency
+from ..utils import aio, codecs, http_context, log_exceptions, shortuuid
+from . import shm_ring
 from .channel import Message
 from .inference_executor import InferenceExecutor
 from .proc_client import _ProcClient
@@ -42,10 +45,12 @@ from .proto import (
     InferenceRequest,
     InferenceResponse,
     InitializeRequest,
+    InitializeResponse,
     ShutdownRequest,
     StartJobRequest,
     TracingRequest,
     TracingResponse,
+    TurnLatencyReport,
 )
 
 
@@ -84,19 +89,35 @@ def proc_main(args: ProcStartArgs) -> None:
 
 
 class _InfClient(InferenceExecutor):
-    def __init__(self, proc_client: _ProcClient) -> None:
+    def __init__(self, proc_client: _ProcClient, shm: shm_ring.ShmTransport | None = None) -> None:
         self._client = proc_client
         self._active_requests: dict[str, asyncio.Future[InferenceResponse]] = {}
+        # rings shared with the worker, the payloads don't go through the socket
+        self._shm = shm
 
-    async def do_inference(self, method: str, data: bytes) -> bytes | None:
+    async def do_inference(
+        self, method: str, data: bytes, *, timeout: float | None = None
+    ) -> bytes | None:
         request_id = shortuuid("inference_job_")
         fut = asyncio.Future[InferenceResponse]()
+        self._active_requests[request_id] = fut
 
-        await self._client.send(
-            InferenceRequest(request_id=request_id, method=method, data=data),
+        req = InferenceRequest(
+            request_id=request_id,
+            method=method,
+            deadline=time.time() + timeout if timeout is not None else 0.0,
         )
+        desc = None
+        if self._shm is not None and len(data) >= shm_ring.MIN_PAYLOAD_SIZE:
+            desc = self._shm.requests.write(data)
 
-        self._active_requests[request_id] = fut
+        if desc is not None:
+            req.shm_offset, req.shm_length, req.shm_seq = desc
+        else:
+            req.data = data  # too small, or the ring is full
+
+        # no await between the write to the ring and the send, the descriptors stay in order
+        await self._client.send(req)
 
         inf_resp = await fut
         if inf_resp.error:
@@ -105,6 +126,11 @@ class _InfClient(InferenceExecutor):
         return inf_resp.data
 
     def _on_inference_response(self, resp: InferenceResponse) -> None:
+        if resp.shm_seq:
+            # always consumed, the responses must be read from the ring in order
+            assert self._shm is not None
+            resp.data = self._shm.responses.read(resp.shm_offset, resp.shm_length, resp.shm_seq)
+
         fut = self._active_requests.pop(resp.request_id, None)
         if fut is None:
             logger.warning("received unexpected inference response", extra={"resp": resp})
@@ -133,6 +159,7 @@ class _JobProc:
         self._initialize_process_fnc = initialize_process_fnc
         self._job_entrypoint_fnc = job_entrypoint_fnc
         self._job_task: asyncio.Task[None] | None = None
+        self._report_tasks: set[asyncio.Task[None]] = set()
 
         # used to warn users if both connect and shutdown are not called inside the job_entry
         self._ctx_connect_called = False
@@ -142,15 +169,26 @@ class _JobProc:
     def has_running_job(self) -> bool:
         return self._job_task is not None
 
-    def initialize(self, init_req: InitializeRequest, client: _ProcClient) -> None:
+    def initialize(self, init_req: InitializeRequest, client: _ProcClient) -> InitializeResponse:
         self._client = client
-        self._inf_client = _InfClient(client)
+        self._shm: shm_ring.ShmTransport | None = None
+        if init_req.shm_name:
+            try:
+                self._shm = shm_ring.ShmTransport.attach(init_req.shm_name, init_req.shm_ring_size)
+            except OSError:
+                logger.warning("failed to attach to the shared memory, using the socket")
+
+        self._inf_client = _InfClient(client, self._shm)
         self._job_proc = JobProcess(
             executor_type=self._executor_type,
             user_arguments=self._user_arguments,
             http_proxy=init_req.http_proxy or None,
         )
+        if init_req.audio_decoder_workers > 0:
+            codecs.DecoderScheduler.configure(max_workers=init_req.audio_decoder_workers)
+
         self._initialize_process_fnc(self._job_proc)
+        return InitializeResponse(shm_name=self._shm.name if self._shm else "")
 
     @log_exceptions(logger=logger)
     async def entrypoint(self, cch: aio.ChanReceiver[Message]) -> None:
@@ -209,6 +247,9 @@ class _JobProc:
         await self._exit_proc_flag.wait()
         await aio.cancel_and_wait(read_task)
 
+        if self._shm is not None:
+            self._shm.close()
+
     def _start_job(self, msg: StartJobRequest) -> None:
         if cli.CLI_ARGUMENTS is not None and cli.CLI_ARGUMENTS.console:
             from .mock_room import MockRoom
@@ -242,6 +283,7 @@ class _JobProc:
             on_connect=_on_ctx_connect,
             on_shutdown=_on_ctx_shutdown,
             inference_executor=self._inf_client,
+            on_turn_latency=self._on_turn_latency,
         )
 
         self._job_task = asyncio.create_task(self._run_job_task(), name="job_task")
@@ -251,6 +293,14 @@ class _JobProc:
 
         self._job_task.add_done_callback(_exit_proc_cb)
 
+    def _on_turn_latency(self, turn: TurnLatency) -> None:
+        task = asyncio.create_task(
+            self._client.send(TurnLatencyReport(**asdict(turn))),
+            name="turn_latency_report",
+        )
+        self._report_tasks.add(task)
+        task.add_done_callback(self._report_tasks.discard)
+
     async def _run_job_task(self) -> None:
         job_ctx_token = _JobContextVar.set(self._job_ctx)
         http_context._new_session_ctx()
@@ -6,12 +6,13 @@ import socket
 import threading
 import time
 from collections.abc import Awaitable
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Any, Callable
 
 from .. import utils
 from ..job import JobContext, JobProcess, RunningJobInfo
 from ..log import logger
+from ..metrics import TurnLatency
 from ..utils.aio import duplex_unix
 from . import channel, job_proc_lazy_main, proto
 from .inference_executor import InferenceExecutor
@@ -27,6 +28,7 @@ class _ProcOpts:
     ping_interval: float
     high_ping_threshold: float
     http_proxy: str | None
+    audio_decoder_workers: int
 
 
 class ThreadJobExecutor:
@@ -42,6 +44,8 @@ class ThreadJobExecutor:
         high_ping_threshold: float,
         http_proxy: str | None,
         loop: asyncio.AbstractEventLoop,
+        audio_decoder_workers: int = 0,
+        on_turn_latency: Callable[[TurnLatency], None] | None = None,
     ) -> None:
         self._loop = loop
         self._opts = _ProcOpts(
@@ -52,6 +56,7 @@ class ThreadJobExecutor:
             ping_interval=ping_interval,
             high_ping_threshold=high_ping_threshold,
             http_proxy=http_proxy,
+            audio_decoder_workers=audio_decoder_workers,
         )
 
         self._user_args: Any | None = None
@@ -67,6 +72,7 @@ class ThreadJobExecutor:
         self._inference_tasks: list[asyncio.Task[None]] = []
         self._id = utils.shortuuid("THEXEC_")
         self._tracing_requests = dict[str, asyncio.Future[proto.TracingResponse]]()
+        self._on_turn_latency = on_turn_latency
 
     @property
     def id(self) -> str:
@@ -157,7 +163,11 @@ class ThreadJobExecutor:
 
     async def initialize(self) -> None:
         await channel.asend_message(
-            self._pch, proto.InitializeRequest(http_proxy=self._opts.http_proxy or "")
+            self._pch,
+            proto.InitializeRequest(
+                http_proxy=self._opts.http_proxy or "",
+                audio_decoder_workers=self._opts.audio_decoder_workers,
+            ),
         )
 
         try:
@@ -224,7 +234,10 @@ class ThreadJobExecutor:
             return
 
         try:
-            inf_res = await self._inference_executor.do_inference(inf_req.method, inf_req.data)
+            timeout = max(0.0, inf_req.deadline - time.time()) if inf_req.deadline else None
+            inf_res = await self._inference_executor.do_inference(
+                inf_req.method, inf_req.data, timeout=timeout
+            )
             await channel.asend_message(
                 self._pch,
                 proto.InferenceResponse(request_id=inf_req.request_id, data=inf_res),
@@ -298,6 +311,9 @@ class ThreadJobExecutor:
                 with contextlib.suppress(asyncio.InvalidStateError):
                     fut.set_result(msg)
 
+            if isinstance(msg, proto.TurnLatencyReport) and self._on_turn_latency is not None:
+                self._on_turn_latency(TurnLatency(**asdict(msg)))
+
     @utils.log_exceptions(logger=logger)
     async def _ping_task(self) -> None:
         ping_interval = utils.aio.interval(self._opts.ping_interval)
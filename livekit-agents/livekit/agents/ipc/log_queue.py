@@ -1,16 +1,204 @@
 from __future__ import annotations
 
-import copy
+import functools
+import json
 import logging
-import pickle
+import os
 import queue
+import struct
 import sys
 import threading
+import time
+from dataclasses import dataclass
 from typing import Callable, Optional
 
 from .. import utils
+from ..cli.log import _RESERVED_ATTRS, JsonFormatter
+from ..log import logger
 from ..utils.aio import duplex_unix
 
+# records of a job process are coalesced for up to BATCH_INTERVAL before being sent to the
+# supervisor, in frames of at most MAX_BATCH_RECORDS records and about MAX_BATCH_BYTES
+BATCH_INTERVAL = 0.005
+MAX_BATCH_BYTES = 64 * 1024
+MAX_BATCH_RECORDS = 4096  # keeps the string table of a batch under 65536 entries
+
+# records below WARNING are dropped above this rate, 0 disables the limit
+DEFAULT_MAX_RECORDS_PER_SECOND = 1000.0
+
+_FORMAT_VERSION = 1
+# format version, records dropped since the previous batch, number of strings in the table
+_BATCH_HEADER = struct.Struct("!BIH")
+# created, relativeCreated, levelno, lineno, process, thread, index in the string table of
+# name/pathname/funcName/threadName/processName, length of msg and of the json extra
+_RECORD_HEADER = struct.Struct("!ddHIQQHHHHHII")
+_STR_LEN = struct.Struct("!I")
+_RECORD_ATTRS = frozenset(_RESERVED_ATTRS) | {"websocket"}
+
+_json_encoder = JsonFormatter.JsonEncoder(ensure_ascii=False)
+_json_decoder = json.JSONDecoder()
+
+
+@dataclass
+class _PendingRecord:
+    created: float
+    relative_created: float
+    levelno: int
+    lineno: int
+    process: int
+    thread: int
+    name: str
+    pathname: str
+    func_name: str
+    thread_name: str
+    process_name: str
+    msg: bytes
+    extra: bytes
+
+
+def _pending_record(record: logging.LogRecord, msg: str) -> _PendingRecord:
+    extra = {
+        key: value
+        for key, value in record.__dict__.items()
+        if key not in _RECORD_ATTRS and not key.startswith("_")
+    }
+    return _PendingRecord(
+        created=record.created,
+        relative_created=record.relativeCreated,
+        levelno=record.levelno,
+        lineno=record.lineno or 0,
+        process=record.process or 0,
+        thread=record.thread or 0,
+        name=record.name,
+        pathname=record.pathname,
+        func_name=record.funcName or "",
+        thread_name=record.threadName or "",
+        process_name=record.processName or "",
+        msg=msg.encode("utf-8", errors="replace"),
+        extra=_json_encoder.encode(extra).encode("utf-8", errors="replace") if extra else b"",
+    )
+
+
+def _encode_batch(records: list[_PendingRecord], dropped: int) -> bytes:
+    # names, paths, ... repeat across records, they're sent once per batch
+    strings: dict[str, int] = {}
+
+    def _index(s: str) -> int:
+        index = strings.get(s)
+        if index is None:
+            index = strings[s] = len(strings)
+        return index
+
+    parts: list[bytes] = []
+    for r in records:
+        parts.append(
+            _RECORD_HEADER.pack(
+                r.created,
+                r.relative_created,
+                r.levelno,
+                r.lineno,
+                r.process,
+                r.thread,
+                _index(r.name),
+                _index(r.pathname),
+                _index(r.func_name),
+                _index(r.thread_name),
+                _index(r.process_name),
+                len(r.msg),
+                len(r.extra),
+            )
+        )
+        parts.append(r.msg)
+        parts.append(r.extra)
+
+    table: list[bytes] = []
+    for s in strings:
+        data = s.encode("utf-8", errors="replace")
+        table.append(_STR_LEN.pack(len(data)))
+        table.append(data)
+
+    return b"".join([_BATCH_HEADER.pack(_FORMAT_VERSION, dropped, len(strings)), *table, *parts])
+
+
+def _decode_batch(data: bytes) -> tuple[list[logging.LogRecord], int]:
+    """Return the records of a batch and the number of records dropped before it"""
+    version, dropped, num_strings = _BATCH_HEADER.unpack_from(data, 0)
+    if version != _FORMAT_VERSION:
+        raise ValueError(f"unsupported log batch version: {version}")
+
+    offset = _BATCH_HEADER.size
+    strings: list[str] = []
+    for _ in range(num_strings):
+        (length,) = _STR_LEN.unpack_from(data, offset)
+        offset += _STR_LEN.size
+        strings.append(data[offset : offset + length].decode())
+        offset += length
+
+    records: list[logging.LogRecord] = []
+    while offset < len(data):
+        (
+            created,
+            relative_created,
+            levelno,
+            lineno,
+            process,
+            thread,
+            name,
+            pathname,
+            func_name,
+            thread_name,
+            process_name,
+            msg_len,
+            extra_len,
+        ) = _RECORD_HEADER.unpack_from(data, offset)
+        offset += _RECORD_HEADER.size
+        msg = data[offset : offset + msg_len].decode()
+        offset += msg_len
+        extra = data[offset : offset + extra_len]
+        offset += extra_len
+
+        pathname = strings[pathname]
+        filename, module = _split_pathname(pathname)
+
+        # like unpickling, fill the record without going through LogRecord.__init__
+        record = logging.LogRecord.__new__(logging.LogRecord)
+        record.__dict__ = {
+            "name": strings[name],
+            "msg": msg,
+            "message": msg,
+            "args": None,
+            "levelname": logging.getLevelName(levelno),
+            "levelno": levelno,
+            "pathname": pathname,
+            "filename": filename,
+            "module": module,
+            "exc_info": None,
+            "exc_text": None,
+            "stack_info": None,
+            "lineno": lineno,
+            "funcName": strings[func_name],
+            "created": created,
+            "msecs": (created - int(created)) * 1000,
+            "relativeCreated": relative_created,
+            "thread": thread,
+            "threadName": strings[thread_name],
+            "processName": strings[process_name],
+            "process": process,
+            "taskName": None,
+        }
+        if extra:
+            record.__dict__.update(_json_decoder.decode(extra.decode()))
+
+        records.append(record)
+
+    return records, dropped
+
+
+@functools.lru_cache(maxsize=1024)
+def _split_pathname(pathname: str) -> tuple[str, str]:
+    filename = os.path.basename(pathname)
+    return filename, os.path.splitext(filename)[0]
+
 
 class LogQueueListener:
     def __init__(
@@ -21,6 +209,12 @@ class LogQueueListener:
         self._thread: threading.Thread | None = None
         self._duplex = duplex
         self._prepare_fnc = prepare_fnc
+        self._dropped_records = 0
+
+    @property
+    def dropped_records(self) -> int:
+        """Number of records the process dropped because of the rate limit"""
+        return self._dropped_records
 
     def start(self) -> None:
         self._thread = threading.Thread(target=self._monitor, name="ipc_log_listener")
@@ -50,55 +244,134 @@ class LogQueueListener:
             except utils.aio.duplex_unix.DuplexClosed:
                 break
 
-            record = pickle.loads(data)
-            self.handle(record)
+            try:
+                records, dropped = _decode_batch(data)
+            except Exception:
+                logger.exception("failed to decode log records from the process")
+                continue
+
+            for record in records:
+                self.handle(record)
+
+            if dropped:
+                self._dropped_records += dropped
+                self.handle(
+                    logging.makeLogRecord(
+                        {
+                            "name": logger.name,
+                            "levelno": logging.WARNING,
+                            "levelname": logging.getLevelName(logging.WARNING),
+                            "msg": f"process logs are rate limited, dropped {dropped} records",
+                            "dropped_records": self._dropped_records,
+                        }
+                    )
+                )
 
 
 class LogQueueHandler(logging.Handler):
     _sentinal = None
 
-    def __init__(self, duplex: utils.aio.duplex_unix._Duplex) -> None:
+    def __init__(
+        self,
+        duplex: utils.aio.duplex_unix._Duplex,
+        *,
+        max_records_per_second: float = DEFAULT_MAX_RECORDS_PER_SECOND,
+        batch_interval: float = BATCH_INTERVAL,
+    ) -> None:
         super().__init__()
         self._duplex = duplex
-        self._send_q = queue.SimpleQueue[Optional[bytes]]()
+        self._batch_interval = batch_interval
+
+        # token bucket allowing bursts of up to one second of records
+        self._max_records_per_second = max_records_per_second
+        self._tokens = max_records_per_second
+        self._last_refill = time.monotonic()
+        self._dropped = 0
+        self._rate_lock = threading.Lock()
+
+        self._send_q = queue.SimpleQueue[Optional[_PendingRecord]]()
         self._send_thread = threading.Thread(target=self._forward_logs, name="ipc_log_forwarder")
         self._send_thread.start()
 
+    @property
+    def dropped_records(self) -> int:
+        """Number of records dropped because of the rate limit and not yet reported"""
+        return self._dropped
+
     def _forward_logs(self) -> None:
-        while True:
-            serialized_record = self._send_q.get()
-            if serialized_record is None:
-                break
+        closing = False
+        while not closing:
+            record = self._send_q.get()
+            if record is None:
+                closing = True
+                batch = []
+            else:
+                batch = [record]
+
+            size = sum(len(r.msg) + len(r.extra) for r in batch)
+            deadline = time.monotonic() + self._batch_interval
+            while not closing and size < MAX_BATCH_BYTES and len(batch) < MAX_BATCH_RECORDS:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+
+                try:
+                    record = self._send_q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+                if record is None:
+                    closing = True
+                    break
+
+                batch.append(record)
+                size += len(record.msg) + len(record.extra)
+
+            with self._rate_lock:
+                dropped, self._dropped = self._dropped, 0
+
+            if not batch and not dropped:
+                continue
 
             try:
-                self._duplex.send_bytes(serialized_record)
+                self._duplex.send_bytes(_encode_batch(batch, dropped))
             except duplex_unix.DuplexClosed:
                 break
 
         self._duplex.close()
 
+    def _acquire(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self._max_records_per_second <= 0:
+            return True
+
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._max_records_per_second,
+                self._tokens + (now - self._last_refill) * self._max_records_per_second,
+            )
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+
+            self._dropped += 1
+            return False
+
     def emit(self, record: logging.LogRecord) -> None:
         try:
             # Check if Python is shutting down
             if sys.is_finalizing():
                 return
 
-            # from https://github.com/python/cpython/blob/91b7f2e7f6593acefda4fa860250dd87d6f849bf/Lib/logging/handlers.py#L1453
+            if not self._acquire(record):
+                return
+
+            # the message is formatted here (with the exception if any), the supervisor only
+            # receives the fields needed to log it again, and the extra as json. Encoding the
+            # batch is left to the forwarder thread
             msg = self.format(record)
-            record = copy.copy(record)
-            record.message = msg
-            record.msg = msg
-            record.args = None
-            record.exc_info = None
-            record.exc_text = None
-            record.stack_info = None
-
-            # https://websockets.readthedocs.io/en/stable/topics/logging.html#logging-to-json
-            # webosckets library add "websocket" attribute to log records, which is not pickleable
-            if hasattr(record, "websocket"):
-                record.websocket = None
-
-            self._send_q.put_nowait(pickle.dumps(record))
+            self._send_q.put_nowait(_pending_record(record, msg))
 
         except Exception:
             self.handleError(record)
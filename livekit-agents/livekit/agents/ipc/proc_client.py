@@ -26,7 +26,8 @@ class _ProcClient:
         self,
         mp_cch: socket.socket,
         log_cch: socket.socket | None,
-        initialize_fnc: Callable[[InitializeRequest, _ProcClient], None],
+        # may return the InitializeResponse to send back, e.g. to accept the shared memory
+        initialize_fnc: Callable[[InitializeRequest, _ProcClient], InitializeResponse | None],
         main_task_fnc: Callable[[aio.ChanReceiver[Message]], Coroutine[None, None, None]],
     ) -> None:
         self._mp_cch = mp_cch
@@ -58,8 +59,8 @@ class _ProcClient:
 
             self._init_req = first_req
             try:
-                self._initialize_fnc(self._init_req, self)
-                send_message(cch, InitializeResponse())
+                init_res = self._initialize_fnc(self._init_req, self)
+                send_message(cch, init_res or InitializeResponse())
             except Exception as e:
                 send_message(cch, InitializeResponse(error=str(e)))
                 raise
@@ -2,13 +2,18 @@ from __future__ import annotations
 
 import asyncio
 import math
+import time
 from collections.abc import Awaitable
+from dataclasses import dataclass
 from multiprocessing.context import BaseContext
 from typing import Any, Callable, Literal
 
+import psutil
+
 from .. import utils
 from ..job import JobContext, JobExecutorType, JobProcess, RunningJobInfo
 from ..log import logger
+from ..metrics import TurnLatencyCollector
 from ..utils import aio
 from ..utils.hw.cpu import get_cpu_monitor
 from . import inference_executor, job_proc_executor, job_thread_executor
@@ -24,6 +29,126 @@ EventTypes = Literal[
 
 MAX_CONCURRENT_INITIALIZATIONS = math.ceil(get_cpu_monitor().cpu_count())
 
+# time constants of the long-term (EWMA) and short-term job arrival rates, a burst is when the
+# short-term rate exceeds BURST_THRESHOLD times the long-term one
+ARRIVAL_RATE_WINDOW = 60.0
+BURST_RATE_WINDOW = 5.0
+BURST_THRESHOLD = 2.0
+# warm-up time assumed until a process has been initialized, and smoothing of the measured ones
+DEFAULT_WARMUP_TIME = 2.0
+WARMUP_SMOOTHING = 0.3
+# fraction of the available memory the predicted idle processes may use
+MEMORY_HEADROOM = 0.8
+
+
+@dataclass
+class ProcPoolStats:
+    target_idle_processes: int
+    idle_processes: int
+    pool_hits: int
+    """jobs launched on an already warmed process"""
+    cold_starts: int
+    """jobs that had to wait for a process to be spawned and initialized"""
+    arrival_rate: float
+    """expected job arrivals per second"""
+    burst: bool
+    avg_warmup_time: float
+
+
+class IdlePoolController:
+    """Predicts how many idle processes are needed to absorb the incoming jobs.
+
+    New processes take the warm-up time to be ready, so the pool keeps enough of them idle to
+    cover the jobs expected to arrive within it. The arrival rate is an EWMA over
+    ARRIVAL_RATE_WINDOW, replaced by the short-term rate during bursts.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_idle_processes: int,
+        max_idle_processes: int,
+        process_memory_mb: float = 0.0,
+    ) -> None:
+        self._min_idle = min_idle_processes
+        self._max_idle = max(max_idle_processes, min_idle_processes)
+        self._process_memory_mb = process_memory_mb
+
+        # exponentially decayed arrival counts, as of _last_arrival
+        self._long_count = 0.0
+        self._short_count = 0.0
+        self._last_arrival: float | None = None
+        self._warmup_time: float | None = None
+
+    @property
+    def min_idle_processes(self) -> int:
+        return self._min_idle
+
+    @property
+    def max_idle_processes(self) -> int:
+        return self._max_idle
+
+    @property
+    def avg_warmup_time(self) -> float:
+        return self._warmup_time if self._warmup_time is not None else DEFAULT_WARMUP_TIME
+
+    def record_arrival(self, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        if self._last_arrival is not None:
+            elapsed = max(now - self._last_arrival, 0.0)
+            self._long_count *= math.exp(-elapsed / ARRIVAL_RATE_WINDOW)
+            self._short_count *= math.exp(-elapsed / BURST_RATE_WINDOW)
+
+        self._long_count += 1.0
+        self._short_count += 1.0
+        self._last_arrival = now
+
+    def record_warmup(self, duration: float) -> None:
+        if self._warmup_time is None:
+            self._warmup_time = duration
+        else:
+            self._warmup_time += WARMUP_SMOOTHING * (duration - self._warmup_time)
+
+    def _rates(self, now: float) -> tuple[float, float]:
+        if self._last_arrival is None:
+            return 0.0, 0.0
+
+        elapsed = max(now - self._last_arrival, 0.0)
+        long_rate = self._long_count * math.exp(-elapsed / ARRIVAL_RATE_WINDOW)
+        short_rate = self._short_count * math.exp(-elapsed / BURST_RATE_WINDOW)
+        return long_rate / ARRIVAL_RATE_WINDOW, short_rate / BURST_RATE_WINDOW
+
+    def is_bursting(self, now: float | None = None) -> bool:
+        long_rate, short_rate = self._rates(time.monotonic() if now is None else now)
+        # a single arrival after a quiet period isn't a burst
+        return short_rate * BURST_RATE_WINDOW >= 2.0 and short_rate > BURST_THRESHOLD * long_rate
+
+    def arrival_rate(self, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        long_rate, short_rate = self._rates(now)
+        return short_rate if self.is_bursting(now) else long_rate
+
+    def target_idle_processes(
+        self,
+        *,
+        idle_processes: int = 0,
+        available_memory_mb: float | None = None,
+        now: float | None = None,
+    ) -> int:
+        """Number of idle processes to keep, between the min and max bounds.
+
+        Above the minimum, the processes also have to fit in the available memory, which
+        already accounts for the idle processes that exist.
+        """
+        expected = self.arrival_rate(now) * self.avg_warmup_time
+        target = min(math.ceil(expected), self._max_idle)
+
+        if available_memory_mb is not None and self._process_memory_mb > 0:
+            spare = math.floor(available_memory_mb * MEMORY_HEADROOM / self._process_memory_mb)
+            target = min(target, idle_processes + max(spare, 0))
+
+        return max(target, self._min_idle)
+
 
 class ProcPool(utils.EventEmitter[EventTypes]):
     def __init__(
@@ -41,6 +166,8 @@ class ProcPool(utils.EventEmitter[EventTypes]):
         memory_limit_mb: float,
         http_proxy: str | None,
         loop: asyncio.AbstractEventLoop,
+        audio_decoder_workers: int = 0,
+        max_idle_processes: int | None = None,
     ) -> None:
         super().__init__()
         self._job_executor_type = job_executor_type
@@ -55,8 +182,26 @@ class ProcPool(utils.EventEmitter[EventTypes]):
         self._memory_warn_mb = memory_warn_mb
         self._default_num_idle_processes = num_idle_processes
         self._http_proxy = http_proxy
+        self._audio_decoder_workers = audio_decoder_workers
         self._target_idle_processes = num_idle_processes
 
+        # threads share the memory of the worker, memory is only a concern with processes
+        self._process_memory_mb = 0.0
+        if job_executor_type == JobExecutorType.PROCESS:
+            self._process_memory_mb = memory_limit_mb if memory_limit_mb > 0 else memory_warn_mb
+        self._controller = IdlePoolController(
+            min_idle_processes=num_idle_processes,
+            max_idle_processes=(
+                max_idle_processes if max_idle_processes is not None else num_idle_processes
+            ),
+            process_memory_mb=self._process_memory_mb,
+        )
+        self._max_idle_from_load = self._controller.max_idle_processes
+        self._pool_hits = 0
+        self._cold_starts = 0
+        # turns of all the jobs, reported by the executors
+        self._turn_latency = TurnLatencyCollector()
+
         self._init_sem = asyncio.Semaphore(MAX_CONCURRENT_INITIALIZATIONS)
         self._warmed_proc_queue = asyncio.Queue[JobExecutor]()
         self._executors: list[JobExecutor] = []
@@ -72,6 +217,10 @@ class ProcPool(utils.EventEmitter[EventTypes]):
     def processes(self) -> list[JobExecutor]:
         return self._executors
 
+    @property
+    def turn_latency(self) -> TurnLatencyCollector:
+        return self._turn_latency
+
     def get_by_job_id(self, job_id: str) -> JobExecutor | None:
         return next(
             (x for x in self._executors if x.running_job and x.running_job.job.id == job_id),
@@ -96,7 +245,28 @@ class ProcPool(utils.EventEmitter[EventTypes]):
         self._closed = True
         await aio.cancel_and_wait(self._main_atask)
 
+    @property
+    def controller(self) -> IdlePoolController:
+        return self._controller
+
+    def stats(self) -> ProcPoolStats:
+        return ProcPoolStats(
+            target_idle_processes=self._target_idle_processes,
+            idle_processes=self._warmed_proc_queue.qsize(),
+            pool_hits=self._pool_hits,
+            cold_starts=self._cold_starts,
+            arrival_rate=self._controller.arrival_rate(),
+            burst=self._controller.is_bursting(),
+            avg_warmup_time=self._controller.avg_warmup_time,
+        )
+
     async def launch_job(self, info: RunningJobInfo) -> None:
+        self._controller.record_arrival()
+        if self._warmed_proc_queue.qsize() > self._jobs_waiting_for_process:
+            self._pool_hits += 1
+        else:
+            self._cold_starts += 1
+
         self._jobs_waiting_for_process += 1
         if (
             self._warmed_proc_queue.empty()
@@ -114,12 +284,28 @@ class ProcPool(utils.EventEmitter[EventTypes]):
         self.emit("process_job_launched", proc)
 
     def set_target_idle_processes(self, num_idle_processes: int) -> None:
-        self._target_idle_processes = num_idle_processes
+        """Limit the number of idle processes, e.g. to what the worker load allows.
+
+        The pool keeps at most this many idle processes, fewer when the controller doesn't
+        expect as many jobs.
+        """
+        self._max_idle_from_load = num_idle_processes
 
     @property
     def target_idle_processes(self) -> int:
         return self._target_idle_processes
 
+    def _update_target(self) -> None:
+        idle = self._warmed_proc_queue.qsize()
+        available_memory_mb: float | None = None
+        if self._process_memory_mb > 0:
+            available_memory_mb = psutil.virtual_memory().available / (1024 * 1024)
+
+        target = self._controller.target_idle_processes(
+            idle_processes=idle, available_memory_mb=available_memory_mb
+        )
+        self._target_idle_processes = min(target, self._max_idle_from_load)
+
     @utils.log_exceptions(logger=logger)
     async def _proc_spawn_task(self) -> None:
         proc: JobExecutor
@@ -134,6 +320,8 @@ class ProcPool(utils.EventEmitter[EventTypes]):
                 high_ping_threshold=0.5,
                 http_proxy=self._http_proxy,
                 loop=self._loop,
+                audio_decoder_workers=self._audio_decoder_workers,
+                on_turn_latency=self._turn_latency.add_turn,
             )
         elif self._job_executor_type == JobExecutorType.PROCESS:
             proc = job_proc_executor.ProcJobExecutor(
@@ -150,6 +338,8 @@ class ProcPool(utils.EventEmitter[EventTypes]):
                 memory_warn_mb=self._memory_warn_mb,
                 memory_limit_mb=self._memory_limit_mb,
                 http_proxy=self._http_proxy,
+                audio_decoder_workers=self._audio_decoder_workers,
+                on_turn_latency=self._turn_latency.add_turn,
             )
         else:
             raise ValueError(f"unsupported job executor: {self._job_executor_type}")
@@ -161,6 +351,7 @@ class ProcPool(utils.EventEmitter[EventTypes]):
                 return
 
             self.emit("process_created", proc)
+            started_at = time.monotonic()
             await proc.start()
             self.emit("process_started", proc)
             try:
@@ -168,6 +359,7 @@ class ProcPool(utils.EventEmitter[EventTypes]):
                 # process where initialization times out will never fire "process_ready"
                 # neither be used to launch jobs
 
+                self._controller.record_warmup(time.monotonic() - started_at)
                 self.emit("process_ready", proc)
                 self._warmed_proc_queue.put_nowait(proc)
                 if self._warmed_proc_queue.qsize() >= self._default_num_idle_processes:
@@ -191,11 +383,9 @@ class ProcPool(utils.EventEmitter[EventTypes]):
     async def _main_task(self) -> None:
         try:
             while not self._closed:
+                self._update_target()
                 current_pending = self._warmed_proc_queue.qsize() + len(self._spawn_tasks)
-                to_spawn = (
-                    min(self._target_idle_processes, self._default_num_idle_processes)
-                    - current_pending
-                )
+                to_spawn = self._target_idle_processes - current_pending
 
                 for _ in range(to_spawn):
                     task = asyncio.create_task(self._proc_spawn_task())
@@ -16,6 +16,16 @@ class InitializeRequest:
     """sent by the main process to the subprocess to initialize it. this is going to call initialize_process_fnc"""  # noqa: E501
 
     MSG_ID: ClassVar[int] = 0
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(
+        ("asyncio_debug", "bool"),
+        ("ping_interval", "float"),
+        ("ping_timeout", "float"),
+        ("high_ping_threshold", "float"),
+        ("http_proxy", "string"),
+        ("audio_decoder_workers", "int"),
+        ("shm_name", "string"),
+        ("shm_ring_size", "int"),
+    )
 
     asyncio_debug: bool = False
     ping_interval: float = 0
@@ -23,20 +33,10 @@ class InitializeRequest:
     # if ping is higher than this, process is considered unresponsive
     high_ping_threshold: float = 0
     http_proxy: str = ""  # empty = None
-
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_bool(b, self.asyncio_debug)
-        channel.write_float(b, self.ping_interval)
-        channel.write_float(b, self.ping_timeout)
-        channel.write_float(b, self.high_ping_threshold)
-        channel.write_string(b, self.http_proxy)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.asyncio_debug = channel.read_bool(b)
-        self.ping_interval = channel.read_float(b)
-        self.ping_timeout = channel.read_float(b)
-        self.high_ping_threshold = channel.read_float(b)
-        self.http_proxy = channel.read_string(b)
+    audio_decoder_workers: int = 0  # 0 = default
+    # shared memory segment proposed for the inference payloads (see shm_ring), empty = none
+    shm_name: str = ""
+    shm_ring_size: int = 0
 
 
 @dataclass
@@ -44,13 +44,11 @@ class InitializeResponse:
     """mark the process as initialized"""
 
     MSG_ID: ClassVar[int] = 1
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(
+        ("error", "string"), ("shm_name", "string")
+    )
     error: str = ""
-
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_string(b, self.error)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.error = channel.read_string(b)
+    shm_name: str = ""  # the shared memory segment the process attached to, empty = none
 
 
 @dataclass
@@ -58,31 +56,21 @@ class PingRequest:
     """sent by the main process to the subprocess to check if it is still alive"""
 
     MSG_ID: ClassVar[int] = 2
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(("timestamp", "long"))
     timestamp: int = 0
 
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_long(b, self.timestamp)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.timestamp = channel.read_long(b)
-
 
 @dataclass
 class PongResponse:
     """response to a PingRequest"""
 
     MSG_ID: ClassVar[int] = 3
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(
+        ("last_timestamp", "long"), ("timestamp", "long")
+    )
     last_timestamp: int = 0
     timestamp: int = 0
 
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_long(b, self.last_timestamp)
-        channel.write_long(b, self.timestamp)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.last_timestamp = channel.read_long(b)
-        self.timestamp = channel.read_long(b)
-
 
 @dataclass
 class StartJobRequest:
@@ -124,47 +112,41 @@ class ShutdownRequest:
     gracefully. the subprocess will follow with a ExitInfo message"""
 
     MSG_ID: ClassVar[int] = 5
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(("reason", "string"))
     reason: str = ""
 
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_string(b, self.reason)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.reason = channel.read_string(b)
-
 
 @dataclass
 class Exiting:
     """sent by the subprocess to the main process to indicate that it is exiting"""
 
     MSG_ID: ClassVar[int] = 6
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(("reason", "string"))
     reason: str = ""
 
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_string(b, self.reason)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.reason = channel.read_string(b)
-
 
 @dataclass
 class InferenceRequest:
     """sent by a subprocess to the main process to request inference"""
 
     MSG_ID: ClassVar[int] = 7
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(
+        ("method", "string"),
+        ("request_id", "string"),
+        ("data", "bytes"),
+        ("deadline", "double"),
+        ("shm_offset", "long"),
+        ("shm_length", "int"),
+        ("shm_seq", "long"),
+    )
     method: str = ""
     request_id: str = ""
     data: bytes = b""
-
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_string(b, self.method)
-        channel.write_string(b, self.request_id)
-        channel.write_bytes(b, self.data)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.method = channel.read_string(b)
-        self.request_id = channel.read_string(b)
-        self.data = channel.read_bytes(b)
+    deadline: float = 0.0  # unix timestamp after which the result is no longer needed, 0 = none
+    # descriptor of the data in the shared memory ring, shm_seq = 0 when data is inline
+    shm_offset: int = 0
+    shm_length: int = 0
+    shm_seq: int = 0
 
 
 @dataclass
@@ -172,36 +154,28 @@ class InferenceResponse:
     """response to an InferenceRequest"""
 
     MSG_ID: ClassVar[int] = 8
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(
+        ("request_id", "string"),
+        ("data", "optional_bytes"),
+        ("error", "string"),
+        ("shm_offset", "long"),
+        ("shm_length", "int"),
+        ("shm_seq", "long"),
+    )
     request_id: str = ""
     data: bytes | None = None
     error: str = ""
-
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_string(b, self.request_id)
-        channel.write_bool(b, self.data is not None)
-        if self.data is not None:
-            channel.write_bytes(b, self.data)
-        channel.write_string(b, self.error)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.request_id = channel.read_string(b)
-        has_data = channel.read_bool(b)
-        if has_data:
-            self.data = channel.read_bytes(b)
-        self.error = channel.read_string(b)
+    shm_offset: int = 0
+    shm_length: int = 0
+    shm_seq: int = 0
 
 
 @dataclass
 class TracingRequest:
     MSG_ID: ClassVar[int] = 9
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(("request_id", "string"))
     request_id: str = ""
 
-    def write(self, b: io.BytesIO) -> None:
-        channel.write_string(b, self.request_id)
-
-    def read(self, b: io.BytesIO) -> None:
-        self.request_id = channel.read_string(b)
-
 
 @dataclass
 class TracingResponse:
@@ -218,6 +192,35 @@ class TracingResponse:
         self.info = pickle.loads(channel.read_bytes(b))
 
 
+@dataclass
+class TurnLatencyReport:
+    """sent by the job to the main process when the latencies of a user turn are known"""
+
+    MSG_ID: ClassVar[int] = 11
+    CODEC: ClassVar[channel.MessageCodec] = channel.MessageCodec(
+        ("speech_id", "string"),
+        ("timestamp", "double"),
+        ("end_of_utterance_delay", "double"),
+        ("transcription_delay", "double"),
+        ("on_user_turn_completed_delay", "double"),
+        ("llm_ttft", "double"),
+        ("tts_ttfb", "double"),
+        ("preemptive_hit", "bool"),
+        ("preemptive_lead_time", "double"),
+        ("preemptive_tts", "bool"),
+    )
+    speech_id: str = ""
+    timestamp: float = 0.0
+    end_of_utterance_delay: float = 0.0
+    transcription_delay: float = 0.0
+    on_user_turn_completed_delay: float = 0.0
+    llm_ttft: float = 0.0
+    tts_ttfb: float = 0.0
+    preemptive_hit: bool = False
+    preemptive_lead_time: float = 0.0
+    preemptive_tts: bool = False
+
+
 IPC_MESSAGES = {
     InitializeRequest.MSG_ID: InitializeRequest,
     InitializeResponse.MSG_ID: InitializeResponse,
@@ -230,4 +233,5 @@ IPC_MESSAGES = {
     InferenceResponse.MSG_ID: InferenceResponse,
     TracingRequest.MSG_ID: TracingRequest,
     TracingResponse.MSG_ID: TracingResponse,
+    TurnLatencyReport.MSG_ID: TurnLatencyReport,
 }
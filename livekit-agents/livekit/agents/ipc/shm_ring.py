@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import struct
+import sys
+from multiprocessing import shared_memory
+
+from ..log import logger
+
+DEFAULT_RING_SIZE = 4 * 1024 * 1024
+# a job process only carries the requests of its own job
+DEFAULT_JOB_RING_SIZE = 1024 * 1024
+# smaller payloads are cheaper to send inline, the socket copies are negligible below ~4KB
+# (e.g. a 32ms VAD window is 2KB) while the ring bookkeeping isn't
+MIN_PAYLOAD_SIZE = 4096
+
+# position up to which the reader consumed the ring, written by the reader only
+_TAIL = struct.Struct("=Q")
+_HEADER_SIZE = 64
+
+
+class ShmRing:
+    """Byte ring buffer in shared memory, with one writer process and one reader process.
+
+    The payloads stay in the shared memory, only their descriptor (offset, length, seq) is sent
+    over the IPC channel. The reader must consume the descriptors in the order they were
+    written, which holds as long as they're sent over the same socket. Offsets are positions in
+    an ever increasing stream of bytes, a payload that doesn't fit before the end of the buffer
+    is written at its beginning.
+    """
+
+    def __init__(self, buf: memoryview) -> None:
+        self._buf = buf
+        self._tail_buf = buf[:_HEADER_SIZE]
+        self._data = buf[_HEADER_SIZE:]
+        self._capacity = len(self._data)
+        self._head = 0  # writer only
+        self._seq = 0
+
+    @staticmethod
+    def buffer_size(capacity: int) -> int:
+        return _HEADER_SIZE + capacity
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def _tail(self) -> int:
+        return _TAIL.unpack_from(self._tail_buf)[0]  # type: ignore
+
+    def write(self, data: bytes) -> tuple[int, int, int] | None:
+        """Copy data into the ring, returns its descriptor or None if there is not enough space"""
+        length = len(data)
+        offset = self._head
+        index = offset % self._capacity
+        if index + length > self._capacity:
+            # skip the end of the buffer
+            offset += self._capacity - index
+            index = 0
+
+        if offset + length - self._tail() > self._capacity:
+            return None
+
+        self._data[index : index + length] = data
+        self._head = offset + length
+        self._seq += 1
+        return offset, length, self._seq
+
+    def read(self, offset: int, length: int, seq: int) -> bytes:
+        """Copy a payload out of the ring and release its space"""
+        self._seq += 1
+        if seq != self._seq:
+            raise RuntimeError(f"shared memory ring out of sync, expected {self._seq}, got {seq}")
+
+        index = offset % self._capacity
+        data = bytes(self._data[index : index + length])
+        _TAIL.pack_into(self._tail_buf, 0, offset + length)
+        return data
+
+    def release(self) -> None:
+        self._tail_buf.release()
+        self._data.release()
+        self._buf.release()
+
+
+class ShmTransport:
+    """Shared memory segment holding the request ring and the response ring of a process"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, ring_size: int, *, owner: bool) -> None:
+        self._shm = shm
+        self._owner = owner
+        half = ShmRing.buffer_size(ring_size)
+        assert shm.buf is not None
+        self.requests = ShmRing(shm.buf[:half])
+        self.responses = ShmRing(shm.buf[half : 2 * half])
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @classmethod
+    def create(cls, ring_size: int) -> ShmTransport:
+        size = 2 * ShmRing.buffer_size(ring_size)
+        return cls(shared_memory.SharedMemory(create=True, size=size), ring_size, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, ring_size: int) -> ShmTransport:
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # the resource tracker is shared with the creator, which unlinks the segment
+            shm = shared_memory.SharedMemory(name=name)
+
+        return cls(shm, ring_size, owner=False)
+
+    def close(self) -> None:
+        self.requests.release()
+        self.responses.release()
+        try:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+        except (BufferError, OSError):
+            logger.exception("failed to close the shared memory segment")
@@ -18,7 +18,7 @@ import psutil
 from ..log import logger
 from ..utils import aio, log_exceptions, time_ms
 from ..utils.aio import duplex_unix
-from . import channel, proto
+from . import channel, proto, shm_ring
 from .log_queue import LogQueueListener
 
 
@@ -71,6 +71,12 @@ class SupervisedProc(ABC):
         self._initialize_fut = asyncio.Future[None]()
         self._lock = asyncio.Lock()
 
+        # size of the shared memory rings proposed to the process for the inference payloads,
+        # set by the subclasses. 0 disables them, payloads are then always sent over the socket
+        self._shm_ring_size = 0
+        self._shm: shm_ring.ShmTransport | None = None
+        self._shm_accepted = False
+
     @abstractmethod
     def _create_process(self, cch: socket.socket, log_cch: socket.socket) -> mp.Process: ...
 
@@ -147,19 +153,48 @@ class SupervisedProc(ABC):
         if self._supervise_atask:
             await asyncio.shield(self._supervise_atask)
 
+    def _initialize_request(self) -> proto.InitializeRequest:
+        init_req = proto.InitializeRequest(
+            asyncio_debug=self._loop.get_debug(),
+            ping_interval=self._opts.ping_interval,
+            ping_timeout=self._opts.ping_timeout,
+            high_ping_threshold=self._opts.high_ping_threshold,
+            http_proxy=self._opts.http_proxy or "",
+        )
+
+        self._close_shm()
+        if self._shm_ring_size > 0:
+            try:
+                self._shm = shm_ring.ShmTransport.create(self._shm_ring_size)
+                init_req.shm_name = self._shm.name
+                init_req.shm_ring_size = self._shm_ring_size
+            except OSError:
+                logger.warning(
+                    "failed to create the shared memory for inference, using the socket",
+                    exc_info=True,
+                    extra=self.logging_extra(),
+                )
+
+        return init_req
+
+    def _handle_initialize_response(self, init_res: proto.InitializeResponse) -> None:
+        self._shm_accepted = self._shm is not None and init_res.shm_name == self._shm.name
+        if self._shm is not None and not self._shm_accepted:
+            logger.warning(
+                "process didn't attach to the shared memory, using the socket",
+                extra=self.logging_extra(),
+            )
+
+    def _close_shm(self) -> None:
+        self._shm_accepted = False
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
     async def initialize(self) -> None:
         """initialize the process, this is sending a InitializeRequest message and waiting for a
         InitializeResponse with a timeout"""
-        await channel.asend_message(
-            self._pch,
-            proto.InitializeRequest(
-                asyncio_debug=self._loop.get_debug(),
-                ping_interval=self._opts.ping_interval,
-                ping_timeout=self._opts.ping_timeout,
-                high_ping_threshold=self._opts.high_ping_threshold,
-                http_proxy=self._opts.http_proxy or "",
-            ),
-        )
+        await channel.asend_message(self._pch, self._initialize_request())
 
         # wait for the process to become ready
         try:
@@ -176,6 +211,7 @@ class SupervisedProc(ABC):
             if init_res.error:
                 raise RuntimeError(f"process initialization failed: {init_res.error}")
             else:
+                self._handle_initialize_response(init_res)
                 self._initialize_fut.set_result(None)
 
             logger.info(
@@ -277,6 +313,7 @@ class SupervisedProc(ABC):
         self._exitcode = self._proc.exitcode
         self._proc.close()
         await aio.cancel_and_wait(ping_task, read_ipc_task, main_task)
+        self._close_shm()
 
         if memory_monitor_task is not None:
             await aio.cancel_and_wait(memory_monitor_task)
@@ -33,6 +33,7 @@ from livekit.protocol import agent, models
 from .cli import cli
 from .ipc.inference_executor import InferenceExecutor
 from .log import logger
+from .metrics import TurnLatency, TurnLatencyCollector
 from .types import NOT_GIVEN, NotGivenOr
 from .utils import http_context, is_given, wait_for_participant
 
@@ -103,6 +104,7 @@ class JobContext:
         on_connect: Callable[[], None],
         on_shutdown: Callable[[str], None],
         inference_executor: InferenceExecutor,
+        on_turn_latency: Callable[[TurnLatency], None] | None = None,
     ) -> None:
         self._proc = proc
         self._info = info
@@ -123,6 +125,7 @@ class JobContext:
         self._pending_tasks = list[asyncio.Task[Any]]()
         self._room.on("participant_connected", self._participant_available)
         self._inf_executor = inference_executor
+        self._turn_latency = TurnLatencyCollector(on_turn=on_turn_latency)
 
         self._init_log_factory()
         self._log_fields: dict[str, Any] = {}
@@ -156,6 +159,11 @@ class JobContext:
     def inference_executor(self) -> InferenceExecutor:
         return self._inf_executor
 
+    @property
+    def turn_latency(self) -> TurnLatencyCollector:
+        """Latencies of the user turns of the sessions of this job, fed by AgentSession"""
+        return self._turn_latency
+
     @functools.cached_property
     def api(self) -> api.LiveKitAPI:
         """Returns an LiveKitAPI for making API calls to LiveKit.
@@ -44,6 +44,7 @@ from .tool_context import (
     function_tool,
     is_function_tool,
     is_raw_function_tool,
+    memoize_tool,
 )
 
 __all__ = [
@@ -66,6 +67,7 @@ __all__ = [
     "ToolChoice",
     "is_function_tool",
     "function_tool",
+    "memoize_tool",
     "find_function_tools",
     "FunctionTool",
     "is_raw_function_tool",
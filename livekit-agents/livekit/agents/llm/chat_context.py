@@ -214,6 +214,13 @@ class ChatContext:
     def index_by_id(self, item_id: str) -> int | None:
         return next((i for i, item in enumerate(self.items) if item.id == item_id), None)
 
+    def is_equivalent(self, other: ChatContext) -> bool:
+        """Whether both contexts contain the same items in the same order"""
+        if len(self.items) != len(other.items):
+            return False
+
+        return all(a is b or a == b for a, b in zip(self.items, other.items))
+
     def copy(
         self,
         *,
@@ -10,6 +10,7 @@ from typing import Any, Literal
 from .._exceptions import APIConnectionError, APIError
 from ..log import logger
 from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
+from ..utils import hedging
 from .chat_context import ChatContext
 from .llm import LLM, ChatChunk, LLMStream
 from .tool_context import FunctionTool, RawFunctionTool, ToolChoice
@@ -42,6 +43,10 @@ class FallbackAdapter(
         # use fallback instead of retrying
         max_retry_per_llm: int = 0,
         retry_interval: float = 0.5,
+        # when set, the request is also sent to the next LLM if the first chunk takes longer than
+        # the p95 of the current one (this delay until enough requests were made), and the LLMs
+        # are ranked by their latency and availability
+        hedge_after: float | None = None,
     ) -> None:
         if len(llm) < 1:
             raise ValueError("at least one LLM instance must be provided.")
@@ -52,10 +57,17 @@ class FallbackAdapter(
         self._attempt_timeout = attempt_timeout
         self._max_retry_per_llm = max_retry_per_llm
         self._retry_interval = retry_interval
+        self._hedge_after = hedge_after
 
         self._status = [
             _LLMStatus(available=True, recovering_task=None) for _ in self._llm_instances
         ]
+        self._stats = [hedging.ProviderStats() for _ in self._llm_instances]
+
+    def _provider_order(self) -> list[int]:
+        if self._hedge_after is None:
+            return list(range(len(self._llm_instances)))
+        return hedging.rank_providers(self._stats, self._hedge_after)
 
     def chat(
         self,
@@ -207,24 +219,59 @@ class FallbackLLMStream(LLMStream):
         if all_failed:
             logger.error("all LLMs are unavailable, retrying..")
 
-        for i, llm in enumerate(self._fallback_adapter._llm_instances):
+        failed: set[int] = set()
+
+        def _candidate(i: int) -> hedging.HedgeCandidate[ChatChunk]:
+            llm, llm_status = (
+                self._fallback_adapter._llm_instances[i],
+                self._fallback_adapter._status[i],
+            )
+
+            def _on_error(_: Exception) -> None:
+                failed.add(i)
+                if llm_status.available:
+                    llm_status.available = False
+                    self._fallback_adapter.emit(
+                        "llm_availability_changed",
+                        AvailabilityChangedEvent(llm=llm, available=False),
+                    )
+
+            return hedging.HedgeCandidate(
+                stats=self._fallback_adapter._stats[i],
+                start=lambda: self._try_generate(llm=llm, check_recovery=False),
+                on_error=_on_error,
+            )
+
+        order = self._fallback_adapter._provider_order()
+        for pos, i in enumerate(order):
+            llm = self._fallback_adapter._llm_instances[i]
             llm_status = self._fallback_adapter._status[i]
-            if llm_status.available or all_failed:
+            if i not in failed and (llm_status.available or all_failed):
+                backup = None
+                if self._fallback_adapter._hedge_after is not None:
+                    backup = next(
+                        (
+                            _candidate(j)
+                            for j in order[pos + 1 :]
+                            if self._fallback_adapter._status[j].available or all_failed
+                        ),
+                        None,
+                    )
+
                 chunk_sent = False
                 try:
-                    async for result in self._try_generate(llm=llm, check_recovery=False):
+                    async for result in hedging.hedged_stream(
+                        _candidate(i),
+                        backup,
+                        delay=self._fallback_adapter._stats[i].hedge_delay(
+                            self._fallback_adapter._hedge_after or 0.0
+                        ),
+                    ):
                         chunk_sent = True
                         self._event_ch.send_nowait(result)
 
                     return
-                except Exception:  # exceptions already logged inside _try_synthesize
-                    if llm_status.available:
-                        llm_status.available = False
-                        self._fallback_adapter.emit(
-                            "llm_availability_changed",
-                            AvailabilityChangedEvent(llm=llm, available=False),
-                        )
-
+                except Exception:  # exceptions already logged inside _try_generate
                     if chunk_sent:
                         logger.error(f"{llm.label} failed after sending chunk, skip retrying")
                         raise
@@ -13,6 +13,7 @@ from livekit import rtc
 
 from .. import utils
 from .._exceptions import APIConnectionError, APIError
+from ..debug import tracing
 from ..log import logger
 from ..metrics import LLMMetrics
 from ..types import (
@@ -194,6 +195,7 @@ class LLMStream(ABC):
     @utils.log_exceptions(logger=logger)
     async def _metrics_monitor_task(self, event_aiter: AsyncIterable[ChatChunk]) -> None:
         start_time = time.perf_counter()
+        start_timestamp = time.time()
         ttft = -1.0
         request_id = ""
         usage: CompletionUsage | None = None
@@ -226,6 +228,15 @@ class LLMStream(ABC):
         )
         self._llm.emit("metrics_collected", metrics)
 
+        if ttft != -1.0:
+            tracing.Tracing.add_span(
+                "llm_ttft",
+                start_timestamp,
+                start_timestamp + ttft,
+                category="llm",
+                args={"request_id": request_id, "label": self._llm._label},
+            )
+
     @property
     def chat_ctx(self) -> ChatContext:
         return self._chat_ctx
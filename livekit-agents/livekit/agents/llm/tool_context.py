@@ -15,8 +15,10 @@
 from __future__ import annotations
 
 import inspect
+import time
+from collections import OrderedDict
 from collections.abc import Awaitable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import (
     Any,
     Callable,
@@ -75,10 +77,15 @@ class StopResponse(Exception):
         super().__init__()
 
 
+ToolExecutor = Literal["thread", "process"]
+
+
 @dataclass
 class _FunctionToolInfo:
     name: str
     description: str | None
+    executor: ToolExecutor | None = None
+    timeout: float | None = None
 
 
 @runtime_checkable
@@ -117,7 +124,7 @@ class RawFunctionTool(Protocol):
     def __call__(self, *args: Any, **kwargs: Any) -> Any: ...
 
 
-F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+F = TypeVar("F", bound=Callable[..., Any])
 Raw_F = TypeVar("Raw_F", bound=Callable[..., Awaitable[Any]])
 
 
@@ -135,13 +142,23 @@ def function_tool(
 
 @overload
 def function_tool(
-    f: F, *, name: str | None = None, description: str | None = None
+    f: F,
+    *,
+    name: str | None = None,
+    description: str | None = None,
+    executor: ToolExecutor | None = None,
+    timeout: float | None = None,
 ) -> FunctionTool: ...
 
 
 @overload
 def function_tool(
-    f: None = None, *, name: str | None = None, description: str | None = None
+    f: None = None,
+    *,
+    name: str | None = None,
+    description: str | None = None,
+    executor: ToolExecutor | None = None,
+    timeout: float | None = None,
 ) -> Callable[[F], FunctionTool]: ...
 
 
@@ -150,6 +167,8 @@ def function_tool(
     *,
     name: str | None = None,
     description: str | None = None,
+    executor: ToolExecutor | None = None,
+    timeout: float | None = None,
     raw_schema: RawFunctionDescription | dict[str, Any] | None = None,
 ) -> (
     FunctionTool
@@ -157,6 +176,16 @@ def function_tool(
     | Callable[[F], FunctionTool]
     | Callable[[Raw_F], RawFunctionTool]
 ):
+    """Expose a function to the LLM.
+
+    CPU-bound tools can be regular (non async) functions with `executor` set, they then run in
+    a thread or in a process pool instead of blocking the event loop. Regular functions without
+    `executor` run in a thread. With "process", the
+    function and its arguments must be picklable (e.g. a module level function without a
+    RunContext). `timeout` is the maximum time in seconds the tool can take, the LLM receives
+    an error when it's exceeded.
+    """
+
     def deco_raw(func: Raw_F) -> RawFunctionTool:
         assert raw_schema is not None
 
@@ -174,10 +203,23 @@ def function_tool(
     def deco_func(func: F) -> FunctionTool:
         from docstring_parser import parse_from_object
 
+        if executor is not None and inspect.iscoroutinefunction(func):
+            raise ValueError(
+                f"{func.__name__} is a coroutine function, only regular functions can run "
+                f"in a {executor} pool"
+            )
+
+        tool_executor = executor
+        if tool_executor is None and not inspect.iscoroutinefunction(func):
+            # a regular function would block the event loop
+            tool_executor = "thread"
+
         docstring = parse_from_object(func)
         info = _FunctionToolInfo(
             name=name or func.__name__,
             description=description or docstring.description,
+            executor=tool_executor,
+            timeout=timeout,
         )
         setattr(func, "__livekit_tool_info", info)
         return cast(FunctionTool, func)
@@ -204,6 +246,75 @@ def get_raw_function_info(f: RawFunctionTool) -> _RawFunctionToolInfo:
     return cast(_RawFunctionToolInfo, getattr(f, "__livekit_raw_tool_info"))
 
 
+@dataclass
+class _ToolResultCache:
+    """LRU cache of the results of a pure function tool"""
+
+    maxsize: int
+    ttl: float | None
+    hits: int = 0
+    misses: int = 0
+    _entries: OrderedDict[Any, tuple[float, Any]] = field(default_factory=OrderedDict)
+
+    def get(self, key: Any) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None or (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+            self._entries.pop(key, None)
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, key: Any, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+@overload
+def memoize_tool(f: F, *, maxsize: int = 128, ttl: float | None = None) -> F: ...
+
+
+@overload
+def memoize_tool(
+    f: None = None, *, maxsize: int = 128, ttl: float | None = None
+) -> Callable[[F], F]: ...
+
+
+def memoize_tool(
+    f: F | None = None, *, maxsize: int = 128, ttl: float | None = None
+) -> F | Callable[[F], F]:
+    """Cache the results of a pure function tool.
+
+    The cache is keyed on the arguments validated from the LLM output, the RunContext is not
+    part of the key. The result must only depend on these arguments since it is shared by
+    every call of the tool in the process. Exceptions are not cached.
+    Can be applied before or after `function_tool`.
+    """
+
+    if maxsize <= 0:
+        raise ValueError("maxsize must be positive")
+
+    def deco(func: F) -> F:
+        setattr(func, "__livekit_tool_cache", _ToolResultCache(maxsize=maxsize, ttl=ttl))
+        return func
+
+    if f is not None:
+        return deco(f)
+
+    return deco
+
+
+def get_tool_cache(f: Callable[..., Any]) -> _ToolResultCache | None:
+    return getattr(f, "__livekit_tool_cache", None)
+
+
 def find_function_tools(cls_or_obj: Any) -> list[FunctionTool | RawFunctionTool]:
     methods: list[FunctionTool | RawFunctionTool] = []
     for _, member in inspect.getmembers(cls_or_obj):
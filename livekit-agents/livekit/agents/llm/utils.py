@@ -5,7 +5,7 @@ import base64
 import inspect
 import sys
 import types
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import (
     TYPE_CHECKING,
     Annotated,
@@ -27,7 +27,7 @@ from livekit import rtc
 from ..log import logger
 from ..utils import images
 from . import _strict
-from .chat_context import ChatContext, ImageContent
+from .chat_context import ChatContext, ChatItem, ImageContent
 from .tool_context import (
     FunctionTool,
     RawFunctionTool,
@@ -45,34 +45,128 @@ THINK_TAG_END = "</think>"
 
 def _compute_lcs(old_ids: list[str], new_ids: list[str]) -> list[str]:
     """
-    Standard dynamic-programming LCS to get the common subsequence
-    of IDs (in order) that appear in both old_ids and new_ids.
+    Longest common subsequence of IDs (in order) that appear in both old_ids and new_ids.
+
+    Contexts mostly grow by appending items, the common prefix and suffix are matched first and
+    usually leave nothing to diff. The rest is diffed with Myers' O((n+m)·d) algorithm.
     """
     n, m = len(old_ids), len(new_ids)
-    dp = [[0] * (m + 1) for _ in range(n + 1)]
-
-    # Fill DP table
-    for i in range(1, n + 1):
-        for j in range(1, m + 1):
-            if old_ids[i - 1] == new_ids[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1] + 1
+    prefix = 0
+    while prefix < n and prefix < m and old_ids[prefix] == new_ids[prefix]:
+        prefix += 1
+
+    suffix = 0
+    while (
+        suffix < n - prefix
+        and suffix < m - prefix
+        and old_ids[n - 1 - suffix] == new_ids[m - 1 - suffix]
+    ):
+        suffix += 1
+
+    old_middle = old_ids[prefix : n - suffix]
+    new_middle = new_ids[prefix : m - suffix]
+    lcs_ids = old_ids[:prefix]
+    if old_middle and new_middle:
+        # IDs only in one of the contexts can't be common, don't count them as edits
+        old_set, new_set = set(old_middle), set(new_middle)
+        old_middle = [item_id for item_id in old_middle if item_id in new_set]
+        new_middle = [item_id for item_id in new_middle if item_id in old_set]
+        _myers_lcs(old_middle, 0, len(old_middle), new_middle, 0, len(new_middle), lcs_ids)
+
+    lcs_ids.extend(old_ids[n - suffix :])
+    return lcs_ids
+
+
+def _myers_lcs(
+    a: list[str], a0: int, a1: int, b: list[str], b0: int, b1: int, out: list[str]
+) -> None:
+    """Append the LCS of a[a0:a1] and b[b0:b1] to out, in linear space"""
+    while True:
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            out.append(a[a0])
+            a0 += 1
+            b0 += 1
+
+        n, m = a1 - a0, b1 - b0
+        if n == 0 or m == 0:
+            return
+
+        d, x, y, u, v = _middle_snake(a, a0, a1, b, b0, b1)
+        if d <= 1:
+            # a single insertion or deletion, the shorter sequence is common
+            out.extend(a[a0:a1] if n < m else b[b0:b1])
+            return
+
+        _myers_lcs(a, a0, a0 + x, b, b0, b0 + y, out)
+        out.extend(a[a0 + x : a0 + u])
+        # iterate over the second half instead of recursing
+        a0, b0 = a0 + u, b0 + v
+
+
+def _middle_snake(
+    a: list[str], a0: int, a1: int, b: list[str], b0: int, b1: int
+) -> tuple[int, int, int, int, int]:
+    """Find the middle snake of the shortest edit script of a[a0:a1] into b[b0:b1].
+
+    Returns the length of the script and the snake from (x, y) to (u, v), relative to a0/b0.
+    """
+    n, m = a1 - a0, b1 - b0
+    delta = n - m
+    odd = delta & 1
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    # furthest x reached on each diagonal k = x - y, forward and backward from the ends
+    vf = [0] * (2 * offset + 1)
+    vb = [0] * (2 * offset + 1)
+
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[offset + k - 1] < vf[offset + k + 1]):
+                x = vf[offset + k + 1]
             else:
-                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
-
-    # Backtrack to find the actual LCS sequence
-    lcs_ids = []
-    i, j = n, m
-    while i > 0 and j > 0:
-        if old_ids[i - 1] == new_ids[j - 1]:
-            lcs_ids.append(old_ids[i - 1])
-            i -= 1
-            j -= 1
-        elif dp[i - 1][j] > dp[i][j - 1]:
-            i -= 1
-        else:
-            j -= 1
-
-    return list(reversed(lcs_ids))
+                x = vf[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[a0 + x] == b[b0 + y]:
+                x += 1
+                y += 1
+            vf[offset + k] = x
+            if odd and delta - d < k < delta + d and x + vb[offset + delta - k] >= n:
+                return 2 * d - 1, x0, y0, x, y
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vb[offset + k - 1] < vb[offset + k + 1]):
+                x = vb[offset + k + 1]
+            else:
+                x = vb[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[a1 - 1 - x] == b[b1 - 1 - y]:
+                x += 1
+                y += 1
+            vb[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + vf[offset + delta - k] >= n:
+                return 2 * d, n - x, m - y, n - x0, m - y0
+
+    raise AssertionError("no middle snake found")
+
+
+def _item_content_hash(item: ChatItem) -> int:
+    """Hash of the content of a chat item, items with the same id and hash are unchanged"""
+    if item.type == "message":
+        content = tuple(
+            c
+            if isinstance(c, str)
+            else (c.type, c.id)
+            if isinstance(c, ImageContent)
+            else (c.type, c.transcript, len(c.frame))
+            for c in item.content
+        )
+        return hash((item.type, item.role, item.interrupted, content))
+    elif item.type == "function_call":
+        return hash((item.type, item.call_id, item.name, item.arguments))
+    else:
+        return hash((item.type, item.call_id, item.name, item.output, item.is_error))
 
 
 @dataclass
@@ -81,33 +175,38 @@ class DiffOps:
     to_create: list[
         tuple[str | None, str]
     ]  # (previous_item_id, id), if previous_item_id is None, add to the root
+    to_update: list[tuple[str | None, str]] = field(default_factory=list)
+    """(previous_item_id, id) of the items in both contexts whose content changed"""
 
 
 def compute_chat_ctx_diff(old_ctx: ChatContext, new_ctx: ChatContext) -> DiffOps:
-    """Computes the minimal list of create/remove operations to transform old_ctx into new_ctx."""
-    # TODO(theomonnom): Make ChatMessage hashable and also add update ops
+    """Computes the minimal list of create/remove operations to transform old_ctx into new_ctx.
 
+    Items kept in place but whose content changed are returned as update operations.
+    """
     old_ids = [m.id for m in old_ctx.items]
     new_ids = [m.id for m in new_ctx.items]
     lcs_ids = set(_compute_lcs(old_ids, new_ids))
 
     to_remove = [msg.id for msg in old_ctx.items if msg.id not in lcs_ids]
     to_create: list[tuple[str | None, str]] = []
+    to_update: list[tuple[str | None, str]] = []
+    old_items = {item.id: item for item in old_ctx.items}
 
     last_id_in_sequence: str | None = None
     for new_msg in new_ctx.items:
         if new_msg.id in lcs_ids:
-            last_id_in_sequence = new_msg.id
+            old_msg = old_items[new_msg.id]
+            if old_msg is not new_msg and _item_content_hash(old_msg) != _item_content_hash(
+                new_msg
+            ):
+                to_update.append((last_id_in_sequence, new_msg.id))
         else:
-            if last_id_in_sequence is None:
-                prev_id = None  # root
-            else:
-                prev_id = last_id_in_sequence
+            to_create.append((last_id_in_sequence, new_msg.id))
 
-            to_create.append((prev_id, new_msg.id))
-            last_id_in_sequence = new_msg.id
+        last_id_in_sequence = new_msg.id
 
-    return DiffOps(to_remove=to_remove, to_create=to_create)
+    return DiffOps(to_remove=to_remove, to_create=to_create, to_update=to_update)
 
 
 def is_context_type(ty: type) -> bool:
@@ -400,8 +499,8 @@ def _is_optional_type(hint: Any) -> bool:
 
 def _shallow_model_dump(model: BaseModel, *, by_alias: bool = False) -> dict[str, Any]:
     result = {}
-    for name, field in model.model_fields.items():
-        key = field.alias if by_alias and field.alias else name
+    for name, field_info in model.model_fields.items():
+        key = field_info.alias if by_alias and field_info.alias else name
         result[key] = getattr(model, name)
     return result
 
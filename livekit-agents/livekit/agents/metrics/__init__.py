@@ -1,5 +1,6 @@
 from .base import (
     AgentMetrics,
+    CacheMetrics,
     EOUMetrics,
     LLMMetrics,
     RealtimeModelMetrics,
@@ -7,6 +8,7 @@ from .base import (
     TTSMetrics,
     VADMetrics,
 )
+from .turn_latency import LatencyHistogram, TurnLatency, TurnLatencyCollector
 from .usage_collector import UsageCollector, UsageSummary
 from .utils import log_metrics
 
@@ -18,8 +20,12 @@ __all__ = [
     "STTMetrics",
     "TTSMetrics",
     "RealtimeModelMetrics",
+    "CacheMetrics",
     "UsageSummary",
     "UsageCollector",
+    "TurnLatency",
+    "TurnLatencyCollector",
+    "LatencyHistogram",
     "log_metrics",
 ]
 
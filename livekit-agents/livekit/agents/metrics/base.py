@@ -47,6 +47,8 @@ class TTSMetrics(BaseModel):
     streamed: bool
     segment_id: str | None = None
     speech_id: str | None = None
+    cached: bool = False
+    """The audio was served from a cache (see tts.CacheAdapter) instead of the provider."""
 
 
 class VADMetrics(BaseModel):
@@ -76,6 +78,30 @@ class EOUMetrics(BaseModel):
 
     speech_id: str | None = None
 
+    preemptive_hit: bool = False
+    """Whether the reply was generated preemptively, before the end of turn was detected."""
+
+    preemptive_lead_time: float = 0.0
+    """How long before the end of turn the preemptive generation started, 0.0 if not used."""
+
+    preemptive_tts: bool = False
+    """Whether the TTS of the preemptive reply also ran before the end of turn (`preemptive_tts`
+    option), otherwise only the LLM did."""
+
+
+class CacheMetrics(BaseModel):
+    type: Literal["cache_metrics"] = "cache_metrics"
+    label: str
+    timestamp: float
+    hits: int
+    """Number of lookups answered from the cache."""
+    misses: int
+    """Number of lookups that had to be computed."""
+    hit_rate: float
+    """hits / (hits + misses), 0.0 if the cache was never used."""
+    saved_latency: float
+    """Estimated time saved by the cache hits in seconds, based on the average miss latency."""
+
 
 class RealtimeModelMetrics(BaseModel):
     class CachedTokenDetails(BaseModel):
@@ -127,4 +153,5 @@ AgentMetrics = Union[
     VADMetrics,
     EOUMetrics,
     RealtimeModelMetrics,
+    CacheMetrics,
 ]
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .base import AgentMetrics, EOUMetrics, LLMMetrics, TTSMetrics
+
+# turns waiting for their metrics, the oldest are dropped (e.g. speeches without a user turn)
+DEFAULT_MAX_PENDING_TURNS = 32
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+@dataclass
+class TurnLatency:
+    """Latencies of the agent's response to a user turn, joined from the metrics of its speech"""
+
+    speech_id: str
+    timestamp: float
+    end_of_utterance_delay: float
+    transcription_delay: float
+    on_user_turn_completed_delay: float
+    llm_ttft: float
+    tts_ttfb: float
+    preemptive_hit: bool = False
+    preemptive_lead_time: float = 0.0
+    preemptive_tts: bool = False
+
+    @property
+    def saved_latency(self) -> float:
+        """Part of the LLM TTFT (and TTS TTFB if the TTS also ran preemptively) elapsed before the
+        end of turn (preemptive hits)"""
+        if not self.preemptive_hit:
+            return 0.0
+
+        # without preemptive_tts, the TTS only starts at the end of turn
+        saveable = self.llm_ttft + (self.tts_ttfb if self.preemptive_tts else 0.0)
+        return min(self.preemptive_lead_time, saveable)
+
+    @property
+    def response_latency(self) -> float:
+        """Time between the end of the user's speech and the first audio of the response"""
+        return (
+            self.end_of_utterance_delay
+            + self.on_user_turn_completed_delay
+            + self.llm_ttft
+            + self.tts_ttfb
+            - self.saved_latency
+        )
+
+
+class LatencyHistogram:
+    """Streaming histogram of latencies in seconds.
+
+    Like an HDR histogram, the buckets are log-spaced so that percentiles are estimated within
+    `precision` relative error between min_value and max_value, in constant memory.
+    """
+
+    def __init__(
+        self, *, min_value: float = 0.001, max_value: float = 600.0, precision: float = 0.01
+    ) -> None:
+        self._min_value = min_value
+        self._log_growth = math.log1p(2 * precision)
+        # bucket 0 holds the values below min_value
+        num_buckets = math.ceil(math.log(max_value / min_value) / self._log_growth) + 2
+        self._counts = [0] * num_buckets
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def record(self, value: float) -> None:
+        if value < self._min_value:
+            index = 0
+        else:
+            index = int(math.log(value / self._min_value) / self._log_growth) + 1
+            index = min(index, len(self._counts) - 1)
+
+        self._counts[index] += 1
+        self._count += 1
+        self._sum += value
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+
+    def percentile(self, q: float) -> float:
+        """Value below which a fraction q (0-1) of the recorded values fall, 0.0 if empty"""
+        if not self._count:
+            return 0.0
+
+        rank = max(math.ceil(q * self._count), 1)
+        if rank >= self._count:
+            return self._max
+
+        index, seen = 0, self._counts[0]
+        while seen < rank:
+            index += 1
+            seen += self._counts[index]
+
+        if index == 0:
+            return self._min
+
+        # middle of the bucket, in log space
+        value = self._min_value * math.exp((index - 0.5) * self._log_growth)
+        return min(max(value, self._min), self._max)
+
+    def summary(self) -> dict[str, float]:
+        summary = {
+            "count": self._count,
+            "mean": self._sum / self._count if self._count else 0.0,
+            "max": self._max if self._count else 0.0,
+        }
+        for q in PERCENTILES:
+            summary[f"p{q * 100:g}"] = self.percentile(q)
+        return summary
+
+
+_STAGES = (
+    "end_of_utterance_delay",
+    "transcription_delay",
+    "on_user_turn_completed_delay",
+    "llm_ttft",
+    "tts_ttfb",
+    "response_latency",
+)
+
+
+class TurnLatencyCollector:
+    """Join the EOU, LLM and TTS metrics of each speech into a TurnLatency and aggregate them.
+
+    The metrics are matched by speech_id, only the first LLM and TTS request of a speech are
+    used (the ones the user waits for).
+    """
+
+    def __init__(
+        self,
+        *,
+        on_turn: Callable[[TurnLatency], None] | None = None,
+        max_pending_turns: int = DEFAULT_MAX_PENDING_TURNS,
+    ) -> None:
+        self._on_turn = on_turn
+        self._max_pending_turns = max_pending_turns
+        self._pending: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._histograms = {stage: LatencyHistogram() for stage in _STAGES}
+        self._saved_latency = LatencyHistogram()
+        self._last_turn: TurnLatency | None = None
+
+    def __call__(self, metrics: AgentMetrics) -> None:
+        self.collect(metrics)
+
+    @property
+    def last_turn(self) -> TurnLatency | None:
+        return self._last_turn
+
+    def collect(self, metrics: AgentMetrics) -> None:
+        if not isinstance(metrics, (EOUMetrics, LLMMetrics, TTSMetrics)) or not metrics.speech_id:
+            return
+
+        pending = self._pending.get(metrics.speech_id)
+        if pending is None:
+            pending = self._pending[metrics.speech_id] = {}
+            while len(self._pending) > self._max_pending_turns:
+                self._pending.popitem(last=False)
+
+        if isinstance(metrics, EOUMetrics):
+            pending.setdefault("eou", metrics)
+        elif isinstance(metrics, LLMMetrics):
+            pending.setdefault("llm", metrics)
+        else:
+            pending.setdefault("tts", metrics)
+
+        if len(pending) < 3:
+            return
+
+        del self._pending[metrics.speech_id]
+        eou: EOUMetrics = pending["eou"]
+        llm: LLMMetrics = pending["llm"]
+        tts: TTSMetrics = pending["tts"]
+        if llm.ttft < 0 or tts.ttfb < 0:
+            return  # cancelled before the first token or the first audio
+
+        self.add_turn(
+            TurnLatency(
+                speech_id=metrics.speech_id,
+                timestamp=eou.timestamp,
+                end_of_utterance_delay=eou.end_of_utterance_delay,
+                transcription_delay=eou.transcription_delay,
+                on_user_turn_completed_delay=eou.on_user_turn_completed_delay,
+                llm_ttft=llm.ttft,
+                tts_ttfb=tts.ttfb,
+                preemptive_hit=eou.preemptive_hit,
+                preemptive_lead_time=eou.preemptive_lead_time,
+                preemptive_tts=eou.preemptive_tts,
+            )
+        )
+
+    def add_turn(self, turn: TurnLatency) -> None:
+        for stage in _STAGES:
+            self._histograms[stage].record(getattr(turn, stage))
+
+        if turn.preemptive_hit:
+            self._saved_latency.record(turn.saved_latency)
+
+        self._last_turn = turn
+        if self._on_turn is not None:
+            self._on_turn(turn)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """count, mean, max and percentiles of each stage of the turns.
+
+        `preemptive_saved_latency` only covers the turns answered by a preemptive generation,
+        its count over the number of turns is the hit rate.
+        """
+        summary = {stage: histogram.summary() for stage, histogram in self._histograms.items()}
+        summary["preemptive_saved_latency"] = self._saved_latency.summary()
+        summary["preemptive_saved_latency"]["hit_rate"] = (
+            self._saved_latency.count / self._histograms["response_latency"].count
+            if self._histograms["response_latency"].count
+            else 0.0
+        )
+        return summary
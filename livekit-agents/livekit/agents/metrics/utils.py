@@ -3,7 +3,15 @@ from __future__ import annotations
 import logging
 
 from ..log import logger as default_logger
-from .base import AgentMetrics, EOUMetrics, LLMMetrics, RealtimeModelMetrics, STTMetrics, TTSMetrics
+from .base import (
+    AgentMetrics,
+    CacheMetrics,
+    EOUMetrics,
+    LLMMetrics,
+    RealtimeModelMetrics,
+    STTMetrics,
+    TTSMetrics,
+)
 
 
 def log_metrics(metrics: AgentMetrics, *, logger: logging.Logger | None = None) -> None:
@@ -20,7 +28,7 @@ def log_metrics(metrics: AgentMetrics, *, logger: logging.Logger | None = None)
         )
     elif isinstance(metrics, TTSMetrics):
         logger.info(
-            f"TTS metrics: ttfb={metrics.ttfb}, audio_duration={metrics.audio_duration:.2f}"
+            f"TTS metrics: ttfb={metrics.ttfb}, audio_duration={metrics.audio_duration:.2f}, cached={metrics.cached}"  # noqa: E501
         )
     elif isinstance(metrics, EOUMetrics):
         logger.info(
@@ -28,3 +36,7 @@ def log_metrics(metrics: AgentMetrics, *, logger: logging.Logger | None = None)
         )
     elif isinstance(metrics, STTMetrics):
         logger.info(f"STT metrics: audio_duration={metrics.audio_duration:.2f}")
+    elif isinstance(metrics, CacheMetrics):
+        logger.info(
+            f"Cache metrics ({metrics.label}): hit_rate={metrics.hit_rate:.2f}, hits={metrics.hits}, misses={metrics.misses}, saved_latency={metrics.saved_latency:.2f}"  # noqa: E501
+        )
@@ -4,6 +4,7 @@ import asyncio
 import contextlib
 import dataclasses
 import time
+from collections.abc import AsyncGenerator
 from dataclasses import dataclass
 from typing import Literal
 
@@ -13,7 +14,7 @@ from .. import utils
 from .._exceptions import APIConnectionError, APIError
 from ..log import logger
 from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
-from ..utils import aio
+from ..utils import aio, hedging
 from ..utils.audio import AudioBuffer
 from ..vad import VAD
 from .stt import STT, RecognizeStream, SpeechEvent, SpeechEventType, STTCapabilities
@@ -48,6 +49,10 @@ class FallbackAdapter(
         attempt_timeout: float = 10.0,
         max_retry_per_stt: int = 1,
         retry_interval: float = 5,
+        # when set, a recognition is also sent to the next STT if it takes longer than the p95 of
+        # the current one (this delay until enough requests were made), and the STTs are ranked
+        # by their latency and availability
+        hedge_after: float | None = None,
     ) -> None:
         if len(stt) < 1:
             raise ValueError("At least one STT instance must be provided.")
@@ -78,6 +83,7 @@ class FallbackAdapter(
         self._attempt_timeout = attempt_timeout
         self._max_retry_per_stt = max_retry_per_stt
         self._retry_interval = retry_interval
+        self._hedge_after = hedge_after
 
         self._status: list[_STTStatus] = [
             _STTStatus(
@@ -87,6 +93,12 @@ class FallbackAdapter(
             )
             for _ in self._stt_instances
         ]
+        self._stats = [hedging.ProviderStats() for _ in self._stt_instances]
+
+    def _provider_order(self) -> list[int]:
+        if self._hedge_after is None:
+            return list(range(len(self._stt_instances)))
+        return hedging.rank_providers(self._stats, self._hedge_after)
 
     async def _try_recognize(
         self,
@@ -195,24 +207,61 @@ class FallbackAdapter(
         if all_failed:
             logger.error("all STTs are unavailable, retrying..")
 
-        for i, stt in enumerate(self._stt_instances):
+        failed: set[int] = set()
+
+        async def _recognize(i: int) -> AsyncGenerator[SpeechEvent, None]:
+            yield await self._try_recognize(
+                stt=self._stt_instances[i],
+                buffer=buffer,
+                language=language,
+                conn_options=conn_options,
+                recovering=False,
+            )
+
+        def _candidate(i: int) -> hedging.HedgeCandidate[SpeechEvent]:
+            stt, stt_status = self._stt_instances[i], self._status[i]
+
+            def _on_error(_: Exception) -> None:
+                failed.add(i)
+                if stt_status.available:
+                    stt_status.available = False
+                    self.emit(
+                        "stt_availability_changed",
+                        AvailabilityChangedEvent(stt=stt, available=False),
+                    )
+
+            return hedging.HedgeCandidate(
+                stats=self._stats[i], start=lambda: _recognize(i), on_error=_on_error
+            )
+
+        order = self._provider_order()
+        for pos, i in enumerate(order):
+            stt = self._stt_instances[i]
             stt_status = self._status[i]
-            if stt_status.available or all_failed:
-                try:
-                    return await self._try_recognize(
-                        stt=stt,
-                        buffer=buffer,
-                        language=language,
-                        conn_options=conn_options,
-                        recovering=False,
+            if i not in failed and (stt_status.available or all_failed):
+                backup = None
+                if self._hedge_after is not None:
+                    backup = next(
+                        (
+                            _candidate(j)
+                            for j in order[pos + 1 :]
+                            if self._status[j].available or all_failed
+                        ),
+                        None,
                     )
-                except Exception:  # exceptions already logged inside _try_recognize
-                    if stt_status.available:
-                        stt_status.available = False
-                        self.emit(
-                            "stt_availability_changed",
-                            AvailabilityChangedEvent(stt=stt, available=False),
+
+                try:
+                    events = [
+                        ev
+                        async for ev in hedging.hedged_stream(
+                            _candidate(i),
+                            backup,
+                            delay=self._stats[i].hedge_delay(self._hedge_after or 0.0),
                         )
+                    ]
+                    return events[0]
+                except Exception:
+                    pass  # already logged inside _try_recognize, and marked unavailable
 
             self._try_recovery(stt=stt, buffer=buffer, language=language, conn_options=conn_options)
 
@@ -246,6 +295,14 @@ class FallbackAdapter(
                 await aio.cancel_and_wait(stt_status.recovering_stream_task)
 
 
+def _has_transcript(ev: SpeechEvent) -> bool:
+    return (
+        ev.type in (SpeechEventType.INTERIM_TRANSCRIPT, SpeechEventType.FINAL_TRANSCRIPT)
+        and bool(ev.alternatives)
+        and bool(ev.alternatives[0].text)
+    )
+
+
 class FallbackRecognizeStream(RecognizeStream):
     def __init__(
         self,
@@ -268,8 +325,12 @@ class FallbackRecognizeStream(RecognizeStream):
 
         main_stream: RecognizeStream | None = None
         forward_input_task: asyncio.Task[None] | None = None
+        # the first transcript latency of a STT is measured from the first frame it got
+        first_frame_time: float | None = None
 
         async def _forward_input_task() -> None:
+            nonlocal first_frame_time
+
             async for data in self._input_ch:
                 try:
                     for stream in self._recovering_streams:
@@ -280,6 +341,8 @@ class FallbackRecognizeStream(RecognizeStream):
 
                     if main_stream is not None:
                         if isinstance(data, rtc.AudioFrame):
+                            if first_frame_time is None:
+                                first_frame_time = time.perf_counter()
                             main_stream.push_frame(data)
                         elif isinstance(data, self._FlushSentinel):
                             main_stream.flush()
@@ -292,10 +355,12 @@ class FallbackRecognizeStream(RecognizeStream):
                 with contextlib.suppress(RuntimeError):
                     main_stream.end_input()
 
-        for i, stt in enumerate(self._fallback_adapter._stt_instances):
+        for i in self._fallback_adapter._provider_order():
+            stt = self._fallback_adapter._stt_instances[i]
             stt_status = self._fallback_adapter._status[i]
             if stt_status.available or all_failed:
                 try:
+                    first_frame_time = None
                     main_stream = stt.stream(
                         language=self._language,
                         conn_options=dataclasses.replace(
@@ -309,9 +374,20 @@ class FallbackRecognizeStream(RecognizeStream):
                     if forward_input_task is None or forward_input_task.done():
                         forward_input_task = asyncio.create_task(_forward_input_task())
 
+                    latency_recorded = False
                     try:
                         async with main_stream:
                             async for ev in main_stream:
+                                if (
+                                    not latency_recorded
+                                    and first_frame_time is not None
+                                    and _has_transcript(ev)
+                                ):
+                                    self._fallback_adapter._stats[i].add_latency(
+                                        time.perf_counter() - first_frame_time
+                                    )
+                                    latency_recorded = True
+
                                 self._event_ch.send_nowait(ev)
 
                     except asyncio.TimeoutError:
@@ -336,6 +412,7 @@ class FallbackRecognizeStream(RecognizeStream):
 
                     return
                 except Exception:
+                    self._fallback_adapter._stats[i].add_failure()
                     if stt_status.available:
                         stt_status.available = False
                         self._stt.emit(
@@ -1,25 +1,126 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
+import string
 from collections.abc import AsyncIterable
+from dataclasses import dataclass
 from typing import Any
 
+from livekit import rtc
+
 from .. import utils
+from ..log import logger
 from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
 from ..vad import VAD, VADEventType
-from .stt import STT, RecognizeStream, SpeechEvent, SpeechEventType, STTCapabilities
+from .stt import (
+    STT,
+    RecognizeStream,
+    SpeechData,
+    SpeechEvent,
+    SpeechEventType,
+    STTCapabilities,
+)
 
 # already a retry mechanism in STT.recognize, don't retry in stream adapter
 DEFAULT_STREAM_ADAPTER_API_CONNECT_OPTIONS = APIConnectOptions(
     max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout
 )
 
+# words compared when stitching the transcript of a window to the previous ones
+MAX_STITCH_WORDS = 8
+
+
+@dataclass
+class _PartialOptions:
+    interval: float
+    window: float
+    overlap: float
+
+
+@dataclass
+class _PendingSpeech:
+    """Speech of the current user turn, recognized by rolling windows"""
+
+    frames: list[rtc.AudioFrame]
+    duration: float = 0.0
+    # end of the audio sent with the last window request, in seconds
+    requested_duration: float = 0.0
+    # transcript of the audio up to committed_duration, later windows start from there
+    committed_text: str = ""
+    committed_duration: float = 0.0
+    task: asyncio.Task[None] | None = None
+
+
+def _normalize_word(word: str) -> str:
+    return word.strip(string.punctuation).lower()
+
+
+def _stitch_transcripts(committed: str, text: str) -> str:
+    """Append the transcript of a window to the committed one, the words at its start that
+    were already recognized at the end of the committed transcript (the overlap) are dropped"""
+    committed_words, words = committed.split(), text.split()
+    max_overlap = min(len(committed_words), len(words), MAX_STITCH_WORDS)
+    for n in range(max_overlap, 0, -1):
+        if [_normalize_word(w) for w in committed_words[-n:]] == [
+            _normalize_word(w) for w in words[:n]
+        ]:
+            words = words[n:]
+            break
+
+    return " ".join(committed_words + words)
+
+
+def _slice_audio(frames: list[rtc.AudioFrame], start: float) -> rtc.AudioFrame:
+    """Merge the frames, dropping the audio before start (in seconds)"""
+    merged = utils.merge_frames(frames)
+    start_sample = min(int(start * merged.sample_rate), merged.samples_per_channel)
+    return rtc.AudioFrame(
+        data=merged.data[start_sample * merged.num_channels :].tobytes(),
+        sample_rate=merged.sample_rate,
+        num_channels=merged.num_channels,
+        samples_per_channel=merged.samples_per_channel - start_sample,
+    )
+
 
 class StreamAdapter(STT):
-    def __init__(self, *, stt: STT, vad: VAD) -> None:
-        super().__init__(capabilities=STTCapabilities(streaming=True, interim_results=False))
+    def __init__(
+        self,
+        *,
+        stt: STT,
+        vad: VAD,
+        interim_interval: float | None = None,
+        window_duration: float = 8.0,
+        window_overlap: float = 1.0,
+    ) -> None:
+        """
+        Stream the audio to a non-streaming STT, the speech segmented by the VAD is recognized
+        when it ends.
+
+        Args:
+            stt: The non-streaming STT to wrap.
+            vad: Detects the start and the end of the speech.
+            interim_interval: Seconds of new speech between the recognitions of the speech so
+                far, emitted as interim transcripts. None only recognizes the speech at its end.
+            window_duration: Once the audio not committed yet is this long, its transcript is
+                committed and the next recognitions (and the final one) start from there.
+            window_overlap: Seconds of audio before the committed point sent again with the next
+                recognitions, to recover the words cut at the boundary.
+        """
+        super().__init__(
+            capabilities=STTCapabilities(
+                streaming=True, interim_results=interim_interval is not None
+            )
+        )
         self._vad = vad
         self._stt = stt
+        self._partial_opts = (
+            _PartialOptions(
+                interval=interim_interval, window=window_duration, overlap=window_overlap
+            )
+            if interim_interval is not None
+            else None
+        )
 
         @self._stt.on("metrics_collected")
         def _forward_metrics(*args: Any, **kwargs: Any) -> None:
@@ -52,6 +153,7 @@ class StreamAdapter(STT):
             wrapped_stt=self._stt,
             language=language,
             conn_options=conn_options,
+            partial_opts=self._partial_opts,
         )
 
 
@@ -64,12 +166,15 @@ class StreamAdapterWrapper(RecognizeStream):
         wrapped_stt: STT,
         language: NotGivenOr[str],
         conn_options: APIConnectOptions,
+        partial_opts: _PartialOptions | None = None,
     ) -> None:
         super().__init__(stt=stt, conn_options=DEFAULT_STREAM_ADAPTER_API_CONNECT_OPTIONS)
         self._vad = vad
         self._wrapped_stt = wrapped_stt
         self._wrapped_stt_conn_options = conn_options
         self._language = language
+        self._partial_opts = partial_opts
+        self._pending_speech: _PendingSpeech | None = None
 
     async def _metrics_monitor_task(self, event_aiter: AsyncIterable[SpeechEvent]) -> None:
         pass  # do nothing
@@ -92,6 +197,13 @@ class StreamAdapterWrapper(RecognizeStream):
             async for event in vad_stream:
                 if event.type == VADEventType.START_OF_SPEECH:
                     self._event_ch.send_nowait(SpeechEvent(SpeechEventType.START_OF_SPEECH))
+                    if self._partial_opts is not None:
+                        # the frames of START_OF_SPEECH and END_OF_SPEECH start at the same sample
+                        self._pending_speech = _PendingSpeech(frames=list(event.frames))
+                        self._pending_speech.duration = sum(f.duration for f in event.frames)
+                elif event.type == VADEventType.INFERENCE_DONE:
+                    if self._pending_speech is not None:
+                        self._push_partial_frames(self._pending_speech, event.frames)
                 elif event.type == VADEventType.END_OF_SPEECH:
                     self._event_ch.send_nowait(
                         SpeechEvent(
@@ -99,22 +211,41 @@ class StreamAdapterWrapper(RecognizeStream):
                         )
                     )
 
-                    merged_frames = utils.merge_frames(event.frames)
+                    # only the tail that wasn't committed by the windows is recognized
+                    committed_text, start = "", 0.0
+                    if (speech := self._pending_speech) is not None:
+                        self._pending_speech = None
+                        if speech.task is not None:
+                            await utils.aio.cancel_and_wait(speech.task)
+
+                        assert self._partial_opts is not None
+                        committed_text = speech.committed_text
+                        start = max(0.0, speech.committed_duration - self._partial_opts.overlap)
+
                     t_event = await self._wrapped_stt.recognize(
-                        buffer=merged_frames,
+                        buffer=_slice_audio(event.frames, start)
+                        if start
+                        else utils.merge_frames(event.frames),
                         language=self._language,
                         conn_options=self._wrapped_stt_conn_options,
                     )
 
-                    if len(t_event.alternatives) == 0:
+                    if len(t_event.alternatives) == 0 and not committed_text:
                         continue
-                    elif not t_event.alternatives[0].text:
+
+                    alternative = (
+                        t_event.alternatives[0]
+                        if t_event.alternatives
+                        else SpeechData(language=self._language or "", text="")
+                    )
+                    text = _stitch_transcripts(committed_text, alternative.text)
+                    if not text:
                         continue
 
                     self._event_ch.send_nowait(
                         SpeechEvent(
                             type=SpeechEventType.FINAL_TRANSCRIPT,
-                            alternatives=[t_event.alternatives[0]],
+                            alternatives=[dataclasses.replace(alternative, text=text)],
                         )
                     )
 
@@ -126,4 +257,56 @@ class StreamAdapterWrapper(RecognizeStream):
             await asyncio.gather(*tasks)
         finally:
             await utils.aio.cancel_and_wait(*tasks)
+            if self._pending_speech is not None and self._pending_speech.task is not None:
+                await utils.aio.cancel_and_wait(self._pending_speech.task)
             await vad_stream.aclose()
+
+    def _push_partial_frames(self, speech: _PendingSpeech, frames: list[rtc.AudioFrame]) -> None:
+        assert self._partial_opts is not None
+        speech.frames.extend(frames)
+        speech.duration += sum(f.duration for f in frames)
+        if (
+            speech.task is None
+            and speech.duration - speech.requested_duration >= self._partial_opts.interval
+        ):
+            speech.requested_duration = speech.duration
+            speech.task = asyncio.create_task(self._recognize_window(speech))
+
+    async def _recognize_window(self, speech: _PendingSpeech) -> None:
+        """Recognize the speech since the committed point, and commit it if the window is full"""
+        assert self._partial_opts is not None
+        try:
+            start = max(0.0, speech.committed_duration - self._partial_opts.overlap)
+            end = speech.requested_duration
+            try:
+                t_event = await self._wrapped_stt.recognize(
+                    buffer=_slice_audio(speech.frames, start),
+                    language=self._language,
+                    conn_options=self._wrapped_stt_conn_options,
+                )
+            except Exception:
+                # the final recognition covers the uncommitted audio anyway
+                logger.warning("failed to recognize the partial speech", exc_info=True)
+                return
+
+            if not t_event.alternatives:
+                return
+
+            alternative = t_event.alternatives[0]
+            text = _stitch_transcripts(speech.committed_text, alternative.text)
+            if text:
+                self._event_ch.send_nowait(
+                    SpeechEvent(
+                        type=SpeechEventType.INTERIM_TRANSCRIPT,
+                        alternatives=[dataclasses.replace(alternative, text=text)],
+                    )
+                )
+
+            if end - speech.committed_duration >= self._partial_opts.window:
+                # the last word may be cut by the end of the window, the overlap recognizes it
+                # again with the next window
+                words = alternative.text.split()[:-1]
+                speech.committed_text = _stitch_transcripts(speech.committed_text, " ".join(words))
+                speech.committed_duration = end
+        finally:
+            speech.task = None
@@ -1,54 +1,88 @@
+from __future__ import annotations
+
 import re
 
+# fmt: off
+_alphabets = r"([A-Za-z])"
+_prefixes = r"(Mr|St|Mrs|Ms|Dr)[.]"
+_suffixes = r"(Inc|Ltd|Jr|Sr|Co)"
+_starters = r"(Mr|Mrs|Ms|Dr|Prof|Capt|Cpt|Lt|He\s|She\s|It\s|They\s|Their\s|Our\s|We\s|But\s|However\s|That\s|This\s|Wherever)"  # noqa: E501
+_acronyms = r"([A-Z][.][A-Z][.](?:[A-Z][.])?)"
+_websites = r"[.](com|net|org|io|gov|edu|me)"
+_digits = r"([0-9])"
+_multiple_dots = r"\.{2,}"
+
+_prefixes_re = re.compile(_prefixes)
+_websites_re = re.compile(_websites)
+_digits_re = re.compile(_digits + "[.]" + _digits)
+_multiple_dots_re = re.compile(_multiple_dots)
+_single_letter_re = re.compile(r"\s" + _alphabets + "[.] ")
+_acronym_starter_re = re.compile(_acronyms + " " + _starters)
+_three_letters_re = re.compile(_alphabets + "[.]" + _alphabets + "[.]" + _alphabets + "[.]")
+_two_letters_re = re.compile(_alphabets + "[.]" + _alphabets + "[.]")
+_suffix_starter_re = re.compile(r" " + _suffixes + "[.] " + _starters)
+_suffix_re = re.compile(r" " + _suffixes + "[.]")
+_letter_re = re.compile(r" " + _alphabets + "[.]")
+_quoted_end_re = re.compile(r"([.!?。！？])([\"”])")
+_end_re = re.compile(r"([.!?。！？])(?![\"”])")
+# fmt: on
+
+# the rules above look at most this many characters past a period (acronym + " However ")
+_LOOKAHEAD = 16
+# the suffix rule drops the period of "Inc. However", such sentences end with the suffix
+_dropped_period_re = re.compile(_suffixes + r"\Z")
+# a starter and the space after it can be consumed by the rules stopping a sentence before it
+_starter_start_re = re.compile(" " + _starters)
+_starter_end_re = re.compile(r"(He|She|It|They|Their|Our|We|But|However|That|This)\Z")
 
-# rule based segmentation based on https://stackoverflow.com/a/31505798, works surprisingly well
-def split_sentences(
-    text: str, min_sentence_len: int = 20, retain_format: bool = False
-) -> list[tuple[str, int, int]]:
-    """
-    the text may not contain substrings "<prd>" or "<stop>"
-    """
-    alphabets = r"([A-Za-z])"
-    prefixes = r"(Mr|St|Mrs|Ms|Dr)[.]"
-    suffixes = r"(Inc|Ltd|Jr|Sr|Co)"
-    starters = r"(Mr|Mrs|Ms|Dr|Prof|Capt|Cpt|Lt|He\s|She\s|It\s|They\s|Their\s|Our\s|We\s|But\s|However\s|That\s|This\s|Wherever)"  # noqa: E501
-    acronyms = r"([A-Z][.][A-Z][.](?:[A-Z][.])?)"
-    websites = r"[.](com|net|org|io|gov|edu|me)"
-    digits = r"([0-9])"
-    multiple_dots = r"\.{2,}"
 
+def _mark_stops(text: str, retain_format: bool) -> str:
+    """Return the text with "<stop>" inserted after each end of sentence"""
     # fmt: off
     if retain_format:
         text = text.replace("\n","<nel><stop>")
     else:
         text = text.replace("\n"," ")
 
-    text = re.sub(prefixes,"\\1<prd>", text)
-    text = re.sub(websites,"<prd>\\1", text)
-    text = re.sub(digits + "[.]" + digits,"\\1<prd>\\2",text)
-    # text = re.sub(multiple_dots, lambda match: "<prd>" * len(match.group(0)) + "<stop>", text)
-    # TODO(theomonnom): need improvement for ""..." dots", check capital + next sentence should not be  # noqa: E501
-    # small
-    text = re.sub(multiple_dots, lambda match: "<prd>" * len(match.group(0)), text)
-    if "Ph.D" in text:
-        text = text.replace("Ph.D.","Ph<prd>D<prd>")
-    text = re.sub(r"\s" + alphabets + "[.] "," \\1<prd> ",text)
-    text = re.sub(acronyms+" "+starters,"\\1<stop> \\2",text)
-    text = re.sub(alphabets + "[.]" + alphabets + "[.]" + alphabets + "[.]","\\1<prd>\\2<prd>\\3<prd>",text)  # noqa: E501
-    text = re.sub(alphabets + "[.]" + alphabets + "[.]","\\1<prd>\\2<prd>",text)
-    text = re.sub(r" "+suffixes+"[.] "+starters," \\1<stop> \\2",text)
-    text = re.sub(r" "+suffixes+"[.]"," \\1<prd>",text)
-    text = re.sub(r" " + alphabets + "[.]"," \\1<prd>",text)
+    # all of these rules need a period, the stream rescans short texts that often have none
+    if "." in text:
+        text = _prefixes_re.sub("\\1<prd>", text)
+        text = _websites_re.sub("<prd>\\1", text)
+        text = _digits_re.sub("\\1<prd>\\2",text)
+        # text = re.sub(multiple_dots, lambda match: "<prd>" * len(match.group(0)) + "<stop>", text)
+        # TODO(theomonnom): need improvement for ""..." dots", check capital + next sentence should not be  # noqa: E501
+        # small
+        text = _multiple_dots_re.sub(lambda match: "<prd>" * len(match.group(0)), text)
+        if "Ph.D" in text:
+            text = text.replace("Ph.D.","Ph<prd>D<prd>")
+        text = _single_letter_re.sub(" \\1<prd> ",text)
+        text = _acronym_starter_re.sub("\\1<stop> \\2",text)
+        text = _three_letters_re.sub("\\1<prd>\\2<prd>\\3<prd>",text)
+        text = _two_letters_re.sub("\\1<prd>\\2<prd>",text)
+        text = _suffix_starter_re.sub(" \\1<stop> \\2",text)
+        text = _suffix_re.sub(" \\1<prd>",text)
+        text = _letter_re.sub(" \\1<prd>",text)
 
     # mark end of sentence punctuations with <stop>
-    text = re.sub(r"([.!?。！？])([\"”])", "\\1\\2<stop>", text)
-    text = re.sub(r"([.!?。！？])(?![\"”])", "\\1<stop>", text)
+    text = _quoted_end_re.sub("\\1\\2<stop>", text)
+    text = _end_re.sub("\\1<stop>", text)
 
     text = text.replace("<prd>",".")
     # fmt: on
 
     if retain_format:
         text = text.replace("<nel>", "\n")
+    return text
+
+
+# rule based segmentation based on https://stackoverflow.com/a/31505798, works surprisingly well
+def split_sentences(
+    text: str, min_sentence_len: int = 20, retain_format: bool = False
+) -> list[tuple[str, int, int]]:
+    """
+    the text may not contain substrings "<prd>" or "<stop>"
+    """
+    text = _mark_stops(text, retain_format)
     splitted_sentences = text.split("<stop>")
     text = text.replace("<stop>", "")
 
@@ -77,3 +111,154 @@ def split_sentences(
         sentences.append((buff[len(pre_pad) :], start_pos, len(text) - 1))
 
     return sentences
+
+
+class SentenceSegmenter:
+    """Incremental split_sentences for streamed text.
+
+    pop_token() returns the first sentence once split_sentences would return more than one for
+    the pushed text, and removes it from the buffer. The rules only look a few characters past
+    a period, so the text is rescanned from the last sentence end or space that can't change
+    anymore instead of from the start of the buffer.
+    """
+
+    def __init__(self, *, min_sentence_len: int = 20, retain_format: bool = False) -> None:
+        self._min_sentence_len = min_sentence_len
+        self._retain_format = retain_format
+        self.reset()
+
+    @property
+    def text(self) -> str:
+        """The text that hasn't been returned by pop_token"""
+        return self._text
+
+    def reset(self) -> None:
+        self._text = ""
+        self._reset_scan()
+
+    def push_text(self, text: str) -> None:
+        self._text += text
+        self._scanned = False
+
+    def pop_token(self) -> tuple[str, int, int] | None:
+        if not self._scanned:
+            self._scan()
+
+        # same as split_sentences, but a sentence only counts when there is text after it. The
+        # last piece is never followed by any, only whether it is empty matters
+        pre_pad = "" if self._retain_format else " "
+        buff = ""
+        end_pos = 0
+        for i, match in enumerate(self._pieces):
+            sentence = match if self._retain_format else match.strip()
+            if not sentence:
+                continue
+
+            buff += pre_pad + sentence
+            end_pos += len(match)
+            if len(buff) > self._min_sentence_len:
+                if not self._has_text_after(i):
+                    return None
+
+                self._consume(i + 1, end_pos)
+                return buff[len(pre_pad) :], 0, end_pos
+
+        return None
+
+    def _reset_scan(self) -> None:
+        # pieces (text split by "<stop>") that more text can't change
+        self._stable: list[str] = []
+        # start of the piece after them, from its beginning to _rescan_from
+        self._partial = ""
+        self._partial_has_text = False
+        self._rescan_from = 0
+
+        # all the pieces but the last one, which is being written
+        self._pieces: list[str] = []
+        self._last_has_text = False
+        self._scanned = False
+
+    def _scan(self) -> None:
+        tail = _mark_stops(self._text[self._rescan_from :], self._retain_format).split("<stop>")
+
+        # sentence ends more than _LOOKAHEAD characters before the end of the text are final
+        limit = len(self._text) - _LOOKAHEAD
+        offset = self._rescan_from
+        group: list[str] = []
+        group_len = 0
+        while len(tail) > 1:
+            length = _original_len(tail[0])
+            if offset + group_len + length > limit:
+                break
+
+            group.append(tail.pop(0))
+            group_len += length
+            # the rules stopping a sentence before a starter consume it, don't rescan from there
+            if not _starter_start_re.match(tail[0]):
+                self._stable.extend([self._partial + group[0], *group[1:]])
+                self._partial, self._partial_has_text = "", False
+                offset += group_len
+                group, group_len = [], 0
+
+        if len(tail) == 1:
+            # inside of the last piece, rescan from a space no match can end with
+            cut = self._safe_cut(offset + group_len, limit)
+            if cut > offset + group_len:
+                if group:
+                    self._stable.extend([self._partial + group[0], *group[1:]])
+                    self._partial, self._partial_has_text = "", False
+                    offset += group_len
+                    group = []
+
+                head, tail[0] = tail[0][: cut - offset], tail[0][cut - offset :]
+                self._partial += head
+                self._partial_has_text = self._partial_has_text or self._is_text(head)
+                offset = cut
+
+        tail[0:0] = group
+        if len(tail) == 1:
+            self._pieces = list(self._stable)
+            self._last_has_text = self._partial_has_text or self._is_text(tail[0])
+        else:
+            self._pieces = [*self._stable, self._partial + tail[0], *tail[1:-1]]
+            self._last_has_text = self._is_text(tail[-1])
+
+        self._rescan_from = offset
+        self._scanned = True
+
+    def _safe_cut(self, start: int, end: int) -> int:
+        cut = self._text.rfind(" ", start, end)
+        while cut > start:
+            # the rules ending with a space have a period or a starter before it
+            if self._text[cut - 1] != "." and not _starter_end_re.search(
+                self._text, max(cut - 8, 0), cut
+            ):
+                return cut
+            cut = self._text.rfind(" ", start, cut)
+
+        return start
+
+    def _is_text(self, piece: str) -> bool:
+        return bool(piece) if self._retain_format else not piece.isspace() and bool(piece)
+
+    def _has_text_after(self, index: int) -> bool:
+        return self._last_has_text or any(
+            self._is_text(match) for match in self._pieces[index + 1 :]
+        )
+
+    def _consume(self, num_pieces: int, end_pos: int) -> None:
+        self._text = self._text[end_pos:]
+        if num_pieces <= len(self._stable) and end_pos == sum(
+            _original_len(piece) for piece in self._stable[:num_pieces]
+        ):
+            # the pieces after the sentence start at the same place in the new text
+            del self._stable[:num_pieces]
+            del self._pieces[:num_pieces]
+            self._rescan_from -= end_pos
+            return
+
+        self._reset_scan()
+
+
+def _original_len(piece: str) -> int:
+    return len(piece) + (1 if _dropped_period_re.search(piece) else 0)
@@ -66,6 +66,10 @@ class SentenceTokenizer(tokenizer.SentenceTokenizer):
             ),
             min_token_len=self._config.min_sentence_len,
             min_ctx_len=self._config.stream_context_len,
+            segmenter=_basic_sent.SentenceSegmenter(
+                min_sentence_len=self._config.min_sentence_len,
+                retain_format=self._config.retain_format,
+            ),
         )
 
 
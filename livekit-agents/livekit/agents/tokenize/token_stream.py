@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import typing
-from typing import Callable, Union
+from typing import Callable, Protocol, Union
 
 from ..utils import aio, shortuuid
 from .tokenizer import SentenceStream, TokenData, WordStream
@@ -11,6 +11,23 @@ from .tokenizer import SentenceStream, TokenData, WordStream
 TokenizeCallable = Callable[[str], Union[list[str], list[tuple[str, int, int]]]]
 
 
+class TokenSegmenter(Protocol):
+    """Tokenizes the text pushed to a stream incrementally, e.g. _basic_sent.SentenceSegmenter
+
+    pop_token must return the first token of the text once the tokenize function would return
+    more than one, and remove it from the text, like BufferedTokenStream does.
+    """
+
+    @property
+    def text(self) -> str: ...
+
+    def push_text(self, text: str) -> None: ...
+
+    def pop_token(self) -> tuple[str, int, int] | None: ...
+
+    def reset(self) -> None: ...
+
+
 class BufferedTokenStream:
     def __init__(
         self,
@@ -19,9 +36,11 @@ class BufferedTokenStream:
         min_token_len: int,
         min_ctx_len: int,
         retain_format: bool = False,
+        segmenter: TokenSegmenter | None = None,
     ) -> None:
         self._event_ch = aio.Chan[TokenData]()
         self._tokenize_fnc = tokenize_fnc
+        self._segmenter = segmenter
         self._min_ctx_len = min_ctx_len
         self._min_token_len = min_token_len
         self._retain_format = retain_format
@@ -34,6 +53,10 @@ class BufferedTokenStream:
     @typing.no_type_check
     def push_text(self, text: str) -> None:
         self._check_not_closed()
+        if self._segmenter is not None:
+            self._push_segmented_text(text)
+            return
+
         self._in_buf += text
 
         if len(self._in_buf) < self._min_ctx_len:
@@ -66,9 +89,30 @@ class BufferedTokenStream:
                 tok_i = max(self._in_buf.find(tok), 0)
                 self._in_buf = self._in_buf[tok_i + len(tok) :].lstrip()
 
+    def _push_segmented_text(self, text: str) -> None:
+        assert self._segmenter is not None
+        self._segmenter.push_text(text)
+        if len(self._segmenter.text) < self._min_ctx_len:
+            return
+
+        while (tok := self._segmenter.pop_token()) is not None:
+            if self._out_buf:
+                self._out_buf += " "
+
+            self._out_buf += tok[0]
+            if len(self._out_buf) >= self._min_token_len:
+                self._event_ch.send_nowait(
+                    TokenData(token=self._out_buf, segment_id=self._current_segment_id)
+                )
+
+                self._out_buf = ""
+
     @typing.no_type_check
     def flush(self) -> None:
         self._check_not_closed()
+        if self._segmenter is not None:
+            self._in_buf = self._segmenter.text
+            self._segmenter.reset()
 
         if self._in_buf or self._out_buf:
             tokens = self._tokenize_fnc(self._in_buf)
@@ -116,11 +160,13 @@ class BufferedSentenceStream(BufferedTokenStream, SentenceStream):
         tokenizer: TokenizeCallable,
         min_token_len: int,
         min_ctx_len: int,
+        segmenter: TokenSegmenter | None = None,
     ) -> None:
         super().__init__(
             tokenize_fnc=tokenizer,
             min_token_len=min_token_len,
             min_ctx_len=min_ctx_len,
+            segmenter=segmenter,
         )
 
 
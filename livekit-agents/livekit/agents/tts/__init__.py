@@ -1,3 +1,4 @@
+from .cache_adapter import CacheAdapter, CacheChunkedStream
 from .fallback_adapter import (
     AvailabilityChangedEvent,
     FallbackAdapter,
@@ -22,6 +23,8 @@ __all__ = [
     "TTSCapabilities",
     "StreamAdapterWrapper",
     "StreamAdapter",
+    "CacheAdapter",
+    "CacheChunkedStream",
     "ChunkedStream",
     "AvailabilityChangedEvent",
     "FallbackAdapter",
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import enum
+import hashlib
+import json
+import mmap
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .. import tokenize, utils
+from ..log import logger
+from ..metrics import CacheMetrics
+from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
+from ..utils import MovingAverage
+from .stream_adapter import StreamAdapter, StreamAdapterWrapper
+from .tts import TTS, AudioEmitter, ChunkedStream, TTSCapabilities
+
+# already a retry mechanism in the wrapped TTS, don't retry in the cache adapter
+DEFAULT_CACHE_ADAPTER_API_CONNECT_OPTIONS = APIConnectOptions(
+    max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout
+)
+
+DEFAULT_MAX_MEMORY_SIZE = 32 * 1024 * 1024
+DEFAULT_MAX_DISK_SIZE = 512 * 1024 * 1024
+# longer texts are unlikely to be repeated, they're synthesized without going through the cache
+DEFAULT_MAX_TEXT_LENGTH = 300
+
+_DISK_SUFFIX = ".pcm"
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+_SKIPPED = object()
+
+
+def _plain_options(value: Any) -> Any:
+    """JSON-compatible copy of the plain values of the options.
+
+    Other objects (tokenizers, http sessions..) are skipped, their repr usually contains a memory
+    address that would change the cache key in every process.
+    """
+    if isinstance(value, enum.Enum):
+        return _plain_options(value.value)
+
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+
+    if isinstance(value, (list, tuple)):
+        return [v for v in map(_plain_options, value) if v is not _SKIPPED]
+
+    if isinstance(value, dict):
+        items = {str(k): _plain_options(v) for k, v in value.items()}
+        return {k: v for k, v in items.items() if v is not _SKIPPED}
+
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _plain_options({f.name: getattr(value, f.name) for f in dataclasses.fields(value)})
+
+    if callable(getattr(value, "model_dump", None)):  # pydantic models
+        return _plain_options(value.model_dump())
+
+    return _SKIPPED
+
+
+def _default_options_key(tts: TTS) -> str:
+    # the plugins keep the options changing the audio (voice, model, speed..) in `_opts`
+    options = _plain_options(getattr(tts, "_opts", None))
+    return json.dumps(None if options is _SKIPPED else options, sort_keys=True)
+
+
+class _AudioCache:
+    """PCM audio keyed by phrase, in a memory LRU and optionally in a directory shared by the
+    processes of a worker.
+
+    The files are read through mmap, straight from the page cache shared by the processes, but
+    each process keeps its own copy of the audio it played in its memory LRU."""
+
+    def __init__(self, *, max_memory_size: int, disk_dir: str | None, max_disk_size: int) -> None:
+        self._max_memory_size = max_memory_size
+        self._memory_size = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._disk_dir = disk_dir
+        self._max_disk_size = max_disk_size
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._hits = 0
+        self._misses = 0
+        self._saved_latency = 0.0
+        self._miss_latency = MovingAverage(32)
+
+    async def get(self, key: str) -> bytes | None:
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        elif self._disk_dir is not None:
+            data = await asyncio.get_running_loop().run_in_executor(None, self._read_file, key)
+            if data is not None:
+                self._put_memory(key, data)
+
+        if data is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._saved_latency += self._miss_latency.get_avg()
+        return data
+
+    async def put(self, key: str, data: bytes, *, latency: float) -> None:
+        self._miss_latency.add_sample(latency)
+        self._put_memory(key, data)
+        if self._disk_dir is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_file, key, data)
+
+    def _put_memory(self, key: str, data: bytes) -> None:
+        if len(data) > self._max_memory_size:
+            return
+
+        if (prev := self._entries.pop(key, None)) is not None:
+            self._memory_size -= len(prev)
+
+        self._entries[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self._max_memory_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _path(self, key: str) -> str:
+        assert self._disk_dir is not None
+        return os.path.join(self._disk_dir, key + _DISK_SUFFIX)
+
+    def _read_file(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    data = mm[:]
+
+            # the mtime orders the eviction of the files
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning("failed to read the tts cache", exc_info=True, extra={"path": path})
+            return None
+
+    def _write_file(self, key: str, data: bytes) -> None:
+        assert self._disk_dir is not None
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+
+            # other processes only ever see complete files
+            os.replace(tmp_path, path)
+            self._evict_files()
+        except OSError:
+            logger.warning("failed to write the tts cache", exc_info=True, extra={"path": path})
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+    def _evict_files(self) -> None:
+        assert self._disk_dir is not None
+        files = []
+        total_size = 0
+        with os.scandir(self._disk_dir) as it:
+            for entry in it:
+                if entry.name.endswith(_DISK_SUFFIX):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+
+        files.sort()
+        for _, size, path in files:
+            if total_size <= self._max_disk_size:
+                break
+
+            with contextlib.suppress(FileNotFoundError):  # evicted by another process
+                os.remove(path)
+            total_size -= size
+
+    def metrics(self, label: str) -> CacheMetrics:
+        total = self._hits + self._misses
+        return CacheMetrics(
+            label=label,
+            timestamp=time.time(),
+            hits=self._hits,
+            misses=self._misses,
+            hit_rate=self._hits / total if total else 0.0,
+            saved_latency=self._saved_latency,
+        )
+
+
+class CacheAdapter(TTS):
+    def __init__(
+        self,
+        *,
+        tts: TTS,
+        max_memory_size: int = DEFAULT_MAX_MEMORY_SIZE,
+        disk_dir: str | None = None,
+        max_disk_size: int = DEFAULT_MAX_DISK_SIZE,
+        max_text_length: int = DEFAULT_MAX_TEXT_LENGTH,
+        options_key: Callable[[TTS], str] | None = None,
+        sentence_tokenizer: NotGivenOr[tokenize.SentenceTokenizer] = NOT_GIVEN,
+        lookahead: int = 1,
+    ) -> None:
+        """
+        Cache the audio synthesized for each phrase, so the repeated ones (greetings, prompts,
+        common sentences) are played without a request to the TTS provider.
+
+        Streamed text is split in sentences, each synthesized with the `synthesize` API of the
+        wrapped TTS (like tts.StreamAdapter) so they can be cached.
+
+        Args:
+            tts: The TTS to wrap.
+            max_memory_size: Maximum size in bytes of the audio kept in memory.
+            disk_dir: Directory of the on-disk cache, shared by the job processes of a worker
+                when they use the same one. None keeps the cache in memory only.
+            max_disk_size: Maximum size in bytes of the on-disk cache.
+            max_text_length: Longer texts are synthesized without going through the cache.
+            options_key: Returns the options of the wrapped TTS changing its audio (voice,
+                model, speed..), part of the cache key. Defaults to the plain values (strings,
+                numbers, enums..) of its `_opts`, other objects are ignored.
+            sentence_tokenizer: Splits the streamed text into sentences.
+            lookahead: Number of upcoming sentences synthesized while the current one is
+                played, see tts.StreamAdapter.
+        """
+        super().__init__(
+            capabilities=TTSCapabilities(streaming=True),
+            sample_rate=tts.sample_rate,
+            num_channels=tts.num_channels,
+        )
+        self._wrapped_tts = tts
+        self._max_text_length = max_text_length
+        self._options_key = options_key or _default_options_key
+        self._cache = _AudioCache(
+            max_memory_size=max_memory_size, disk_dir=disk_dir, max_disk_size=max_disk_size
+        )
+        self._stream_adapter = StreamAdapter(
+            tts=self, sentence_tokenizer=sentence_tokenizer, lookahead=lookahead
+        )
+
+    @property
+    def wrapped_tts(self) -> TTS:
+        return self._wrapped_tts
+
+    def cache_metrics(self) -> CacheMetrics:
+        """Hit rate and saved latency of the audio cache"""
+        return self._cache.metrics(self._label)
+
+    def _cache_key(self, text: str) -> str | None:
+        text = _normalize_text(text)
+        if not text or len(text) > self._max_text_length:
+            return None
+
+        key = "\n".join(
+            [
+                self._wrapped_tts.label,
+                str(self.sample_rate),
+                str(self.num_channels),
+                self._options_key(self._wrapped_tts),
+                text,
+            ]
+        )
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> CacheChunkedStream:
+        return CacheChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    def stream(
+        self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> StreamAdapterWrapper:
+        return self._stream_adapter.stream(conn_options=conn_options)
+
+    def prewarm(self) -> None:
+        self._wrapped_tts.prewarm()
+
+
+class CacheChunkedStream(ChunkedStream):
+    def __init__(
+        self, *, tts: CacheAdapter, input_text: str, conn_options: APIConnectOptions
+    ) -> None:
+        super().__init__(
+            tts=tts,
+            input_text=input_text,
+            conn_options=DEFAULT_CACHE_ADAPTER_API_CONNECT_OPTIONS,
+        )
+        self._tts: CacheAdapter = tts
+        self._wrapped_tts_conn_options = conn_options
+
+    async def _run(self, output_emitter: AudioEmitter) -> None:
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._tts.sample_rate,
+            num_channels=self._tts.num_channels,
+            mime_type="audio/pcm",
+        )
+
+        key = self._tts._cache_key(self._input_text)
+        if key is not None and (data := await self._tts._cache.get(key)) is not None:
+            self._cached = True
+            output_emitter.push(data)
+            return
+
+        start_time = time.perf_counter()
+        ttfb = 0.0
+        chunks: list[bytes] = []
+        async with self._tts._wrapped_tts.synthesize(
+            self._input_text, conn_options=self._wrapped_tts_conn_options
+        ) as tts_stream:
+            async for audio in tts_stream:
+                if not chunks:
+                    ttfb = time.perf_counter() - start_time
+
+                data = audio.frame.data.tobytes()
+                chunks.append(data)
+                output_emitter.push(data)
+
+        if key is not None and chunks:
+            await self._tts._cache.put(key, b"".join(chunks), latency=ttfb)
@@ -13,7 +13,7 @@ from .. import utils
 from .._exceptions import APIConnectionError
 from ..log import logger
 from ..types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
-from ..utils import aio
+from ..utils import aio, hedging
 from .tts import (
     TTS,
     AudioEmitter,
@@ -33,7 +33,6 @@ DEFAULT_FALLBACK_API_CONNECT_OPTIONS = APIConnectOptions(
 class _TTSStatus:
     available: bool
     recovering_task: asyncio.Task[None] | None
-    resampler: rtc.AudioResampler | None
 
 
 @dataclass
@@ -55,6 +54,7 @@ class FallbackAdapter(
         *,
         max_retry_per_tts: int = 2,
         sample_rate: int | None = None,
+        hedge_after: float | None = None,
     ) -> None:
         """
         Initialize a FallbackAdapter that manages multiple TTS instances.
@@ -63,6 +63,7 @@ class FallbackAdapter(
             tts (list[TTS]): A list of TTS instances to use for fallback.
             max_retry_per_tts (int, optional): Maximum number of retries per TTS instance. Defaults to 2.
             sample_rate (int | None, optional): Desired sample rate for the synthesized audio. If None, uses the maximum sample rate among the TTS instances.
+            hedge_after (float | None, optional): Enable hedged requests. When a synthesize request didn't receive audio within the p95 latency of its TTS (this delay until enough requests were made), it's also sent to the next TTS, the first to respond is used and the other cancelled. The TTS instances are also ranked by their latency and availability. Defaults to None (disabled).
 
         Raises:
             ValueError: If less than one TTS instance is provided.
@@ -90,17 +91,27 @@ class FallbackAdapter(
 
         self._tts_instances = tts
         self._max_retry_per_tts = max_retry_per_tts
+        self._hedge_after = hedge_after
+        self._stats = [hedging.ProviderStats() for _ in tts]
 
         self._status: list[_TTSStatus] = []
         for t in tts:
-            resampler = None
             if sample_rate != t.sample_rate:
                 logger.info(f"resampling {t.label} from {t.sample_rate}Hz to {sample_rate}Hz")
-                resampler = rtc.AudioResampler(input_rate=t.sample_rate, output_rate=sample_rate)
 
-            self._status.append(
-                _TTSStatus(available=True, recovering_task=None, resampler=resampler)
-            )
+            self._status.append(_TTSStatus(available=True, recovering_task=None))
+
+    def _new_resampler(self, tts: TTS) -> rtc.AudioResampler | None:
+        # a resampler per request, a cancelled request leaves its unflushed samples behind
+        if tts.sample_rate == self.sample_rate:
+            return None
+
+        return rtc.AudioResampler(input_rate=tts.sample_rate, output_rate=self.sample_rate)
+
+    def _provider_order(self) -> list[int]:
+        if self._hedge_after is None:
+            return list(range(len(self._tts_instances)))
+        return hedging.rank_providers(self._stats, self._hedge_after)
 
     def synthesize(
         self, text: str, *, conn_options: APIConnectOptions = DEFAULT_FALLBACK_API_CONNECT_OPTIONS
@@ -196,31 +207,66 @@ class FallbackChunkedStream(ChunkedStream):
             mime_type="audio/pcm",
         )
 
-        for i, tts in enumerate(self._tts._tts_instances):
+        failed: set[int] = set()
+
+        async def _synthesize(i: int) -> AsyncGenerator[bytes, None]:
+            assert isinstance(self._tts, FallbackAdapter)
+            tts = self._tts._tts_instances[i]
+            resampler = self._tts._new_resampler(tts)
+            async for synthesized_audio in self._try_synthesize(tts=tts, recovering=False):
+                if resampler is not None:
+                    for rf in resampler.push(synthesized_audio.frame):
+                        yield rf.data.tobytes()
+                else:
+                    yield synthesized_audio.frame.data.tobytes()
+
+            if resampler is not None:
+                for rf in resampler.flush():
+                    yield rf.data.tobytes()
+
+        def _candidate(i: int) -> hedging.HedgeCandidate[bytes]:
+            assert isinstance(self._tts, FallbackAdapter)
+            tts, tts_status = self._tts._tts_instances[i], self._tts._status[i]
+
+            def _on_error(_: Exception) -> None:
+                failed.add(i)
+                if tts_status.available:
+                    tts_status.available = False
+                    self._tts.emit(
+                        "tts_availability_changed",
+                        AvailabilityChangedEvent(tts=tts, available=False),
+                    )
+
+            return hedging.HedgeCandidate(
+                stats=self._tts._stats[i], start=lambda: _synthesize(i), on_error=_on_error
+            )
+
+        order = self._tts._provider_order()
+        for pos, i in enumerate(order):
+            tts = self._tts._tts_instances[i]
             tts_status = self._tts._status[i]
-            if tts_status.available or all_failed:
+            if i not in failed and (tts_status.available or all_failed):
+                backup = None
+                if self._tts._hedge_after is not None:
+                    backup = next(
+                        (
+                            _candidate(j)
+                            for j in order[pos + 1 :]
+                            if self._tts._status[j].available or all_failed
+                        ),
+                        None,
+                    )
+
                 try:
-                    resampler = tts_status.resampler
-                    async for synthesized_audio in self._try_synthesize(tts=tts, recovering=False):
-                        if resampler is not None:
-                            for rf in resampler.push(synthesized_audio.frame):
-                                output_emitter.push(rf.data.tobytes())
-                        else:
-                            output_emitter.push(synthesized_audio.frame.data.tobytes())
-
-                    if resampler is not None:
-                        for rf in resampler.flush():
-                            output_emitter.push(rf.data.tobytes())
+                    async for data in hedging.hedged_stream(
+                        _candidate(i),
+                        backup,
+                        delay=self._tts._stats[i].hedge_delay(self._tts._hedge_after or 0.0),
+                    ):
+                        output_emitter.push(data)
 
                     return
                 except Exception:  # exceptions already logged inside _try_synthesize
-                    if tts_status.available:
-                        tts_status.available = False
-                        self._tts.emit(
-                            "tts_availability_changed",
-                            AvailabilityChangedEvent(tts=tts, available=False),
-                        )
-
                     if output_emitter.pushed_duration() > 0.0:
                         logger.warning(
                             f"{tts.label} already synthesized of audio, ignoring fallback"
@@ -292,6 +338,8 @@ class FallbackSynthesizeStream(SynthesizeStream):
             logger.error("all TTSs are unavailable, retrying..")
 
         new_input_ch: aio.Chan[str | SynthesizeStream._FlushSentinel] | None = None
+        # the time to first audio of a TTS is measured from when it got the first text
+        first_text_time: float | None = None
         output_emitter.initialize(
             request_id=utils.shortuuid(),
             sample_rate=self._fallback_adapter.sample_rate,
@@ -302,7 +350,7 @@ class FallbackSynthesizeStream(SynthesizeStream):
         output_emitter.start_segment(segment_id=utils.shortuuid())
 
         async def _forward_input_task() -> None:
-            nonlocal new_input_ch
+            nonlocal new_input_ch, first_text_time
 
             async for data in self._input_ch:
                 if new_input_ch:
@@ -310,6 +358,8 @@ class FallbackSynthesizeStream(SynthesizeStream):
 
                 if isinstance(data, str) and data:
                     self._pushed_tokens.append(data)
+                    if first_text_time is None:
+                        first_text_time = time.perf_counter()
 
             if new_input_ch:
                 new_input_ch.close()
@@ -317,7 +367,8 @@ class FallbackSynthesizeStream(SynthesizeStream):
         input_task = asyncio.create_task(_forward_input_task())
 
         try:
-            for i, tts in enumerate(self._fallback_adapter._tts_instances):
+            for i in self._fallback_adapter._provider_order():
+                tts = self._fallback_adapter._tts_instances[i]
                 tts_status = self._fallback_adapter._status[i]
                 if tts_status.available or all_failed:
                     try:
@@ -329,7 +380,9 @@ class FallbackSynthesizeStream(SynthesizeStream):
                         if input_task.done():
                             new_input_ch.close()
 
-                        resampler = tts_status.resampler
+                        resampler = self._fallback_adapter._new_resampler(tts)
+                        attempt_time = time.perf_counter()
+                        latency_recorded = False
                         async for synthesized_audio in self._try_synthesize(
                             tts=tts,
                             input_ch=new_input_ch,
@@ -341,6 +394,12 @@ class FallbackSynthesizeStream(SynthesizeStream):
                             ),
                             recovering=False,
                         ):
+                            if not latency_recorded and first_text_time is not None:
+                                self._fallback_adapter._stats[i].add_latency(
+                                    time.perf_counter() - max(attempt_time, first_text_time)
+                                )
+                                latency_recorded = True
+
                             if resampler is not None:
                                 for resampled_frame in resampler.push(synthesized_audio.frame):
                                     output_emitter.push(resampled_frame.data.tobytes())
@@ -353,6 +412,7 @@ class FallbackSynthesizeStream(SynthesizeStream):
 
                         return
                     except Exception:
+                        self._fallback_adapter._stats[i].add_failure()
                         if tts_status.available:
                             tts_status.available = False
                             self._tts.emit(
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import asyncio
 from collections.abc import AsyncIterable
+from dataclasses import dataclass, field
 from typing import Any
 
+from livekit import rtc
+
 from .. import tokenize, utils
 from ..types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
 from .tts import (
@@ -20,6 +23,9 @@ DEFAULT_STREAM_ADAPTER_API_CONNECT_OPTIONS = APIConnectOptions(
     max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout
 )
 
+# maximum duration of audio synthesized for the upcoming sentences, in seconds
+DEFAULT_MAX_BUFFERED_AUDIO = 20.0
+
 
 class StreamAdapter(TTS):
     def __init__(
@@ -27,7 +33,24 @@ class StreamAdapter(TTS):
         *,
         tts: TTS,
         sentence_tokenizer: NotGivenOr[tokenize.SentenceTokenizer] = NOT_GIVEN,
+        lookahead: int = 0,
+        max_buffered_audio: float = DEFAULT_MAX_BUFFERED_AUDIO,
     ) -> None:
+        """
+        Stream the input text to a non-streaming TTS, sentence by sentence.
+
+        Args:
+            tts: The non-streaming TTS to wrap.
+            sentence_tokenizer: Splits the input text into sentences.
+            lookahead: Number of upcoming sentences synthesized while the current one is
+                played, hides the latency of each request between sentences. Their audio is
+                still emitted in order. 0 synthesizes one sentence at a time.
+            max_buffered_audio: Maximum duration in seconds of audio synthesized for the
+                upcoming sentences, the requests are paused when it's reached.
+        """
+        if lookahead < 0:
+            raise ValueError("lookahead must be >= 0")
+
         super().__init__(
             capabilities=TTSCapabilities(
                 streaming=True,
@@ -37,6 +60,8 @@ class StreamAdapter(TTS):
         )
         self._wrapped_tts = tts
         self._sentence_tokenizer = sentence_tokenizer or tokenize.basic.SentenceTokenizer()
+        self._lookahead = lookahead
+        self._max_buffered_audio = max_buffered_audio
 
         @self._wrapped_tts.on("metrics_collected")
         def _forward_metrics(*args: Any, **kwargs: Any) -> None:
@@ -62,6 +87,38 @@ class StreamAdapter(TTS):
         self._wrapped_tts.prewarm()
 
 
+@dataclass
+class _PendingSentence:
+    text: str
+    frames: utils.aio.Chan[rtc.AudioFrame] = field(default_factory=utils.aio.Chan)
+    playing: bool = False
+    task: asyncio.Task[None] | None = None
+
+
+class _AudioBudget:
+    """Duration of the audio synthesized but not emitted yet, bounded for the sentences that
+    are not being played (the one being played is drained as it's synthesized)"""
+
+    def __init__(self, max_duration: float) -> None:
+        self._max_duration = max_duration
+        self._buffered = 0.0
+        self._released = asyncio.Event()
+
+    async def reserve(self, sentence: _PendingSentence, duration: float) -> None:
+        while not sentence.playing and self._buffered >= self._max_duration:
+            self._released.clear()
+            await self._released.wait()
+
+        self._buffered += duration
+
+    def release(self, duration: float) -> None:
+        self._buffered -= duration
+        self._released.set()
+
+    def notify(self) -> None:
+        self._released.set()
+
+
 class StreamAdapterWrapper(SynthesizeStream):
     def __init__(self, *, tts: StreamAdapter, conn_options: APIConnectOptions) -> None:
         super().__init__(tts=tts, conn_options=DEFAULT_STREAM_ADAPTER_API_CONNECT_OPTIONS)
@@ -106,9 +163,64 @@ class StreamAdapterWrapper(SynthesizeStream):
 
         tasks = [
             asyncio.create_task(_forward_input()),
-            asyncio.create_task(_synthesize()),
+            asyncio.create_task(
+                self._synthesize_pipelined(output_emitter)
+                if self._tts._lookahead > 0
+                else _synthesize()
+            ),
         ]
         try:
             await asyncio.gather(*tasks)
         finally:
             await utils.aio.cancel_and_wait(*tasks)
+
+    async def _synthesize_pipelined(self, output_emitter: AudioEmitter) -> None:
+        """Synthesize the upcoming sentences while the current one is emitted"""
+        slots = asyncio.Semaphore(self._tts._lookahead + 1)
+        budget = _AudioBudget(self._tts._max_buffered_audio)
+        sentences = utils.aio.Chan[_PendingSentence]()
+        pending: list[_PendingSentence] = []
+
+        async def _synthesize_sentence(sentence: _PendingSentence) -> None:
+            try:
+                async with self._tts._wrapped_tts.synthesize(
+                    sentence.text, conn_options=self._wrapped_tts_conn_options
+                ) as tts_stream:
+                    async for audio in tts_stream:
+                        await budget.reserve(sentence, audio.frame.duration)
+                        sentence.frames.send_nowait(audio.frame)
+            finally:
+                sentence.frames.close()
+
+        async def _prefetch() -> None:
+            try:
+                async for ev in self._sent_stream:
+                    await slots.acquire()
+                    sentence = _PendingSentence(text=ev.token)
+                    sentence.task = asyncio.create_task(_synthesize_sentence(sentence))
+                    pending.append(sentence)
+                    sentences.send_nowait(sentence)
+            finally:
+                sentences.close()
+
+        prefetch_task = asyncio.create_task(_prefetch())
+        try:
+            async for sentence in sentences:
+                sentence.playing = True
+                budget.notify()
+                async for frame in sentence.frames:
+                    budget.release(frame.duration)
+                    output_emitter.push(frame.data.tobytes())
+
+                assert sentence.task is not None
+                await sentence.task  # raise the synthesis errors, in order
+                output_emitter.flush()
+                pending.remove(sentence)
+                slots.release()
+
+            await prefetch_task
+        finally:
+            # interrupted, the prefetched sentences are not needed anymore
+            await utils.aio.cancel_and_wait(
+                prefetch_task, *[sentence.task for sentence in pending if sentence.task]
+            )
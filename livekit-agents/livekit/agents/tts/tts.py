@@ -15,6 +15,7 @@ from pydantic import BaseModel, ConfigDict, Field
 from livekit import rtc
 
 from .._exceptions import APIError
+from ..debug import tracing
 from ..log import logger
 from ..metrics import TTSMetrics
 from ..types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
@@ -137,6 +138,7 @@ class ChunkedStream(ABC):
         self._tee = aio.itertools.tee(self._event_ch, 2)
         self._event_aiter, monitor_aiter = self._tee
         self._current_attempt_has_error = False
+        self._cached = False  # set when the audio is served from a cache
         self._metrics_task = asyncio.create_task(
             self._metrics_monitor_task(monitor_aiter), name="TTS._metrics_task"
         )
@@ -159,6 +161,7 @@ class ChunkedStream(ABC):
         """Task used to collect metrics"""
 
         start_time = time.perf_counter()
+        start_timestamp = time.time()
         audio_duration = 0.0
         ttfb = -1.0
         request_id = ""
@@ -185,9 +188,19 @@ class ChunkedStream(ABC):
             cancelled=self._synthesize_task.cancelled(),
             label=self._tts._label,
             streamed=False,
+            cached=self._cached,
         )
         self._tts.emit("metrics_collected", metrics)
 
+        if ttfb != -1.0:
+            tracing.Tracing.add_span(
+                "tts_ttfb",
+                start_timestamp,
+                start_timestamp + ttfb,
+                category="tts",
+                args={"request_id": request_id, "label": self._tts._label},
+            )
+
     async def collect(self) -> rtc.AudioFrame:
         """Utility method to collect every frame in a single call"""
         frames = []
@@ -375,6 +388,7 @@ class SynthesizeStream(ABC):
                 return
 
             duration = time.perf_counter() - self._started_time
+            start_timestamp = time.time() - duration
 
             if not self._mtc_pending_texts:
                 return
@@ -397,6 +411,15 @@ class SynthesizeStream(ABC):
             )
             self._tts.emit("metrics_collected", metrics)
 
+            if ttfb != -1.0:
+                tracing.Tracing.add_span(
+                    "tts_ttfb",
+                    start_timestamp,
+                    start_timestamp + ttfb,
+                    category="tts",
+                    args={"request_id": request_id, "label": self._tts._label},
+                )
+
             audio_duration = 0.0
             ttfb = -1.0
             request_id = ""
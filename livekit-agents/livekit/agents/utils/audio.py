@@ -78,6 +78,7 @@ class AudioByteStream:
 
         self._bytes_per_sample = num_channels * ctypes.sizeof(ctypes.c_int16)
         self._bytes_per_frame = samples_per_channel * self._bytes_per_sample
+        # only holds the data of an incomplete frame, complete frames are never buffered
         self._buf = bytearray()
 
     def push(self, data: bytes | memoryview) -> list[rtc.AudioFrame]:
@@ -90,35 +91,58 @@ class AudioByteStream:
         Returns:
             list[rtc.AudioFrame]: A list of `AudioFrame` objects of fixed size.
 
-        The method appends the incoming data to the internal buffer.
-        While the buffer contains enough data to form complete frames,
-        it extracts the data for each frame, creates an `AudioFrame` object,
-        and appends it to the list of frames to return.
+        The method first completes the frame left incomplete by the previous push, then
+        slices the rest of the incoming data into frames. The remaining bytes are kept
+        until the next push or flush.
+
+        The audio data of each frame is copied once into its own `bytes` (`rtc.AudioFrame`
+        would copy a slice of a larger buffer anyway), so the caller can safely reuse a mutable
+        buffer. A `bytes` object holding exactly one frame is referenced without a copy.
 
         This allows you to feed in variable-sized chunks of audio data
         (e.g., from a stream or file) and receive back a list of
         fixed-size audio frames ready for processing or transmission.
         """
-        self._buf.extend(data)
+        view = memoryview(data)
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
 
         frames = []
-        while len(self._buf) >= self._bytes_per_frame:
-            frame_data = self._buf[: self._bytes_per_frame]
-            self._buf = self._buf[self._bytes_per_frame :]
-
-            frames.append(
-                rtc.AudioFrame(
-                    data=frame_data,
-                    sample_rate=self._sample_rate,
-                    num_channels=self._num_channels,
-                    samples_per_channel=len(frame_data) // self._bytes_per_sample,
-                )
-            )
+
+        if self._buf:
+            missing = self._bytes_per_frame - len(self._buf)
+            self._buf += view[:missing]
+            view = view[missing:]
+            if len(self._buf) < self._bytes_per_frame:
+                return frames
+
+            frames.append(self._new_frame(self._buf))
+            self._buf = bytearray()
+
+        complete_len = len(view) - len(view) % self._bytes_per_frame
+        for i in range(0, complete_len, self._bytes_per_frame):
+            frame_data = view[i : i + self._bytes_per_frame]
+            if not isinstance(frame_data.obj, bytes) or frame_data.nbytes != len(frame_data.obj):
+                # the caller may reuse its buffer, and rtc.AudioFrame copies the slices
+                frame_data = memoryview(frame_data.tobytes())
+
+            frames.append(self._new_frame(frame_data))
+
+        if complete_len < len(view):
+            self._buf += view[complete_len:]
 
         return frames
 
     write = push  # Alias for the push method.
 
+    def _new_frame(self, data: bytes | bytearray | memoryview) -> rtc.AudioFrame:
+        return rtc.AudioFrame(
+            data=data,
+            sample_rate=self._sample_rate,
+            num_channels=self._num_channels,
+            samples_per_channel=len(data) // self._bytes_per_sample,
+        )
+
     def flush(self) -> list[rtc.AudioFrame]:
         """
         Flush the buffer and retrieve any remaining audio data as a frame.
@@ -138,19 +162,12 @@ class AudioByteStream:
         if len(self._buf) == 0:
             return []
 
-        if len(self._buf) % (2 * self._num_channels) != 0:
+        if len(self._buf) % self._bytes_per_sample != 0:
             logger.warning("AudioByteStream: incomplete frame during flush, dropping")
             return []
 
-        frames = [
-            rtc.AudioFrame(
-                data=self._buf.copy(),
-                sample_rate=self._sample_rate,
-                num_channels=self._num_channels,
-                samples_per_channel=len(self._buf) // 2,
-            )
-        ]
-        self._buf.clear()
+        frames = [self._new_frame(self._buf)]
+        self._buf = bytearray()
         return frames
 
 
@@ -189,3 +206,4 @@ async def audio_frames_from_file(
 
     finally:
         await cancel_and_wait(reader_task)
+        await decoder.aclose()
@@ -12,9 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .decoder import AudioStreamDecoder, StreamBuffer
+from .decoder import (
+    AudioStreamDecoder,
+    DecoderScheduler,
+    DecoderSchedulerStats,
+    StreamBuffer,
+)
 
-__all__ = ["AudioStreamDecoder", "StreamBuffer"]
+__all__ = ["AudioStreamDecoder", "DecoderScheduler", "DecoderSchedulerStats", "StreamBuffer"]
 
 # Cleanup docs of unexported modules
 _module = dir()
@@ -15,12 +15,14 @@
 from __future__ import annotations
 
 import asyncio
-import io
+import contextlib
 import struct
 import threading
-from collections.abc import AsyncIterator
-from concurrent.futures import ThreadPoolExecutor
-from typing import cast
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Generator
+from dataclasses import dataclass
+from typing import Callable, cast
 
 import av
 import av.container
@@ -30,6 +32,7 @@ from livekit import rtc
 from ...log import logger
 from .. import aio
 from ..audio import AudioByteStream
+from ..moving_average import MovingAverage
 
 
 def _mime_to_av_format(mime: str | None) -> str | None:
@@ -66,54 +69,338 @@ class StreamBuffer:
     """
     A thread-safe buffer that behaves like an IO stream.
     Allows writing from one thread and reading from another.
+
+    Written chunks are kept as-is in a queue and consumed through a read cursor, so each read
+    only copies the bytes it returns, regardless of how much unread data is buffered.
+
+    `on_wait` and `on_resume` are called (without the lock held) before and after a read waits for
+    data, the DecoderScheduler uses them to give the worker back while the reader is blocked.
     """
 
-    def __init__(self) -> None:
-        self._buffer = io.BytesIO()
+    def __init__(
+        self,
+        *,
+        on_wait: Callable[[], None] | None = None,
+        on_resume: Callable[[], None] | None = None,
+    ) -> None:
+        self._on_wait = on_wait
+        self._on_resume = on_resume
+        self._chunks: deque[bytes] = deque()
+        self._offset = 0  # read cursor inside self._chunks[0]
+        self._size = 0  # number of unread bytes
         self._lock = threading.Lock()
         self._data_available = threading.Condition(self._lock)
+        self._reader_waiting = False
         self._eof = False
+        self._closed = False
 
-    def write(self, data: bytes) -> None:
+    def write(self, data: bytes | bytearray | memoryview) -> None:
         """Write data to the buffer from a writer thread."""
-        with self._data_available:
-            self._buffer.seek(0, io.SEEK_END)
-            self._buffer.write(data)
-            self._data_available.notify_all()
-
-    def read(self, size: int = -1) -> bytes:
-        """Read data from the buffer in a reader thread."""
-
-        if self._buffer.closed:
-            return b""
-
-        with self._data_available:
-            while True:
-                if self._buffer.closed:
-                    return b""
-                # always read from beginning
-                self._buffer.seek(0)
-                data = self._buffer.read(size)
+        if not data:
+            return
 
-                if data:
-                    # shrink the buffer to remove already-read data
-                    remaining = self._buffer.read()
-                    self._buffer = io.BytesIO(remaining)
-                    return data
+        # the caller may reuse a mutable buffer, bytes are kept without copying
+        chunk = bytes(data)
+        with self._lock:
+            if self._closed:
+                return
 
-                if self._eof:
-                    return b""
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+            if self._reader_waiting:
+                self._data_available.notify()
 
-                self._data_available.wait()
+    def read(self, size: int = -1) -> bytes:
+        """Read data from the buffer in a reader thread."""
+        self._wait_for_data()
+        with self._lock:
+            if self._closed or self._size == 0:
+                return b""
+
+            if size < 0 or size > self._size:
+                size = self._size
+
+            pieces: list[bytes] = []
+            remaining = size
+            while remaining > 0:
+                chunk = self._chunks[0]
+                available = len(chunk) - self._offset
+                if available <= remaining:
+                    pieces.append(chunk[self._offset :] if self._offset else chunk)
+                    self._chunks.popleft()
+                    self._offset = 0
+                    remaining -= available
+                else:
+                    pieces.append(chunk[self._offset : self._offset + remaining])
+                    self._offset += remaining
+                    remaining = 0
+
+            self._size -= size
+            return pieces[0] if len(pieces) == 1 else b"".join(pieces)
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        """Read data directly into a pre-allocated buffer, return the number of bytes read."""
+        dst = memoryview(buffer).cast("B")
+        self._wait_for_data()
+        with self._lock:
+            if self._closed or self._size == 0:
+                return 0
+
+            size = min(len(dst), self._size)
+            written = 0
+            while written < size:
+                chunk = self._chunks[0]
+                n = min(len(chunk) - self._offset, size - written)
+                dst[written : written + n] = memoryview(chunk)[self._offset : self._offset + n]
+                written += n
+                self._offset += n
+                if self._offset == len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+
+            self._size -= size
+            return size
+
+    def readable(self) -> bool:
+        return True
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Number of bytes that can be read without blocking"""
+        return self._size
+
+    @property
+    def eof(self) -> bool:
+        """True once no more data will be written"""
+        return self._eof or self._closed
 
     def end_input(self) -> None:
         """Signal that no more data will be written."""
-        with self._data_available:
+        with self._lock:
             self._eof = True
             self._data_available.notify_all()
 
     def close(self) -> None:
-        self._buffer.close()
+        with self._lock:
+            self._closed = True
+            self._chunks.clear()
+            self._offset = 0
+            self._size = 0
+            self._data_available.notify_all()
+
+    def _wait_for_data(self) -> None:
+        # returns once data is available, on EOF or when the buffer is closed
+        with self._lock:
+            if self._closed or self._size > 0 or self._eof:
+                return
+
+        if self._on_wait is not None:
+            self._on_wait()
+
+        try:
+            with self._lock:
+                while not self._closed and self._size == 0 and not self._eof:
+                    self._reader_waiting = True
+                    try:
+                        self._data_available.wait()
+                    finally:
+                        self._reader_waiting = False
+        finally:
+            if self._on_resume is not None:
+                self._on_resume()
+
+
+DEFAULT_MAX_WORKERS = 10
+DEFAULT_MAX_BUFFERED_FRAMES = 64
+DECODE_SLICE_DURATION = 0.005  # max time a stream holds a worker before yielding it
+MIN_READ_AHEAD = 1024  # bytes to buffer before resuming a stream, so it rarely blocks on read
+WORKER_IDLE_TIMEOUT = 30.0  # idle worker threads exit after this delay
+
+
+@dataclass
+class DecoderSchedulerStats:
+    max_workers: int
+    active_streams: int
+    """Number of decoders that started decoding and haven't finished yet"""
+    queue_depth: int
+    """Number of streams ready to decode and waiting for a free worker"""
+    max_queue_depth: int
+    waiting_streams: int
+    """Number of streams blocked on a read in the middle of a slice, they don't hold a worker"""
+    avg_time_to_first_frame: float
+    """Average time between the first push and the first decoded frame, in seconds"""
+    max_time_to_first_frame: float
+
+
+class DecoderScheduler:
+    """Multiplex the decoding of many AudioStreamDecoder over a bounded number of workers.
+
+    Instead of holding a thread for the whole life of a stream, a decoder is only scheduled when
+    it has enough buffered input (or reached EOF) and room in its output channel. It then decodes
+    for at most DECODE_SLICE_DURATION before yielding the worker to the next ready stream.
+
+    The demuxer may still ask for more input than what is buffered. The blocked slice then gives
+    its worker back until the data arrives, so a stream starved of input never delays the others:
+    `max_workers` bounds the slices decoding at the same time, not the threads waiting for input.
+    """
+
+    _shared: DecoderScheduler | None = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, *, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._ready: deque[AudioStreamDecoder] = deque()
+        self._running = 0  # slices holding a worker
+        self._threads = 0
+        self._idle_threads = 0
+        self._waiting = 0  # threads blocked on a read, they gave their worker back
+        self._active_streams = 0
+        self._max_queue_depth = 0
+        self._ttff_avg = MovingAverage(100)
+        self._max_ttff = 0.0
+
+    @classmethod
+    def shared(cls) -> DecoderScheduler:
+        """Return the process-wide scheduler used by AudioStreamDecoder"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def configure(cls, *, max_workers: int) -> None:
+        """Resize the process-wide scheduler.
+
+        Slices already running finish on their worker, the following ones use the new limit.
+        """
+        cls.shared()._resize(max_workers)
+
+    def _resize(self, max_workers: int) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        with self._lock:
+            self._max_workers = max_workers
+            self._cond.notify_all()
+            self._spawn_workers()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def stats(self) -> DecoderSchedulerStats:
+        with self._lock:
+            return DecoderSchedulerStats(
+                max_workers=self._max_workers,
+                active_streams=self._active_streams,
+                queue_depth=len(self._ready),
+                max_queue_depth=self._max_queue_depth,
+                waiting_streams=self._waiting,
+                avg_time_to_first_frame=self._ttff_avg.get_avg(),
+                max_time_to_first_frame=self._max_ttff,
+            )
+
+    def _register(self) -> None:
+        with self._lock:
+            self._active_streams += 1
+
+    def _record_first_frame(self, ttff: float) -> None:
+        with self._lock:
+            self._ttff_avg.add_sample(ttff)
+            self._max_ttff = max(self._max_ttff, ttff)
+
+    def _wake(self, decoder: AudioStreamDecoder) -> None:
+        with self._lock:
+            if decoder._finished:
+                return
+
+            if decoder._slice_running:
+                # the running slice will reschedule the decoder once it's done
+                decoder._wake_pending = True
+                return
+
+            if decoder._slice_queued:
+                return
+
+            decoder._slice_queued = True
+            self._ready.append(decoder)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._ready))
+            self._cond.notify_all()
+            self._spawn_workers()
+
+    def _spawn_workers(self) -> None:
+        # must be called with the lock held
+        # the threads blocked on a read don't count, they released their worker
+        while (
+            self._idle_threads < len(self._ready)
+            and self._threads - self._waiting < self._max_workers
+        ):
+            self._threads += 1
+            self._idle_threads += 1
+            threading.Thread(target=self._worker, name="audio_decoder", daemon=True).start()
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                while not self._ready or self._running >= self._max_workers:
+                    if not self._cond.wait(WORKER_IDLE_TIMEOUT) and not self._ready:
+                        self._idle_threads -= 1
+                        self._threads -= 1
+                        return
+
+                self._idle_threads -= 1
+                self._running += 1
+                decoder = self._ready.popleft()
+                decoder._slice_queued = False
+                decoder._slice_running = True
+
+            try:
+                self._run_slice(decoder)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._idle_threads += 1
+                    self._cond.notify_all()
+
+    def _on_read_wait(self) -> None:
+        # the slice is blocked until more input is pushed, let another stream use the worker
+        with self._lock:
+            self._running -= 1
+            self._waiting += 1
+            self._cond.notify_all()
+            self._spawn_workers()
+
+    def _on_read_resume(self) -> None:
+        with self._lock:
+            while self._running >= self._max_workers:
+                self._cond.wait()
+
+            self._running += 1
+            self._waiting -= 1
+
+    def _run_slice(self, decoder: AudioStreamDecoder) -> None:
+        finished = True
+        try:
+            finished = decoder._decode_slice()
+        except Exception:
+            logger.exception("error running audio decoder slice")
+        finally:
+            with self._lock:
+                decoder._slice_running = False
+                wake_pending, decoder._wake_pending = decoder._wake_pending, False
+                if finished:
+                    decoder._finished = True
+                    self._active_streams -= 1
+
+        if finished:
+            decoder._finish()
+        elif wake_pending or decoder._can_decode():
+            self._wake(decoder)
 
 
 class AudioStreamDecoder:
@@ -121,10 +408,10 @@ class AudioStreamDecoder:
 
     Decoders are stateful, and it should not be reused across multiple streams. Each decoder
     is designed to decode a single stream.
-    """
 
-    _max_workers: int = 10
-    _executor: ThreadPoolExecutor | None = None
+    Decoding runs on the shared DecoderScheduler. At most `max_buffered_frames` decoded frames
+    are kept waiting for the consumer, a slow consumer pauses the decoding of its stream.
+    """
 
     def __init__(
         self,
@@ -132,6 +419,7 @@ class AudioStreamDecoder:
         sample_rate: int | None = 48000,
         num_channels: int | None = 1,
         format: str | None = None,
+        max_buffered_frames: int = DEFAULT_MAX_BUFFERED_FRAMES,
     ):
         self._sample_rate = sample_rate
 
@@ -142,30 +430,100 @@ class AudioStreamDecoder:
         self._mime_type = format.lower() if format else None
         self._av_format = _mime_to_av_format(self._mime_type)
 
-        self._output_ch = aio.Chan[rtc.AudioFrame]()
+        self._max_buffered_frames = max_buffered_frames
+        self._output_ch = aio.Chan[rtc.AudioFrame](maxsize=max_buffered_frames)
         self._closed = False
         self._started = False
-        self._input_buf = StreamBuffer()
         self._loop = asyncio.get_event_loop()
 
-        if self.__class__._executor is None:
-            # each decoder instance will submit jobs to the shared pool
-            self.__class__._executor = ThreadPoolExecutor(max_workers=self.__class__._max_workers)
+        self._scheduler = DecoderScheduler.shared()
+        self._input_buf = StreamBuffer(
+            on_wait=self._scheduler._on_read_wait, on_resume=self._scheduler._on_read_resume
+        )
+        self._frames: Generator[rtc.AudioFrame, None, None] | None = None
+        # decoded frames not yet received by the consumer, guarded by _pending_lock
+        self._pending_frames = 0
+        self._pending_lock = threading.Lock()
+        # guarded by the lock of the scheduler
+        self._slice_queued = False
+        self._slice_running = False
+        self._wake_pending = False
+        self._finished = False
+
+        self._first_push_time: float | None = None
+        self._time_to_first_frame: float | None = None
+
+    @property
+    def time_to_first_frame(self) -> float | None:
+        """Time between the first push and the first decoded frame, None until it's decoded"""
+        return self._time_to_first_frame
 
     def push(self, chunk: bytes) -> None:
         self._input_buf.write(chunk)
         if not self._started:
             self._started = True
-            target = self._decode_wav_loop if self._av_format == "wav" else self._decode_loop
-            self._loop.run_in_executor(self.__class__._executor, target)
+            self._first_push_time = time.perf_counter()
+            self._scheduler._register()
+
+        self._scheduler._wake(self)
 
     def end_input(self) -> None:
         self._input_buf.end_input()
         if not self._started:
             # if no data was pushed, close the output channel
             self._output_ch.close()
+            return
+
+        self._scheduler._wake(self)
+
+    def _can_decode(self) -> bool:
+        if self._closed:
+            return True  # let the scheduler release the stream
+
+        with self._pending_lock:
+            if self._pending_frames >= self._max_buffered_frames:
+                return False
+
+        return self._input_buf.eof or self._input_buf.buffered_bytes >= MIN_READ_AHEAD
+
+    def _decode_slice(self) -> bool:
+        """Decode until the slice duration is elapsed or the stream can't make progress.
+
+        Runs on a worker of the scheduler, returns True once the stream is finished."""
+        if self._frames is None:
+            self._frames = (
+                self._decode_wav_frames() if self._av_format == "wav" else (self._decode_frames())
+            )
+
+        deadline = time.perf_counter() + DECODE_SLICE_DURATION
+        while True:
+            if self._closed:
+                self._frames.close()
+                return True
 
-    def _decode_loop(self) -> None:
+            if not self._can_decode() or time.perf_counter() > deadline:
+                return False
+
+            try:
+                frame = next(self._frames)
+            except StopIteration:
+                return True
+
+            if self._time_to_first_frame is None and self._first_push_time is not None:
+                self._time_to_first_frame = time.perf_counter() - self._first_push_time
+                self._scheduler._record_first_frame(self._time_to_first_frame)
+
+            with self._pending_lock:
+                self._pending_frames += 1
+
+            self._loop.call_soon_threadsafe(self._output_ch.send_nowait, frame)
+
+    def _finish(self) -> None:
+        # the loop may already be closed if the decoder was abandoned
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(self._output_ch.close)
+
+    def _decode_frames(self) -> Generator[rtc.AudioFrame, None, None]:
         container: av.container.InputContainer | None = None
         resampler: av.AudioResampler | None = None
         try:
@@ -212,24 +570,20 @@ class AudioStreamDecoder:
 
                 for f in frames:
                     nchannels = len(f.layout.channels)
-                    self._loop.call_soon_threadsafe(
-                        self._output_ch.send_nowait,
-                        rtc.AudioFrame(
-                            data=f.to_ndarray().tobytes(),
-                            num_channels=nchannels,
-                            sample_rate=int(f.sample_rate),
-                            samples_per_channel=int(f.samples / nchannels),
-                        ),
+                    yield rtc.AudioFrame(
+                        data=f.to_ndarray().tobytes(),
+                        num_channels=nchannels,
+                        sample_rate=int(f.sample_rate),
+                        samples_per_channel=int(f.samples / nchannels),
                     )
 
         except Exception:
             logger.exception("error decoding audio")
         finally:
-            self._loop.call_soon_threadsafe(self._output_ch.close)
             if container:
                 container.close()
 
-    def _decode_wav_loop(self) -> None:
+    def _decode_wav_frames(self) -> Generator[rtc.AudioFrame, None, None]:
         """Decode wav data from the buffer without ffmpeg, parse header and emit PCM frames.
 
         This can be much faster than using ffmpeg, as we are emitting frames as quickly as possible.
@@ -295,37 +649,35 @@ class AudioStreamDecoder:
                 else None
             )
 
-            def resample_and_push(frame: rtc.AudioFrame) -> None:
-                if not resampler:
-                    self._loop.call_soon_threadsafe(self._output_ch.send_nowait, frame)
-                    return
-
-                for resampled_frame in resampler.push(frame):
-                    self._loop.call_soon_threadsafe(
-                        self._output_ch.send_nowait,
-                        resampled_frame,
-                    )
+            def resample(frame: rtc.AudioFrame) -> list[rtc.AudioFrame]:
+                return resampler.push(frame) if resampler else [frame]
 
             while True:
                 chunk = self._input_buf.read(1024)
                 if not chunk:
                     break
-                frames = bstream.push(chunk)
-                for rtc_frame in frames:
-                    resample_and_push(rtc_frame)
+                for rtc_frame in bstream.push(chunk):
+                    yield from resample(rtc_frame)
 
             for rtc_frame in bstream.flush():
-                resample_and_push(rtc_frame)
+                yield from resample(rtc_frame)
         except Exception:
             logger.exception("error decoding wav")
-        finally:
-            self._loop.call_soon_threadsafe(self._output_ch.close)
 
     def __aiter__(self) -> AsyncIterator[rtc.AudioFrame]:
         return self
 
     async def __anext__(self) -> rtc.AudioFrame:
-        return await self._output_ch.__anext__()
+        frame = await self._output_ch.__anext__()
+        with self._pending_lock:
+            self._pending_frames -= 1
+            resume = self._pending_frames == self._max_buffered_frames // 2
+
+        if resume:
+            # the decoder may have paused because the consumer was too slow
+            self._scheduler._wake(self)
+
+        return frame
 
     async def aclose(self) -> None:
         if self._closed:
@@ -338,5 +690,6 @@ class AudioStreamDecoder:
         if not self._started:
             return
 
+        self._scheduler._wake(self)
         async for _ in self._output_ch:
             pass
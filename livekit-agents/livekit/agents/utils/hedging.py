@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from typing import Callable, Generic, TypeVar
+
+from . import aio
+
+T = TypeVar("T")
+
+DEFAULT_WINDOW_SIZE = 50
+# the hedge delay falls back to the configured one until a provider has enough samples
+MIN_SAMPLES = 5
+HEDGE_PERCENTILE = 95.0
+# lower bound of the availability used in the ranking score
+MIN_AVAILABILITY = 0.05
+
+
+class ProviderStats:
+    """Rolling time to first chunk and availability of a provider"""
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE) -> None:
+        self._latencies: deque[float] = deque(maxlen=window_size)
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+
+    def add_latency(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self._outcomes.append(True)
+
+    def add_failure(self) -> None:
+        self._outcomes.append(False)
+
+    def percentile(self, percentile: float) -> float | None:
+        """Latency percentile, None until MIN_SAMPLES latencies were collected"""
+        if len(self._latencies) < MIN_SAMPLES:
+            return None
+
+        latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100.0))
+        return latencies[index]
+
+    @property
+    def availability(self) -> float:
+        if not self._outcomes:
+            return 1.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def hedge_delay(self, default: float) -> float:
+        """Delay after which a request is also sent to the next provider"""
+        p95 = self.percentile(HEDGE_PERCENTILE)
+        return p95 if p95 is not None else default
+
+    def score(self, default_latency: float) -> float:
+        """Expected latency to a successful first chunk, lower is better"""
+        p50 = self.percentile(50.0)
+        latency = p50 if p50 is not None else default_latency
+        return latency / max(self.availability, MIN_AVAILABILITY)
+
+
+def rank_providers(stats: list[ProviderStats], default_latency: float) -> list[int]:
+    """Indices of the providers by score, the configured order breaks the ties"""
+    return sorted(range(len(stats)), key=lambda i: (stats[i].score(default_latency), i))
+
+
+@dataclass
+class HedgeCandidate(Generic[T]):
+    stats: ProviderStats
+    start: Callable[[], AsyncGenerator[T, None]]
+    on_error: Callable[[Exception], None]
+
+
+async def hedged_stream(
+    primary: HedgeCandidate[T], backup: HedgeCandidate[T] | None, *, delay: float
+) -> AsyncGenerator[T, None]:
+    """Iterate the stream of the first candidate producing an item.
+
+    The backup is started when the primary didn't produce its first item within the delay (or
+    failed before), the other stream is then cancelled. The failures are reported to on_error of
+    their candidate, the last one is raised if no candidate succeeded.
+    """
+    candidates = [primary] if backup is None else [primary, backup]
+    streams: list[AsyncGenerator[T, None]] = []
+    start_times: list[float] = []
+    tasks: dict[asyncio.Future[T], int] = {}
+    winner: int | None = None
+    first: list[T] = []
+    error: Exception | None = None
+
+    def _start_next() -> None:
+        index = len(streams)
+        streams.append(candidates[index].start())
+        start_times.append(time.perf_counter())
+        tasks[asyncio.ensure_future(streams[index].__anext__())] = index
+
+    try:
+        _start_next()
+        while tasks and winner is None:
+            timeout = None
+            if len(streams) < len(candidates):
+                timeout = max(0.0, start_times[0] + delay - time.perf_counter())
+
+            done, _ = await asyncio.wait(
+                set(tasks), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                _start_next()  # the primary is slower than usual
+                continue
+
+            for task in sorted(done, key=lambda t: tasks[t]):
+                index = tasks.pop(task)
+                exc = task.exception()
+                if winner is not None:
+                    continue  # another candidate already won, its item is dropped
+
+                if exc is None or isinstance(exc, StopAsyncIteration):
+                    winner = index
+                    first = [task.result()] if exc is None else []
+                    candidates[index].stats.add_latency(time.perf_counter() - start_times[index])
+                elif isinstance(exc, Exception):
+                    error = exc
+                    candidates[index].stats.add_failure()
+                    candidates[index].on_error(exc)
+                else:
+                    raise exc
+
+            if winner is None and len(streams) < len(candidates):
+                _start_next()  # the primary failed, don't wait for the delay
+    finally:
+        await aio.cancel_and_wait(*tasks)
+        for index, stream in enumerate(streams):
+            if index != winner:
+                await stream.aclose()
+
+    if winner is None:
+        assert error is not None
+        raise error
+
+    try:
+        for item in first:
+            yield item
+
+        if first:
+            async for item in streams[winner]:
+                yield item
+    except Exception as e:
+        candidates[winner].on_error(e)
+        raise
+    finally:
+        await streams[winner].aclose()
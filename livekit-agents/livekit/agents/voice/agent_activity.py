@@ -5,6 +5,7 @@ import contextvars
 import heapq
 import time
 from collections.abc import AsyncIterable, Coroutine, Sequence
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Optional, Union, cast
 
 from livekit import rtc
@@ -13,6 +14,7 @@ from .. import debug, llm, stt, tts, utils, vad
 from ..llm.tool_context import StopResponse
 from ..log import logger
 from ..metrics import (
+    CacheMetrics,
     EOUMetrics,
     LLMMetrics,
     RealtimeModelMetrics,
@@ -24,7 +26,12 @@ from ..tokenize.basic import split_words
 from ..types import NOT_GIVEN, NotGivenOr
 from ..utils.misc import is_given
 from .agent import Agent, ModelSettings
-from .audio_recognition import AudioRecognition, RecognitionHooks, _EndOfTurnInfo
+from .audio_recognition import (
+    AudioRecognition,
+    RecognitionHooks,
+    _EndOfTurnInfo,
+    _PreemptiveGenerationInfo,
+)
 from .events import (
     ErrorEvent,
     FunctionToolsExecutedEvent,
@@ -60,6 +67,16 @@ _AgentActivityContextVar = contextvars.ContextVar["AgentActivity"]("agents_activ
 _SpeechHandleContextVar = contextvars.ContextVar["SpeechHandle"]("agents_speech_handle")
 
 
+@dataclass
+class _PreemptiveGeneration:
+    speech_handle: SpeechHandle
+    user_message: llm.ChatMessage
+    chat_ctx: llm.ChatContext
+    tools: list[llm.FunctionTool | llm.RawFunctionTool]
+    tool_choice: llm.ToolChoice | None
+    created_at: float
+
+
 # NOTE: AgentActivity isn't exposed to the public API
 class AgentActivity(RecognitionHooks):
     def __init__(self, agent: Agent, sess: AgentSession) -> None:
@@ -82,6 +99,7 @@ class AgentActivity(RecognitionHooks):
         self._main_atask: asyncio.Task[None] | None = None
         self._user_turn_completed_atask: asyncio.Task[None] | None = None
         self._speech_tasks: list[asyncio.Task[Any]] = []
+        self._preemptive_generation: _PreemptiveGeneration | None = None
 
         self._turn_detection_mode = (
             self.turn_detection if isinstance(self.turn_detection, str) else None
@@ -385,6 +403,10 @@ class AgentActivity(RecognitionHooks):
             if isinstance(self.vad, vad.VAD):
                 self.vad.on("metrics_collected", self._on_metrics_collected)
 
+            # e.g. the cache metrics of the turn detector plugin
+            if isinstance(self.turn_detection, rtc.EventEmitter):
+                self.turn_detection.on("metrics_collected", self._on_metrics_collected)
+
             self._main_atask = asyncio.create_task(self._main_task(), name="_main_task")
             self._audio_recognition = AudioRecognition(
                 hooks=self,
@@ -413,6 +435,8 @@ class AgentActivity(RecognitionHooks):
             task = self._create_speech_task(self._agent.on_exit(), name="AgentTask_on_exit")
             _authorize_inline_task(task)
 
+            # never scheduled, the main task would wait for it forever
+            self._cancel_preemptive_generation()
             self._wake_up_main_task()
             self._draining = True
             if self._main_atask is not None:
@@ -449,12 +473,17 @@ class AgentActivity(RecognitionHooks):
             if isinstance(self.vad, vad.VAD):
                 self.vad.off("metrics_collected", self._on_metrics_collected)
 
+            if isinstance(self.turn_detection, rtc.EventEmitter):
+                self.turn_detection.off("metrics_collected", self._on_metrics_collected)
+
             if self._rt_session is not None:
                 await self._rt_session.aclose()
 
             if self._audio_recognition is not None:
                 await self._audio_recognition.aclose()
 
+            self._cancel_preemptive_generation()
+
             if self._main_atask is not None:
                 await utils.aio.cancel_and_wait(self._main_atask)
 
@@ -545,6 +574,7 @@ class AgentActivity(RecognitionHooks):
         instructions: NotGivenOr[str] = NOT_GIVEN,
         tool_choice: NotGivenOr[llm.ToolChoice] = NOT_GIVEN,
         allow_interruptions: NotGivenOr[bool] = NOT_GIVEN,
+        schedule_speech: bool = True,
     ) -> SpeechHandle:
         if (
             isinstance(self.llm, llm.RealtimeModel)
@@ -580,10 +610,15 @@ class AgentActivity(RecognitionHooks):
             if is_given(allow_interruptions)
             else self.allow_interruptions
         )
-        self._session.emit(
-            "speech_created",
-            SpeechCreatedEvent(speech_handle=handle, user_initiated=True, source="generate_reply"),
-        )
+        # when the speech isn't scheduled (preemptive generation), the reply is generated but
+        # only played once the caller schedules the handle
+        if schedule_speech:
+            self._session.emit(
+                "speech_created",
+                SpeechCreatedEvent(
+                    speech_handle=handle, user_initiated=True, source="generate_reply"
+                ),
+            )
 
         if isinstance(self.llm, llm.RealtimeModel):
             self._create_speech_task(
@@ -617,13 +652,15 @@ class AgentActivity(RecognitionHooks):
                         if utils.is_given(tool_choice) or self._tool_choice is None
                         else self._tool_choice
                     ),
+                    preemptive=not schedule_speech,
                 ),
                 owned_speech_handle=handle,
                 name="AgentActivity.pipeline_reply",
             )
             task.add_done_callback(self._on_pipeline_reply_done)
 
-        self._schedule_speech(handle, SpeechHandle.SPEECH_PRIORITY_NORMAL)
+        if schedule_speech:
+            self._schedule_speech(handle, SpeechHandle.SPEECH_PRIORITY_NORMAL)
         return handle
 
     def interrupt(self) -> asyncio.Future[None]:
@@ -662,6 +699,7 @@ class AgentActivity(RecognitionHooks):
         return future
 
     def clear_user_turn(self) -> None:
+        self._cancel_preemptive_generation()
         if self._audio_recognition:
             self._audio_recognition.clear_user_turn()
 
@@ -728,7 +766,8 @@ class AgentActivity(RecognitionHooks):
     # -- Realtime Session events --
 
     def _on_metrics_collected(
-        self, ev: STTMetrics | TTSMetrics | VADMetrics | LLMMetrics | RealtimeModelMetrics
+        self,
+        ev: STTMetrics | TTSMetrics | VADMetrics | LLMMetrics | RealtimeModelMetrics | CacheMetrics,
     ) -> None:
         if (speech_handle := _SpeechHandleContextVar.get(None)) and (
             isinstance(ev, LLMMetrics) or isinstance(ev, TTSMetrics)
@@ -910,6 +949,7 @@ class AgentActivity(RecognitionHooks):
                 user_input=info.new_transcript,
             )
             # TODO(theomonnom): should we "forward" this new turn to the next agent/activity?
+            self._cancel_preemptive_generation()
             return True
 
         if (
@@ -925,16 +965,57 @@ class AgentActivity(RecognitionHooks):
             # avoid interruption if the new_transcript is too short
             return False
 
+        # the preemptive generation belongs to this turn, the next one can start while
+        # on_user_turn_completed is running
+        preemptive, self._preemptive_generation = self._preemptive_generation, None
         old_task = self._user_turn_completed_atask
         self._user_turn_completed_atask = self._create_speech_task(
-            self._user_turn_completed_task(old_task, info),
+            self._user_turn_completed_task(old_task, info, preemptive),
             name="AgentActivity._user_turn_completed_task",
         )
         return True
 
+    def on_preemptive_generation(self, info: _PreemptiveGenerationInfo) -> None:
+        if (
+            not self._session.options.preemptive_generation
+            or self.draining
+            or not isinstance(self.llm, llm.LLM)
+            or (self._current_speech is not None and not self._current_speech.interrupted)
+        ):
+            return
+
+        # the transcript changed, the previous generation can't be used anymore
+        self._cancel_preemptive_generation()
+
+        user_message = llm.ChatMessage(
+            role="user",
+            content=[info.new_transcript],
+            transcript_confidence=info.transcript_confidence,
+        )
+        chat_ctx = self._agent.chat_ctx.copy()
+        speech_handle = self._generate_reply(
+            user_message=user_message, chat_ctx=chat_ctx, schedule_speech=False
+        )
+        self._preemptive_generation = _PreemptiveGeneration(
+            speech_handle=speech_handle,
+            user_message=user_message,
+            chat_ctx=chat_ctx,
+            tools=self.tools.copy(),
+            tool_choice=self._tool_choice,
+            created_at=time.time(),
+        )
+
+    def _cancel_preemptive_generation(self) -> None:
+        if self._preemptive_generation is not None:
+            self._preemptive_generation.speech_handle._cancel()
+            self._preemptive_generation = None
+
     @utils.log_exceptions(logger=logger)
     async def _user_turn_completed_task(
-        self, old_task: asyncio.Task[None] | None, info: _EndOfTurnInfo
+        self,
+        old_task: asyncio.Task[None] | None,
+        info: _EndOfTurnInfo,
+        preemptive: _PreemptiveGeneration | None = None,
     ) -> None:
         if old_task is not None:
             # We never cancel user code as this is very confusing.
@@ -963,6 +1044,8 @@ class AgentActivity(RecognitionHooks):
                     "skipping reply to user input, current speech generation cannot be interrupted",
                     extra={"user_input": info.new_transcript},
                 )
+                if preemptive is not None:
+                    preemptive.speech_handle._cancel()
                 return
 
             log_event(
@@ -991,9 +1074,13 @@ class AgentActivity(RecognitionHooks):
                 temp_mutable_chat_ctx, new_message=user_message
             )
         except StopResponse:
+            if preemptive is not None:
+                preemptive.speech_handle._cancel()
             return  # ignore this turn
         except Exception:
             logger.exception("error occured during on_user_turn_completed")
+            if preemptive is not None:
+                preemptive.speech_handle._cancel()
             return
 
         callback_duration = time.time() - start_time
@@ -1002,13 +1089,48 @@ class AgentActivity(RecognitionHooks):
             # ignore stt transcription for realtime model
             user_message = None  # type: ignore
         elif self.llm is None:
+            if preemptive is not None:
+                preemptive.speech_handle._cancel()
             return  # skip response if no llm is set
 
-        # Ensure the new message is passed to generate_reply
-        # This preserves the original message_id, making it easier for users to track responses
-        speech_handle = self._generate_reply(
-            user_message=user_message, chat_ctx=temp_mutable_chat_ctx
-        )
+        preemptive_hit, preemptive_lead_time = False, 0.0
+        if (
+            preemptive is not None
+            and not preemptive.speech_handle.interrupted
+            # on_user_turn_completed can change the request, e.g. to inject RAG results
+            and preemptive.user_message.content == user_message.content
+            and preemptive.chat_ctx.is_equivalent(temp_mutable_chat_ctx)
+            and preemptive.tools == self.tools
+            and preemptive.tool_choice == self._tool_choice
+        ):
+            speech_handle = preemptive.speech_handle
+            preemptive_hit, preemptive_lead_time = True, time.time() - preemptive.created_at
+            log_event(
+                "using preemptive generation",
+                speech_id=speech_handle.id,
+                lead_time=preemptive_lead_time,
+            )
+
+            # the generation only used the message for the request, it wasn't added yet
+            self._agent._chat_ctx.insert(preemptive.user_message)
+            self._session._conversation_item_added(preemptive.user_message)
+            self._session.emit(
+                "speech_created",
+                SpeechCreatedEvent(
+                    speech_handle=speech_handle, user_initiated=True, source="generate_reply"
+                ),
+            )
+            self._schedule_speech(speech_handle, SpeechHandle.SPEECH_PRIORITY_NORMAL)
+        else:
+            if preemptive is not None:
+                preemptive.speech_handle._cancel()
+
+            # Ensure the new message is passed to generate_reply
+            # This preserves the original message_id, making it easier for users to track
+            # responses
+            speech_handle = self._generate_reply(
+                user_message=user_message, chat_ctx=temp_mutable_chat_ctx
+            )
 
         if self._user_turn_completed_atask != asyncio.current_task():
             # If a new user turn has already started, interrupt this one since it's now outdated
@@ -1022,6 +1144,9 @@ class AgentActivity(RecognitionHooks):
             transcription_delay=info.transcription_delay,
             on_user_turn_completed_delay=callback_duration,
             speech_id=speech_handle.id,
+            preemptive_hit=preemptive_hit,
+            preemptive_lead_time=preemptive_lead_time,
+            preemptive_tts=preemptive_hit and self._session.options.preemptive_tts,
         )
         self._session.emit("metrics_collected", MetricsCollectedEvent(metrics=eou_metrics))
 
@@ -1157,6 +1282,7 @@ class AgentActivity(RecognitionHooks):
         new_message: llm.ChatMessage | None = None,
         instructions: str | None = None,
         _tools_messages: Sequence[llm.ChatItem] | None = None,
+        preemptive: bool = False,
     ) -> None:
         from .agent import ModelSettings
 
@@ -1179,8 +1305,10 @@ class AgentActivity(RecognitionHooks):
 
         if new_message is not None:
             chat_ctx.insert(new_message)
-            self._agent._chat_ctx.insert(new_message)
-            self._session._conversation_item_added(new_message)
+            if not preemptive:
+                # a preemptive generation adds the message once the user turn is committed
+                self._agent._chat_ctx.insert(new_message)
+                self._session._conversation_item_added(new_message)
 
         if instructions is not None:
             try:
@@ -1188,7 +1316,9 @@ class AgentActivity(RecognitionHooks):
             except ValueError:
                 logger.exception("failed to update the instructions")
 
-        self._session._update_agent_state("thinking")
+        if not preemptive:
+            self._session._update_agent_state("thinking")
+
         tasks: list[asyncio.Task[Any]] = []
         llm_task, llm_gen_data = perform_llm_inference(
             node=self._agent.llm_node,
@@ -1202,7 +1332,7 @@ class AgentActivity(RecognitionHooks):
 
         tts_task: asyncio.Task[bool] | None = None
         tts_gen_data: _TTSGenerationData | None = None
-        if audio_output is not None:
+        if audio_output is not None and (not preemptive or self._session.options.preemptive_tts):
             tts_task, tts_gen_data = perform_tts_inference(
                 node=self._agent.tts_node,
                 input=tts_text_input,
@@ -1210,15 +1340,27 @@ class AgentActivity(RecognitionHooks):
             )
             tasks.append(tts_task)
 
-        await speech_handle.wait_if_not_interrupted(
-            [asyncio.ensure_future(speech_handle._wait_for_authorization())]
-        )
+        wait_for_authorization = asyncio.ensure_future(speech_handle._wait_for_authorization())
+        await speech_handle.wait_if_not_interrupted([wait_for_authorization])
 
         if speech_handle.interrupted:
-            await utils.aio.cancel_and_wait(*tasks)
+            # a discarded preemptive generation is never authorized
+            await utils.aio.cancel_and_wait(*tasks, wait_for_authorization)
             await tee.aclose()
             return
 
+        if preemptive:
+            self._session._update_agent_state("thinking")
+
+        if audio_output is not None and tts_task is None:
+            # the llm output was buffered by the tee until the preemptive reply was committed
+            tts_task, tts_gen_data = perform_tts_inference(
+                node=self._agent.tts_node,
+                input=tts_text_input,
+                model_settings=model_settings,
+            )
+            tasks.append(tts_task)
+
         reply_started_at = time.time()
 
         tr_node = self._agent.transcription_node(llm_output, model_settings)
@@ -57,6 +57,8 @@ class VoiceOptions:
     max_tool_steps: int
     user_away_timeout: float | None
     min_consecutive_speech_delay: float
+    preemptive_generation: bool
+    preemptive_tts: bool
 
 
 Userdata_T = TypeVar("Userdata_T")
@@ -130,6 +132,8 @@ class AgentSession(rtc.EventEmitter[EventTypes], Generic[Userdata_T]):
         video_sampler: NotGivenOr[_VideoSampler | None] = NOT_GIVEN,
         user_away_timeout: float | None = 15.0,
         min_consecutive_speech_delay: float = 0.0,
+        preemptive_generation: bool = False,
+        preemptive_tts: bool = False,
         conn_options: NotGivenOr[SessionConnectOptions] = NOT_GIVEN,
         loop: asyncio.AbstractEventLoop | None = None,
     ) -> None:
@@ -190,6 +194,13 @@ class AgentSession(rtc.EventEmitter[EventTypes], Generic[Userdata_T]):
                 Default ``15.0`` s, set to ``None`` to disable.
             min_consecutive_speech_delay (float, optional): The minimum delay between
                 consecutive speech. Default ``0.0`` s.
+            preemptive_generation (bool): Start generating the reply as soon as a
+                final transcript is received, while the end of turn is still being
+                detected. The reply is played if the turn ends with the same transcript
+                and chat context, and discarded otherwise. Reduces the response latency
+                at the cost of extra LLM requests. Default ``False``.
+            preemptive_tts (bool): Also synthesize the preemptive reply before the end
+                of turn, only used with ``preemptive_generation``. Default ``False``.
             conn_options (SessionConnectOptions, optional): Connection options for
                 stt, llm, and tts.
             loop (asyncio.AbstractEventLoop, optional): Event loop to bind the
@@ -215,6 +226,8 @@ class AgentSession(rtc.EventEmitter[EventTypes], Generic[Userdata_T]):
             max_tool_steps=max_tool_steps,
             user_away_timeout=user_away_timeout,
             min_consecutive_speech_delay=min_consecutive_speech_delay,
+            preemptive_generation=preemptive_generation,
+            preemptive_tts=preemptive_tts,
         )
         self._conn_options = conn_options or SessionConnectOptions()
         self._started = False
@@ -410,6 +423,11 @@ class AgentSession(rtc.EventEmitter[EventTypes], Generic[Userdata_T]):
 
                 if not self._job_context_cb_registered:
                     job_ctx.add_tracing_callback(self._trace_chat_ctx)
+                    turn_latency = job_ctx.turn_latency
+                    self.on(
+                        "metrics_collected",
+                        lambda ev: turn_latency.collect(ev.metrics),
+                    )
                     job_ctx.add_shutdown_callback(
                         lambda: self._aclose_impl(reason=CloseReason.JOB_SHUTDOWN)
                     )
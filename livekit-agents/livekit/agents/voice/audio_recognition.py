@@ -29,6 +29,12 @@ class _EndOfTurnInfo:
     transcript_confidence: float
 
 
+@dataclass
+class _PreemptiveGenerationInfo:
+    new_transcript: str
+    transcript_confidence: float
+
+
 class _TurnDetector(Protocol):
     # TODO: Move those two functions to EOU ctor (capabilities dataclass)
     def unlikely_threshold(self, language: str | None) -> float | None: ...
@@ -44,6 +50,7 @@ class RecognitionHooks(Protocol):
     def on_interim_transcript(self, ev: stt.SpeechEvent) -> None: ...
     def on_final_transcript(self, ev: stt.SpeechEvent) -> None: ...
     def on_end_of_turn(self, info: _EndOfTurnInfo) -> bool: ...
+    def on_preemptive_generation(self, info: _PreemptiveGenerationInfo) -> None: ...
 
     def retrieve_chat_ctx(self) -> llm.ChatContext: ...
 
@@ -77,6 +84,7 @@ class AudioRecognition:
         self._sample_rate: int | None = None
 
         self._speaking = False
+        self._speech_start_time: float = 0
         self._last_speaking_time: float = 0
         self._last_final_transcript_time: float = 0
         self._final_transcript_received = asyncio.Event()
@@ -267,6 +275,17 @@ class AudioRecognition:
             self._audio_interim_transcript = ""
             self._final_transcript_received.set()
 
+            if self._turn_detection_mode != "manual":
+                # the transcript of the turn may be complete, the reply can be generated while
+                # the end of turn is still being detected
+                self._hooks.on_preemptive_generation(
+                    _PreemptiveGenerationInfo(
+                        new_transcript=self._audio_transcript,
+                        transcript_confidence=sum(self._final_transcript_confidence)
+                        / len(self._final_transcript_confidence),
+                    )
+                )
+
             if not self._speaking:
                 if not self._vad:
                     # vad disabled, use stt timestamp
@@ -295,6 +314,7 @@ class AudioRecognition:
         if ev.type == vad.VADEventType.START_OF_SPEECH:
             self._hooks.on_start_of_speech(ev)
             self._speaking = True
+            self._speech_start_time = time.time() - ev.speech_duration
 
             if self._end_of_turn_task is not None:
                 self._end_of_turn_task.cancel()
@@ -308,6 +328,9 @@ class AudioRecognition:
             self._speaking = False
             # when VAD fires END_OF_SPEECH, it already waited for the silence_duration
             self._last_speaking_time = time.time() - ev.silence_duration
+            tracing.Tracing.add_span(
+                "user_speech", self._speech_start_time, self._last_speaking_time, category="vad"
+            )
 
             if self._vad_base_turn_detection or (
                 self._turn_detection_mode == "stt" and self._user_turn_committed
@@ -364,6 +387,18 @@ class AudioRecognition:
             else:
                 transcription_delay = max(self._last_final_transcript_time - last_speaking_time, 0)
                 end_of_utterance_delay = time.time() - last_speaking_time
+                tracing.Tracing.add_span(
+                    "stt_final",
+                    last_speaking_time,
+                    last_speaking_time + transcription_delay,
+                    category="stt",
+                )
+                tracing.Tracing.add_span(
+                    "end_of_utterance",
+                    last_speaking_time,
+                    last_speaking_time + end_of_utterance_delay,
+                    category="eou",
+                )
 
             committed = self._hooks.on_end_of_turn(
                 _EndOfTurnInfo(
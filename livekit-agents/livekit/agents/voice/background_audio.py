@@ -4,7 +4,11 @@ import asyncio
 import atexit
 import contextlib
 import enum
+import functools
+import os
 import random
+import threading
+from collections import OrderedDict
 from collections.abc import AsyncGenerator, AsyncIterator, Generator
 from importlib.resources import as_file, files
 from typing import Any, NamedTuple, Union, cast
@@ -60,6 +64,11 @@ class AudioConfig(NamedTuple):
 # Instead, we remove the sound from the mixer, and it will get removed 400ms later.
 _AUDIO_SOURCE_BUFFER_MS = 400
 
+# decoded clips are shared by all the players of the process, up to this size (~6min at 48kHz)
+_CLIP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# duration of the frames of a cached clip, the mixer reads 100ms blocks
+_CLIP_FRAME_MS = 100
+
 
 class BackgroundAudioPlayer:
     def __init__(
@@ -329,26 +338,26 @@ class BackgroundAudioPlayer:
         if isinstance(sound, BuiltinAudioClip):
             sound = sound.path()
 
+        file_frames: AsyncGenerator[rtc.AudioFrame, None] | None = None
         if isinstance(sound, str):
             if loop:
-                sound = _loop_audio_frames(sound)
+                file_frames = _loop_audio_frames(sound)
             else:
-                sound = audio_frames_from_file(sound)
+                file_frames = _clip_cache.frames(sound)
+            sound = file_frames
+
+        gain_table = _gain_table(volume) if volume != 1.0 else None
 
         async def _gen_wrapper() -> AsyncGenerator[rtc.AudioFrame, None]:
-            async for frame in sound:
-                if volume != 1.0:
-                    data = np.frombuffer(frame.data, dtype=np.int16).astype(np.float32)
-                    data *= 10 ** (np.log10(volume))
-                    np.clip(data, -32768, 32767, out=data)
-                    yield rtc.AudioFrame(
-                        data=data.astype(np.int16).tobytes(),
-                        sample_rate=frame.sample_rate,
-                        num_channels=frame.num_channels,
-                        samples_per_channel=frame.samples_per_channel,
-                    )
-                else:
-                    yield frame
+            try:
+                async for frame in sound:
+                    if gain_table is not None:
+                        yield _apply_gain(frame, gain_table)
+                    else:
+                        yield frame
+            finally:
+                if file_frames is not None:
+                    await file_frames.aclose()
 
             # TODO(theomonnom): the wait_for_playout() may be innaccurate by 400ms
             play_handle._mark_playout_done()
@@ -426,7 +435,118 @@ class PlayHandle:
             self._done_fut.set_result(None)
 
 
+class _ClipCache:
+    """Decoded PCM of the audio files played by the players of the process.
+
+    A file is decoded once (while it is played for the first time) and kept as frames of
+    _CLIP_FRAME_MS, the least recently played clips are evicted above max_bytes. The frames
+    handed out wrap the cached buffers without copying them.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._clips: OrderedDict[tuple[str, int, int, int, int], list[bytes]] = OrderedDict()
+        self._lock = threading.Lock()  # jobs can run in threads
+
+    def _get(self, key: tuple[str, int, int, int, int]) -> list[bytes] | None:
+        with self._lock:
+            chunks = self._clips.get(key)
+            if chunks is not None:
+                self._clips.move_to_end(key)
+            return chunks
+
+    def _put(self, key: tuple[str, int, int, int, int], chunks: list[bytes]) -> None:
+        size = sum(len(chunk) for chunk in chunks)
+        with self._lock:
+            if size > self._max_bytes or key in self._clips:
+                return
+
+            self._clips[key] = chunks
+            self._size += size
+            while self._size > self._max_bytes:
+                _, evicted = self._clips.popitem(last=False)
+                self._size -= sum(len(chunk) for chunk in evicted)
+
+    async def frames(
+        self, file_path: str, sample_rate: int = 48000, num_channels: int = 1
+    ) -> AsyncGenerator[rtc.AudioFrame, None]:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            st = None
+
+        if st is None:
+            # let the decoder report the error
+            frames = audio_frames_from_file(file_path, sample_rate, num_channels)
+            try:
+                async for frame in frames:
+                    yield frame
+            finally:
+                await frames.aclose()
+            return
+
+        # the file may be replaced while the process runs
+        key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size, sample_rate, num_channels)
+        chunks = self._get(key)
+        if chunks is not None:
+            bytes_per_sample = 2 * num_channels
+            for chunk in chunks:
+                yield rtc.AudioFrame(
+                    data=chunk,
+                    sample_rate=sample_rate,
+                    num_channels=num_channels,
+                    samples_per_channel=len(chunk) // bytes_per_sample,
+                )
+            return
+
+        pcm = bytearray()
+        frames = audio_frames_from_file(file_path, sample_rate, num_channels)
+        try:
+            async for frame in frames:
+                if len(pcm) <= self._max_bytes:
+                    pcm += frame.data.cast("B")
+                yield frame
+        finally:
+            # the clip is often stopped before its end, release its decoder right away
+            await frames.aclose()
+
+        # only reached when the whole file was decoded
+        if len(pcm) <= self._max_bytes:
+            chunk_size = sample_rate * _CLIP_FRAME_MS // 1000 * 2 * num_channels
+            self._put(key, [bytes(pcm[i : i + chunk_size]) for i in range(0, len(pcm), chunk_size)])
+
+
+_clip_cache = _ClipCache(_CLIP_CACHE_MAX_BYTES)
+
+
+@functools.lru_cache(maxsize=32)
+def _gain_table(volume: float) -> np.ndarray[tuple[int], np.dtype[np.int16]]:
+    """Sample value after applying the volume, indexed by the sample bits"""
+    samples = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.float64)
+    return np.clip(samples * volume, -32768, 32767).astype(np.int16)
+
+
+def _apply_gain(
+    frame: rtc.AudioFrame, gain_table: np.ndarray[tuple[int], np.dtype[np.int16]]
+) -> rtc.AudioFrame:
+    data = bytearray(len(frame.data) * 2)
+    np.take(
+        gain_table, np.frombuffer(frame.data, dtype=np.uint16), out=np.frombuffer(data, np.int16)
+    )
+    return rtc.AudioFrame(
+        data=data,
+        sample_rate=frame.sample_rate,
+        num_channels=frame.num_channels,
+        samples_per_channel=frame.samples_per_channel,
+    )
+
+
 async def _loop_audio_frames(file_path: str) -> AsyncGenerator[rtc.AudioFrame, None]:
     while True:
-        async for frame in audio_frames_from_file(file_path):
-            yield frame
+        frames = _clip_cache.frames(file_path)
+        try:
+            async for frame in frames:
+                yield frame
+        finally:
+            await frames.aclose()
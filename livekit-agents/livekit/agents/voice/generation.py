@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import inspect
+import multiprocessing as mp
+import time
 from collections.abc import AsyncIterable
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from functools import partial
 from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
 
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
 from livekit import rtc
 
@@ -20,6 +25,10 @@ from ..llm import (
     utils as llm_utils,
 )
 from ..llm.tool_context import (
+    FunctionTool,
+    RawFunctionTool,
+    get_function_info,
+    get_tool_cache,
     is_function_tool,
     is_raw_function_tool,
 )
@@ -216,6 +225,7 @@ async def _audio_forwarding_task(
     out: _AudioOutput,
 ) -> None:
     resampler: rtc.AudioResampler | None = None
+    start_time = time.time()
     try:
         async for frame in tts_output:
             out.audio.append(frame)
@@ -242,6 +252,9 @@ async def _audio_forwarding_task(
             # (after completing the first frame)
             if not out.first_frame_fut.done():
                 out.first_frame_fut.set_result(None)
+                debug.Tracing.add_span(
+                    "first_audio_frame", start_time, time.time(), category="audio_output"
+                )
     finally:
         if isinstance(tts_output, _ACloseable):
             try:
@@ -376,7 +389,7 @@ async def _execute_tools_task(
 
             try:
                 task = asyncio.create_task(
-                    function_tool(*fnc_args, **fnc_kwargs),
+                    _run_function_tool(function_tool, fnc_args, fnc_kwargs),
                     name=f"function_tool_{fnc_call.name}",
                 )
 
@@ -456,6 +469,89 @@ async def _execute_tools_task(
             )
 
 
+# tools with executor="process" share this pool, a single worker per job process is enough to
+# keep CPU-bound tools off the event loop without oversubscribing the host
+_TOOL_PROCESS_POOL_SIZE = 1
+_tool_process_pool: ProcessPoolExecutor | None = None
+
+
+def _get_tool_process_pool() -> ProcessPoolExecutor:
+    global _tool_process_pool
+    if _tool_process_pool is None:
+        _tool_process_pool = ProcessPoolExecutor(
+            max_workers=_TOOL_PROCESS_POOL_SIZE, mp_context=mp.get_context("spawn")
+        )
+    return _tool_process_pool
+
+
+def _freeze_arguments(value: Any) -> Any:
+    """hashable version of validated tool arguments, used as a cache key"""
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze_arguments(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        items = tuple(_freeze_arguments(v) for v in value)
+        return frozenset(items) if isinstance(value, set) else items
+    return value
+
+
+async def _run_function_tool(
+    function_tool: FunctionTool | RawFunctionTool,
+    fnc_args: tuple[Any, ...],
+    fnc_kwargs: dict[str, Any],
+) -> Any:
+    from .events import RunContext
+
+    cache = get_tool_cache(function_tool)
+    cache_key: Any = None
+    if cache is not None:
+        cache_key = _freeze_arguments(
+            (
+                [arg for arg in fnc_args if not isinstance(arg, RunContext)],
+                {k: v for k, v in fnc_kwargs.items() if not isinstance(v, RunContext)},
+            )
+        )
+        try:
+            hit, output = cache.get(cache_key)
+        except TypeError:  # unhashable arguments
+            cache = None
+        else:
+            if hit:
+                return output
+
+    executor, timeout = None, None
+    if is_function_tool(function_tool):
+        info = get_function_info(function_tool)
+        executor, timeout = info.executor, info.timeout
+
+    loop = asyncio.get_running_loop()
+    fnc = partial(function_tool, *fnc_args, **fnc_kwargs)
+    if executor == "thread":
+        ctx = contextvars.copy_context()
+        fut = loop.run_in_executor(None, ctx.run, fnc)
+    elif executor == "process":
+        fut = loop.run_in_executor(_get_tool_process_pool(), fnc)
+    else:
+        fut = fnc()
+
+    if inspect.isawaitable(fut):
+        try:
+            # a tool running in a pool can't be interrupted, only its result is discarded
+            output = await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            raise ToolError(f"the tool didn't complete within {timeout} seconds") from None
+    else:
+        # e.g. a regular raw function tool, it already ran on the event loop
+        output = fut
+
+    if cache is not None:
+        cache.put(cache_key, output)
+
+    return output
+
+
 def _is_valid_function_output(value: Any) -> bool:
     VALID_TYPES = (str, int, float, bool, complex, type(None))
 
@@ -125,6 +125,11 @@ class SpeechHandle:
         ]
         await asyncio.wait(fs, return_when=asyncio.FIRST_COMPLETED)
 
+    def _cancel(self) -> None:
+        """Stop a speech that was never played, even if it doesn't allow interruptions"""
+        with contextlib.suppress(asyncio.InvalidStateError):
+            self._interrupt_fut.set_result(None)
+
     def _authorize_playout(self) -> None:
         self._authorize_fut.set_result(None)
 
@@ -51,6 +51,81 @@ class SpeakingRateDetector:
         return SpeakingRateStream(self, self._opts)
 
 
+class _SpectralFlux:
+    """Average spectral flux of the windows of a segment.
+
+    Consecutive windows overlap, the magnitudes of their STFT frames are kept and only the
+    frames past the previous window are computed, in a single batched rfft.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        self._frame_length = int(sample_rate * 0.025)  # 25ms
+        self._hop_length = self._frame_length // 2  # 50% overlap
+
+        window = np.hanning(self._frame_length)
+        window /= np.sqrt(np.sum(window**2))  # scale the fft
+        self._window = window.astype(np.float32)
+
+        num_bins = self._frame_length // 2 + 1
+        self._workspace = np.empty((0, self._frame_length), dtype=np.float32)
+        self._magnitudes = np.empty((0, num_bins), dtype=np.float32)
+        # l1 norm of the difference with the previous frame
+        self._flux = np.empty(0, dtype=np.float64)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the frames of the previous windows"""
+        self._first_frame: int | None = None
+        self._num_frames = 0
+
+    def compute(self, audio: np.ndarray[tuple[int], np.dtype[np.float32]], offset: int) -> float:
+        """Spectral flux of the window starting `offset` samples after the start of the segment.
+
+        Higher spectral flux correlates with more rapid speech articulation.
+        """
+        hop_length = self._hop_length
+        num_frames = (len(audio) - self._frame_length) // hop_length + 1
+        if num_frames < 2:
+            return 0.0
+
+        # frames of a previous window can be reused when both are on the same grid
+        first_frame = offset // hop_length if offset % hop_length == 0 else None
+        reused = 0
+        if (
+            first_frame is not None
+            and self._first_frame is not None
+            and self._first_frame <= first_frame < self._first_frame + self._num_frames
+        ):
+            shift = first_frame - self._first_frame
+            reused = min(self._num_frames - shift, num_frames)
+            self._magnitudes[:reused] = self._magnitudes[shift : shift + reused]
+            self._flux[:reused] = self._flux[shift : shift + reused]
+
+        if len(self._magnitudes) < num_frames:
+            self._workspace = np.empty((num_frames, self._frame_length), dtype=np.float32)
+            magnitudes = np.empty((num_frames, self._magnitudes.shape[1]), dtype=np.float32)
+            magnitudes[:reused] = self._magnitudes[:reused]
+            flux = np.empty(num_frames, dtype=np.float64)
+            flux[:reused] = self._flux[:reused]
+            self._magnitudes, self._flux = magnitudes, flux
+
+        if reused < num_frames:
+            frames = np.lib.stride_tricks.sliding_window_view(audio, self._frame_length)[
+                reused * hop_length : num_frames * hop_length : hop_length
+            ]
+            windowed = self._workspace[: len(frames)]
+            np.multiply(frames, self._window, out=windowed)
+            self._magnitudes[reused:num_frames] = np.abs(np.fft.rfft(windowed))
+
+            start = max(reused, 1)
+            diff = np.abs(np.diff(self._magnitudes[start - 1 : num_frames], axis=0))
+            self._flux[start:num_frames] = np.sum(diff, axis=1, dtype=np.float64)
+
+        self._first_frame = first_frame
+        self._num_frames = num_frames if first_frame is not None else 0
+        return float(np.mean(self._flux[1:num_frames]))
+
+
 class SpeakingRateStream:
     class _FlushSentinel:
         pass
@@ -73,6 +148,9 @@ class SpeakingRateStream:
     async def _main_task(self) -> None:
         _inference_sample_rate = 0
         inference_f32_data = np.empty(0, dtype=np.float32)
+        spectral_flux: _SpectralFlux | None = None
+        # start of the window, in samples since the start of the segment
+        window_offset = 0
 
         pub_timestamp = self._opts.window_duration / 2
         inference_frames: list[rtc.AudioFrame] = []
@@ -83,10 +161,11 @@ class SpeakingRateStream:
                 # estimate the speech rate for the last frame
                 available_samples = sum(frame.samples_per_channel for frame in inference_frames)
                 if available_samples > self._window_size_samples * 0.5:
+                    assert spectral_flux is not None
                     frame = rtc.combine_audio_frames(inference_frames)
                     frame_f32_data = np.divide(frame.data, np.iinfo(np.int16).max, dtype=np.float32)
 
-                    sr = self._compute_speaking_rate(frame_f32_data, _inference_sample_rate)
+                    sr = self._compute_speaking_rate(frame_f32_data, spectral_flux, window_offset)
                     pub_timestamp += frame.duration
                     self._event_ch.send_nowait(
                         SpeakingRateEvent(
@@ -96,6 +175,9 @@ class SpeakingRateStream:
                         )
                     )
                 inference_frames = []
+                window_offset = 0
+                if spectral_flux is not None:
+                    spectral_flux.reset()
                 continue
 
             # resample the input frame if necessary
@@ -106,6 +188,7 @@ class SpeakingRateStream:
                 self._window_size_samples = int(self._opts.window_duration * _inference_sample_rate)
                 self._step_size_samples = int(self._opts.step_size * _inference_sample_rate)
                 inference_f32_data = np.empty(self._window_size_samples, dtype=np.float32)
+                spectral_flux = _SpectralFlux(_inference_sample_rate)
 
                 if self._input_sample_rate != _inference_sample_rate:
                     resampler = rtc.AudioResampler(
@@ -134,6 +217,7 @@ class SpeakingRateStream:
                 if available_samples < self._window_size_samples:
                     break
 
+                assert spectral_flux is not None
                 inference_frame = rtc.combine_audio_frames(inference_frames)
                 np.divide(
                     inference_frame.data[: self._window_size_samples],
@@ -143,7 +227,7 @@ class SpeakingRateStream:
                 )
 
                 # run the inference
-                sr = self._compute_speaking_rate(inference_f32_data, _inference_sample_rate)
+                sr = self._compute_speaking_rate(inference_f32_data, spectral_flux, window_offset)
                 self._event_ch.send_nowait(
                     SpeakingRateEvent(
                         timestamp=pub_timestamp,
@@ -156,6 +240,7 @@ class SpeakingRateStream:
                 pub_timestamp += self._opts.step_size
                 if len(inference_frame.data) - self._step_size_samples > 0:
                     data = inference_frame.data[self._step_size_samples :]
+                    window_offset += self._step_size_samples
                     inference_frames = [
                         rtc.AudioFrame(
                             data=data,
@@ -166,7 +251,10 @@ class SpeakingRateStream:
                     ]
 
     def _compute_speaking_rate(
-        self, audio: np.ndarray[tuple[int], np.dtype[np.float32]], sample_rate: int
+        self,
+        audio: np.ndarray[tuple[int], np.dtype[np.float32]],
+        spectral_flux: _SpectralFlux,
+        offset: int,
     ) -> float:
         """
         Compute the speaking rate of the audio using the selected method
@@ -184,58 +272,7 @@ class SpeakingRateStream:
         if len(tail_audio_sq) > 0 and np.sqrt(np.mean(tail_audio_sq)) < silence_threshold * 0.5:
             return 0.0
 
-        return self._spectral_flux(audio, sample_rate)
-
-    def _stft(
-        self,
-        audio: np.ndarray[tuple[int], np.dtype[np.float32]],
-        frame_length: int,
-        hop_length: int,
-    ) -> np.ndarray[tuple[int, int], np.dtype[np.complex128]]:
-        num_frames = (len(audio) - frame_length) // hop_length + 1
-        result = np.zeros((frame_length // 2 + 1, num_frames), dtype=np.complex128)
-
-        window = np.hanning(frame_length)
-        scale_factor = 1.0 / np.sqrt(np.sum(window**2))
-        for i in range(num_frames):
-            start = i * hop_length
-            end = start + frame_length
-            frame = audio[start:end]
-            windowed = frame * window
-
-            # perform fft and scale
-            fft_result = np.fft.rfft(windowed)
-            result[:, i] = fft_result * scale_factor
-
-        return result
-
-    def _spectral_flux(
-        self, audio: np.ndarray[tuple[int], np.dtype[np.float32]], sample_rate: int
-    ) -> float:
-        """
-        Calculate speaking rate based on spectral flux.
-        Higher spectral flux correlates with more rapid speech articulation.
-        """
-        # Parameters
-        frame_length = int(sample_rate * 0.025)  # 25ms
-        hop_length = frame_length // 2  # 50% overlap
-
-        Zxx = self._stft(audio, frame_length, hop_length)
-
-        # calculate spectral flux (sum of spectral magnitude changes between frames)
-        spectral_magnitudes = np.abs(Zxx)
-        spectral_flux_values = []
-
-        for i in range(1, spectral_magnitudes.shape[1]):
-            # l1 norm of difference between consecutive spectral frames
-            flux = np.sum(np.abs(spectral_magnitudes[:, i] - spectral_magnitudes[:, i - 1]))
-            spectral_flux_values.append(flux)
-
-        if not spectral_flux_values:
-            return 0.0
-
-        avg_flux = float(np.mean(spectral_flux_values))
-        return avg_flux
+        return spectral_flux.compute(audio, offset)
 
     def push_frame(self, frame: rtc.AudioFrame) -> None:
         """Push audio frame for syllable rate detection"""
@@ -26,7 +26,7 @@ import sys
 import threading
 import time
 from collections.abc import Awaitable
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 from typing import Any, Callable, Generic, Literal, TypeVar
 from urllib.parse import urljoin, urlparse
@@ -179,10 +179,21 @@ class WorkerOptions:
         dev_default=0, prod_default=math.ceil(get_cpu_monitor().cpu_count())
     )
     """Number of idle processes to keep warm."""
+    max_idle_processes: int | _WorkerEnvOption[int] = _WorkerEnvOption(
+        dev_default=0, prod_default=math.ceil(get_cpu_monitor().cpu_count()) * 2
+    )
+    """Maximum number of idle processes to keep warm when jobs arrive faster than processes
+    can be initialized. The pool grows from ``num_idle_processes`` to cover the jobs expected
+    during the initialization time, as long as they fit in the available memory."""
     shutdown_process_timeout: float = 60.0
     """Maximum amount of time to wait for a job to shut down gracefully"""
     initialize_process_timeout: float = 10.0
     """Maximum amount of time to wait for a process to initialize/prewarm"""
+    audio_decoder_workers: int = 10
+    """Number of threads each job process uses to decode compressed audio (e.g. TTS responses).
+
+    Streams are multiplexed over these threads, so this bounds CPU usage rather than the number
+    of concurrent streams."""
     permissions: WorkerPermissions = field(default_factory=WorkerPermissions)
     """Permissions that the agent should join the room with."""
     agent_name: str = ""
@@ -321,6 +332,8 @@ class Worker(utils.EventEmitter[EventTypes]):
             memory_warn_mb=opts.job_memory_warn_mb,
             memory_limit_mb=opts.job_memory_limit_mb,
             http_proxy=opts.http_proxy or None,
+            audio_decoder_workers=opts.audio_decoder_workers,
+            max_idle_processes=_WorkerEnvOption.getvalue(opts.max_idle_processes, self._devmode),
         )
 
         self._previous_status = agent.WorkerStatus.WS_AVAILABLE
@@ -342,6 +355,8 @@ class Worker(utils.EventEmitter[EventTypes]):
                     "agent_name": self._opts.agent_name,
                     "worker_type": agent.JobType.Name(self._opts.worker_type.value),
                     "active_jobs": len(self.active_jobs),
+                    "process_pool": asdict(self._proc_pool.stats()),
+                    "turn_latency": self._proc_pool.turn_latency.summary(),
                 }
             )
             return web.Response(body=body, content_type="application/json")
@@ -363,15 +378,13 @@ class Worker(utils.EventEmitter[EventTypes]):
             max_data_points=int(1 / UPDATE_LOAD_INTERVAL * 30),
         )
 
-        default_num_idle_processes = _WorkerEnvOption.getvalue(
-            self._opts.num_idle_processes, self._devmode
-        )
+        max_idle_processes = self._proc_pool.controller.max_idle_processes
         self._num_idle_target_graph = tracing.Tracing.add_graph(
             title="num_idle_processes_target",
             x_label="time",
             y_label="target",
             x_type="time",
-            y_range=(0, default_num_idle_processes),
+            y_range=(0, max_idle_processes),
             max_data_points=int(1 / UPDATE_LOAD_INTERVAL * 30),
         )
 
@@ -380,7 +393,7 @@ class Worker(utils.EventEmitter[EventTypes]):
             x_label="time",
             y_label="idle",
             x_type="time",
-            y_range=(0, default_num_idle_processes),
+            y_range=(0, max_idle_processes),
             max_data_points=int(1 / UPDATE_LOAD_INTERVAL * 30),
         )
 
@@ -445,9 +458,7 @@ class Worker(utils.EventEmitter[EventTypes]):
                 self._worker_load = await asyncio.get_event_loop().run_in_executor(None, load_fnc)
 
                 load_threshold = _WorkerEnvOption.getvalue(self._opts.load_threshold, self._devmode)
-                default_num_idle_processes = _WorkerEnvOption.getvalue(
-                    self._opts.num_idle_processes, self._devmode
-                )
+                max_idle_processes = self._proc_pool.controller.max_idle_processes
 
                 if not math.isinf(load_threshold):
                     active_jobs = len(self.active_jobs)
@@ -456,11 +467,11 @@ class Worker(utils.EventEmitter[EventTypes]):
                         if job_load > 0.0:
                             available_load = max(load_threshold - self._worker_load, 0.0)
                             available_job = min(
-                                math.ceil(available_load / job_load), default_num_idle_processes
+                                math.ceil(available_load / job_load), max_idle_processes
                             )
                             self._proc_pool.set_target_idle_processes(available_job)
                     else:
-                        self._proc_pool.set_target_idle_processes(default_num_idle_processes)
+                        self._proc_pool.set_target_idle_processes(max_idle_processes)
 
                 self._num_idle_target_graph.plot(time.time(), self._proc_pool.target_idle_processes)
                 self._num_idle_process_graph.plot(
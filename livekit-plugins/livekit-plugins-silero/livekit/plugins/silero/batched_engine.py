@@ -0,0 +1,266 @@
+# mypy: disable-error-code=unused-ignore
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from . import onnx_model
+from .log import logger
+
+if TYPE_CHECKING:
+    import onnxruntime  # type: ignore
+
+BATCH_TICK_INTERVAL = 0.01  # max time a window waits for the windows of other streams
+MAX_BATCH_SIZE = 256
+_INITIAL_CAPACITY = 16
+
+
+@dataclass
+class _PendingWindow:
+    loop: asyncio.AbstractEventLoop
+    fut: asyncio.Future[float]
+    generation: int
+
+
+class BatchedVADEngine:
+    """Run the Silero model for many streams with a single session call per tick.
+
+    Each stream owns a row of the stacked RNN state and context arrays. Windows submitted by the
+    streams are collected for up to `tick_interval` seconds, then evaluated together on a
+    dedicated thread. The engine is thread-safe and can be shared by streams living on different
+    event loops (e.g. jobs using the thread executor).
+    """
+
+    _instances: dict[tuple[int, bool], BatchedVADEngine] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        *,
+        session: onnxruntime.InferenceSession,
+        sample_rate: int,
+        tick_interval: float = BATCH_TICK_INTERVAL,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ) -> None:
+        if sample_rate not in onnx_model.SUPPORTED_SAMPLE_RATES:
+            raise ValueError("Silero VAD only supports 8KHz and 16KHz sample rates")
+
+        self._sess = session
+        self._sample_rate = sample_rate
+        self._tick_interval = tick_interval
+        self._max_batch_size = max_batch_size
+
+        if sample_rate == 8000:
+            self._window_size_samples = 256
+            self._context_size = 32
+        else:
+            self._window_size_samples = 512
+            self._context_size = 64
+
+        self._sample_rate_nd = np.array(sample_rate, dtype=np.int64)
+
+        self._cond = threading.Condition()
+        self._capacity = 0
+        self._rnn_state = np.zeros((2, 0, 128), dtype=np.float32)
+        self._input = np.zeros((0, self._context_size + self._window_size_samples), np.float32)
+        self._generations: list[int] = []
+        self._free_slots: list[int] = []
+        self._pending: dict[int, _PendingWindow] = {}
+        self._grow(_INITIAL_CAPACITY)
+
+        self._batch_count = 0
+        self._window_count = 0
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def shared(cls, *, sample_rate: int, force_cpu: bool = True) -> BatchedVADEngine:
+        """Return the process-wide engine for the given sample rate"""
+        with cls._instances_lock:
+            key = (sample_rate, force_cpu)
+            engine = cls._instances.get(key)
+            if engine is None:
+                engine = cls(
+                    session=onnx_model.new_inference_session(force_cpu), sample_rate=sample_rate
+                )
+                cls._instances[key] = engine
+
+            return engine
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    @property
+    def window_size_samples(self) -> int:
+        return self._window_size_samples
+
+    @property
+    def context_size(self) -> int:
+        return self._context_size
+
+    @property
+    def active_streams(self) -> int:
+        with self._cond:
+            return self._active_streams_locked()
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self._window_count / self._batch_count if self._batch_count else 0.0
+
+    def model(self) -> BatchedOnnxModel:
+        """Allocate a row for a new stream"""
+        with self._cond:
+            if not self._free_slots:
+                self._grow(self._capacity * 2)
+
+            slot = self._free_slots.pop()
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="silero_batched_vad", daemon=True
+                )
+                self._thread.start()
+
+        return BatchedOnnxModel(self, slot)
+
+    def _grow(self, capacity: int) -> None:
+        extra = capacity - self._capacity
+        self._rnn_state = np.concatenate(
+            [self._rnn_state, np.zeros((2, extra, 128), dtype=np.float32)], axis=1
+        )
+        self._input = np.concatenate(
+            [self._input, np.zeros((extra, self._input.shape[1]), dtype=np.float32)], axis=0
+        )
+        self._generations.extend([0] * extra)
+        # pop() hands out the lowest slots first
+        self._free_slots = list(range(capacity - 1, self._capacity - 1, -1)) + self._free_slots
+        self._capacity = capacity
+
+    def _release(self, slot: int) -> None:
+        with self._cond:
+            self._generations[slot] += 1
+            self._rnn_state[:, slot, :] = 0
+            self._input[slot, :] = 0
+            pending = self._pending.pop(slot, None)
+            self._free_slots.append(slot)
+
+        if pending is not None:
+            _resolve(pending, None)
+
+    def _submit(self, slot: int, x: np.ndarray) -> asyncio.Future[float]:
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future[float] = loop.create_future()
+        with self._cond:
+            if slot in self._pending:
+                raise RuntimeError("a window is already pending for this stream")
+
+            # the first context_size samples already contain the end of the previous window
+            self._input[slot, self._context_size :] = x
+            self._pending[slot] = _PendingWindow(loop, fut, self._generations[slot])
+            self._cond.notify()
+
+        return fut
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+
+                # give the other streams a chance to submit their windows
+                deadline = time.perf_counter() + self._tick_interval
+                while len(self._pending) < self._active_streams_locked():
+                    timeout = deadline - time.perf_counter()
+                    if timeout <= 0 or len(self._pending) >= self._max_batch_size:
+                        break
+                    self._cond.wait(timeout)
+
+                batch = list(self._pending.items())[: self._max_batch_size]
+                for slot, _ in batch:
+                    del self._pending[slot]
+
+                slots = np.fromiter((slot for slot, _ in batch), dtype=np.intp, count=len(batch))
+                inputs = self._input[slots]
+                state = self._rnn_state[:, slots, :]
+
+            try:
+                out, new_state = self._sess.run(
+                    None, {"input": inputs, "state": state, "sr": self._sample_rate_nd}
+                )
+            except Exception as e:
+                logger.exception("error running batched vad inference")
+                for _, pending in batch:
+                    _resolve(pending, None, e)
+                continue
+
+            with self._cond:
+                self._batch_count += 1
+                self._window_count += len(batch)
+                for i, (slot, pending) in enumerate(batch):
+                    if self._generations[slot] != pending.generation:
+                        continue  # the stream was closed while the batch was running
+
+                    self._rnn_state[:, slot, :] = new_state[:, i, :]
+                    self._input[slot, : self._context_size] = inputs[i, -self._context_size :]
+
+            for i, (_, pending) in enumerate(batch):
+                _resolve(pending, float(out[i, 0]))
+
+    def _active_streams_locked(self) -> int:
+        return self._capacity - len(self._free_slots)
+
+
+def _resolve(pending: _PendingWindow, p: float | None, e: BaseException | None = None) -> None:
+    def _set() -> None:
+        if pending.fut.done():
+            return
+
+        if e is not None:
+            pending.fut.set_exception(e)
+        elif p is None:
+            pending.fut.cancel()
+        else:
+            pending.fut.set_result(p)
+
+    # the loop of the stream may already be closed
+    with contextlib.suppress(RuntimeError):
+        pending.loop.call_soon_threadsafe(_set)
+
+
+class BatchedOnnxModel:
+    """Per-stream handle on a BatchedVADEngine, mirrors the interface of OnnxModel"""
+
+    def __init__(self, engine: BatchedVADEngine, slot: int) -> None:
+        self._engine = engine
+        self._slot = slot
+        self._closed = False
+
+    @property
+    def sample_rate(self) -> int:
+        return self._engine.sample_rate
+
+    @property
+    def window_size_samples(self) -> int:
+        return self._engine.window_size_samples
+
+    @property
+    def context_size(self) -> int:
+        return self._engine.context_size
+
+    async def infer(self, x: np.ndarray) -> float:
+        if self._closed:
+            raise RuntimeError("model is closed")
+
+        return await self._engine._submit(self._slot, x)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._engine._release(self._slot)
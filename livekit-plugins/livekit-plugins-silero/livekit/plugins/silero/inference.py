@@ -0,0 +1,225 @@
+# mypy: disable-error-code=unused-ignore
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from livekit.agents.inference_runner import _InferenceRunner
+from livekit.agents.ipc.inference_executor import InferenceExecutor
+from livekit.agents.utils import shortuuid
+
+from . import onnx_model
+from .log import logger
+
+MAX_BATCH_SIZE = 256
+BATCH_WINDOW = 0.005
+INFERENCE_TIMEOUT = 2.0
+# state of the streams that didn't send a window for this long is dropped (e.g. crashed jobs)
+STREAM_IDLE_TIMEOUT = 60.0
+
+_OP_INFER = 0
+_OP_CLOSE = 1
+
+# op, sample rate, length of the stream id. followed by the stream id and the f32 window
+_HEADER = struct.Struct("<BIB")
+_RESULT = struct.Struct("<f")
+
+
+def _window_size(sample_rate: int) -> tuple[int, int]:
+    """window and context sizes in samples"""
+    if sample_rate == 8000:
+        return 256, 32
+    return 512, 64
+
+
+@dataclass
+class _StreamState:
+    context: np.ndarray
+    rnn_state: np.ndarray = field(default_factory=lambda: np.zeros((2, 128), dtype=np.float32))
+    last_used: float = 0.0
+
+
+@dataclass
+class _Request:
+    op: int
+    sample_rate: int
+    stream_id: str
+    window: np.ndarray
+
+
+def _decode_request(data: bytes) -> _Request:
+    op, sample_rate, id_len = _HEADER.unpack_from(data)
+    offset = _HEADER.size + id_len
+    return _Request(
+        op=op,
+        sample_rate=sample_rate,
+        stream_id=data[_HEADER.size : offset].decode(),
+        window=np.frombuffer(data, dtype=np.float32, offset=offset),
+    )
+
+
+class _VADRunner(_InferenceRunner):
+    """Run the Silero VAD of every job in the inference process.
+
+    The RNN state and context of each stream are kept here, keyed by the stream id sent with
+    each window. Windows received together are evaluated with a single session call.
+    """
+
+    INFERENCE_METHOD = "lk_silero_vad"
+    MAX_BATCH_SIZE = MAX_BATCH_SIZE
+    BATCH_WINDOW = BATCH_WINDOW
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._streams: OrderedDict[str, _StreamState] = OrderedDict()
+
+    def initialize(self) -> None:
+        self._session = onnx_model.new_inference_session(force_cpu=True)
+
+    def run(self, data: bytes) -> bytes | None:
+        return self.run_batch([data])[0]
+
+    def run_batch(self, data: list[bytes]) -> list[bytes | None]:
+        now = time.monotonic()
+        while self._streams:
+            stream_id, state = next(iter(self._streams.items()))
+            if now - state.last_used < STREAM_IDLE_TIMEOUT:
+                break
+
+            logger.debug("dropping idle vad stream", extra={"stream_id": stream_id})
+            del self._streams[stream_id]
+
+        results: list[bytes | None] = [None] * len(data)
+        pending = list(enumerate(_decode_request(d) for d in data))
+        while pending:
+            # a stream can only appear once per session call, the rest waits for the next round
+            seen: set[str] = set()
+            current, pending_next = [], []
+            for i, req in pending:
+                if req.stream_id in seen:
+                    pending_next.append((i, req))
+                else:
+                    seen.add(req.stream_id)
+                    current.append((i, req))
+
+            self._run_round(current, results, now)
+            pending = pending_next
+
+        return results
+
+    def _run_round(
+        self, reqs: list[tuple[int, _Request]], results: list[bytes | None], now: float
+    ) -> None:
+        by_sample_rate: dict[int, list[tuple[int, _Request]]] = {}
+        for i, req in reqs:
+            if req.op == _OP_CLOSE:
+                self._streams.pop(req.stream_id, None)
+            else:
+                by_sample_rate.setdefault(req.sample_rate, []).append((i, req))
+
+        for sample_rate, windows in by_sample_rate.items():
+            window_size, context_size = _window_size(sample_rate)
+            states: list[_StreamState] = []
+            inputs = np.empty((len(windows), context_size + window_size), dtype=np.float32)
+            for row, (_, req) in enumerate(windows):
+                state = self._streams.pop(req.stream_id, None)
+                if state is None:
+                    state = _StreamState(context=np.zeros(context_size, dtype=np.float32))
+
+                # re-inserted at the end, the least recently used streams stay first
+                state.last_used = now
+                self._streams[req.stream_id] = state
+                states.append(state)
+                inputs[row, :context_size] = state.context
+                inputs[row, context_size:] = req.window
+
+            out, new_state = self._session.run(
+                None,
+                {
+                    "input": inputs,
+                    "state": np.stack([state.rnn_state for state in states], axis=1),
+                    "sr": np.array(sample_rate, dtype=np.int64),
+                },
+            )
+
+            for row, ((i, _), state) in enumerate(zip(windows, states)):
+                state.rnn_state = new_state[:, row, :].copy()
+                state.context = inputs[row, -context_size:].copy()
+                results[i] = _RESULT.pack(float(out[row, 0]))
+
+
+class InferenceProcModel:
+    """Per-stream handle on the VAD running in the inference process, mirrors OnnxModel"""
+
+    def __init__(self, *, executor: InferenceExecutor, sample_rate: int) -> None:
+        if sample_rate not in onnx_model.SUPPORTED_SAMPLE_RATES:
+            raise ValueError("Silero VAD only supports 8KHz and 16KHz sample rates")
+
+        self._executor = executor
+        self._sample_rate = sample_rate
+        self._window_size_samples, self._context_size = _window_size(sample_rate)
+        self._stream_id = shortuuid("VAD_").encode()
+        self._closed = False
+        self._close_task: asyncio.Task[None] | None = None
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    @property
+    def window_size_samples(self) -> int:
+        return self._window_size_samples
+
+    @property
+    def context_size(self) -> int:
+        return self._context_size
+
+    def _encode(self, op: int, x: np.ndarray | None = None) -> bytes:
+        data = _HEADER.pack(op, self._sample_rate, len(self._stream_id)) + self._stream_id
+        if x is not None:
+            data += x.astype(np.float32, copy=False).tobytes()
+        return data
+
+    async def infer(self, x: np.ndarray) -> float:
+        if self._closed:
+            raise RuntimeError("model is closed")
+
+        result = await asyncio.wait_for(
+            self._executor.do_inference(
+                _VADRunner.INFERENCE_METHOD,
+                self._encode(_OP_INFER, x),
+                timeout=INFERENCE_TIMEOUT,
+            ),
+            timeout=INFERENCE_TIMEOUT,
+        )
+        assert result is not None, "vad inference should always return a result"
+        return float(_RESULT.unpack(result)[0])
+
+    def close(self) -> None:
+        """Release the state of the stream in the inference process"""
+        if self._closed:
+            return
+
+        self._closed = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # the idle timeout of the runner will release it
+
+        self._close_task = loop.create_task(self._send_close())
+
+    async def _send_close(self) -> None:
+        # best effort, the inference process may already be gone
+        with contextlib.suppress(Exception):
+            await self._executor.do_inference(
+                _VADRunner.INFERENCE_METHOD,
+                self._encode(_OP_CLOSE),
+                timeout=INFERENCE_TIMEOUT,
+            )
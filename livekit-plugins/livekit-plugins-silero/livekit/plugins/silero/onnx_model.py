@@ -1,11 +1,16 @@
 # mypy: disable-error-code=unused-ignore
 
+from __future__ import annotations
+
 import atexit
 import importlib.resources
 from contextlib import ExitStack
+from typing import TYPE_CHECKING
 
 import numpy as np
-import onnxruntime  # type: ignore
+
+if TYPE_CHECKING:
+    import onnxruntime  # type: ignore
 
 _resource_files = ExitStack()
 atexit.register(_resource_files.close)
@@ -15,6 +20,9 @@ SUPPORTED_SAMPLE_RATES = [8000, 16000]
 
 
 def new_inference_session(force_cpu: bool) -> onnxruntime.InferenceSession:
+    # imported lazily, job processes running the VAD in the inference process don't need it
+    import onnxruntime  # type: ignore
+
     res = importlib.resources.files("livekit.plugins.silero.resources") / "silero_vad.onnx"
     ctx = importlib.resources.as_file(res)
     path = str(_resource_files.enter_context(ctx))
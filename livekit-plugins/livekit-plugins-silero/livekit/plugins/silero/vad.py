@@ -19,24 +19,31 @@ import time
 import weakref
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Literal
+from typing import TYPE_CHECKING, Literal, Union
 
 import numpy as np
-import onnxruntime  # type: ignore
 
 from livekit import agents, rtc
 from livekit.agents import utils
+from livekit.agents.inference_runner import _InferenceRunner
+from livekit.agents.ipc.inference_executor import InferenceExecutor
+from livekit.agents.job import get_job_context
 from livekit.agents.types import (
     NOT_GIVEN,
     NotGivenOr,
 )
 from livekit.agents.utils import is_given
 
-from . import onnx_model
+from . import batched_engine, inference, onnx_model
 from .log import logger
 
+if TYPE_CHECKING:
+    import onnxruntime  # type: ignore
+
 SLOW_INFERENCE_THRESHOLD = 0.2  # late by 200ms
 
+_Model = Union[onnx_model.OnnxModel, batched_engine.BatchedOnnxModel, inference.InferenceProcModel]
+
 
 @dataclass
 class _VADOptions:
@@ -55,6 +62,17 @@ class VAD(agents.vad.VAD):
     This class provides functionality to detect speech segments within audio data using the Silero VAD model.
     """  # noqa: E501
 
+    @classmethod
+    def register_inference_runner(cls) -> None:
+        """
+        Allow running the VAD in the inference process of the worker, see `load(inference_process=True)`.
+
+        Like the other inference runners, this must be called on the main thread when your agent
+        module is imported, before the worker starts.
+        """  # noqa: E501
+        if inference._VADRunner.INFERENCE_METHOD not in _InferenceRunner.registered_runners:
+            _InferenceRunner.register_runner(inference._VADRunner)
+
     @classmethod
     def load(
         cls,
@@ -66,6 +84,9 @@ class VAD(agents.vad.VAD):
         activation_threshold: float = 0.5,
         sample_rate: Literal[8000, 16000] = 16000,
         force_cpu: bool = True,
+        batched: bool = False,
+        inference_process: bool = False,
+        inference_executor: InferenceExecutor | None = None,
         # deprecated
         padding_duration: NotGivenOr[float] = NOT_GIVEN,
     ) -> VAD:
@@ -103,24 +124,55 @@ class VAD(agents.vad.VAD):
             activation_threshold (float): Threshold to consider a frame as speech.
             sample_rate (Literal[8000, 16000]): Sample rate for the inference (only 8KHz and 16KHz are supported).
             force_cpu (bool): Force the use of CPU for inference.
+            batched (bool): Evaluate the windows of all the streams of the process together using a shared
+                BatchedVADEngine, instead of running one inference per stream. This reduces the CPU usage
+                when many sessions run in the same process, at the cost of up to 10ms of extra latency.
+            inference_process (bool): Run the model in the inference process shared by all the jobs of the
+                worker instead of loading it in each job process, which keeps the job processes lightweight.
+                Requires `VAD.register_inference_runner()` to be called when your agent module is imported.
+            inference_executor (InferenceExecutor | None): Executor used when `inference_process` is set,
+                defaults to the one of the job context the streams are created in.
             padding_duration (float | None): **Deprecated**. Use `prefix_padding_duration` instead.
 
         Returns:
             VAD: An instance of the VAD class ready for streaming.
 
         Raises:
-            ValueError: If an unsupported sample rate is provided.
+            ValueError: If an unsupported sample rate is provided, or if `inference_process` is set
+                without registering the inference runner.
         """  # noqa: E501
         if sample_rate not in onnx_model.SUPPORTED_SAMPLE_RATES:
             raise ValueError("Silero VAD only supports 8KHz and 16KHz sample rates")
 
+        if inference_process and batched:
+            raise ValueError("batched and inference_process can't be used together")
+
+        if (
+            inference_process
+            and inference._VADRunner.INFERENCE_METHOD not in _InferenceRunner.registered_runners
+        ):
+            raise ValueError(
+                "silero.VAD.register_inference_runner() must be called when your agent module "
+                "is imported to use inference_process=True"
+            )
+
         if is_given(padding_duration):
             logger.warning(
                 "padding_duration is deprecated and will be removed in 1.5.0, use prefix_padding_duration instead",  # noqa: E501
             )
             prefix_padding_duration = padding_duration
 
-        session = onnx_model.new_inference_session(force_cpu)
+        engine: batched_engine.BatchedVADEngine | None = None
+        session: onnxruntime.InferenceSession | None = None
+        if batched:
+            engine = batched_engine.BatchedVADEngine.shared(
+                sample_rate=sample_rate, force_cpu=force_cpu
+            )
+            session = engine._sess
+        elif not inference_process:
+            # otherwise the model is loaded once by the inference process
+            session = onnx_model.new_inference_session(force_cpu)
+
         opts = _VADOptions(
             min_speech_duration=min_speech_duration,
             min_silence_duration=min_silence_duration,
@@ -129,17 +181,29 @@ class VAD(agents.vad.VAD):
             activation_threshold=activation_threshold,
             sample_rate=sample_rate,
         )
-        return cls(session=session, opts=opts)
+        return cls(
+            session=session,
+            opts=opts,
+            engine=engine,
+            inference_process=inference_process,
+            inference_executor=inference_executor,
+        )
 
     def __init__(
         self,
         *,
-        session: onnxruntime.InferenceSession,
+        session: onnxruntime.InferenceSession | None,
         opts: _VADOptions,
+        engine: batched_engine.BatchedVADEngine | None = None,
+        inference_process: bool = False,
+        inference_executor: InferenceExecutor | None = None,
     ) -> None:
         super().__init__(capabilities=agents.vad.VADCapabilities(update_interval=0.032))
         self._onnx_session = session
         self._opts = opts
+        self._engine = engine
+        self._inference_process = inference_process
+        self._inference_executor = inference_executor
         self._streams = weakref.WeakSet[VADStream]()
 
     def stream(self) -> VADStream:
@@ -149,13 +213,22 @@ class VAD(agents.vad.VAD):
         Returns:
             VADStream: A stream object for processing audio input and detecting speech.
         """
-        stream = VADStream(
-            self,
-            self._opts,
-            onnx_model.OnnxModel(
+        model: _Model
+        if self._inference_process:
+            # the VAD is usually loaded in prewarm, before the job context exists
+            model = inference.InferenceProcModel(
+                executor=self._inference_executor or get_job_context().inference_executor,
+                sample_rate=self._opts.sample_rate,
+            )
+        elif self._engine is not None:
+            model = self._engine.model()
+        else:
+            assert self._onnx_session is not None
+            model = onnx_model.OnnxModel(
                 onnx_session=self._onnx_session, sample_rate=self._opts.sample_rate
-            ),
-        )
+            )
+
+        stream = VADStream(self, self._opts, model)
         self._streams.add(stream)
         return stream
 
@@ -202,13 +275,20 @@ class VAD(agents.vad.VAD):
 
 
 class VADStream(agents.vad.VADStream):
-    def __init__(self, vad: VAD, opts: _VADOptions, model: onnx_model.OnnxModel) -> None:
+    def __init__(
+        self,
+        vad: VAD,
+        opts: _VADOptions,
+        model: _Model,
+    ) -> None:
         super().__init__(vad)
         self._opts, self._model = opts, model
         self._loop = asyncio.get_event_loop()
 
         self._executor = ThreadPoolExecutor(max_workers=1)
         self._task.add_done_callback(lambda _: self._executor.shutdown(wait=False))
+        if not isinstance(model, onnx_model.OnnxModel):
+            self._task.add_done_callback(lambda _: model.close())
         self._exp_filter = utils.ExpFilter(alpha=0.35)
 
         self._input_sample_rate = 0
@@ -288,6 +368,7 @@ class VADStream(agents.vad.VADStream):
         input_copy_remaining_fract = 0.0
 
         extra_inference_time = 0.0
+        last_p = 0.0  # raw probability of the last window, used when an inference fails
 
         async for input_frame in self._input_ch:
             if not isinstance(input_frame, rtc.AudioFrame):
@@ -351,9 +432,23 @@ class VADStream(agents.vad.VADStream):
                 )
 
                 # run the inference
-                p = await self._loop.run_in_executor(
-                    self._executor, self._model, inference_f32_data
-                )
+                if isinstance(self._model, inference.InferenceProcModel):
+                    try:
+                        p = await self._model.infer(inference_f32_data)
+                    except (asyncio.TimeoutError, RuntimeError) as e:
+                        # a slow inference process must not stop the stream, skip the window
+                        logger.warning(
+                            "vad inference failed, reusing the last probability",
+                            extra={"error": str(e)},
+                        )
+                        p = last_p
+                elif not isinstance(self._model, onnx_model.OnnxModel):
+                    p = await self._model.infer(inference_f32_data)
+                else:
+                    p = await self._loop.run_in_executor(
+                        self._executor, self._model, inference_f32_data
+                    )
+                last_p = p
                 p = self._exp_filter.apply(exp=1.0, sample=p)
 
                 window_duration = self._model.window_size_samples / self._opts.sample_rate
@@ -1,23 +1,37 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import math
+import re
 import time
 from abc import ABC, abstractmethod
-from typing import Any
+from collections import OrderedDict
+from typing import Any, Literal
 
-from livekit.agents import llm
+import numpy as np
+
+from livekit import rtc
+from livekit.agents import llm, metrics
 from livekit.agents.inference_runner import _InferenceRunner
 from livekit.agents.ipc.inference_executor import InferenceExecutor
 from livekit.agents.job import get_job_context
-from livekit.agents.utils import hw
+from livekit.agents.utils import MovingAverage, hw
 
 from .log import logger
 from .models import HG_MODEL, MODEL_REVISIONS, ONNX_FILENAME, EOUModelType
 
 MAX_HISTORY_TOKENS = 128
 MAX_HISTORY_TURNS = 6
+MAX_BATCH_SIZE = 16
+BATCH_WINDOW = 0.005
+PREDICTION_CACHE_SIZE = 64
+PREDICTION_CACHE_TTL = 30.0
+TURN_IDS_CACHE_SIZE = 512
+
+# every turn of the chat template starts with this special token
+_TURN_START_RE = re.compile(r"(?=<\|im_start\|>)")
 
 
 def _download_from_hf_hub(repo_id: str, filename: str, **kwargs: Any) -> str:
@@ -27,29 +41,34 @@ def _download_from_hf_hub(repo_id: str, filename: str, **kwargs: Any) -> str:
     return local_path
 
 
+def _merge_adjacent_turns(chat_ctx: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    new_chat_ctx: list[dict[str, Any]] = []
+    for msg in chat_ctx:
+        content = msg["content"]
+        if not content:
+            continue
+
+        # need to combine adjacent turns together to match training data
+        if new_chat_ctx and new_chat_ctx[-1]["role"] == msg["role"]:
+            new_chat_ctx[-1]["content"] += content
+        else:
+            new_chat_ctx.append({"role": msg["role"], "content": content})
+
+    return new_chat_ctx
+
+
 class _EUORunnerBase(_InferenceRunner):
+    MAX_BATCH_SIZE = MAX_BATCH_SIZE
+    BATCH_WINDOW = BATCH_WINDOW
+
     def __init__(self, model_type: EOUModelType):
         super().__init__()
         self._model_revision = MODEL_REVISIONS[model_type]
+        self._turn_ids_cache: OrderedDict[str, list[int]] = OrderedDict()
 
     def _format_chat_ctx(self, chat_ctx: list[dict[str, Any]]) -> str:
-        new_chat_ctx = []
-        last_msg: dict[str, Any] | None = None
-        for msg in chat_ctx:
-            content = msg["content"]
-            if not content:
-                continue
-
-            # need to combine adjacent turns together to match training data
-            if last_msg and last_msg["role"] == msg["role"]:
-                last_msg["content"] += content
-            else:
-                msg["content"] = content
-                new_chat_ctx.append(msg)
-                last_msg = msg
-
         convo_text = self._tokenizer.apply_chat_template(
-            new_chat_ctx,
+            _merge_adjacent_turns(chat_ctx),
             add_generation_prompt=False,
             add_special_tokens=False,
             tokenize=False,
@@ -60,6 +79,29 @@ class _EUORunnerBase(_InferenceRunner):
         text = convo_text[:ix]
         return text  # type: ignore
 
+    def _tokenize(self, text: str) -> list[int]:
+        # the tokenizer splits the text on special tokens before encoding it, so each turn can be
+        # tokenized on its own and the ids of the previous turns reused between calls.
+        # (runners are called from a single thread, see _InferenceRunner.MAX_CONCURRENCY)
+        input_ids: list[int] = []
+        for turn in _TURN_START_RE.split(text):
+            if not turn:
+                continue
+
+            turn_ids = self._turn_ids_cache.get(turn)
+            if turn_ids is None:
+                turn_ids = self._tokenizer(turn, add_special_tokens=False)["input_ids"]
+                self._turn_ids_cache[turn] = turn_ids
+                if len(self._turn_ids_cache) > TURN_IDS_CACHE_SIZE:
+                    self._turn_ids_cache.popitem(last=False)
+            else:
+                self._turn_ids_cache.move_to_end(turn)
+
+            input_ids.extend(turn_ids)
+
+        # keep the most recent tokens, same as truncation_side="left"
+        return input_ids[-MAX_HISTORY_TOKENS:]
+
     def initialize(self) -> None:
         import onnxruntime as ort  # type: ignore
         from huggingface_hub import errors
@@ -102,36 +144,104 @@ class _EUORunnerBase(_InferenceRunner):
             ) from None
 
     def run(self, data: bytes) -> bytes | None:
-        data_json = json.loads(data)
-        chat_ctx = data_json.get("chat_ctx", None)
+        result = self.run_batch([data])[0]
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+    def run_batch(self, data: list[bytes]) -> list[bytes | None | Exception]:
+        # an invalid request is failed on its own, the others of the batch still run
+        results: list[bytes | None | Exception] = [None] * len(data)
+        indices: list[int] = []
+        texts: list[str] = []
+        for r, d in enumerate(data):
+            chat_ctx = json.loads(d).get("chat_ctx", None)
+            if not chat_ctx:
+                results[r] = ValueError("chat_ctx is required on the inference input data")
+                continue
+
+            indices.append(r)
+            texts.append(self._format_chat_ctx(chat_ctx))
 
-        if not chat_ctx:
-            raise ValueError("chat_ctx is required on the inference input data")
+        if not texts:
+            return results
 
         start_time = time.perf_counter()
 
-        text = self._format_chat_ctx(chat_ctx)
-        inputs = self._tokenizer(
-            text,
-            add_special_tokens=False,
-            return_tensors="np",
-            max_length=MAX_HISTORY_TOKENS,
-            truncation=True,
-        )
+        token_ids = [self._tokenize(text) for text in texts]
+
+        # the model is causal, right padding doesn't change the logits of the real tokens
+        seq_len = max(len(ids) for ids in token_ids)
+        pad_id = self._tokenizer.pad_token_id or 0
+        input_ids = np.full((len(token_ids), seq_len), pad_id, dtype=np.int64)
+        for i, ids in enumerate(token_ids):
+            input_ids[i, : len(ids)] = ids
+
         # Run inference
-        outputs = self._session.run(None, {"input_ids": inputs["input_ids"].astype("int64")})
-        eou_probability = outputs[0].flatten()[-1]
+        outputs = self._session.run(None, {"input_ids": input_ids})
+        probs = outputs[0].reshape(len(token_ids), seq_len)
         end_time = time.perf_counter()
 
-        result: dict[str, Any] = {
-            "eou_probability": float(eou_probability),
-            "input": text,
-            "duration": round(end_time - start_time, 3),
-        }
-        return json.dumps(result).encode()
+        for i, (r, text) in enumerate(zip(indices, texts)):
+            result: dict[str, Any] = {
+                "eou_probability": float(probs[i, len(token_ids[i]) - 1]),
+                "input": text,
+                "duration": round(end_time - start_time, 3),
+                "batch_size": len(texts),
+            }
+            results[r] = json.dumps(result).encode()
+
+        return results
+
+
+class _PredictionCache:
+    """LRU cache of end of turn probabilities, entries expire after `ttl` seconds"""
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._saved_latency = 0.0
+        self._miss_latency = MovingAverage(32)
+
+    def get(self, key: str) -> float | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        self._saved_latency += self._miss_latency.get_avg()
+        return entry[1]
+
+    def put(self, key: str, probability: float, *, latency: float) -> None:
+        self._miss_latency.add_sample(latency)
+        self._entries[key] = (time.monotonic() + self._ttl, probability)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def metrics(self, label: str) -> metrics.CacheMetrics:
+        total = self._hits + self._misses
+        return metrics.CacheMetrics(
+            label=label,
+            timestamp=time.time(),
+            hits=self._hits,
+            misses=self._misses,
+            hit_rate=self._hits / total if total else 0.0,
+            saved_latency=self._saved_latency,
+        )
 
 
-class EOUModelBase(ABC):
+class EOUModelBase(ABC, rtc.EventEmitter[Literal["metrics_collected"]]):
     def __init__(
         self,
         model_type: EOUModelType = "en",  # default to smaller, english-only model
@@ -140,6 +250,7 @@ class EOUModelBase(ABC):
         # not recommended unless you're confident in the impact.
         unlikely_threshold: float | None = None,
     ) -> None:
+        super().__init__()
         self._model_type = model_type
         self._executor = inference_executor or get_job_context().inference_executor
 
@@ -153,6 +264,8 @@ class EOUModelBase(ABC):
             self._languages = json.load(f)
 
         self._unlikely_threshold = unlikely_threshold
+        self._label = f"{type(self).__module__}.{type(self).__name__}"
+        self._cache = _PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
 
     @abstractmethod
     def _inference_method(self) -> str: ...
@@ -182,6 +295,15 @@ class EOUModelBase(ABC):
     def supports_language(self, language: str | None) -> bool:
         return self.unlikely_threshold(language) is not None
 
+    def cache_metrics(self) -> metrics.CacheMetrics:
+        """Hit rate and saved latency of the prediction cache.
+
+        Interim transcripts often lead to several predictions for the same chat context,
+        those are answered from the cache without going through the inference process.
+        The metrics are also emitted as a `metrics_collected` event after each prediction.
+        """
+        return self._cache.metrics(self._label)
+
     async def predict_eou(self, chat_ctx: llm.ChatContext) -> float:
         return await self.predict_end_of_turn(chat_ctx)
 
@@ -208,12 +330,18 @@ class EOUModelBase(ABC):
                     )
                     break
 
-        messages = messages[-MAX_HISTORY_TURNS:]
+        messages = _merge_adjacent_turns(messages[-MAX_HISTORY_TURNS:])
 
         json_data = json.dumps({"chat_ctx": messages}).encode()
+        cache_key = hashlib.blake2b(json_data, digest_size=16).hexdigest()
+        if (cached_probability := self._cache.get(cache_key)) is not None:
+            logger.debug("eou prediction (cached)", extra={"eou_probability": cached_probability})
+            self.emit("metrics_collected", self.cache_metrics())
+            return cached_probability
 
+        start_time = time.perf_counter()
         result = await asyncio.wait_for(
-            self._executor.do_inference(self._inference_method(), json_data),
+            self._executor.do_inference(self._inference_method(), json_data, timeout=timeout),
             timeout=timeout,
         )
 
@@ -224,4 +352,10 @@ class EOUModelBase(ABC):
             "eou prediction",
             extra=result_json,
         )
+        self._cache.put(
+            cache_key,
+            result_json["eou_probability"],
+            latency=time.perf_counter() - start_time,
+        )
+        self.emit("metrics_collected", self.cache_metrics())
         return result_json["eou_probability"]  # type: ignore
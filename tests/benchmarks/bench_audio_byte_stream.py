@@ -0,0 +1,82 @@
+"""Throughput of AudioByteStream.push for input chunks from 10ms to 10s of audio.
+
+The previous implementation re-sliced its whole buffer for every emitted frame, which made a
+single push quadratic in the size of the chunk. It's kept here as a reference.
+
+usage: python -m tests.benchmarks.bench_audio_byte_stream [--total 60]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import math
+import time
+
+from livekit import rtc
+from livekit.agents.utils.audio import AudioByteStream
+
+SAMPLE_RATE = 24000
+NUM_CHANNELS = 1
+FRAME_SAMPLES = SAMPLE_RATE // 100  # 10ms frames
+CHUNK_DURATIONS = [0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0]
+REPEATS = 3
+
+
+class _LegacyAudioByteStream:
+    def __init__(self, sample_rate: int, num_channels: int, samples_per_channel: int) -> None:
+        self._sample_rate = sample_rate
+        self._num_channels = num_channels
+        self._bytes_per_sample = num_channels * ctypes.sizeof(ctypes.c_int16)
+        self._bytes_per_frame = samples_per_channel * self._bytes_per_sample
+        self._buf = bytearray()
+
+    def push(self, data: bytes) -> list[rtc.AudioFrame]:
+        self._buf.extend(data)
+
+        frames = []
+        while len(self._buf) >= self._bytes_per_frame:
+            frame_data = self._buf[: self._bytes_per_frame]
+            self._buf = self._buf[self._bytes_per_frame :]
+            frames.append(
+                rtc.AudioFrame(
+                    data=frame_data,
+                    sample_rate=self._sample_rate,
+                    num_channels=self._num_channels,
+                    samples_per_channel=len(frame_data) // self._bytes_per_sample,
+                )
+            )
+
+        return frames
+
+
+def _bench(stream_cls: type, chunk_duration: float, total_duration: float) -> float:
+    chunk = b"\x00\x01" * int(SAMPLE_RATE * chunk_duration) * NUM_CHANNELS
+    num_chunks = int(total_duration / chunk_duration)
+
+    elapsed = math.inf
+    for _ in range(REPEATS):
+        bstream = stream_cls(SAMPLE_RATE, NUM_CHANNELS, samples_per_channel=FRAME_SAMPLES)
+        start = time.perf_counter()
+        for _ in range(num_chunks):
+            bstream.push(chunk)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    # microseconds spent per emitted 10ms frame
+    return elapsed / (num_chunks * chunk_duration * 100) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--total", type=float, default=60.0, help="seconds of audio per run")
+    args = parser.parse_args()
+
+    print(f"{'chunk':>8} {'legacy us/frame':>16} {'new us/frame':>14}")
+    for chunk_duration in CHUNK_DURATIONS:
+        legacy = _bench(_LegacyAudioByteStream, chunk_duration, args.total)
+        new = _bench(AudioByteStream, chunk_duration, args.total)
+        print(f"{chunk_duration * 1000:>6.0f}ms {legacy:>16.2f} {new:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
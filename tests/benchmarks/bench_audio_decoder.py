@@ -0,0 +1,137 @@
+"""Decode throughput of AudioStreamDecoder on a 60s MP3 pushed in 4KB chunks.
+
+The previous StreamBuffer copied all of its unread data into a new BytesIO on every read, and
+PyAV reads 256 bytes at a time, so decoding a long response was quadratic in its size. It's kept
+here as a reference.
+
+usage: python -m tests.benchmarks.bench_audio_decoder [--duration 60] [--chunk-size 4096]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import math
+import threading
+import time
+
+import av
+import numpy as np
+
+from livekit.agents.utils.codecs import AudioStreamDecoder, StreamBuffer
+
+SAMPLE_RATE = 24000
+REPEATS = 3
+
+
+class _LegacyStreamBuffer:
+    def __init__(self) -> None:
+        self._buffer = io.BytesIO()
+        self._lock = threading.Lock()
+        self._data_available = threading.Condition(self._lock)
+        self._eof = False
+
+    def write(self, data: bytes) -> None:
+        with self._data_available:
+            self._buffer.seek(0, io.SEEK_END)
+            self._buffer.write(data)
+            self._data_available.notify_all()
+
+    def read(self, size: int = -1) -> bytes:
+        if self._buffer.closed:
+            return b""
+
+        with self._data_available:
+            while True:
+                if self._buffer.closed:
+                    return b""
+                self._buffer.seek(0)
+                data = self._buffer.read(size)
+
+                if data:
+                    remaining = self._buffer.read()
+                    self._buffer = io.BytesIO(remaining)
+                    return data
+
+                if self._eof:
+                    return b""
+
+                self._data_available.wait()
+
+    @property
+    def buffered_bytes(self) -> int:
+        # only consulted by the scheduler to decide when to resume the decoder
+        return len(self._buffer.getbuffer()) if not self._buffer.closed else 0
+
+    @property
+    def eof(self) -> bool:
+        return self._eof or self._buffer.closed
+
+    def end_input(self) -> None:
+        with self._data_available:
+            self._eof = True
+            self._data_available.notify_all()
+
+    def close(self) -> None:
+        self._buffer.close()
+
+
+def _encode_mp3(duration: float) -> bytes:
+    # a chirp with some noise, so the encoder can't collapse it to nothing
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = 0.3 * np.sin(2 * np.pi * (200 + 20 * t) * t)
+    signal += 0.02 * np.random.default_rng(0).standard_normal(len(t))
+    pcm = (signal * 32767).astype(np.int16)
+
+    out = io.BytesIO()
+    with av.open(out, mode="w", format="mp3") as container:
+        stream = container.add_stream("libmp3lame", rate=SAMPLE_RATE, layout="mono")
+        for i in range(0, len(pcm), 1152):
+            frame = av.AudioFrame.from_ndarray(pcm[None, i : i + 1152], format="s16", layout="mono")
+            frame.sample_rate = SAMPLE_RATE
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+    return out.getvalue()
+
+
+async def _decode(data: bytes, chunk_size: int, buffer_cls: type) -> tuple[float, float]:
+    decoder = AudioStreamDecoder(sample_rate=SAMPLE_RATE, num_channels=1, format="audio/mpeg")
+    decoder._input_buf = buffer_cls()
+
+    start = time.perf_counter()
+    for i in range(0, len(data), chunk_size):
+        decoder.push(data[i : i + chunk_size])
+    decoder.end_input()
+
+    decoded = 0.0
+    async for frame in decoder:
+        decoded += frame.duration
+
+    elapsed = time.perf_counter() - start
+    await decoder.aclose()
+    return elapsed, decoded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of encoded audio")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="bytes per push")
+    args = parser.parse_args()
+
+    data = _encode_mp3(args.duration)
+    print(f"{len(data) / 1024:.0f}KB of mp3, {args.chunk_size}B pushes")
+    print(f"{'buffer':>8} {'decode s':>10} {'x realtime':>12}")
+    for name, buffer_cls in (("legacy", _LegacyStreamBuffer), ("new", StreamBuffer)):
+        best, decoded = math.inf, 0.0
+        for _ in range(REPEATS):
+            elapsed, decoded = asyncio.run(_decode(data, args.chunk_size, buffer_cls))
+            best = min(best, elapsed)
+        print(f"{name:>8} {best:>10.3f} {decoded / best:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Cost of looping a clip in BackgroundAudioPlayer, per second of audio played.
+
+The previous implementation decoded the file again on every loop iteration and applied the
+volume by converting each frame to float32, it's kept here as the reference. The clip defaults
+to generated ogg/opus noise shaped like the builtin office ambience, any file can be given.
+
+usage: python -m tests.benchmarks.bench_background_audio [--file clip.ogg] [--loops 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+
+import av
+import numpy as np
+
+from livekit import rtc
+from livekit.agents.utils.audio import audio_frames_from_file
+from livekit.agents.voice import background_audio
+
+VOLUME = 0.6
+
+
+def _write_clip(path: str, seconds: float) -> None:
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(int(seconds * 48000)) * 2000).astype(np.int16)
+    with av.open(path, "w", format="ogg") as container:
+        stream = container.add_stream("libopus", rate=48000)
+        stream.layout = "mono"
+        for i in range(0, len(samples), 960):
+            frame = av.AudioFrame.from_ndarray(
+                samples[None, i : i + 960], format="s16", layout="mono"
+            )
+            frame.sample_rate = 48000
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+
+async def _legacy_loop(file_path: str, loops: int) -> AsyncGenerator[rtc.AudioFrame, None]:
+    for _ in range(loops):
+        async for frame in audio_frames_from_file(file_path):
+            data = np.frombuffer(frame.data, dtype=np.int16).astype(np.float32)
+            data *= 10 ** (np.log10(VOLUME))
+            np.clip(data, -32768, 32767, out=data)
+            yield rtc.AudioFrame(
+                data=data.astype(np.int16).tobytes(),
+                sample_rate=frame.sample_rate,
+                num_channels=frame.num_channels,
+                samples_per_channel=frame.samples_per_channel,
+            )
+
+
+async def _cached_loop(file_path: str, loops: int) -> AsyncGenerator[rtc.AudioFrame, None]:
+    gain_table = background_audio._gain_table(VOLUME)
+    for _ in range(loops):
+        async for frame in background_audio._clip_cache.frames(file_path):
+            yield background_audio._apply_gain(frame, gain_table)
+
+
+async def _played(frames: AsyncIterator[rtc.AudioFrame]) -> tuple[float, float]:
+    start = time.perf_counter()
+    duration = 0.0
+    async for frame in frames:
+        duration += frame.duration
+    return time.perf_counter() - start, duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", help="audio file to loop, defaults to 30s of generated noise")
+    parser.add_argument("--loops", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = args.file
+        if file_path is None:
+            file_path = os.path.join(tmpdir, "ambience.ogg")
+            _write_clip(file_path, seconds=30)
+
+        print(f"{'impl':>8} {'loops':>6} {'audio s':>8} {'ms per s of audio':>18} {'speedup':>8}")
+        legacy_elapsed, audio = asyncio.run(_played(_legacy_loop(file_path, args.loops)))
+        legacy = legacy_elapsed * 1000 / audio
+        print(f"{'legacy':>8} {args.loops:>6} {audio:>8.1f} {legacy:>18.3f} {1:>7.1f}x")
+        for loops in (1, args.loops):
+            background_audio._clip_cache = background_audio._ClipCache(
+                background_audio._CLIP_CACHE_MAX_BYTES
+            )
+            elapsed, audio = asyncio.run(_played(_cached_loop(file_path, loops)))
+            cached = elapsed * 1000 / audio
+            print(
+                f"{'cached':>8} {loops:>6} {audio:>8.1f} {cached:>18.3f} {legacy / cached:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
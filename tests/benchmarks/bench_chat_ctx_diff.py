@@ -0,0 +1,120 @@
+"""Cost of compute_chat_ctx_diff, run by the realtime models on every chat context update.
+
+The previous implementation filled an O(n·m) dynamic-programming LCS table, it's kept here as
+the reference. Both must remove and create the same number of items.
+
+usage: python -m tests.benchmarks.bench_chat_ctx_diff [--sizes 50,500,5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable
+
+from livekit.agents.llm import ChatContext, ChatItem, utils
+
+MIN_DURATION = 0.2
+
+
+def _legacy_compute_lcs(old_ids: list[str], new_ids: list[str]) -> list[str]:
+    n, m = len(old_ids), len(new_ids)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            if old_ids[i - 1] == new_ids[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1] + 1
+            else:
+                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+
+    lcs_ids = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        if old_ids[i - 1] == new_ids[j - 1]:
+            lcs_ids.append(old_ids[i - 1])
+            i -= 1
+            j -= 1
+        elif dp[i - 1][j] > dp[i][j - 1]:
+            i -= 1
+        else:
+            j -= 1
+
+    return list(reversed(lcs_ids))
+
+
+def _legacy_diff(old_ctx: ChatContext, new_ctx: ChatContext) -> utils.DiffOps:
+    old_ids = [m.id for m in old_ctx.items]
+    new_ids = [m.id for m in new_ctx.items]
+    lcs_ids = set(_legacy_compute_lcs(old_ids, new_ids))
+
+    to_remove = [msg.id for msg in old_ctx.items if msg.id not in lcs_ids]
+    to_create: list[tuple[str | None, str]] = []
+    last_id_in_sequence: str | None = None
+    for new_msg in new_ctx.items:
+        if new_msg.id not in lcs_ids:
+            to_create.append((last_id_in_sequence, new_msg.id))
+        last_id_in_sequence = new_msg.id
+
+    return utils.DiffOps(to_remove=to_remove, to_create=to_create)
+
+
+def _session(size: int) -> ChatContext:
+    chat_ctx = ChatContext()
+    chat_ctx.add_message(role="system", content="You are a financial advisor.")
+    for i in range(size - 1):
+        role = "user" if i % 2 == 0 else "assistant"
+        chat_ctx.add_message(role=role, content=f"message {i} " * 8)
+    return chat_ctx
+
+
+def _scenarios(old_ctx: ChatContext, rng: random.Random) -> dict[str, ChatContext]:
+    def _message(text: str) -> ChatItem:
+        return ChatContext().add_message(role="user", content=text)
+
+    items = old_ctx.items
+    appended = ChatContext([*items, _message("and the dividend?")])
+    truncated = ChatContext([items[0], *items[len(items) // 4 :]])
+    edited = list(items)
+    for _ in range(5):
+        edited.pop(rng.randrange(1, len(edited)))
+        edited.insert(rng.randrange(1, len(edited)), _message("edited"))
+    return {"append": appended, "truncate": truncated, "edit": ChatContext(edited)}
+
+
+def _time(fnc: Callable[[], utils.DiffOps]) -> float:
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fnc()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed > MIN_DURATION:
+            return elapsed / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="50,500,5000", help="items in the chat context")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'items':>6} {'change':>9} {'legacy ms':>10} {'diff ms':>9} {'speedup':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        old_ctx = _session(size)
+        for name, new_ctx in _scenarios(old_ctx, rng).items():
+            expected = _legacy_diff(old_ctx, new_ctx)
+            diff_ops = utils.compute_chat_ctx_diff(old_ctx, new_ctx)
+            assert len(diff_ops.to_remove) == len(expected.to_remove)
+            assert len(diff_ops.to_create) == len(expected.to_create)
+
+            legacy = _time(lambda: _legacy_diff(old_ctx, new_ctx))  # noqa: B023
+            new = _time(lambda: utils.compute_chat_ctx_diff(old_ctx, new_ctx))  # noqa: B023
+            print(
+                f"{size:>6} {name:>9} {legacy * 1000:>10.3f} {new * 1000:>9.3f} "
+                f"{legacy / new:>8.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Hyphenation throughput over a real text, as done by the transcript synchronizer.
+
+Compares the trie walk of Hyphenator to CompiledHyphenator, with and without its cache, and
+reports the cache hit rate. The corpus defaults to a Project Gutenberg book from the nltk
+corpora (downloaded if missing), any text file can be given instead.
+
+usage: python -m tests.benchmarks.bench_hyphenator [--corpus book.txt] [--words 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from livekit.agents.tokenize import _basic_hyphenator, basic
+
+
+def _load_corpus(path: str | None) -> str:
+    if path:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+
+    import nltk  # type: ignore[import-untyped]
+
+    try:
+        nltk.data.find("corpora/gutenberg")
+    except LookupError:
+        nltk.download("gutenberg", quiet=True)
+    return str(nltk.corpus.gutenberg.raw("austen-emma.txt"))
+
+
+def _rate(fnc: Callable[[str], list[str]], words: list[str]) -> float:
+    start = time.perf_counter()
+    for word in words:
+        fnc(word)
+    return len(words) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="text file, defaults to nltk's austen-emma.txt")
+    parser.add_argument("--words", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # split like TranscriptSynchronizer does
+    tokens = basic.split_words(
+        _load_corpus(args.corpus), ignore_punctuation=False, split_character=True
+    )
+    words = [w for w, _, _ in tokens][: args.words]
+    print(f"{len(words)} words, {len({w.lower() for w in words})} distinct")
+
+    patterns, exceptions = _basic_hyphenator.PATTERNS, _basic_hyphenator.EXCEPTIONS
+    legacy = _basic_hyphenator.Hyphenator(patterns, exceptions)
+    uncached = _basic_hyphenator.CompiledHyphenator(patterns, exceptions, cache_size=0)
+    compiled = _basic_hyphenator.CompiledHyphenator(patterns, exceptions)
+    uncached.hyphenate_word("compile")
+    compiled.hyphenate_word("compile")
+    compiled._cached_splits.cache_clear()
+
+    print(f"{'impl':>18} {'words/s':>10}")
+    for name, fnc in (
+        ("trie", legacy.hyphenate_word),
+        ("automaton", uncached.hyphenate_word),
+        ("automaton + cache", compiled.hyphenate_word),
+    ):
+        print(f"{name:>18} {_rate(fnc, words):>10.0f}")
+
+    info = compiled.cache_info()
+    lookups = info.hits + info.misses
+    print(f"cache hit rate: {info.hits / lookups:.1%} ({info.currsize}/{info.maxsize} entries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Inference requests carrying audio, sent over the socket or through the shared memory rings.
+
+Every stream sends 16kHz float32 windows to the inference process and waits for each result,
+like a VAD or an audio-based turn detector.
+
+usage: python -m tests.benchmarks.bench_inference_shm [--streams 100] [--window-ms 32 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import struct
+import time
+
+import numpy as np
+
+from livekit.agents.inference_runner import _InferenceRunner
+from livekit.agents.ipc import inference_proc_executor, shm_ring
+
+SAMPLE_RATE = 16000
+
+
+class _RmsRunner(_InferenceRunner):
+    INFERENCE_METHOD = "bench_rms"
+    MAX_CONCURRENCY = 4
+
+    def initialize(self) -> None:
+        pass
+
+    def run(self, data: bytes) -> bytes | None:
+        x = np.frombuffer(data, dtype=np.float32)
+        return struct.pack("<f", float(np.sqrt(np.mean(x * x))))
+
+
+async def _bench(
+    num_streams: int, window_ms: int, windows_per_stream: int, shm_ring_size: int
+) -> dict[str, float]:
+    executor = inference_proc_executor.InferenceProcExecutor(
+        runners={_RmsRunner.INFERENCE_METHOD: _RmsRunner},
+        initialize_timeout=30,
+        close_timeout=5,
+        memory_warn_mb=0,
+        memory_limit_mb=0,
+        ping_interval=5,
+        ping_timeout=60,
+        high_ping_threshold=2.5,
+        mp_ctx=mp.get_context("spawn"),
+        loop=asyncio.get_running_loop(),
+        http_proxy=None,
+        shm_ring_size=shm_ring_size,
+    )
+    await executor.start()
+    await executor.initialize()
+
+    rng = np.random.default_rng(0)
+    window = rng.uniform(-0.5, 0.5, SAMPLE_RATE * window_ms // 1000).astype(np.float32).tobytes()
+    latencies: list[float] = []
+
+    async def _stream() -> None:
+        for _ in range(windows_per_stream):
+            start_time = time.perf_counter()
+            await executor.do_inference(_RmsRunner.INFERENCE_METHOD, window)
+            latencies.append(time.perf_counter() - start_time)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(_stream() for _ in range(num_streams)))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    await executor.aclose()
+
+    num_windows = num_streams * windows_per_stream
+    return {
+        "windows_per_s": num_windows / wall,
+        "cpu_us": cpu / num_windows * 1e6,
+        "p50": float(np.percentile(latencies, 50)) * 1000,
+        "p99": float(np.percentile(latencies, 99)) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=100)
+    parser.add_argument("--window-ms", type=int, nargs="+", default=[32, 1000])
+    parser.add_argument("--windows", type=int, default=100, help="windows per stream")
+    args = parser.parse_args()
+
+    print(
+        f"{'window':>7} {'transport':>10} {'windows/s':>10} {'main cpu us/win':>16} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for window_ms in args.window_ms:
+        for ring_size in (0, shm_ring.DEFAULT_RING_SIZE):
+            res = asyncio.run(_bench(args.streams, window_ms, args.windows, ring_size))
+            transport = "shm" if ring_size else "socket"
+            print(
+                f"{window_ms:>5}ms {transport:>10} {res['windows_per_s']:>10.0f} "
+                f"{res['cpu_us']:>16.1f} {res['p50']:>8.2f} {res['p99']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
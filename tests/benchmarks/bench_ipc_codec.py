@@ -0,0 +1,104 @@
+"""Encode/decode throughput of the IPC messages, with and without their MessageCodec.
+
+The previous implementation wrote and read every field through an io.BytesIO with the
+write_*/read_* helpers, it's kept here as a reference.
+
+usage: python -m tests.benchmarks.bench_ipc_codec [--iterations 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import time
+from functools import partial
+from typing import Any, Callable
+
+from livekit.agents.ipc import channel, proto
+
+
+def _legacy_write(msg: Any, fields: list[tuple[str, str]]) -> bytes:
+    bio = io.BytesIO()
+    channel.write_int(bio, msg.MSG_ID)
+    for name, kind in fields:
+        value = getattr(msg, name)
+        if kind == "optional_bytes":
+            channel.write_bool(bio, value is not None)
+            if value is None:
+                continue
+            kind = "bytes"
+        getattr(channel, f"write_{kind}")(bio, value)
+    return bio.getvalue()
+
+
+def _legacy_read(data: bytes, fields: list[tuple[str, str]]) -> Any:
+    bio = io.BytesIO(data)
+    msg = proto.IPC_MESSAGES[channel.read_int(bio)]()
+    for name, kind in fields:
+        if kind == "optional_bytes":
+            if not channel.read_bool(bio):
+                setattr(msg, name, None)
+                continue
+            kind = "bytes"
+        setattr(msg, name, getattr(channel, f"read_{kind}")(bio))
+    return msg
+
+
+_CASES: list[tuple[str, Any, list[tuple[str, str]]]] = [
+    ("PingRequest", proto.PingRequest(timestamp=1234567890), [("timestamp", "long")]),
+    (
+        "PongResponse",
+        proto.PongResponse(last_timestamp=1234567890, timestamp=1234567891),
+        [("last_timestamp", "long"), ("timestamp", "long")],
+    ),
+    (
+        "InferenceRequest",
+        proto.InferenceRequest(
+            method="lk_end_of_utterance_en",
+            request_id="inference_req_abcdef123456",
+            data=b'{"chat_ctx": []}' * 64,
+            deadline=1750000000.0,
+        ),
+        [("method", "string"), ("request_id", "string"), ("data", "bytes"), ("deadline", "double")],
+    ),
+    (
+        "InferenceResponse",
+        proto.InferenceResponse(request_id="inference_req_abcdef123456", data=b'{"eou": 0.9}'),
+        [("request_id", "string"), ("data", "optional_bytes"), ("error", "string")],
+    ),
+]
+
+
+def _rate(fnc: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fnc()
+    return iterations / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'message':>18} {'op':>7} {'legacy msg/s':>14} {'codec msg/s':>13} {'speedup':>8}")
+    for name, msg, fields in _CASES:
+        data = channel._write_message(msg)
+        assert data == _legacy_write(msg, fields)
+
+        cases: list[tuple[str, Callable[[], Any], Callable[[], Any]]] = [
+            ("encode", partial(_legacy_write, msg, fields), partial(channel._write_message, msg)),
+            (
+                "decode",
+                partial(_legacy_read, data, fields),
+                partial(channel._read_message, data, proto.IPC_MESSAGES),
+            ),
+        ]
+        for op, legacy_fnc, codec_fnc in cases:
+            legacy = _rate(legacy_fnc, args.iterations)
+            codec = _rate(codec_fnc, args.iterations)
+            print(f"{name:>18} {op:>7} {legacy:>14.0f} {codec:>13.0f} {codec / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Throughput of log forwarding from a job process to the supervisor.
+
+Measures the records/sec delivered across a socketpair, and the supervisor-side cost of
+decoding them. The previous implementation pickled every record and sent it as its own message,
+it's kept here as a reference.
+
+usage: python -m tests.benchmarks.bench_log_queue [--records 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import logging
+import pickle
+import queue
+import socket
+import threading
+import time
+from typing import Callable, Optional
+
+from livekit.agents.ipc import log_queue
+from livekit.agents.utils.aio import duplex_unix
+
+
+class _LegacyLogQueueHandler(logging.Handler):
+    def __init__(self, duplex: duplex_unix._Duplex) -> None:
+        super().__init__()
+        self._duplex = duplex
+        self._send_q = queue.SimpleQueue[Optional[bytes]]()
+        self._send_thread = threading.Thread(target=self._forward_logs)
+        self._send_thread.start()
+
+    def _forward_logs(self) -> None:
+        while True:
+            serialized_record = self._send_q.get()
+            if serialized_record is None:
+                break
+            self._duplex.send_bytes(serialized_record)
+        self._duplex.close()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        msg = self.format(record)
+        record = copy.copy(record)
+        record.message = msg
+        record.msg = msg
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        self._send_q.put_nowait(pickle.dumps(record))
+
+    def close(self) -> None:
+        super().close()
+        self._send_q.put_nowait(None)
+
+
+def _legacy_listen(duplex: duplex_unix._Duplex, on_record: Callable[[], None]) -> None:
+    while True:
+        try:
+            data = duplex.recv_bytes()
+        except duplex_unix.DuplexClosed:
+            break
+        pickle.loads(data)
+        on_record()
+
+
+def _new_listen(duplex: duplex_unix._Duplex, on_record: Callable[[], None]) -> None:
+    while True:
+        try:
+            data = duplex.recv_bytes()
+        except duplex_unix.DuplexClosed:
+            break
+        records, _ = log_queue._decode_batch(data)
+        for _ in records:
+            on_record()
+
+
+def _make_record(i: int) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "livekit.agents", logging.DEBUG, __file__, 42, "received frame %d", (i,), None
+    )
+    record.speech_id = "speech_1234"
+    record.delay = 0.012
+    return record
+
+
+def _bench(legacy: bool, num_records: int) -> tuple[float, float]:
+    pch, cch = socket.socketpair()
+    received = 0
+    listener_cpu = 0.0
+
+    def _on_record() -> None:
+        nonlocal received
+        received += 1
+
+    def _listen() -> None:
+        nonlocal listener_cpu
+        start = time.thread_time()
+        (_legacy_listen if legacy else _new_listen)(duplex_unix._Duplex.open(pch), _on_record)
+        listener_cpu = time.thread_time() - start
+
+    listener = threading.Thread(target=_listen)
+    listener.start()
+
+    handler: logging.Handler
+    if legacy:
+        handler = _LegacyLogQueueHandler(duplex_unix._Duplex.open(cch))
+    else:
+        handler = log_queue.LogQueueHandler(duplex_unix._Duplex.open(cch), max_records_per_second=0)
+
+    records = [_make_record(i) for i in range(num_records)]
+    start = time.perf_counter()
+    for record in records:
+        handler.handle(record)
+    handler.close()
+    listener.join()
+    elapsed = time.perf_counter() - start
+
+    assert received == num_records
+    return num_records / elapsed, listener_cpu / num_records * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'impl':>8} {'records/s':>12} {'supervisor us/record':>22}")
+    for name, legacy in (("legacy", True), ("batched", False)):
+        rate, cpu = _bench(legacy, args.records)
+        print(f"{name:>8} {rate:>12.0f} {cpu:>22.2f}")
+
+
+if __name__ == "__main__":
+    main()
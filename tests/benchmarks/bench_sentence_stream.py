@@ -0,0 +1,94 @@
+"""Cost of streaming LLM replies through basic.SentenceTokenizer, token by token.
+
+Without a segmenter, BufferedTokenStream reruns split_sentences over its whole buffer on every
+push, which is quadratic in the length of punctuation-poor replies. The previous stream is
+kept as the reference, and both must produce the same sentences.
+
+usage: python -m tests.benchmarks.bench_sentence_stream [--size 10240] [--token-len 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import random
+import time
+from typing import Callable
+
+from livekit.agents import tokenize
+from livekit.agents.tokenize import _basic_sent, basic, token_stream
+
+MIN_SENTENCE_LEN = 20
+REPEATS = 3
+
+
+def _prose(size: int, rng: random.Random) -> str:
+    words = ["the", "market", "closed", "higher", "today", "while", "analysts", "expect"]
+    text = ""
+    while len(text) < size:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(6, 20)))
+        text += sentence.capitalize() + rng.choice([". ", "! ", "? ", ".\n"])
+    return text[:size]
+
+
+def _figures(size: int, rng: random.Random) -> str:
+    # what the financial tools return: long lists with few sentence ends
+    text = "Here are the figures you asked for: "
+    while len(text) < size:
+        text += f"{rng.choice(['AAPL', 'MSFT', 'NVDA', 'TSLA'])} {rng.uniform(1, 999):.2f} "
+        text += f"({rng.uniform(-5, 5):+.1f}%), "
+    return text[:size]
+
+
+def _tokens(text: str, token_len: int) -> list[str]:
+    return [text[i : i + token_len] for i in range(0, len(text), token_len)]
+
+
+def _legacy_stream() -> tokenize.SentenceStream:
+    return token_stream.BufferedSentenceStream(
+        tokenizer=functools.partial(_basic_sent.split_sentences, min_sentence_len=MIN_SENTENCE_LEN),
+        min_token_len=MIN_SENTENCE_LEN,
+        min_ctx_len=10,
+    )
+
+
+async def _run(make_stream: Callable[[], tokenize.SentenceStream], tokens: list[str]) -> list[str]:
+    stream = make_stream()
+    for token in tokens:
+        stream.push_text(token)
+    stream.end_input()
+    return [ev.token async for ev in stream]
+
+
+def _bench(
+    make_stream: Callable[[], tokenize.SentenceStream], tokens: list[str]
+) -> tuple[float, list[str]]:
+    best = float("inf")
+    sentences: list[str] = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        sentences = asyncio.run(_run(make_stream, tokens))
+        best = min(best, time.perf_counter() - start)
+    return best, sentences
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=10 * 1024, help="characters per reply")
+    parser.add_argument("--token-len", type=int, default=4, help="characters per LLM token")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    new_stream = basic.SentenceTokenizer(min_sentence_len=MIN_SENTENCE_LEN).stream
+    print(f"{'reply':>8} {'legacy ms':>10} {'segmenter ms':>13} {'speedup':>8}")
+    for name, text in (("prose", _prose(args.size, rng)), ("figures", _figures(args.size, rng))):
+        tokens = _tokens(text, args.token_len)
+        legacy, expected = _bench(_legacy_stream, tokens)
+        new, sentences = _bench(new_stream, tokens)
+        assert sentences == expected
+        print(f"{name:>8} {legacy * 1000:>10.1f} {new * 1000:>13.1f} {legacy / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""CPU usage of the Silero VAD per stream, with and without the BatchedVADEngine.
+
+usage: python -m tests.benchmarks.bench_silero_vad [--streams 1 10 100] [--duration 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from livekit import rtc
+from livekit.plugins import silero
+
+SAMPLE_RATE = 16000
+FRAME_DURATION = 0.01
+
+
+def _make_frames(duration: float) -> list[rtc.AudioFrame]:
+    # alternate one second of noisy tone and one second of silence
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.floor(t) % 2 == 0)
+    signal += 0.01 * np.random.default_rng(0).standard_normal(len(t))
+    pcm = (signal * 32767).astype(np.int16)
+
+    samples_per_frame = int(SAMPLE_RATE * FRAME_DURATION)
+    return [
+        rtc.AudioFrame(
+            data=pcm[i : i + samples_per_frame].tobytes(),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            samples_per_channel=samples_per_frame,
+        )
+        for i in range(0, len(pcm) - samples_per_frame + 1, samples_per_frame)
+    ]
+
+
+async def _run_stream(vad: silero.VAD, frames: list[rtc.AudioFrame]) -> None:
+    stream = vad.stream()
+
+    async def _push() -> None:
+        for frame in frames:
+            stream.push_frame(frame)
+            await asyncio.sleep(0)
+        stream.end_input()
+
+    push_task = asyncio.create_task(_push())
+    async for _ in stream:
+        pass
+
+    await push_task
+    await stream.aclose()
+
+
+async def _bench(num_streams: int, duration: float, batched: bool) -> tuple[float, float]:
+    vad = silero.VAD.load(batched=batched)
+    frames = _make_frames(duration)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(_run_stream(vad, frames) for _ in range(num_streams)))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+    # cpu seconds used per stream for one second of audio
+    return cpu / num_streams / duration, wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{'streams':>8} {'mode':>10} {'cpu ms/stream/s':>16} {'wall s':>8}")
+    for num_streams in args.streams:
+        for batched in (False, True):
+            cpu, wall = asyncio.run(_bench(num_streams, args.duration, batched))
+            mode = "batched" if batched else "default"
+            print(f"{num_streams:>8} {mode:>10} {cpu * 1000:>16.2f} {wall:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
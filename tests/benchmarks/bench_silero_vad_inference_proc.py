@@ -0,0 +1,208 @@
+"""RSS per job and VAD latency, with the Silero model loaded in every job process or once in the
+inference process.
+
+Each job is a separate process streaming real-time audio into a VADStream. In inference process
+mode, the jobs forward their inference requests to the main process, which relays them to an
+InferenceProcExecutor like the worker does.
+
+usage: python -m tests.benchmarks.bench_silero_vad_inference_proc [--jobs 50] [--duration 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import socket
+import time
+from multiprocessing.context import BaseContext
+from typing import Any
+
+import numpy as np
+import psutil
+
+from livekit.agents import ipc, utils, vad
+from livekit.agents.utils.aio import duplex_unix
+from livekit.plugins import silero
+
+from .bench_silero_vad import FRAME_DURATION, _make_frames
+
+
+class _RelayInferenceExecutor:
+    """InferenceExecutor of the job processes, requests go through the main process"""
+
+    def __init__(self, dup: duplex_unix._AsyncDuplex) -> None:
+        self._dup = dup
+        self._requests: dict[str, asyncio.Future[ipc.proto.InferenceResponse]] = {}
+        self._read_atask = asyncio.create_task(self._read_task())
+
+    async def _read_task(self) -> None:
+        while True:
+            msg = await ipc.channel.arecv_message(self._dup, ipc.proto.IPC_MESSAGES)
+            if isinstance(msg, ipc.proto.InferenceResponse):
+                self._requests.pop(msg.request_id).set_result(msg)
+
+    async def do_inference(
+        self, method: str, data: bytes, *, timeout: float | None = None
+    ) -> bytes | None:
+        request_id = utils.shortuuid("inference_job_")
+        fut = self._requests[request_id] = asyncio.Future()
+        await ipc.channel.asend_message(
+            self._dup,
+            ipc.proto.InferenceRequest(
+                request_id=request_id,
+                method=method,
+                data=data,
+                deadline=time.time() + timeout if timeout is not None else 0.0,
+            ),
+        )
+        resp = await fut
+        if resp.error:
+            raise RuntimeError(resp.error)
+
+        return resp.data
+
+
+async def _run_job(cch: socket.socket | None, duration: float) -> dict[str, Any]:
+    if cch is not None:
+        silero.VAD.register_inference_runner()
+        executor = _RelayInferenceExecutor(await duplex_unix._AsyncDuplex.open(cch))
+        vad_model = silero.VAD.load(inference_process=True, inference_executor=executor)
+    else:
+        vad_model = silero.VAD.load()
+
+    frames = _make_frames(duration)
+    stream = vad_model.stream()
+    latencies: list[float] = []
+
+    async def _push() -> None:
+        start_time = time.perf_counter()
+        for i, frame in enumerate(frames):
+            stream.push_frame(frame)
+            # real-time audio, like a participant track
+            await asyncio.sleep(
+                max(0.0, start_time + (i + 1) * FRAME_DURATION - time.perf_counter())
+            )
+        stream.end_input()
+
+    push_task = asyncio.create_task(_push())
+    async for ev in stream:
+        if ev.type == vad.VADEventType.INFERENCE_DONE:
+            latencies.append(ev.inference_duration)
+
+    await push_task
+    await stream.aclose()
+    return {"rss": psutil.Process().memory_info().rss, "latencies": latencies}
+
+
+def _job_main(cch: socket.socket | None, duration: float, results: mp.Queue) -> None:
+    results.put(asyncio.run(_run_job(cch, duration)))
+
+
+async def _relay_task(
+    pch: socket.socket, inf_executor: ipc.inference_proc_executor.InferenceProcExecutor
+) -> None:
+    dup = await duplex_unix._AsyncDuplex.open(pch)
+
+    async def _forward(req: ipc.proto.InferenceRequest) -> None:
+        try:
+            timeout = max(0.0, req.deadline - time.time()) if req.deadline else None
+            data = await inf_executor.do_inference(req.method, req.data, timeout=timeout)
+            resp = ipc.proto.InferenceResponse(request_id=req.request_id, data=data)
+        except Exception as e:
+            resp = ipc.proto.InferenceResponse(request_id=req.request_id, error=str(e))
+        await ipc.channel.asend_message(dup, resp)
+
+    tasks: set[asyncio.Task[None]] = set()
+    try:
+        while True:
+            msg = await ipc.channel.arecv_message(dup, ipc.proto.IPC_MESSAGES)
+            if isinstance(msg, ipc.proto.InferenceRequest):
+                task = asyncio.create_task(_forward(msg))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+    except duplex_unix.DuplexClosed:
+        pass
+    finally:
+        await utils.aio.cancel_and_wait(*tasks)
+
+
+async def _bench(
+    mp_ctx: BaseContext, num_jobs: int, duration: float, inference_process: bool
+) -> dict[str, float]:
+    loop = asyncio.get_running_loop()
+    inf_executor: ipc.inference_proc_executor.InferenceProcExecutor | None = None
+    if inference_process:
+        inf_executor = ipc.inference_proc_executor.InferenceProcExecutor(
+            runners={silero.inference._VADRunner.INFERENCE_METHOD: silero.inference._VADRunner},
+            initialize_timeout=30,
+            close_timeout=5,
+            memory_warn_mb=0,
+            memory_limit_mb=0,
+            ping_interval=5,
+            ping_timeout=60,
+            high_ping_threshold=2.5,
+            mp_ctx=mp_ctx,
+            loop=loop,
+            http_proxy=None,
+        )
+        await inf_executor.start()
+        await inf_executor.initialize()
+
+    results: mp.Queue = mp_ctx.Queue()
+    procs, relay_tasks = [], []
+    for _ in range(num_jobs):
+        cch = None
+        if inf_executor is not None:
+            pch, cch = socket.socketpair()
+            relay_tasks.append(asyncio.create_task(_relay_task(pch, inf_executor)))
+
+        proc = mp_ctx.Process(target=_job_main, args=(cch, duration, results))  # type: ignore
+        proc.start()
+        procs.append(proc)
+        if cch is not None:
+            cch.close()
+
+    job_results = [await loop.run_in_executor(None, results.get) for _ in range(num_jobs)]
+    for proc in procs:
+        await loop.run_in_executor(None, proc.join)
+
+    inference_rss = 0
+    if inf_executor is not None:
+        assert inf_executor.pid is not None
+        inference_rss = psutil.Process(inf_executor.pid).memory_info().rss
+        await utils.aio.cancel_and_wait(*relay_tasks)
+        await inf_executor.aclose()
+
+    latencies = np.concatenate([r["latencies"] for r in job_results])
+    job_rss = np.mean([r["rss"] for r in job_results])
+    return {
+        "job_rss": job_rss / 1e6,
+        "total_rss": (job_rss * num_jobs + inference_rss) / 1e6,
+        "p50": float(np.percentile(latencies, 50)) * 1000,
+        "p99": float(np.percentile(latencies, 99)) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    mp_ctx = mp.get_context("spawn")
+    print(
+        f"{'jobs':>6} {'mode':>18} {'rss MB/job':>11} {'total rss MB':>13} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for inference_process in (False, True):
+        res = asyncio.run(_bench(mp_ctx, args.jobs, args.duration, inference_process))
+        mode = "inference_process" if inference_process else "job"
+        print(
+            f"{args.jobs:>6} {mode:>18} {res['job_rss']:>11.1f} {res['total_rss']:>13.1f} "
+            f"{res['p50']:>8.2f} {res['p99']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cost of the speaking rate estimation run on the TTS audio, per second of audio.
+
+The previous implementation computed the STFT of every window frame by frame in complex128 and
+its spectral flux column by column, it's kept here as the reference. The windows of the stream
+overlap, _SpectralFlux only computes the frames past the previous window.
+
+usage: python -m tests.benchmarks.bench_speaking_rate [--seconds 30] [--sample-rate 24000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from livekit.agents.voice.transcription._speaking_rate import _SpectralFlux
+
+WINDOW_DURATION = 1.0
+STEP_SIZE = 0.1
+
+
+def _legacy_stft(audio: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    num_frames = (len(audio) - frame_length) // hop_length + 1
+    result = np.zeros((frame_length // 2 + 1, num_frames), dtype=np.complex128)
+
+    window = np.hanning(frame_length)
+    scale_factor = 1.0 / np.sqrt(np.sum(window**2))
+    for i in range(num_frames):
+        start = i * hop_length
+        frame = audio[start : start + frame_length]
+        result[:, i] = np.fft.rfft(frame * window) * scale_factor
+
+    return result
+
+
+def _legacy_spectral_flux(audio: np.ndarray, sample_rate: int) -> float:
+    frame_length = int(sample_rate * 0.025)
+    hop_length = frame_length // 2
+
+    spectral_magnitudes = np.abs(_legacy_stft(audio, frame_length, hop_length))
+    spectral_flux_values = []
+    for i in range(1, spectral_magnitudes.shape[1]):
+        flux = np.sum(np.abs(spectral_magnitudes[:, i] - spectral_magnitudes[:, i - 1]))
+        spectral_flux_values.append(flux)
+
+    if not spectral_flux_values:
+        return 0.0
+    return float(np.mean(spectral_flux_values))
+
+
+def _speech_like(seconds: float, sample_rate: int, rng: np.random.Generator) -> np.ndarray:
+    # noise modulated at a syllable rate, with a drifting pitch
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t + rng.uniform(0, np.pi))
+    pitch = np.sin(2 * np.pi * (120 + 30 * np.sin(2 * np.pi * 0.3 * t)) * t)
+    audio = envelope * (0.3 * pitch + 0.1 * rng.standard_normal(len(t)))
+    return audio.astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=30.0, help="seconds of audio")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    args = parser.parse_args()
+
+    sample_rate = args.sample_rate
+    audio = _speech_like(args.seconds, sample_rate, np.random.default_rng(0))
+    window_size = int(WINDOW_DURATION * sample_rate)
+    step_size = int(STEP_SIZE * sample_rate)
+    offsets = range(0, len(audio) - window_size + 1, step_size)
+
+    start = time.perf_counter()
+    expected = [_legacy_spectral_flux(audio[o : o + window_size], sample_rate) for o in offsets]
+    legacy = time.perf_counter() - start
+
+    results: dict[str, float] = {}
+    for name, incremental in (("batched", False), ("incremental", True)):
+        spectral_flux = _SpectralFlux(sample_rate)
+        start = time.perf_counter()
+        values = []
+        for o in offsets:
+            if not incremental:
+                spectral_flux.reset()
+            values.append(spectral_flux.compute(audio[o : o + window_size], o))
+        results[name] = time.perf_counter() - start
+        np.testing.assert_allclose(values, expected, rtol=1e-4)
+
+    print(f"{len(offsets)} windows of {WINDOW_DURATION}s every {STEP_SIZE}s at {sample_rate}Hz")
+    print(f"{'impl':>12} {'ms per s of audio':>18} {'speedup':>8}")
+    print(f"{'legacy':>12} {legacy * 1000 / args.seconds:>18.2f} {1:>7.1f}x")
+    for name, elapsed in results.items():
+        print(f"{name:>12} {elapsed * 1000 / args.seconds:>18.2f} {legacy / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
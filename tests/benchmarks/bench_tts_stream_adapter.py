@@ -0,0 +1,96 @@
+"""Playout gaps of a reply streamed through tts.StreamAdapter, with and without lookahead.
+
+The wrapped TTS is a local fake answering each sentence after a configurable latency, and
+completing its request after the request duration. The audio is played out in real time as it's
+received, any time the player runs out of audio between sentences is counted as a gap.
+
+usage: python -m tests.benchmarks.bench_tts_stream_adapter [--latency 0.5] [--lookahead 0 1 2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from livekit.agents import tts
+
+from ..fake_tts import FakeTTS, FakeTTSResponse
+
+
+def _sentences(num_sentences: int) -> list[str]:
+    return [
+        f"This is sentence number {i} of the reply, long enough to be spoken alone."
+        for i in range(num_sentences)
+    ]
+
+
+async def _bench(
+    sentences: list[str],
+    latency: float,
+    request_duration: float,
+    audio_duration: float,
+    lookahead: int,
+) -> dict[str, float]:
+    fake_tts = FakeTTS(
+        fake_responses=[
+            FakeTTSResponse(
+                input=sentence,
+                audio_duration=audio_duration,
+                ttfb=latency,
+                duration=request_duration,
+            )
+            for sentence in sentences
+        ]
+    )
+    adapter = tts.StreamAdapter(tts=fake_tts, lookahead=lookahead)
+
+    start_time = time.perf_counter()
+    first_audio = 0.0
+    playout_end = 0.0  # when the player runs out of the audio received so far
+    gaps = 0.0
+    async with adapter.stream() as stream:
+        stream.push_text(" ".join(sentences))
+        stream.end_input()
+
+        async for ev in stream:
+            now = time.perf_counter() - start_time
+            if not first_audio:
+                first_audio = playout_end = now
+            elif now > playout_end:
+                gaps += now - playout_end
+                playout_end = now
+
+            playout_end += ev.frame.duration
+
+    return {
+        "first_audio": first_audio * 1000,
+        "gaps": gaps * 1000,
+        "total": playout_end,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="TTS latency per sentence")
+    parser.add_argument(
+        "--request-duration", type=float, default=1.5, help="from the text to the last audio"
+    )
+    parser.add_argument("--audio-duration", type=float, default=1.0, help="audio per sentence")
+    parser.add_argument("--lookahead", type=int, nargs="+", default=[0, 1, 2])
+    args = parser.parse_args()
+
+    sentences = _sentences(args.sentences)
+    print(f"{'lookahead':>9} {'first audio ms':>15} {'gaps ms':>9} {'playout s':>10}")
+    for lookahead in args.lookahead:
+        res = asyncio.run(
+            _bench(sentences, args.latency, args.request_duration, args.audio_duration, lookahead)
+        )
+        print(
+            f"{lookahead:>9} {res['first_audio']:>15.1f} {res['gaps']:>9.1f} {res['total']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
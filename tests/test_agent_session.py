@@ -20,6 +20,7 @@ from livekit.agents import (
 )
 from livekit.agents.llm import FunctionToolCall
 from livekit.agents.llm.chat_context import ChatContext, ChatMessage
+from livekit.agents.metrics import TurnLatency, TurnLatencyCollector
 from livekit.agents.voice.events import FunctionToolsExecutedEvent
 from livekit.agents.voice.io import PlaybackFinishedEvent
 from livekit.agents.voice.transcription.synchronizer import (
@@ -491,6 +492,103 @@ async def test_generate_reply() -> None:
     assert agent.chat_ctx.items[6].text_content == "Goodbye! have a nice day!"
 
 
+async def test_preemptive_generation() -> None:
+    speed = 5.0
+    actions = FakeActions()
+    # final transcript at 2.7s, end of turn at 2.5+2.0=4.5s
+    actions.add_user_speech(0.5, 2.5, "Hello, how are you?", stt_delay=0.2)
+    actions.add_llm("I'm doing well, thank you!", ttft=1.0, duration=1.2)
+    actions.add_tts(2.0, ttfb=0.2)
+
+    session = create_session(
+        actions,
+        speed_factor=speed,
+        extra_kwargs={"preemptive_generation": True, "min_endpointing_delay": 2.0 / speed},
+    )
+    agent = MyAgent()
+
+    agent_state_events: list[AgentStateChangedEvent] = []
+    metrics_events: list[MetricsCollectedEvent] = []
+    session.on("agent_state_changed", agent_state_events.append)
+    session.on("metrics_collected", metrics_events.append)
+
+    t_origin = await asyncio.wait_for(run_session(session, agent), timeout=SESSION_TIMEOUT)
+
+    # the llm output was ready at 3.7s, the tts starts at the end of turn
+    assert [ev.new_state for ev in agent_state_events] == [
+        "listening",
+        "thinking",
+        "speaking",
+        "listening",
+    ]
+    check_timestamp(agent_state_events[1].created_at - t_origin, 4.5, speed_factor=speed)
+    check_timestamp(agent_state_events[2].created_at - t_origin, 4.7, speed_factor=speed)
+
+    eou_metrics = [ev.metrics for ev in metrics_events if ev.metrics.type == "eou_metrics"]
+    assert len(eou_metrics) == 1
+    assert eou_metrics[0].preemptive_hit is True
+    assert eou_metrics[0].preemptive_tts is False
+    check_timestamp(eou_metrics[0].preemptive_lead_time, 1.8, speed_factor=speed)
+
+    # only the llm ttft was saved, the tts ttfb is still paid after the end of turn
+    turns: list[TurnLatency] = []
+    collector = TurnLatencyCollector(on_turn=turns.append)
+    for ev in metrics_events:
+        collector(ev.metrics)
+    assert len(turns) == 1
+    assert turns[0].saved_latency == turns[0].llm_ttft
+    assert turns[0].saved_latency < eou_metrics[0].preemptive_lead_time
+
+    chat_ctx_items = agent.chat_ctx.items
+    assert [item.type for item in chat_ctx_items] == ["message"] * 3
+    assert chat_ctx_items[1].text_content == "Hello, how are you?"
+    assert chat_ctx_items[2].text_content == "I'm doing well, thank you!"
+
+
+async def test_preemptive_generation_discarded() -> None:
+    class _RagAgent(MyAgent):
+        async def on_user_turn_completed(
+            self, turn_ctx: ChatContext, new_message: ChatMessage
+        ) -> None:
+            turn_ctx.add_message(
+                role="assistant", content="retrieved context", created_at=new_message.created_at
+            )
+
+    speed = 5.0
+    actions = FakeActions()
+    actions.add_user_speech(0.5, 2.5, "Hello, how are you?", stt_delay=0.2)
+    actions.add_llm("I'm doing well, thank you!", ttft=1.0, duration=1.2)
+    actions.add_tts(2.0, ttfb=0.2)
+
+    session = create_session(
+        actions,
+        speed_factor=speed,
+        extra_kwargs={"preemptive_generation": True, "min_endpointing_delay": 2.0 / speed},
+    )
+    agent = _RagAgent()
+
+    agent_state_events: list[AgentStateChangedEvent] = []
+    metrics_events: list[MetricsCollectedEvent] = []
+    session.on("agent_state_changed", agent_state_events.append)
+    session.on("metrics_collected", metrics_events.append)
+
+    t_origin = await asyncio.wait_for(run_session(session, agent), timeout=SESSION_TIMEOUT)
+
+    # the chat context changed, the reply is generated again after the end of turn
+    assert agent_state_events[2].new_state == "speaking"
+    check_timestamp(agent_state_events[2].created_at - t_origin, 5.7, speed_factor=speed)
+
+    eou_metrics = [ev.metrics for ev in metrics_events if ev.metrics.type == "eou_metrics"]
+    assert eou_metrics[0].preemptive_hit is False
+    assert eou_metrics[0].preemptive_lead_time == 0.0
+
+    # the discarded generation didn't add anything to the chat context
+    assert [item.text_content for item in agent.chat_ctx.items[1:]] == [  # type: ignore
+        "Hello, how are you?",
+        "I'm doing well, thank you!",
+    ]
+
+
 # helpers
 
 
@@ -505,6 +603,12 @@ def create_session(
     tts_responses = actions.get_tts_responses(speed_factor=speed_factor)
 
     stt = FakeSTT(fake_user_speeches=user_speeches)
+    session_kwargs: dict[str, Any] = {
+        "min_interruption_duration": 0.5 / speed_factor,
+        "min_endpointing_delay": 0.5 / speed_factor,
+        "max_endpointing_delay": 6.0 / speed_factor,
+        **(extra_kwargs or {}),
+    }
     session = AgentSession(
         vad=FakeVAD(
             fake_user_speeches=user_speeches,
@@ -514,10 +618,7 @@ def create_session(
         stt=stt,
         llm=FakeLLM(fake_responses=llm_responses),
         tts=FakeTTS(fake_responses=tts_responses),
-        min_interruption_duration=0.5 / speed_factor,
-        min_endpointing_delay=0.5 / speed_factor,
-        max_endpointing_delay=6.0 / speed_factor,
-        **(extra_kwargs or {}),
+        **session_kwargs,
     )
 
     # setup io with transcription sync
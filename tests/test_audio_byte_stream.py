@@ -0,0 +1,60 @@
+import random
+
+from livekit.agents.utils.audio import AudioByteStream
+
+
+def _random_pcm(num_bytes: int) -> bytes:
+    rng = random.Random(0)
+    return bytes(rng.getrandbits(8) for _ in range(num_bytes))
+
+
+def test_audio_byte_stream_chunking():
+    for num_channels in (1, 2):
+        bytes_per_sample = 2 * num_channels
+        data = _random_pcm(48000 * bytes_per_sample)
+        bstream = AudioByteStream(24000, num_channels, samples_per_channel=240)
+
+        rng = random.Random(1)
+        output = bytearray()
+        i = 0
+        while i < len(data):
+            size = rng.randint(1, 3000) * 2
+            chunk = data[i : i + size]
+            for frame in bstream.push(chunk if rng.random() < 0.5 else bytearray(chunk)):
+                assert frame.samples_per_channel == 240
+                assert frame.num_channels == num_channels
+                output += bytes(frame.data)
+            i += size
+
+        for frame in bstream.flush():
+            output += bytes(frame.data)
+
+        assert bytes(output) == data
+
+
+def test_audio_byte_stream_mutable_input():
+    bstream = AudioByteStream(16000, 1, samples_per_channel=160)
+    buf = bytearray(b"\x01\x00" * 480)
+    frames = bstream.push(buf)
+    buf[:] = b"\x00" * len(buf)
+
+    assert len(frames) == 3
+    assert all(bytes(frame.data) == b"\x01\x00" * 160 for frame in frames)
+
+
+def test_audio_byte_stream_single_frame():
+    bstream = AudioByteStream(16000, 1, samples_per_channel=160)
+    data = b"\x01\x00" * 160
+
+    # a bytes object holding exactly one frame isn't copied
+    (frame,) = bstream.push(data)
+    assert frame.data.obj is data
+
+
+def test_audio_byte_stream_flush():
+    bstream = AudioByteStream(16000, 1, samples_per_channel=160)
+    assert bstream.push(b"\x00" * 100) == []
+    frames = bstream.flush()
+    assert len(frames) == 1
+    assert frames[0].samples_per_channel == 50
+    assert bstream.flush() == []
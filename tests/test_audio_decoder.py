@@ -1,13 +1,19 @@
+import asyncio
+import io
 import os
 import threading
 import time
+import wave
 from concurrent.futures import ThreadPoolExecutor
 
 import aiohttp
+import av
+import numpy as np
 import pytest
 
 from livekit.agents.stt import SpeechEventType
-from livekit.agents.utils.codecs import AudioStreamDecoder, StreamBuffer
+from livekit.agents.utils.audio import audio_frames_from_file
+from livekit.agents.utils.codecs import AudioStreamDecoder, DecoderScheduler, StreamBuffer
 from livekit.plugins import deepgram
 
 from .utils import wer
@@ -150,3 +156,167 @@ def test_stream_buffer_early_close():
 
     # Reading from closed buffer should return empty bytes
     assert buffer.read() == b""
+
+
+def test_stream_buffer_readinto():
+    buffer = StreamBuffer()
+    buffer.write(b"hello")
+    buffer.write(bytearray(b"world"))
+    buffer.end_input()
+
+    out = bytearray(7)
+    assert buffer.readinto(out) == 7
+    assert out == b"hellowo"
+    assert buffer.read() == b"rld"
+    assert buffer.readinto(out) == 0
+
+
+def test_stream_buffer_many_small_reads():
+    buffer = StreamBuffer()
+    data = os.urandom(256 * 1024)
+    for i in range(0, len(data), 4096):
+        buffer.write(data[i : i + 4096])
+    buffer.end_input()
+
+    received = bytearray()
+    while chunk := buffer.read(256):
+        assert len(chunk) <= 256
+        received.extend(chunk)
+
+    assert bytes(received) == data
+
+
+def _make_wav(duration: float, sample_rate: int = 24000) -> bytes:
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(os.urandom(int(duration * sample_rate) * 2))
+    return out.getvalue()
+
+
+def _make_mp3(duration: float, sample_rate: int = 24000) -> bytes:
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    pcm = (0.3 * np.sin(2 * np.pi * 440 * t) * 32767).astype(np.int16)
+    out = io.BytesIO()
+    with av.open(out, mode="w", format="mp3") as container:
+        stream = container.add_stream("libmp3lame", rate=sample_rate, layout="mono")
+        for i in range(0, len(pcm), 1152):
+            frame = av.AudioFrame.from_ndarray(pcm[None, i : i + 1152], format="s16", layout="mono")
+            frame.sample_rate = sample_rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return out.getvalue()
+
+
+async def test_decoder_scheduler_multiplexes_streams():
+    scheduler = DecoderScheduler.shared()
+    previous_workers = scheduler.max_workers
+    DecoderScheduler.configure(max_workers=2)
+    try:
+        wav = _make_wav(1.0)
+
+        async def _decode_stream() -> tuple[int, float | None]:
+            decoder = AudioStreamDecoder(sample_rate=24000, num_channels=1, format="audio/wav")
+
+            async def _push() -> None:
+                for i in range(0, len(wav), 4096):
+                    decoder.push(wav[i : i + 4096])
+                    await asyncio.sleep(0.001)
+                decoder.end_input()
+
+            push_task = asyncio.create_task(_push())
+            samples = 0
+            async for frame in decoder:
+                samples += frame.samples_per_channel
+
+            await push_task
+            await decoder.aclose()
+            return samples, decoder.time_to_first_frame
+
+        # more streams than workers, none of them should wait for another one to finish
+        results = await asyncio.gather(*(_decode_stream() for _ in range(8)))
+        for samples, ttff in results:
+            assert samples == 24000
+            assert ttff is not None and ttff < 0.5
+
+        stats = scheduler.stats()
+        assert stats.max_workers == 2
+        assert stats.active_streams == 0
+        assert stats.queue_depth == 0
+        assert stats.avg_time_to_first_frame > 0
+    finally:
+        DecoderScheduler.configure(max_workers=previous_workers)
+
+
+async def test_decoder_backpressure():
+    decoder = AudioStreamDecoder(
+        sample_rate=24000, num_channels=1, format="audio/wav", max_buffered_frames=8
+    )
+    decoder.push(_make_wav(2.0))
+    decoder.end_input()
+
+    # nothing is consumed, the decoder must pause once its output is full
+    await asyncio.sleep(0.2)
+    assert decoder._pending_frames <= 8
+    assert decoder._output_ch.qsize() <= 8
+
+    samples = 0
+    async for frame in decoder:
+        samples += frame.samples_per_channel
+
+    assert samples == 48000
+    await decoder.aclose()
+
+
+async def test_decoder_starved_stream_releases_worker():
+    scheduler = DecoderScheduler.shared()
+    previous_workers = scheduler.max_workers
+    DecoderScheduler.configure(max_workers=2)
+    mp3 = _make_mp3(2.0)
+
+    # the demuxer of these streams needs more than what is buffered, their slices block on read
+    starved = [AudioStreamDecoder(format="audio/mpeg") for _ in range(2)]
+    decoder = AudioStreamDecoder(format="audio/mpeg")
+    try:
+        for i, d in enumerate(starved):
+            d.push(mp3[: 1024 + i * 76])
+        await asyncio.sleep(0.2)
+
+        decoder.push(mp3)
+        decoder.end_input()
+        await asyncio.wait_for(decoder.__anext__(), 1.0)
+        assert scheduler.stats().waiting_streams == 2
+    finally:
+        for d in [*starved, decoder]:
+            await d.aclose()
+        DecoderScheduler.configure(max_workers=previous_workers)
+
+    assert scheduler.stats().waiting_streams == 0
+
+
+async def test_audio_frames_from_file_closed_early(tmp_path):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(_make_wav(2.0))
+
+    scheduler = DecoderScheduler.shared()
+    previous_workers = scheduler.max_workers
+    DecoderScheduler.configure(max_workers=2)
+    try:
+        # a stream stopped before its end must not keep a worker
+        for _ in range(5):
+            frames = audio_frames_from_file(str(path), sample_rate=24000)
+            await asyncio.wait_for(frames.__anext__(), 1.0)
+            await frames.aclose()
+
+        samples = 0
+        async for frame in audio_frames_from_file(str(path), sample_rate=24000):
+            samples += frame.samples_per_channel
+
+        assert samples > 0
+        assert scheduler.stats().active_streams == 0
+    finally:
+        DecoderScheduler.configure(max_workers=previous_workers)
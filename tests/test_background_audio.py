@@ -0,0 +1,87 @@
+import subprocess
+import sys
+import textwrap
+import wave
+
+import numpy as np
+import pytest
+
+from livekit import rtc
+from livekit.agents.utils.codecs import DecoderScheduler
+from livekit.agents.voice import background_audio
+
+
+def _write_wav(path: str, seconds: float, sample_rate: int = 24000) -> None:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+
+async def _pcm(frames) -> bytes:
+    return b"".join([bytes(frame.data.cast("B")) async for frame in frames])
+
+
+@pytest.mark.asyncio
+async def test_clip_cache(tmp_path):
+    file_path = str(tmp_path / "clip.wav")
+    _write_wav(file_path, seconds=2.5)
+
+    cache = background_audio._ClipCache(max_bytes=16 * 1024 * 1024)
+    decoded = await _pcm(background_audio.audio_frames_from_file(file_path))
+
+    assert len(decoded) > 2 * 48000 * 2
+    assert await _pcm(cache.frames(file_path)) == decoded
+    assert len(cache._clips) == 1
+
+    frames = [frame async for frame in cache.frames(file_path)]
+    assert all(frame.samples_per_channel == 4800 for frame in frames[:-1])
+    assert b"".join(bytes(frame.data.cast("B")) for frame in frames) == decoded
+
+    # a clip stopped before its end isn't cached, neither are clips above the limit
+    small_cache = background_audio._ClipCache(max_bytes=len(decoded) - 1)
+    gen = small_cache.frames(file_path)
+    await gen.__anext__()
+    await gen.aclose()
+    # and its decoder is released
+    assert DecoderScheduler.shared().stats().active_streams == 0
+    assert await _pcm(small_cache.frames(file_path)) == decoded
+    assert not small_cache._clips
+
+
+def test_clip_cache_stopped_clips_exit(tmp_path):
+    file_path = str(tmp_path / "clip.wav")
+    _write_wav(file_path, seconds=2.5)
+
+    # the thinking sound is stopped on every reply, more times than there are decoder workers
+    script = textwrap.dedent(
+        f"""
+        import asyncio
+        from livekit.agents.utils.codecs import DecoderScheduler
+        from livekit.agents.voice import background_audio
+
+        async def main():
+            DecoderScheduler.configure(max_workers=2)
+            cache = background_audio._ClipCache(max_bytes=1024)
+            for _ in range(8):
+                gen = cache.frames({file_path!r})
+                await asyncio.wait_for(gen.__anext__(), 5)
+                await gen.aclose()
+
+        asyncio.run(main())
+        """
+    )
+    proc = subprocess.run([sys.executable, "-c", script], timeout=60, capture_output=True)
+    assert proc.returncode == 0, proc.stderr.decode()
+
+
+def test_gain_table():
+    samples = np.array([-32768, -20000, -1, 0, 1, 12345, 32767], dtype=np.int16)
+    frame = rtc.AudioFrame(samples.tobytes(), 48000, 1, len(samples))
+    for volume in (0.0, 0.3, 1.0, 1.5):
+        expected = np.clip(samples.astype(np.float64) * volume, -32768, 32767).astype(np.int16)
+        out = background_audio._apply_gain(frame, background_audio._gain_table(volume))
+        assert np.array_equal(np.frombuffer(out.data, dtype=np.int16), expected)
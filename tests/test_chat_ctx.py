@@ -48,3 +48,62 @@ def test_dict():
     print(chat_ctx.items)
 
     print(ChatContext.from_dict(chat_ctx.to_dict()).items)
+
+
+def _apply_diff(ids: list[str], diff_ops: utils.DiffOps) -> list[str]:
+    ids = [item_id for item_id in ids if item_id not in diff_ops.to_remove]
+    for previous_id, item_id in diff_ops.to_create:
+        ids.insert(0 if previous_id is None else ids.index(previous_id) + 1, item_id)
+    return ids
+
+
+def _lcs_len(a: list[str], b: list[str]) -> int:
+    row = [0] * (len(b) + 1)
+    for x in a:
+        diag = 0
+        for j, y in enumerate(b):
+            diag, row[j + 1] = row[j + 1], diag + 1 if x == y else max(row[j], row[j + 1])
+    return row[-1]
+
+
+def test_chat_ctx_diff():
+    import random
+
+    from livekit.agents.llm import ChatContext
+
+    rng = random.Random(0)
+    messages = {
+        f"item_{i}": ChatContext().add_message(role="user", content=str(i), id=f"item_{i}")
+        for i in range(40)
+    }
+    for _ in range(200):
+        old_ids = rng.sample(list(messages), rng.randint(0, 20))
+        new_ids = list(old_ids)
+        for _ in range(rng.randint(0, 4)):
+            if new_ids and rng.random() < 0.5:
+                new_ids.pop(rng.randrange(len(new_ids)))
+            else:
+                unused = [item_id for item_id in messages if item_id not in new_ids]
+                new_ids.insert(rng.randint(0, len(new_ids)), rng.choice(unused))
+
+        diff_ops = utils.compute_chat_ctx_diff(
+            ChatContext([messages[i] for i in old_ids]), ChatContext([messages[i] for i in new_ids])
+        )
+        assert _apply_diff(old_ids, diff_ops) == new_ids
+        # minimal: only the items outside of a longest common subsequence are recreated
+        assert len(old_ids) - len(diff_ops.to_remove) == _lcs_len(old_ids, new_ids)
+        assert len(new_ids) - len(diff_ops.to_create) == _lcs_len(old_ids, new_ids)
+        assert not diff_ops.to_update
+
+    # items kept whose content changed are updated
+    old_ctx = ChatContext()
+    old_ctx.add_message(role="system", content="You are a helpful assistant.", id="instructions")
+    old_ctx.add_message(role="user", content="What's the price of AAPL?", id="question")
+    new_ctx = old_ctx.copy()
+    new_ctx.items[0] = new_ctx.items[0].model_copy(update={"content": ["Be concise."]})
+    new_ctx.add_message(role="assistant", content="$200", id="answer")
+
+    diff_ops = utils.compute_chat_ctx_diff(old_ctx, new_ctx)
+    assert diff_ops.to_remove == []
+    assert diff_ops.to_create == [("question", "answer")]
+    assert diff_ops.to_update == [(None, "instructions")]
@@ -3,8 +3,10 @@ from __future__ import annotations
 import asyncio
 import ctypes
 import io
+import logging
 import multiprocessing as mp
 import socket
+import sys
 import time
 import uuid
 from dataclasses import dataclass
@@ -12,8 +14,12 @@ from multiprocessing.context import BaseContext
 from typing import ClassVar
 
 import psutil
+import pytest
 
 from livekit.agents import JobContext, JobProcess, ipc, job, utils
+from livekit.agents.inference_runner import _InferenceRunner
+from livekit.agents.ipc.inference_proc_lazy_main import _RunnerDispatcher
+from livekit.agents.ipc.log_queue import LogQueueHandler, LogQueueListener
 from livekit.protocol import agent
 
 
@@ -391,3 +397,457 @@ async def test_job_graceful_shutdown():
     assert proc.exitcode == 0, "process should have exited cleanly"
     assert not proc.killed
     assert start_args.shutdown_counter.value == 1
+
+
+class _BatchEchoRunner(_InferenceRunner):
+    INFERENCE_METHOD = "test_batch_echo"
+    MAX_BATCH_SIZE = 4
+    BATCH_WINDOW = 0.05
+
+    def __init__(self) -> None:
+        self.batch_sizes: list[int] = []
+
+    def initialize(self) -> None:
+        pass
+
+    def run(self, data: bytes) -> bytes | None:
+        return data[::-1]
+
+    def run_batch(self, data: list[bytes]) -> list[bytes | None | Exception]:
+        self.batch_sizes.append(len(data))
+        return [self.run(d) if d else ValueError("empty request") for d in data]
+
+
+async def test_inference_batch_scheduler():
+    runner = _BatchEchoRunner()
+    responses: dict[str, ipc.proto.InferenceResponse] = {}
+
+    async def _send(resp: ipc.proto.InferenceResponse) -> None:
+        responses[resp.request_id] = resp
+
+    dispatcher = _RunnerDispatcher(runner, send_fnc=_send)
+    for i in range(6):
+        dispatcher.push(
+            ipc.proto.InferenceRequest(
+                method=_BatchEchoRunner.INFERENCE_METHOD,
+                request_id=f"req_{i}",
+                data=f"data_{i}".encode(),
+            )
+        )
+
+    await asyncio.sleep(0.2)
+    await dispatcher.aclose()
+
+    assert runner.batch_sizes == [4, 2]
+    assert dispatcher.stats.batch_count == 2
+    assert dispatcher.stats.request_count == 6
+    assert dispatcher.stats.max_batch_size == 4
+    for i in range(6):
+        assert responses[f"req_{i}"].data == f"data_{i}".encode()[::-1]
+
+
+async def test_inference_batch_request_error():
+    runner = _BatchEchoRunner()
+    responses: dict[str, ipc.proto.InferenceResponse] = {}
+
+    async def _send(resp: ipc.proto.InferenceResponse) -> None:
+        responses[resp.request_id] = resp
+
+    dispatcher = _RunnerDispatcher(runner, send_fnc=_send)
+    for i, data in enumerate([b"data_0", b"", b"data_2"]):
+        dispatcher.push(
+            ipc.proto.InferenceRequest(
+                method=_BatchEchoRunner.INFERENCE_METHOD, request_id=f"req_{i}", data=data
+            )
+        )
+
+    await asyncio.sleep(0.2)
+    await dispatcher.aclose()
+
+    # only the invalid request failed, the others of its batch got their result
+    assert runner.batch_sizes == [3]
+    assert responses["req_1"].error == "empty request"
+    assert responses["req_0"].data == b"0_atad"
+    assert responses["req_2"].data == b"2_atad"
+
+
+class _SlowRunner(_InferenceRunner):
+    INFERENCE_METHOD = "test_slow"
+    MAX_CONCURRENCY = 2
+
+    def initialize(self) -> None:
+        pass
+
+    def run(self, data: bytes) -> bytes | None:
+        time.sleep(0.3)
+        return data
+
+
+class _FastRunner(_InferenceRunner):
+    INFERENCE_METHOD = "test_fast"
+
+    def initialize(self) -> None:
+        pass
+
+    def run(self, data: bytes) -> bytes | None:
+        return data
+
+
+async def test_inference_dispatcher_concurrency():
+    done_times: dict[str, float] = {}
+    responses: dict[str, ipc.proto.InferenceResponse] = {}
+
+    async def _send(resp: ipc.proto.InferenceResponse) -> None:
+        done_times[resp.request_id] = time.perf_counter()
+        responses[resp.request_id] = resp
+
+    slow = _RunnerDispatcher(_SlowRunner(), send_fnc=_send)
+    fast = _RunnerDispatcher(_FastRunner(), send_fnc=_send)
+
+    start = time.perf_counter()
+    for i in range(3):
+        slow.push(ipc.proto.InferenceRequest(method="test_slow", request_id=f"slow_{i}"))
+    fast.push(ipc.proto.InferenceRequest(method="test_fast", request_id="fast"))
+    # the caller of this request already gave up
+    slow.push(
+        ipc.proto.InferenceRequest(
+            method="test_slow", request_id="expired", deadline=time.time() + 0.1
+        )
+    )
+
+    await asyncio.sleep(1.0)
+    await slow.aclose()
+    await fast.aclose()
+
+    # a slow runner doesn't delay the other runners
+    assert done_times["fast"] - start < 0.1
+    # two slow requests run concurrently, the third one waits for a free slot
+    assert done_times["slow_1"] - start < 0.45
+    assert done_times["slow_2"] - start > 0.55
+
+    assert responses["expired"].error == "deadline exceeded"
+    assert slow.stats.expired_count == 1
+    assert slow.stats.request_count == 3
+
+
+def _forward_logs(
+    emit: list[logging.LogRecord], **handler_kwargs
+) -> tuple[list[logging.LogRecord], LogQueueListener]:
+    pch, cch = socket.socketpair()
+    received: list[logging.LogRecord] = []
+
+    def _prepare(record: logging.LogRecord) -> None:
+        received.append(record)
+
+    listener = LogQueueListener(utils.aio.duplex_unix._Duplex.open(pch), _prepare)
+    listener.start()
+
+    handler = LogQueueHandler(utils.aio.duplex_unix._Duplex.open(cch), **handler_kwargs)
+    for record in emit:
+        handler.handle(record)
+    handler.close()
+    handler._send_thread.join()
+
+    # the forwarder closed its end, the listener stops after reading everything
+    listener._thread.join(timeout=5)
+    listener.stop()
+    return received, listener
+
+
+def test_log_queue_forwarding():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        exc_record = logging.makeLogRecord(
+            {"name": "test.logs", "levelno": logging.ERROR, "levelname": "ERROR", "msg": "failed"}
+        )
+        exc_record.exc_info = sys.exc_info()
+
+    records = [
+        logging.LogRecord("test.logs", logging.INFO, __file__, 10, "hello %s", ("world",), None),
+        exc_record,
+    ]
+    records[0].user_data = {"id": 42, "tags": ["a", "b"]}
+    records[0].conn = object()  # not serializable, sent as str
+    records[0].websocket = object()  # skipped
+
+    received, listener = _forward_logs(records)
+
+    assert len(received) == 2
+    assert received[0].getMessage() == "hello world"
+    assert received[0].name == "test.logs"
+    assert received[0].levelno == logging.INFO
+    assert received[0].lineno == 10
+    assert received[0].created == records[0].created
+    assert received[0].user_data == {"id": 42, "tags": ["a", "b"]}
+    assert isinstance(received[0].conn, str)
+    assert not hasattr(received[0], "websocket")
+    assert received[1].getMessage().startswith("failed")
+    assert "ValueError: boom" in received[1].getMessage()
+    assert listener.dropped_records == 0
+
+
+def test_log_queue_rate_limit():
+    records = [
+        logging.LogRecord("test.logs", logging.DEBUG, __file__, 1, f"msg {i}", None, None)
+        for i in range(50)
+    ]
+    records.append(logging.LogRecord("test.logs", logging.WARNING, __file__, 1, "warn", None, None))
+
+    received, listener = _forward_logs(records, max_records_per_second=10)
+
+    # the burst allows 10 debug records, warnings are never dropped
+    messages = [r.getMessage() for r in received if r.name == "test.logs"]
+    assert messages[-1] == "warn"
+    assert 10 <= len(messages) - 1 < 50
+    assert listener.dropped_records == 50 - (len(messages) - 1)
+    assert any(getattr(r, "dropped_records", 0) for r in received)
+
+
+def test_message_codec_roundtrip():
+    messages = [
+        ipc.proto.InitializeRequest(
+            asyncio_debug=True,
+            ping_interval=2.5,
+            ping_timeout=60,
+            high_ping_threshold=0.5,
+            http_proxy="http://proxy:8080",
+            audio_decoder_workers=4,
+            shm_name="psm_1234",
+            shm_ring_size=1 << 20,
+        ),
+        ipc.proto.InitializeResponse(error="ü error", shm_name="psm_1234"),
+        ipc.proto.PingRequest(timestamp=2**63),
+        ipc.proto.PongResponse(last_timestamp=1, timestamp=2),
+        ipc.proto.ShutdownRequest(reason="bye"),
+        ipc.proto.Exiting(reason=""),
+        ipc.proto.InferenceRequest(
+            method="lk_end_of_utterance", request_id="req_1", data=b"\x00" * 4096, deadline=1.5
+        ),
+        ipc.proto.InferenceResponse(request_id="req_1", data=b"result"),
+        ipc.proto.InferenceResponse(
+            request_id="req_3", shm_offset=2**40, shm_length=2048, shm_seq=7
+        ),
+        ipc.proto.InferenceResponse(request_id="req_2", data=None, error="deadline exceeded"),
+        ipc.proto.TracingRequest(request_id="trace_1"),
+    ]
+    for msg in messages:
+        data = ipc.channel._write_message(msg)
+        assert ipc.channel._read_message(data, ipc.proto.IPC_MESSAGES) == msg
+
+
+def test_message_codec_wire_format():
+    # the codec must produce the same bytes as writing the fields with the helpers
+    msg = ipc.proto.InferenceRequest(method="m", request_id="r", data=b"abc", deadline=3.25)
+    bio = io.BytesIO()
+    ipc.channel.write_int(bio, msg.MSG_ID)
+    ipc.channel.write_string(bio, msg.method)
+    ipc.channel.write_string(bio, msg.request_id)
+    ipc.channel.write_bytes(bio, msg.data)
+    ipc.channel.write_double(bio, msg.deadline)
+    ipc.channel.write_long(bio, msg.shm_offset)
+    ipc.channel.write_int(bio, msg.shm_length)
+    ipc.channel.write_long(bio, msg.shm_seq)
+    assert ipc.channel._write_message(msg) == bio.getvalue()
+
+    init = ipc.proto.InitializeRequest(
+        asyncio_debug=True, ping_interval=1.0, http_proxy="p", audio_decoder_workers=3
+    )
+    bio = io.BytesIO()
+    ipc.channel.write_int(bio, init.MSG_ID)
+    ipc.channel.write_bool(bio, init.asyncio_debug)
+    ipc.channel.write_float(bio, init.ping_interval)
+    ipc.channel.write_float(bio, init.ping_timeout)
+    ipc.channel.write_float(bio, init.high_ping_threshold)
+    ipc.channel.write_string(bio, init.http_proxy)
+    ipc.channel.write_int(bio, init.audio_decoder_workers)
+    ipc.channel.write_string(bio, init.shm_name)
+    ipc.channel.write_int(bio, init.shm_ring_size)
+    assert ipc.channel._write_message(init) == bio.getvalue()
+
+    resp = ipc.proto.InferenceResponse(request_id="r", data=None, error="e")
+    bio = io.BytesIO()
+    ipc.channel.write_int(bio, resp.MSG_ID)
+    ipc.channel.write_string(bio, resp.request_id)
+    ipc.channel.write_bool(bio, False)
+    ipc.channel.write_string(bio, resp.error)
+    ipc.channel.write_long(bio, resp.shm_offset)
+    ipc.channel.write_int(bio, resp.shm_length)
+    ipc.channel.write_long(bio, resp.shm_seq)
+    assert ipc.channel._write_message(resp) == bio.getvalue()
+
+
+def test_idle_pool_controller_arrivals():
+    controller = ipc.proc_pool.IdlePoolController(min_idle_processes=1, max_idle_processes=4)
+    assert controller.target_idle_processes(now=0.0) == 1
+
+    # a steady job every 2s with a 3s warm-up needs 2 idle processes
+    controller.record_warmup(3.0)
+    for i in range(300):
+        controller.record_arrival(now=i * 2.0)
+
+    now = 299 * 2.0
+    assert not controller.is_bursting(now=now)
+    assert abs(controller.arrival_rate(now=now) - 0.5) < 0.05
+    assert controller.target_idle_processes(now=now) == 2
+
+    # 10 jobs within a second is a burst, the short-term rate takes over and is bounded
+    for i in range(10):
+        controller.record_arrival(now=now + 1.0 + i * 0.1)
+
+    now += 2.0
+    assert controller.is_bursting(now=now)
+    assert controller.arrival_rate(now=now) > 1.0
+    assert controller.target_idle_processes(now=now) == 4
+
+    # the pool shrinks back to the minimum once the jobs stop
+    assert not controller.is_bursting(now=now + 60.0)
+    assert controller.target_idle_processes(now=now + 600.0) == 1
+
+
+def test_idle_pool_controller_memory_cap():
+    controller = ipc.proc_pool.IdlePoolController(
+        min_idle_processes=2, max_idle_processes=10, process_memory_mb=500
+    )
+    controller.record_warmup(10.0)
+    for i in range(20):
+        controller.record_arrival(now=i * 0.1)
+
+    assert controller.target_idle_processes(now=2.0) == 10
+    assert controller.target_idle_processes(now=2.0, available_memory_mb=1250) == 2
+    assert (
+        controller.target_idle_processes(idle_processes=3, available_memory_mb=1250, now=2.0) == 5
+    )
+    # the minimum is kept regardless of the memory
+    assert controller.target_idle_processes(idle_processes=0, available_memory_mb=0, now=2.0) == 2
+
+
+def test_shm_ring():
+    transport = ipc.shm_ring.ShmTransport.create(1024)
+    try:
+        writer = transport.requests
+        reader = ipc.shm_ring.ShmRing(transport._shm.buf[: ipc.shm_ring.ShmRing.buffer_size(1024)])
+
+        descs = [writer.write(bytes([i]) * 300) for i in range(3)]
+        assert all(desc is not None for desc in descs)
+        assert writer.write(b"x" * 300) is None  # full until the reader consumes
+
+        assert reader.read(*descs[0]) == bytes([0]) * 300
+        # doesn't fit before the end of the buffer, written at its beginning
+        desc = writer.write(b"y" * 300)
+        assert desc is not None and desc[0] == 1024
+
+        assert reader.read(*descs[1]) == bytes([1]) * 300
+        assert reader.read(*descs[2]) == bytes([2]) * 300
+        assert reader.read(*desc) == b"y" * 300
+        assert writer.write(b"z" * 1025) is None
+
+        with pytest.raises(RuntimeError):
+            reader.read(0, 300, 42)
+
+        reader.release()
+    finally:
+        transport.close()
+
+
+class _ReverseRunner(_InferenceRunner):
+    INFERENCE_METHOD = "test_reverse"
+
+    def initialize(self) -> None:
+        pass
+
+    def run(self, data: bytes) -> bytes | None:
+        return data[::-1]
+
+
+async def test_inference_proc_shared_memory():
+    inf_executor = ipc.inference_proc_executor.InferenceProcExecutor(
+        runners={_ReverseRunner.INFERENCE_METHOD: _ReverseRunner},
+        initialize_timeout=20,
+        close_timeout=5,
+        memory_warn_mb=0,
+        memory_limit_mb=0,
+        ping_interval=5,
+        ping_timeout=60,
+        high_ping_threshold=2.5,
+        mp_ctx=mp.get_context("spawn"),
+        loop=asyncio.get_running_loop(),
+        http_proxy=None,
+        shm_ring_size=64 * 1024,
+    )
+    await inf_executor.start()
+    await inf_executor.initialize()
+    assert inf_executor._shm_accepted
+
+    # small payloads are inline, the others go through the rings (and wrap around them)
+    payloads = [b"small"] + [bytes([i % 256]) * (5000 + i) for i in range(100)]
+    for p in payloads:
+        assert await inf_executor.do_inference(_ReverseRunner.INFERENCE_METHOD, p) == p[::-1]
+
+    shm = inf_executor._shm
+    assert shm is not None and shm.requests._seq == 100 and shm.responses._seq == 100
+
+    # when the ring is full, the requests are sent inline
+    results = await asyncio.gather(
+        *(inf_executor.do_inference(_ReverseRunner.INFERENCE_METHOD, p) for p in payloads)
+    )
+    assert results == [p[::-1] for p in payloads]
+    assert 100 < shm.requests._seq < 200
+
+    await inf_executor.aclose()
+    assert inf_executor._shm is None
+
+
+class _ReverseExecutor:
+    async def do_inference(self, method: str, data: bytes, *, timeout: float | None = None):
+        return data[::-1]
+
+
+def _noop_initialize_proc(proc: JobProcess) -> None:
+    pass
+
+
+async def _inference_job_entrypoint(job_ctx: JobContext) -> None:
+    results = job_ctx.proc.user_arguments
+    payloads = [b"small"] + [bytes([i % 256]) * (5000 + i) for i in range(50)]
+    for p in payloads:
+        res = await job_ctx.inference_executor.do_inference(_ReverseRunner.INFERENCE_METHOD, p)
+        if res == p[::-1]:
+            with results.get_lock():
+                results.value += 1
+
+    job_ctx.shutdown("inference done")
+
+
+async def test_job_proc_shared_memory():
+    mp_ctx = mp.get_context("spawn")
+    results = mp_ctx.Value(ctypes.c_uint)
+    proc = ipc.job_proc_executor.ProcJobExecutor(
+        initialize_process_fnc=_noop_initialize_proc,
+        job_entrypoint_fnc=_inference_job_entrypoint,
+        inference_executor=_ReverseExecutor(),
+        initialize_timeout=20.0,
+        close_timeout=10.0,
+        memory_warn_mb=0,
+        memory_limit_mb=0,
+        ping_interval=2.5,
+        ping_timeout=10.0,
+        high_ping_threshold=1.0,
+        http_proxy=None,
+        mp_ctx=mp_ctx,
+        loop=asyncio.get_running_loop(),
+        shm_ring_size=64 * 1024,
+    )
+    proc.user_arguments = results
+    await proc.start()
+    await proc.initialize()
+    assert proc._shm_accepted
+    shm = proc._shm
+
+    await proc.launch_job(_generate_fake_job())
+    await asyncio.wait_for(proc.join(), timeout=20.0)
+
+    # the payloads of the job don't go through the socket to the worker, the small one is inline
+    assert results.value == 51
+    assert shm is not None and shm.requests._seq == 50 and shm.responses._seq == 50
+    assert proc._shm is None
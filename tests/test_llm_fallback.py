@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+
+from livekit.agents.llm import ChatContext, FallbackAdapter
+
+from .fake_llm import FakeLLM, FakeLLMResponse
+
+
+async def _generate(llm: FallbackAdapter, text: str) -> str:
+    chat_ctx = ChatContext.empty()
+    chat_ctx.add_message(role="user", content=text)
+
+    content = ""
+    async with llm.chat(chat_ctx=chat_ctx) as stream:
+        async for chunk in stream:
+            if chunk.delta and chunk.delta.content:
+                content += chunk.delta.content
+    return content
+
+
+async def test_llm_hedged_generate() -> None:
+    slow = FakeLLM(
+        fake_responses=[FakeLLMResponse(input="hello", content="slow", ttft=1.0, duration=1.0)]
+    )
+    fast = FakeLLM(
+        fake_responses=[FakeLLMResponse(input="hello", content="fast", ttft=0.05, duration=0.05)]
+    )
+
+    fallback_adapter = FallbackAdapter([slow, fast], hedge_after=0.1)
+    unavailable = []
+    fallback_adapter.on("llm_availability_changed", unavailable.append)
+
+    start_time = time.perf_counter()
+    assert await _generate(fallback_adapter, "hello") == "fast"
+    assert time.perf_counter() - start_time < 0.5
+
+    # the slow LLM was cancelled, not failed
+    assert not unavailable
+
+    for _ in range(5):
+        await _generate(fallback_adapter, "hello")
+
+    # the fast LLM is ranked first once it has enough samples
+    assert fallback_adapter._provider_order() == [1, 0]
+
+
+async def test_llm_without_hedging() -> None:
+    slow = FakeLLM(
+        fake_responses=[FakeLLMResponse(input="hello", content="slow", ttft=0.2, duration=0.2)]
+    )
+    fast = FakeLLM(
+        fake_responses=[FakeLLMResponse(input="hello", content="fast", ttft=0.0, duration=0.0)]
+    )
+
+    fallback_adapter = FallbackAdapter([slow, fast])
+    assert await _generate(fallback_adapter, "hello") == "slow"
+    assert fallback_adapter._provider_order() == [0, 1]
@@ -0,0 +1,41 @@
+import numpy as np
+
+from livekit.agents.voice.transcription._speaking_rate import _SpectralFlux
+
+SAMPLE_RATE = 16000
+
+
+def _spectral_flux(audio: np.ndarray) -> float:
+    frame_length = int(SAMPLE_RATE * 0.025)
+    hop_length = frame_length // 2
+    window = np.hanning(frame_length)
+    frames = [
+        audio[i : i + frame_length] * window
+        for i in range(0, len(audio) - frame_length + 1, hop_length)
+    ]
+    magnitudes = np.abs(np.fft.rfft(frames)) / np.sqrt(np.sum(window**2))
+    return float(np.mean(np.sum(np.abs(np.diff(magnitudes, axis=0)), axis=1)))
+
+
+def test_spectral_flux_overlapping_windows():
+    rng = np.random.default_rng(0)
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    audio = ((0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) * rng.standard_normal(len(t))).astype(
+        np.float32
+    )
+
+    window_size, step_size = SAMPLE_RATE, SAMPLE_RATE // 10
+    spectral_flux, unaligned = _SpectralFlux(SAMPLE_RATE), _SpectralFlux(SAMPLE_RATE)
+    for offset in range(0, len(audio) - window_size + 1, step_size):
+        window = audio[offset : offset + window_size]
+        expected = _spectral_flux(window)
+        assert np.isclose(spectral_flux.compute(window, offset), expected, rtol=1e-4)
+
+        # windows off the frame grid are computed from scratch
+        assert np.isclose(unaligned.compute(window, offset + 1), expected, rtol=1e-4)
+
+    # the shorter window flushed at the end of a segment
+    tail = audio[-window_size // 2 - 7 :]
+    spectral_flux.reset()
+    assert np.isclose(spectral_flux.compute(tail, 0), _spectral_flux(tail), rtol=1e-4)
+    assert spectral_flux.compute(audio[:400], 0) == 0.0
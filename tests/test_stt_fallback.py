@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import time
 
 import pytest
 
+from livekit import rtc
 from livekit.agents import APIConnectionError, utils
 from livekit.agents.stt import STT, AvailabilityChangedEvent, FallbackAdapter
 from livekit.agents.utils.aio.channel import ChanEmpty
 
-from .fake_stt import FakeSTT
+from .fake_stt import FakeSTT, FakeUserSpeech
 
 
 class FallbackAdapterTester(FallbackAdapter):
@@ -19,12 +21,14 @@ class FallbackAdapterTester(FallbackAdapter):
         attempt_timeout: float = 10.0,
         max_retry_per_stt: int = 1,
         retry_interval: float = 5,
+        hedge_after: float | None = None,
     ) -> None:
         super().__init__(
             stt,
             attempt_timeout=attempt_timeout,
             max_retry_per_stt=max_retry_per_stt,
             retry_interval=retry_interval,
+            hedge_after=hedge_after,
         )
 
         self.on("stt_availability_changed", self._on_stt_availability_changed)
@@ -134,3 +138,59 @@ async def test_stt_recover() -> None:
         fallback_adapter.availability_changed_ch(fake2).recv_nowait()
 
     await fallback_adapter.aclose()
+
+
+async def test_stt_hedged_recognize() -> None:
+    fake1 = FakeSTT(fake_transcript="slow", fake_timeout=1.0)
+    fake2 = FakeSTT(fake_transcript="fast")
+
+    fallback_adapter = FallbackAdapterTester([fake1, fake2], hedge_after=0.1)
+
+    start_time = time.perf_counter()
+    ev = await fallback_adapter.recognize([])
+    assert ev.alternatives[0].text == "fast"
+    assert time.perf_counter() - start_time < 0.5
+
+    assert fake1.recognize_ch.recv_nowait()
+    assert fake2.recognize_ch.recv_nowait()
+
+    # the slow STT was cancelled, not failed
+    with pytest.raises(ChanEmpty):
+        fallback_adapter.availability_changed_ch(fake1).recv_nowait()
+
+    for _ in range(5):
+        await fallback_adapter.recognize([])
+
+    # the fast STT is ranked first once it has enough samples
+    assert fallback_adapter._provider_order() == [1, 0]
+
+    await fallback_adapter.aclose()
+
+
+async def test_stt_stream_latency() -> None:
+    fake1 = FakeSTT(
+        fake_user_speeches=[
+            FakeUserSpeech(start_time=0.0, end_time=0.2, transcript="hello world", stt_delay=0.2)
+        ]
+    )
+    fake2 = FakeSTT(fake_transcript="hello world")
+
+    fallback_adapter = FallbackAdapterTester([fake1, fake2])
+
+    frame = rtc.AudioFrame(
+        b"\x00\x00" * 160, sample_rate=16000, num_channels=1, samples_per_channel=160
+    )
+    async with fallback_adapter.stream() as stream:
+        for _ in range(50):
+            stream.push_frame(frame)
+            await asyncio.sleep(0.01)
+        stream.end_input()
+
+        async for _ in stream:
+            pass
+
+    # the streams are ranked too, the first (interim) transcript was received
+    # end_time + stt_delay / 2 after the first frame
+    assert list(fallback_adapter._stats[0]._latencies) == [pytest.approx(0.3, abs=0.05)]
+
+    await fallback_adapter.aclose()
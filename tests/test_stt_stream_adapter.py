@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+
+from livekit import rtc
+from livekit.agents import stt, utils
+from livekit.agents.stt.stream_adapter import _stitch_transcripts
+from livekit.agents.types import APIConnectOptions, NotGivenOr
+from livekit.agents.vad import VAD, VADCapabilities, VADEvent, VADEventType, VADStream
+
+SAMPLE_RATE = 16000
+FRAME_DURATION = 0.02
+WORD_DURATION = 0.5
+WORDS = "my account number is four two seven one and the balance is three hundred".split()
+
+
+class _WordSTT(stt.STT):
+    """Recognizes the words whose marker is in the audio, slower with longer audio"""
+
+    def __init__(self, *, rtf: float) -> None:
+        super().__init__(capabilities=stt.STTCapabilities(streaming=False, interim_results=False))
+        self.rtf = rtf
+        self.requests: list[float] = []
+
+    async def _recognize_impl(
+        self,
+        buffer: utils.AudioBuffer,
+        *,
+        language: NotGivenOr[str],
+        conn_options: APIConnectOptions,
+    ) -> stt.SpeechEvent:
+        frame = utils.merge_frames(buffer)
+        self.requests.append(frame.duration)
+        await asyncio.sleep(frame.duration * self.rtf)
+
+        markers = np.frombuffer(frame.data, dtype=np.int16)
+        words = [WORDS[m - 1] for m in dict.fromkeys(markers.tolist()) if m]
+        return stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            alternatives=[stt.SpeechData(language="en", text=" ".join(words))],
+        )
+
+
+class _FrameVAD(VAD):
+    """Speech is any frame that isn't silent"""
+
+    def __init__(self) -> None:
+        super().__init__(capabilities=VADCapabilities(update_interval=FRAME_DURATION))
+
+    def stream(self) -> VADStream:
+        return _FrameVADStream(self)
+
+
+class _FrameVADStream(VADStream):
+    async def _main_task(self) -> None:
+        speech: list[rtc.AudioFrame] | None = None
+        async for frame in self._input_ch:
+            if isinstance(frame, self._FlushSentinel):
+                continue
+
+            speaking = bool(np.any(np.frombuffer(frame.data, dtype=np.int16)))
+            self._send(VADEventType.INFERENCE_DONE, [frame], speaking=speaking)
+            if speech is None and speaking:
+                speech = [frame]
+                self._send(VADEventType.START_OF_SPEECH, list(speech), speaking=True)
+            elif speech is not None:
+                speech.append(frame)
+                if not speaking:
+                    self._send(VADEventType.END_OF_SPEECH, speech, speaking=False)
+                    speech = None
+
+    def _send(self, type: VADEventType, frames: list[rtc.AudioFrame], *, speaking: bool) -> None:
+        self._event_ch.send_nowait(
+            VADEvent(
+                type=type,
+                samples_index=0,
+                timestamp=0.0,
+                speech_duration=0.0,
+                silence_duration=0.0,
+                frames=frames,
+                speaking=speaking,
+            )
+        )
+
+
+def _speech_frames() -> list[rtc.AudioFrame]:
+    samples_per_word = int(WORD_DURATION * SAMPLE_RATE)
+    audio = np.concatenate(
+        [np.full(samples_per_word, i + 1, dtype=np.int16) for i in range(len(WORDS))]
+        + [np.zeros(int(FRAME_DURATION * SAMPLE_RATE), dtype=np.int16)]
+    )
+    bstream = utils.audio.AudioByteStream(SAMPLE_RATE, 1, int(FRAME_DURATION * SAMPLE_RATE))
+    return bstream.write(audio.tobytes())
+
+
+async def _transcribe(adapter: stt.StreamAdapter) -> list[stt.SpeechEvent]:
+    stream = adapter.stream()
+    for frame in _speech_frames():
+        stream.push_frame(frame)
+        await asyncio.sleep(FRAME_DURATION / 20)  # 20x real-time
+    stream.end_input()
+
+    events = [
+        ev
+        async for ev in stream
+        if ev.type in (stt.SpeechEventType.INTERIM_TRANSCRIPT, stt.SpeechEventType.FINAL_TRANSCRIPT)
+    ]
+    await stream.aclose()
+    return events
+
+
+def test_stitch_transcripts() -> None:
+    assert _stitch_transcripts("", "my account") == "my account"
+    assert _stitch_transcripts("my account", "") == "my account"
+    assert _stitch_transcripts("my account number", "Number is four") == "my account number is four"
+    assert _stitch_transcripts("my account", "is four") == "my account is four"
+
+
+async def test_stream_adapter_interim_transcripts() -> None:
+    word_stt = _WordSTT(rtf=0.02)
+    adapter = stt.StreamAdapter(
+        stt=word_stt,
+        vad=_FrameVAD(),
+        interim_interval=1.0,
+        window_duration=2.0,
+        window_overlap=WORD_DURATION,
+    )
+    assert adapter.capabilities.interim_results
+
+    events = await _transcribe(adapter)
+    interims, final = events[:-1], events[-1]
+
+    assert final.type == stt.SpeechEventType.FINAL_TRANSCRIPT
+    assert final.alternatives[0].text == " ".join(WORDS)
+    assert len(interims) >= 3
+    for ev in interims:
+        assert ev.type == stt.SpeechEventType.INTERIM_TRANSCRIPT
+        assert " ".join(WORDS).startswith(ev.alternatives[0].text)
+
+    # the final request only covers the audio after the committed windows
+    speech_duration = len(WORDS) * WORD_DURATION
+    assert word_stt.requests[-1] < speech_duration / 2
+
+
+async def test_stream_adapter_final_only() -> None:
+    word_stt = _WordSTT(rtf=0.02)
+    events = await _transcribe(stt.StreamAdapter(stt=word_stt, vad=_FrameVAD()))
+
+    assert [ev.type for ev in events] == [stt.SpeechEventType.FINAL_TRANSCRIPT]
+    assert events[0].alternatives[0].text == " ".join(WORDS)
+    assert len(word_stt.requests) == 1
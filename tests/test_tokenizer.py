@@ -1,7 +1,9 @@
+import functools
+
 import pytest
 
 from livekit.agents import tokenize
-from livekit.agents.tokenize import basic
+from livekit.agents.tokenize import _basic_hyphenator, _basic_sent, basic
 from livekit.agents.tokenize._basic_paragraph import split_paragraphs
 from livekit.plugins import nltk
 
@@ -102,6 +104,42 @@ async def test_streamed_sent_tokenizer(tokenizer: tokenize.SentenceTokenizer, ex
         assert ev.token == expected[i]
 
 
+SEGMENTER_TEXT = TEXT + (
+    "Acme Inc. However the figures are AAPL 189.5 (+1.2%), MSFT 402.1 (-0.3%), "
+    "NVDA 875.3 (+2.9%) and R.T.C. He said e.g. Dr. Smith Jr. We will see " * 20
+)
+
+
+@pytest.mark.parametrize("retain_format", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 3, 7])
+async def test_streamed_sent_tokenizer_segmenter(retain_format: bool, chunk_size: int):
+    # the incremental segmenter must emit what split_sentences over the whole buffer would
+    def _stream(segmenter: bool) -> tokenize.SentenceStream:
+        return tokenize.BufferedSentenceStream(
+            tokenizer=functools.partial(
+                _basic_sent.split_sentences, min_sentence_len=20, retain_format=retain_format
+            ),
+            min_token_len=20,
+            min_ctx_len=10,
+            segmenter=(
+                _basic_sent.SentenceSegmenter(min_sentence_len=20, retain_format=retain_format)
+                if segmenter
+                else None
+            ),
+        )
+
+    results = []
+    for segmenter in (False, True):
+        stream = _stream(segmenter)
+        for i in range(0, len(SEGMENTER_TEXT), chunk_size):
+            stream.push_text(SEGMENTER_TEXT[i : i + chunk_size])
+        stream.end_input()
+        results.append([ev.token async for ev in stream])
+
+    assert len(results[0]) > 20
+    assert results[0] == results[1]
+
+
 WORDS_TEXT = "This is a test. Blabla another test! multiple consecutive spaces:     done"
 WORDS_EXPECTED = [
     "This",
@@ -255,6 +293,24 @@ def test_hyphenate_word():
         assert hyphenated == HYPHENATOR_EXPECTED[i]
 
 
+def test_compiled_hyphenator():
+    reference = _basic_hyphenator.Hyphenator(
+        _basic_hyphenator.PATTERNS, _basic_hyphenator.EXCEPTIONS
+    )
+    compiled = _basic_hyphenator.CompiledHyphenator(
+        _basic_hyphenator.PATTERNS, _basic_hyphenator.EXCEPTIONS, cache_size=16
+    )
+
+    words = [*HYPHENATOR_TEXT, *basic.WordTokenizer().tokenize(TEXT + WORDS_PUNCT_TEXT)]
+    words += ["Associates", "PRESENT", "hyphenation", "naïveté", "İstanbul", "x-ray", "1234567"]
+    for word in words * 2:
+        assert compiled.hyphenate_word(word) == reference.hyphenate_word(word)
+
+    info = compiled.cache_info()
+    assert info.hits > 0
+    assert info.currsize <= 16
+
+
 REPLACE_TEXT = (
     "This is a test. Hello world, I'm creating this agents..     framework. Once again "
     "framework.  A.B.C"
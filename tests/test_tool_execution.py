@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from livekit.agents import function_tool, memoize_tool
+from livekit.agents.llm import FunctionCall, ToolContext, ToolError
+from livekit.agents.llm.tool_context import get_tool_cache
+from livekit.agents.voice.events import RunContext
+from livekit.agents.voice.generation import _PythonOutput, perform_tool_executions
+from livekit.agents.voice.speech_handle import SpeechHandle
+
+
+class _Tools:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @function_tool(executor="thread")
+    @memoize_tool
+    def amortize(self, context: RunContext, principal: float, months: int) -> str:
+        """Amortization of a loan.
+
+        Args:
+            principal: Principal of the loan
+            months: Duration of the loan
+        """
+        self.calls += 1
+        time.sleep(0.2)
+        return f"{principal / months:.2f} on {threading.current_thread().name}"
+
+    @function_tool(timeout=0.1)
+    async def slow_lookup(self, symbol: str) -> str:
+        """Lookup of a ticker symbol.
+
+        Args:
+            symbol: The ticker symbol
+        """
+        await asyncio.sleep(1.0)
+        return symbol
+
+    @function_tool
+    def monthly_rate(self, annual_rate: float) -> str:
+        """Monthly rate of an annual interest rate.
+
+        Args:
+            annual_rate: The annual interest rate
+        """
+        self.calls += 1
+        return f"{annual_rate / 12:.2f} on {threading.current_thread().name}"
+
+
+@function_tool(executor="process")
+def worker_pid(offset: int) -> int:
+    """Pid of the process running the tool.
+
+    Args:
+        offset: Added to the pid
+    """
+    return os.getpid() + offset
+
+
+async def _execute(
+    tools: _Tools, calls: list[FunctionCall], *, extra_tools: list[Any] | None = None
+) -> list[_PythonOutput]:
+    async def _function_stream() -> AsyncIterator[FunctionCall]:
+        for call in calls:
+            yield call
+
+    session: Any = None  # the tools don't use the session
+    task, tool_output = perform_tool_executions(
+        session=session,
+        speech_handle=SpeechHandle.create(),
+        tool_ctx=ToolContext(
+            [tools.amortize, tools.slow_lookup, tools.monthly_rate, *(extra_tools or [])]
+        ),
+        tool_choice="auto",
+        function_stream=_function_stream(),
+    )
+    await task
+    return sorted(tool_output.output, key=lambda out: out.fnc_call.call_id)
+
+
+def _amortize_call(call_id: str, arguments: str) -> FunctionCall:
+    return FunctionCall(call_id=call_id, name="amortize", arguments=arguments)
+
+
+async def test_executor_tool_does_not_block_the_loop() -> None:
+    tools = _Tools()
+    get_tool_cache(_Tools.amortize).clear()  # type: ignore
+
+    ticks = 0
+
+    async def _ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(_ticker())
+    outputs = await _execute(
+        tools,
+        [
+            _amortize_call("1", '{"principal": 1200, "months": 12}'),
+            _amortize_call("2", '{"principal": 2400, "months": 12}'),
+        ],
+    )
+    ticker.cancel()
+
+    assert [out.exception for out in outputs] == [None, None]
+    assert outputs[0].output.startswith("100.00 on ")
+    assert outputs[1].output.startswith("200.00 on ")
+    assert "MainThread" not in outputs[0].output
+    assert ticks >= 10  # the loop kept running while the tools slept
+
+
+async def test_memoized_tool() -> None:
+    tools = _Tools()
+    cache = get_tool_cache(_Tools.amortize)
+    assert cache is not None
+    cache.clear()
+
+    # "1200" and 1200.0 validate to the same arguments
+    await _execute(tools, [_amortize_call("1", '{"principal": 1200, "months": 12}')])
+    start_time = time.perf_counter()
+    outputs = await _execute(tools, [_amortize_call("2", '{"months": 12, "principal": "1200"}')])
+    assert time.perf_counter() - start_time < 0.1
+
+    assert outputs[0].output.startswith("100.00")
+    assert tools.calls == 1
+    assert cache.hits == 1
+
+    # errors aren't cached
+    outputs = await _execute(tools, [_amortize_call("3", '{"principal": 1200, "months": 0}')])
+    assert isinstance(outputs[0].exception, ZeroDivisionError)
+    outputs = await _execute(tools, [_amortize_call("4", '{"principal": 1200, "months": 0}')])
+    assert isinstance(outputs[0].exception, ZeroDivisionError)
+    assert tools.calls == 3
+
+
+async def test_tool_timeout() -> None:
+    outputs = await _execute(
+        _Tools(), [FunctionCall(call_id="1", name="slow_lookup", arguments='{"symbol": "VT"}')]
+    )
+    assert isinstance(outputs[0].exception, ToolError)
+    assert "0.1 seconds" in outputs[0].exception.message
+
+
+async def test_regular_tool_without_executor() -> None:
+    tools = _Tools()
+    outputs = await _execute(
+        tools, [FunctionCall(call_id="1", name="monthly_rate", arguments='{"annual_rate": 6}')]
+    )
+
+    # regular functions run in a thread by default
+    assert outputs[0].exception is None
+    assert outputs[0].output.startswith("0.50 on ")
+    assert "MainThread" not in outputs[0].output
+    assert tools.calls == 1
+
+
+async def test_process_executor_tool() -> None:
+    outputs = await _execute(
+        _Tools(),
+        [FunctionCall(call_id="1", name="worker_pid", arguments='{"offset": 0}')],
+        extra_tools=[worker_pid],
+    )
+    assert outputs[0].exception is None
+    assert outputs[0].output != os.getpid()
+
+
+def test_executor_requires_regular_function() -> None:
+    with pytest.raises(ValueError):
+
+        @function_tool(executor="thread")
+        async def _lookup(symbol: str) -> str:
+            return symbol
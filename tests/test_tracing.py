@@ -0,0 +1,52 @@
+import json
+
+from livekit.agents.debug import Tracing, TracingHandle, tracing
+
+
+def test_tracing_ring_buffers():
+    handle = TracingHandle(max_events=3, max_spans=2)
+    graph = handle.add_graph(
+        title="vad", x_label="time", y_label="p", x_type="time", max_data_points=4
+    )
+    for i in range(10):
+        handle.log_event(f"event {i}", {"i": i})
+        handle.add_span(f"span {i}", 100.0 + i, 100.5 + i, category="llm")
+        graph.plot(100.0 + i, i / 10)
+
+    info = handle._export()
+    assert [ev["name"] for ev in info["events"]] == ["event 7", "event 8", "event 9"]
+    assert [span["name"] for span in info["spans"]] == ["span 8", "span 9"]
+    assert info["spans"][-1] == {
+        "name": "span 9",
+        "category": "llm",
+        "start": 109.0,
+        "duration": 0.5,
+        "args": {},
+    }
+    assert info["graph"][0]["data"] == [(100.0 + i, i / 10) for i in range(6, 10)]
+
+    trace = tracing._chrome_trace(info, pid=42, process_name="job test")
+    json.dumps(trace)
+    phases = [ev["ph"] for ev in trace["traceEvents"]]
+    assert phases.count("X") == 2 and phases.count("i") == 3 and phases.count("C") == 4
+    span = next(ev for ev in trace["traceEvents"] if ev["ph"] == "X")
+    assert span["ts"] == 108.0 * 1e6 and span["dur"] == 0.5 * 1e6 and span["pid"] == 42
+    thread_names = [
+        ev["args"]["name"] for ev in trace["traceEvents"] if ev["name"] == "thread_name"
+    ]
+    assert thread_names == ["llm"]
+
+
+def test_tracing_disabled():
+    handle = Tracing.with_handle("global")
+    num_spans = len(handle._spans)
+    try:
+        Tracing.set_enabled(False)
+        Tracing.add_span("llm_ttft", 0.0, 1.0, category="llm")
+        Tracing.log_event("ignored")
+        assert len(handle._spans) == num_spans
+    finally:
+        Tracing.set_enabled(True)
+
+    Tracing.add_span("llm_ttft", 0.0, 1.0, category="llm")
+    assert len(handle._spans) == num_spans + 1
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+from livekit import rtc
+from livekit.agents import tokenize, tts
+from livekit.agents.metrics import TTSMetrics
+from livekit.agents.tts.cache_adapter import _AudioCache, _default_options_key
+from livekit.agents.types import NOT_GIVEN, NotGivenOr
+
+from .fake_tts import FakeTTS
+
+GREETING = "Hello, I'm your financial advisor. How can I help you today?"
+
+
+async def _synthesize(cache_adapter: tts.CacheAdapter, text: str) -> rtc.AudioFrame:
+    async with cache_adapter.synthesize(text) as stream:
+        return await stream.collect()
+
+
+async def test_cache_adapter_synthesize() -> None:
+    fake_tts = FakeTTS(fake_audio_duration=1.0)
+    cache_adapter = tts.CacheAdapter(tts=fake_tts)
+    metrics: list[TTSMetrics] = []
+    cache_adapter.on("metrics_collected", metrics.append)
+
+    first = await _synthesize(cache_adapter, GREETING)
+    # the whitespaces are normalized
+    second = await _synthesize(cache_adapter, f"  {GREETING.replace(' ', '  ')}\n")
+
+    assert fake_tts.synthesize_ch.recv_nowait().input_text == GREETING
+    assert fake_tts.synthesize_ch.qsize() == 0
+    assert second.duration == first.duration
+    assert bytes(second.data) == bytes(first.data)
+
+    assert [m.cached for m in metrics] == [False, True]
+    cache_metrics = cache_adapter.cache_metrics()
+    assert (cache_metrics.hits, cache_metrics.misses) == (1, 1)
+    assert cache_metrics.hit_rate == 0.5
+
+
+async def test_cache_adapter_options_key() -> None:
+    fake_tts = FakeTTS(fake_audio_duration=0.5)
+    voice = "alloy"
+    cache_adapter = tts.CacheAdapter(tts=fake_tts, options_key=lambda _: voice)
+
+    await _synthesize(cache_adapter, GREETING)
+    voice = "echo"
+    await _synthesize(cache_adapter, GREETING)
+
+    # another voice, synthesized again
+    assert fake_tts.synthesize_ch.qsize() == 2
+    assert cache_adapter.cache_metrics().hits == 0
+
+
+@dataclass
+class _VoiceSettings:
+    stability: float
+    speed: NotGivenOr[float] = NOT_GIVEN
+
+
+@dataclass
+class _TTSOptions:
+    voice_id: str
+    voice_settings: _VoiceSettings
+    word_tokenizer: tokenize.WordTokenizer
+
+
+def test_default_options_key() -> None:
+    def _options_key(voice_id: str) -> str:
+        fake_tts = FakeTTS()
+        fake_tts._opts = _TTSOptions(  # type: ignore[attr-defined]
+            voice_id=voice_id,
+            voice_settings=_VoiceSettings(stability=0.5),
+            word_tokenizer=tokenize.basic.WordTokenizer(),
+        )
+        return _default_options_key(fake_tts)
+
+    # the same across instances (and processes), the repr of the tokenizer has its address
+    assert _options_key("alloy") == _options_key("alloy")
+    assert _options_key("alloy") != _options_key("echo")
+    assert "0x" not in _options_key("alloy")
+
+
+async def test_cache_adapter_disk(tmp_path) -> None:
+    fake_tts = FakeTTS(fake_audio_duration=1.0)
+    disk_dir = str(tmp_path)
+
+    first = await _synthesize(tts.CacheAdapter(tts=fake_tts, disk_dir=disk_dir), GREETING)
+    assert len(os.listdir(disk_dir)) == 1
+
+    # another job process of the worker, with its own memory cache
+    cache_adapter = tts.CacheAdapter(tts=fake_tts, disk_dir=disk_dir)
+    second = await _synthesize(cache_adapter, GREETING)
+
+    assert fake_tts.synthesize_ch.qsize() == 1
+    assert bytes(second.data) == bytes(first.data)
+    assert cache_adapter.cache_metrics().hits == 1
+
+
+async def test_cache_adapter_stream() -> None:
+    fake_tts = FakeTTS(fake_audio_duration=0.5)
+    cache_adapter = tts.CacheAdapter(tts=fake_tts)
+
+    for _ in range(2):
+        async with cache_adapter.stream() as stream:
+            stream.push_text("Let me calculate that for you. The monthly payment is 250 dollars.")
+            stream.end_input()
+            audio_duration = sum([ev.frame.duration async for ev in stream])
+
+        assert audio_duration >= 1.0
+
+    # only the sentences of the first reply were synthesized
+    assert fake_tts.synthesize_ch.qsize() == 2
+    assert cache_adapter.cache_metrics().hits == 2
+
+
+async def test_audio_cache_disk_eviction(tmp_path) -> None:
+    cache = _AudioCache(max_memory_size=1024, disk_dir=str(tmp_path), max_disk_size=2048)
+    for i in range(3):
+        await cache.put(f"key{i}", bytes(1000), latency=0.1)
+        os.utime(tmp_path / f"key{i}.pcm", (i, i))
+
+    await cache.put("key3", bytes(1000), latency=0.1)
+
+    # the least recently used files are removed, a single entry fits in memory
+    assert sorted(os.listdir(tmp_path)) == ["key2.pcm", "key3.pcm"]
+    assert await cache.get("key3") is not None
+    assert await cache.get("key0") is None
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import time
 
 import pytest
 
@@ -11,7 +12,7 @@ from livekit.agents.tts import TTS, AvailabilityChangedEvent, FallbackAdapter
 from livekit.agents.tts.tts import SynthesizedAudio, SynthesizeStream
 from livekit.agents.utils.aio.channel import ChanEmpty
 
-from .fake_tts import FakeTTS
+from .fake_tts import FakeTTS, FakeTTSResponse
 
 
 class FallbackAdapterTester(FallbackAdapter):
@@ -21,11 +22,13 @@ class FallbackAdapterTester(FallbackAdapter):
         *,
         max_retry_per_tts: int = 1,  # only retry once by default
         sample_rate: int | None = None,
+        hedge_after: float | None = None,
     ) -> None:
         super().__init__(
             tts,
             max_retry_per_tts=max_retry_per_tts,
             sample_rate=sample_rate,
+            hedge_after=hedge_after,
         )
 
         self.on("tts_availability_changed", self._on_tts_availability_changed)
@@ -260,3 +263,84 @@ async def test_timeout():
     assert await asyncio.wait_for(fake2.stream_ch.recv(), 1.0)
 
     await fallback_adapter.aclose()
+
+
+async def test_tts_hedged_synthesize() -> None:
+    fake1 = FakeTTS(fake_audio_duration=1.0, fake_timeout=1.0)
+    fake2 = FakeTTS(fake_audio_duration=2.0)
+
+    fallback_adapter = FallbackAdapterTester([fake1, fake2], hedge_after=0.1)
+
+    start_time = time.perf_counter()
+    async with fallback_adapter.synthesize("hello test") as stream:
+        frames = [data.frame async for data in stream]
+
+    # the audio of the fast TTS only
+    assert rtc.combine_audio_frames(frames).duration == pytest.approx(2.0, abs=0.02)
+    assert time.perf_counter() - start_time < 0.5
+
+    assert fake1.synthesize_ch.recv_nowait()
+    assert fake2.synthesize_ch.recv_nowait()
+
+    # the slow TTS was cancelled, not failed
+    with pytest.raises(ChanEmpty):
+        fallback_adapter.availability_changed_ch(fake1).recv_nowait()
+
+    for _ in range(5):
+        async with fallback_adapter.synthesize("hello test") as stream:
+            async for _ in stream:
+                pass
+
+    # the fast TTS is ranked first once it has enough samples
+    assert fallback_adapter._provider_order() == [1, 0]
+
+    await fallback_adapter.aclose()
+
+
+async def test_tts_stream_latency() -> None:
+    fake1 = FakeTTS(fake_exception=APIConnectionError("fake1 failed"))
+    fake2 = FakeTTS(
+        fake_responses=[
+            FakeTTSResponse(input="hello test", audio_duration=0.5, ttfb=0.2, duration=0.3)
+        ]
+    )
+
+    fallback_adapter = FallbackAdapterTester([fake1, fake2])
+
+    async with fallback_adapter.stream() as stream:
+        # the time waiting for the text isn't part of the latency
+        await asyncio.sleep(0.2)
+        stream.push_text("hello test")
+        stream.end_input()
+
+        async for _ in stream:
+            pass
+
+    # the streams are ranked too, fake2 received the text when fake1 failed
+    assert list(fallback_adapter._stats[1]._latencies) == [pytest.approx(0.2, abs=0.05)]
+    assert fallback_adapter._stats[0].availability == 0.0
+
+    await fallback_adapter.aclose()
+
+
+async def test_tts_hedged_cancelled_resampler() -> None:
+    fake1 = FakeTTS(fake_audio_duration=1.0, sample_rate=24000)
+    fake2 = FakeTTS(fake_audio_duration=1.0, sample_rate=48000, fake_timeout=1.0)
+
+    fallback_adapter = FallbackAdapterTester([fake1, fake2], hedge_after=0.5)
+
+    async def _synthesized_samples() -> int:
+        async with fallback_adapter.synthesize("hello test") as stream:
+            return sum([data.frame.samples_per_channel async for data in stream])
+
+    expected_samples = await _synthesized_samples()
+
+    # the primary is cancelled after some audio, before its resampler is flushed
+    async with fallback_adapter.synthesize("hello test") as stream:
+        async for _ in stream:
+            break
+
+    # no leftover samples of the cancelled request
+    assert await _synthesized_samples() == expected_samples
+
+    await fallback_adapter.aclose()
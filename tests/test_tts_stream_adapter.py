@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import numpy as np
+
+from livekit.agents import tts, utils
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, APIConnectOptions
+
+SAMPLE_RATE = 24000
+SENTENCES = [
+    "The market closed higher today after a quiet session.",
+    "Analysts expect the rate decision to be announced on Wednesday.",
+    "Bond yields were mostly unchanged over the week.",
+]
+
+
+class _MarkerTTS(tts.TTS):
+    """Non-streaming TTS filling the audio of each sentence with its index"""
+
+    def __init__(self, latencies: dict[str, float], *, audio_duration: float = 0.2) -> None:
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+        )
+        self.latencies = latencies
+        self.audio_duration = audio_duration
+        self.active = 0
+
+    def synthesize(
+        self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> _MarkerStream:
+        return _MarkerStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class _MarkerStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        assert isinstance(self._tts, _MarkerTTS)
+        output_emitter.initialize(
+            request_id=utils.shortuuid("marker_tts_"),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            mime_type="audio/pcm",
+        )
+
+        self._tts.active += 1
+        try:
+            await asyncio.sleep(self._tts.latencies[self._input_text])
+            marker = SENTENCES.index(self._input_text) + 1
+            num_samples = int(SAMPLE_RATE * self._tts.audio_duration)
+            output_emitter.push(np.full(num_samples, marker, dtype=np.int16).tobytes())
+            output_emitter.flush()
+        finally:
+            self._tts.active -= 1
+
+
+async def test_stream_adapter_lookahead() -> None:
+    marker_tts = _MarkerTTS(dict(zip(SENTENCES, [0.3, 0.1, 0.2])))
+    adapter = tts.StreamAdapter(tts=marker_tts, lookahead=2)
+
+    start_time = time.perf_counter()
+    async with adapter.stream() as stream:
+        stream.push_text(" ".join(SENTENCES))
+        stream.end_input()
+
+        markers: list[int] = []
+        async for ev in stream:
+            for marker in np.frombuffer(ev.frame.data, dtype=np.int16):
+                # skip the silence padding the frames at each flush
+                if marker and (not markers or markers[-1] != marker):
+                    markers.append(int(marker))
+
+    # sentences synthesized concurrently, played in order
+    assert markers == [1, 2, 3]
+    assert time.perf_counter() - start_time < 0.5  # 0.6s one sentence at a time
+
+
+async def test_stream_adapter_lookahead_interrupted() -> None:
+    marker_tts = _MarkerTTS(dict.fromkeys(SENTENCES, 0.5))
+    adapter = tts.StreamAdapter(tts=marker_tts, lookahead=2)
+
+    stream = adapter.stream()
+    stream.push_text(" ".join(SENTENCES))
+    stream.end_input()
+    await asyncio.sleep(0.2)
+    assert marker_tts.active == 3
+
+    await stream.aclose()
+    assert marker_tts.active == 0
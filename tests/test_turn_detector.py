@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from livekit.agents import llm
+from livekit.agents.metrics import CacheMetrics
+from livekit.plugins.turn_detector import base
+from livekit.plugins.turn_detector.english import _EUORunnerEn
+
+
+class _FakeTokenizer:
+    """One token id per character"""
+
+    pad_token_id = 0
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def __call__(self, text: str, add_special_tokens: bool = False) -> dict[str, list[int]]:
+        self.calls.append(text)
+        return {"input_ids": [ord(c) for c in text]}
+
+
+class _FakeSession:
+    """End of turn probability of 0.5 for every token"""
+
+    def run(self, output_names: None, inputs: dict[str, np.ndarray]) -> list[np.ndarray]:
+        return [np.full(inputs["input_ids"].shape, 0.5, dtype=np.float32)]
+
+
+class _FakeInferenceExecutor:
+    def __init__(self, eou_probability: float) -> None:
+        self._eou_probability = eou_probability
+        self.calls = 0
+
+    async def do_inference(self, method: str, data: bytes, timeout: float | None = None) -> bytes:
+        self.calls += 1
+        return json.dumps({"eou_probability": self._eou_probability}).encode()
+
+
+class _EOUModelTester(base.EOUModelBase):
+    def _inference_method(self) -> str:
+        return _EUORunnerEn.INFERENCE_METHOD
+
+
+def _make_runner() -> tuple[_EUORunnerEn, _FakeTokenizer]:
+    runner = _EUORunnerEn()
+    tokenizer = _FakeTokenizer()
+    runner._tokenizer = tokenizer
+    return runner, tokenizer
+
+
+def test_prediction_cache_lru() -> None:
+    cache = base._PredictionCache(max_size=2, ttl=30.0)
+    cache.put("a", 0.1, latency=0.1)
+    cache.put("b", 0.2, latency=0.1)
+    assert cache.get("a") == 0.1
+
+    # b is the least recently used
+    cache.put("c", 0.3, latency=0.1)
+    assert cache.get("b") is None
+    assert cache.get("a") == 0.1
+    assert cache.get("c") == 0.3
+
+    cache_metrics = cache.metrics("test")
+    assert (cache_metrics.hits, cache_metrics.misses) == (3, 1)
+    assert cache_metrics.hit_rate == 0.75
+    assert cache_metrics.saved_latency == pytest.approx(0.3)
+
+
+def test_prediction_cache_ttl() -> None:
+    cache = base._PredictionCache(max_size=2, ttl=0.01)
+    cache.put("a", 0.1, latency=0.1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.metrics("test").saved_latency == 0.0
+
+
+def test_tokenize_reuses_turns() -> None:
+    runner, tokenizer = _make_runner()
+    previous = "<|im_start|>assistant\nhow can I help?<|im_end|>"
+    text = f"{previous}<|im_start|>user\nI'd like"
+
+    assert runner._tokenize(text) == [ord(c) for c in text]
+    tokenizer.calls.clear()
+
+    # an interim transcript, only the text of the new user turn is tokenized
+    text = f"{previous}<|im_start|>user\nI'd like to book"
+    assert runner._tokenize(text) == [ord(c) for c in text]
+    assert tokenizer.calls == ["<|im_start|>user\nI'd like to book"]
+
+
+def test_tokenize_keeps_last_tokens() -> None:
+    runner, _ = _make_runner()
+    text = "<|im_start|>user\n" + "".join(chr(ord("a") + i % 26) for i in range(300))
+
+    input_ids = runner._tokenize(text)
+    assert len(input_ids) == base.MAX_HISTORY_TOKENS
+    assert input_ids == [ord(c) for c in text][-base.MAX_HISTORY_TOKENS :]
+
+
+def test_run_batch_invalid_request(monkeypatch) -> None:
+    runner, _ = _make_runner()
+    runner._session = _FakeSession()
+    monkeypatch.setattr(runner, "_format_chat_ctx", lambda chat_ctx: chat_ctx[-1]["content"])
+
+    valid = json.dumps({"chat_ctx": [{"role": "user", "content": "hello"}]}).encode()
+    results = runner.run_batch([valid, json.dumps({}).encode(), valid])
+
+    # only the request without chat_ctx failed
+    assert isinstance(results[1], ValueError)
+    for result in (results[0], results[2]):
+        assert isinstance(result, bytes)
+        assert json.loads(result)["eou_probability"] == 0.5
+        assert json.loads(result)["batch_size"] == 2
+
+
+async def test_cache_metrics_collected(monkeypatch, tmp_path) -> None:
+    languages = tmp_path / "languages.json"
+    languages.write_text(json.dumps({"en": {"threshold": 0.1}}))
+    monkeypatch.setattr(base, "_download_from_hf_hub", lambda *args, **kwargs: str(languages))
+
+    executor = _FakeInferenceExecutor(eou_probability=0.9)
+    model = _EOUModelTester(inference_executor=executor)  # type: ignore[arg-type]
+    collected: list[CacheMetrics] = []
+    model.on("metrics_collected", collected.append)
+
+    chat_ctx = llm.ChatContext()
+    chat_ctx.add_message(role="user", content="I'd like to book a table")
+    assert await model.predict_end_of_turn(chat_ctx) == 0.9
+    assert await model.predict_end_of_turn(chat_ctx) == 0.9
+
+    assert executor.calls == 1
+    assert [(m.hits, m.misses) for m in collected] == [(0, 1), (1, 1)]
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import random
+from dataclasses import asdict
+
+from livekit.agents.ipc import channel, proto
+from livekit.agents.metrics import (
+    EOUMetrics,
+    LatencyHistogram,
+    LLMMetrics,
+    TTSMetrics,
+    TurnLatency,
+    TurnLatencyCollector,
+)
+
+
+def _eou(
+    speech_id: str,
+    delay: float = 0.2,
+    preemptive_lead_time: float = 0.0,
+    preemptive_tts: bool = False,
+) -> EOUMetrics:
+    return EOUMetrics(
+        timestamp=1.0,
+        end_of_utterance_delay=delay,
+        transcription_delay=0.1,
+        on_user_turn_completed_delay=0.05,
+        speech_id=speech_id,
+        preemptive_hit=preemptive_lead_time > 0,
+        preemptive_lead_time=preemptive_lead_time,
+        preemptive_tts=preemptive_tts,
+    )
+
+
+def _llm(speech_id: str, ttft: float = 0.3) -> LLMMetrics:
+    return LLMMetrics(
+        label="llm",
+        request_id="req",
+        timestamp=1.5,
+        duration=1.0,
+        ttft=ttft,
+        cancelled=False,
+        completion_tokens=10,
+        prompt_tokens=100,
+        prompt_cached_tokens=0,
+        total_tokens=110,
+        tokens_per_second=10.0,
+        speech_id=speech_id,
+    )
+
+
+def _tts(speech_id: str, ttfb: float = 0.15) -> TTSMetrics:
+    return TTSMetrics(
+        label="tts",
+        request_id="req",
+        timestamp=1.8,
+        ttfb=ttfb,
+        duration=1.0,
+        audio_duration=2.0,
+        cancelled=False,
+        characters_count=20,
+        streamed=True,
+        speech_id=speech_id,
+    )
+
+
+def test_latency_histogram_percentiles():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(-1.0, 0.8) for _ in range(10000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    values.sort()
+    for q in (0.5, 0.9, 0.99):
+        expected = values[int(q * len(values)) - 1]
+        assert abs(histogram.percentile(q) - expected) / expected < 0.02
+
+    assert histogram.count == len(values)
+    assert histogram.percentile(1.0) == values[-1]
+    assert LatencyHistogram().percentile(0.5) == 0.0
+
+
+def test_turn_latency_collector():
+    turns: list[TurnLatency] = []
+    collector = TurnLatencyCollector(on_turn=turns.append)
+
+    # the metrics of a turn arrive in any order, only the first LLM/TTS requests count
+    collector(_llm("speech_1"))
+    collector(_eou("speech_1"))
+    collector(_tts("speech_1"))
+    collector(_llm("speech_1", ttft=5.0))
+    assert len(turns) == 1
+    assert turns[0].speech_id == "speech_1"
+    assert abs(turns[0].response_latency - (0.2 + 0.05 + 0.3 + 0.15)) < 1e-9
+
+    # speeches without a user turn (e.g session.say) never complete
+    collector(_tts("speech_2"))
+    collector(_eou("speech_3"))
+    collector(_tts("speech_3"))
+    collector(_llm("speech_3", ttft=0.5))
+    assert [turn.speech_id for turn in turns] == ["speech_1", "speech_3"]
+
+    summary = collector.summary()
+    assert summary["llm_ttft"]["count"] == 2
+    assert abs(summary["llm_ttft"]["max"] - 0.5) < 1e-9
+    assert 0.3 <= summary["llm_ttft"]["p50"] <= 0.31
+
+
+def test_turn_latency_preemptive_generation():
+    turns: list[TurnLatency] = []
+    collector = TurnLatencyCollector(on_turn=turns.append)
+    turn_options = [(0.0, False), (0.2, False), (1.0, True), (1.0, False), (0.0, False)]
+    for i, (lead_time, preemptive_tts) in enumerate(turn_options):
+        collector(
+            _eou(f"speech_{i}", preemptive_lead_time=lead_time, preemptive_tts=preemptive_tts)
+        )
+        collector(_llm(f"speech_{i}"))
+        collector(_tts(f"speech_{i}"))
+
+    assert abs(turns[0].response_latency - (0.2 + 0.05 + 0.3 + 0.15)) < 1e-9
+    assert abs(turns[1].response_latency - (0.2 + 0.05 + 0.3 + 0.15 - 0.2)) < 1e-9
+    # the generation started 1s before the end of turn, the first audio was already ready
+    assert abs(turns[2].response_latency - (0.2 + 0.05)) < 1e-9
+    # without preemptive_tts, the tts only starts at the end of turn
+    assert abs(turns[3].saved_latency - 0.3) < 1e-9
+    assert abs(turns[3].response_latency - (0.2 + 0.05 + 0.15)) < 1e-9
+
+    summary = collector.summary()["preemptive_saved_latency"]
+    assert summary["hit_rate"] == 0.6
+    assert summary["count"] == 3
+    assert abs(summary["max"] - (0.3 + 0.15)) < 1e-9
+    assert abs(summary["mean"] - (0.2 + 0.45 + 0.3) / 3) < 1e-9
+
+
+def test_turn_latency_collector_bounded():
+    collector = TurnLatencyCollector(max_pending_turns=4)
+    for i in range(1000):
+        collector(_eou(f"speech_{i}"))
+
+    assert len(collector._pending) == 4
+    collector(_llm("speech_999"))
+    collector(_tts("speech_999"))
+    assert collector.last_turn is not None and collector.last_turn.speech_id == "speech_999"
+    assert len(collector._pending) == 3
+
+
+def test_turn_latency_report_roundtrip():
+    turn = TurnLatency(
+        speech_id="speech_1",
+        timestamp=1.0,
+        end_of_utterance_delay=0.2,
+        transcription_delay=0.1,
+        on_user_turn_completed_delay=0.05,
+        llm_ttft=0.3,
+        tts_ttfb=0.15,
+        preemptive_hit=True,
+        preemptive_lead_time=0.4,
+        preemptive_tts=True,
+    )
+    data = channel._write_message(proto.TurnLatencyReport(**asdict(turn)))
+    msg = channel._read_message(data, proto.IPC_MESSAGES)
+    assert isinstance(msg, proto.TurnLatencyReport)
+    assert TurnLatency(**asdict(msg)) == turn
@@ -1,5 +1,9 @@
+import asyncio
+
+import numpy as np
 import pytest
 
+from livekit import rtc
 from livekit.agents import vad
 from livekit.plugins import silero
 
@@ -83,3 +87,128 @@ async def test_file_vad(sample_rate):
 
     assert start_of_speech_i > 0, "no start of speech detected"
     assert start_of_speech_i == end_of_speech_i, "start and end of speech mismatch"
+
+
+async def test_batched_engine_matches_single_stream():
+    rng = np.random.default_rng(0)
+    num_streams, num_windows = 5, 20
+    engine = silero.batched_engine.BatchedVADEngine(
+        session=silero.onnx_model.new_inference_session(force_cpu=True), sample_rate=16000
+    )
+    windows = rng.uniform(-0.5, 0.5, (num_streams, num_windows, 512)).astype(np.float32)
+
+    # reference: one session call per window, carrying the state and context of each stream
+    expected = np.zeros((num_streams, num_windows))
+    for s in range(num_streams):
+        state = np.zeros((2, 1, 128), dtype=np.float32)
+        context = np.zeros((1, 64), dtype=np.float32)
+        for w in range(num_windows):
+            x = np.concatenate([context, windows[s, w][None, :]], axis=1)
+            out, state = engine._sess.run(
+                None, {"input": x, "state": state, "sr": np.array(16000, dtype=np.int64)}
+            )
+            context = x[:, -64:]
+            expected[s, w] = out.item()
+
+    models = [engine.model() for _ in range(num_streams)]
+
+    async def _run(s: int) -> list[float]:
+        return [await models[s].infer(windows[s, w]) for w in range(num_windows)]
+
+    results = await asyncio.gather(*(_run(s) for s in range(num_streams)))
+    for model in models:
+        model.close()
+
+    assert np.allclose(np.array(results), expected, atol=1e-5)
+    assert engine.avg_batch_size > 1
+    assert engine.active_streams == 0
+
+
+class _LocalInferenceExecutor:
+    def __init__(self, runner: silero.inference._VADRunner) -> None:
+        self._runner = runner
+
+    async def do_inference(self, method: str, data: bytes, *, timeout: float | None = None):
+        assert method == silero.inference._VADRunner.INFERENCE_METHOD
+        return self._runner.run(data)
+
+
+async def test_inference_process_runner_matches_single_stream():
+    rng = np.random.default_rng(0)
+    num_streams, num_windows = 3, 20
+    runner = silero.inference._VADRunner()
+    runner.initialize()
+    windows = rng.uniform(-0.5, 0.5, (num_streams, num_windows, 512)).astype(np.float32)
+
+    # reference: one session call per window, like the batched engine the state is carried over
+    expected = np.zeros((num_streams, num_windows))
+    for s in range(num_streams):
+        state = np.zeros((2, 1, 128), dtype=np.float32)
+        context = np.zeros((1, 64), dtype=np.float32)
+        for w in range(num_windows):
+            x = np.concatenate([context, windows[s, w][None, :]], axis=1)
+            out, state = runner._session.run(
+                None, {"input": x, "state": state, "sr": np.array(16000, dtype=np.int64)}
+            )
+            context = x[:, -64:]
+            expected[s, w] = out.item()
+
+    executor = _LocalInferenceExecutor(runner)
+    models = [
+        silero.inference.InferenceProcModel(executor=executor, sample_rate=16000)
+        for _ in range(num_streams)
+    ]
+
+    # the windows of all the streams are sent in the same batch
+    results = np.zeros((num_streams, num_windows))
+    for w in range(num_windows):
+        batch = [m._encode(silero.inference._OP_INFER, windows[s, w]) for s, m in enumerate(models)]
+        for s, data in enumerate(runner.run_batch(batch)):
+            results[s, w] = silero.inference._RESULT.unpack(data)[0]
+
+    assert np.allclose(results, expected, atol=1e-5)
+    assert len(runner._streams) == num_streams
+
+    for model in models:
+        model.close()
+        await model._close_task
+    assert not runner._streams
+
+
+class _SlowInferenceExecutor(_LocalInferenceExecutor):
+    def __init__(self, runner: silero.inference._VADRunner, *, slow_windows: set[int]) -> None:
+        super().__init__(runner)
+        self._slow_windows = slow_windows
+        self._windows = 0
+
+    async def do_inference(self, method: str, data: bytes, *, timeout: float | None = None):
+        op = silero.inference._HEADER.unpack_from(data)[0]
+        if op == silero.inference._OP_INFER:
+            self._windows += 1
+            if self._windows in self._slow_windows:
+                await asyncio.sleep(1.0)
+            elif self._windows == 5:
+                raise RuntimeError("inference of lk_silero_vad failed: deadline exceeded")
+
+        return await super().do_inference(method, data, timeout=timeout)
+
+
+async def test_inference_process_timeout_skips_window(monkeypatch):
+    monkeypatch.setattr(silero.inference, "INFERENCE_TIMEOUT", 0.05)
+    silero.VAD.register_inference_runner()
+    runner = silero.inference._VADRunner()
+    runner.initialize()
+
+    executor = _SlowInferenceExecutor(runner, slow_windows={3})
+    inference_vad = silero.VAD.load(inference_process=True, inference_executor=executor)
+    stream = inference_vad.stream()
+
+    rng = np.random.default_rng(0)
+    samples = (rng.uniform(-0.3, 0.3, 16000) * 32767).astype(np.int16)
+    stream.push_frame(rtc.AudioFrame(samples.tobytes(), 16000, 1, len(samples)))
+    stream.end_input()
+
+    # the stream survives the timed out and expired windows, every window is reported
+    windows = [ev async for ev in stream if ev.type == vad.VADEventType.INFERENCE_DONE]
+    assert len(windows) == 16000 // 512
+    await stream.aclose()